@@ -1,27 +1,74 @@
-"""Benchmark pure-Python examples vs Cython-compiled equivalents."""
+"""Benchmark pure-Python examples vs Cython-compiled equivalents.
+
+Each measurement runs in separate worker processes with warmup and calibrated
+loop counts (see ``recython.benchmarks.measure_case``) and reports the median
+per-call time with a 95% confidence interval, plus the peak traced allocation
+and allocator blocks left alive by one call.  Pass ``--json PATH`` to also
+write every statistic as JSON, and ``--scaling`` to time ``advance_system`` and
+``fit_multiple_regression`` across input sizes with a fitted complexity.
+"""
 
 from __future__ import annotations
 
-import sys
-import timeit
+import argparse
+import json
+import os
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent / "examples" / "src_fuzzy_arithmetic"))
-sys.path.insert(0, str(Path(__file__).parent.parent / "examples" / "src_multiple_regression"))
-sys.path.insert(0, str(Path(__file__).parent.parent / "examples" / "src_orbital_mechanics"))
-sys.path.insert(0, str(Path(__file__).parent / "fuzzy_arithmetic_cy"))
-sys.path.insert(0, str(Path(__file__).parent / "multiple_regression_cy"))
-sys.path.insert(0, str(Path(__file__).parent / "orbital_mechanics_cy"))
-
-
+from recython.benchmarks import format_bytes, measure_case, measure_memory
+from recython.jobs import BenchmarkCase, BenchRequest
+from recython.scaling import render_scaling_chart, scaling_curve
+
+ROOT = Path(__file__).parent
+SEARCH_PATHS = [
+    ROOT.parent / "examples" / "src_fuzzy_arithmetic",
+    ROOT.parent / "examples" / "src_multiple_regression",
+    ROOT.parent / "examples" / "src_orbital_mechanics",
+    ROOT / "fuzzy_arithmetic_cy",
+    ROOT / "multiple_regression_cy",
+    ROOT / "orbital_mechanics_cy",
+]
+WORKER_ENV = {"PYTHONPATH": os.pathsep.join(str(path) for path in SEARCH_PATHS)}
+SETTINGS = BenchRequest(processes=3, warmup=1, min_time=0.05)
 REPS = 5
+RESULTS: dict[str, dict[str, object]] = {}
+
+# --scaling grids: (size variable, sizes, pure import, compiled import, inputs, statement).
+# One step / one epoch per call keeps the largest sizes affordable in pure Python.
+SCALING_SETTINGS = BenchRequest(processes=2, warmup=0, min_time=0.05)
+SCALING = {
+    "advance_system": (
+        "bodies",
+        [3, 10, 30, 100, 300, 1000],
+        "from orbital_mechanics.__main__ import Body, advance_system",
+        "from orbital_mechanics_cy import Body, advance_system",
+        "system = [Body(1.9885e30 if i == 0 else 5.972e24, 1.0e9 * i, 0.0, 0.0, 29780.0 if i else 0.0)"
+        " for i in range(bodies)]",
+        "advance_system(system, 3600.0, 1)",
+    ),
+    "fit_multiple_regression": (
+        "samples",
+        [100, 1000, 10000, 100000, 1000000],
+        "from multiple_regression.__main__ import build_dataset, fit_multiple_regression",
+        "from multiple_regression_cy import build_dataset, fit_multiple_regression",
+        "features, targets = build_dataset(samples, 5)",
+        "fit_multiple_regression(features, targets, epochs=1)",
+    ),
+}
 
 
 def bench(label: str, stmt: str, setup: str, reps: int = REPS) -> float:
-    times = timeit.repeat(stmt=stmt, setup=setup, repeat=reps, number=1)
-    best = min(times)
-    print(f"  {label:45s}  {best:.4f}s")
-    return best
+    case = BenchmarkCase(name=label.strip(), stmt=stmt, setup=setup, repeat=reps)
+    stats = measure_case(case, package_name="", search_path=[], bench=SETTINGS, env=WORKER_ENV)
+    memory = measure_memory(case, package_name="", search_path=[], env=WORKER_ENV)
+    RESULTS[f"{setup.split()[1]}: {stmt}"] = {"timing": stats, "memory": memory}
+    margin = (stats["ci_high"] - stats["ci_low"]) / 2
+    print(
+        f"  {label:45s}  {stats['median']:.6f}s  (±{margin:.6f}s, {stats['kept']}/{stats['samples']} samples)  "
+        f"peak alloc {format_bytes(memory['tracemalloc_peak_bytes'])}, "
+        f"live blocks {memory['live_blocks_delta']:+d}"
+    )
+    return float(stats["median"])
 
 
 def benchmark_fuzzy() -> tuple[float, float]:
@@ -75,8 +122,40 @@ def benchmark_orbital() -> tuple[float, float]:
     return t_py, t_cy
 
 
-def main() -> None:
-    print("Running benchmarks (best of 5 runs each)...")
+def benchmark_scaling(max_size: int | None) -> list[dict[str, object]]:
+    print("\n=== Scaling ===")
+    curves = []
+    for name, (axis, sizes, import_py, import_cy, inputs, stmt) in SCALING.items():
+        points = []
+        for size in sizes:
+            if max_size is not None and size > max_size:
+                continue
+            seconds = {}
+            for side, imports in (("pure", import_py), ("compiled", import_cy)):
+                case = BenchmarkCase(name=name, stmt=stmt, setup=f"{axis} = {size}\n{imports}\n{inputs}", repeat=3)
+                stats = measure_case(case, package_name="", search_path=[], bench=SCALING_SETTINGS, env=WORKER_ENV)
+                seconds[side] = float(stats["median"])
+            points.append(
+                {
+                    "size": size,
+                    "ok": True,
+                    "pure_seconds": seconds["pure"],
+                    "compiled_seconds": seconds["compiled"],
+                    "speedup": seconds["pure"] / seconds["compiled"] if seconds["compiled"] > 0 else None,
+                }
+            )
+        curves.append(scaling_curve(name, axis, points))
+    print(render_scaling_chart(curves), end="")
+    return curves
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", type=Path, help="Also write every timing statistic as JSON to this path.")
+    parser.add_argument("--scaling", action="store_true", help="Also run each workload across a grid of input sizes.")
+    parser.add_argument("--max-size", type=int, help="Skip scaling sizes above this.")
+    args = parser.parse_args(argv)
+    print(f"Running benchmarks ({SETTINGS.processes} worker processes x {REPS} samples each)...")
 
     fuzzy_py, fuzzy_cy = benchmark_fuzzy()
     reg_py, reg_cy = benchmark_regression()
@@ -90,7 +169,14 @@ def main() -> None:
     ]
     for name, t_py, t_cy in results:
         speedup = t_py / t_cy if t_cy > 0 else float("inf")
-        print(f"  {name:25s}  Python={t_py:.4f}s  Cython={t_cy:.4f}s  Speedup={speedup:.2f}x")
+        print(f"  {name:25s}  Python={t_py:.6f}s  Cython={t_cy:.6f}s  Speedup={speedup:.2f}x")
+
+    if args.scaling:
+        RESULTS["scaling"] = {"curves": benchmark_scaling(args.max_size)}
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(RESULTS, indent=2), encoding="utf-8")
+        print(f"\nWrote {args.json}")
 
 
 if __name__ == "__main__":
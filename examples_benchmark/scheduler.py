@@ -0,0 +1,146 @@
+"""Load-test the conversion scheduler against the simulated provider.
+
+Builds a throwaway package of ``--files`` modules and converts it once per
+``--concurrency`` setting with ``provider = "simulated"``: every model call
+sleeps for a sampled latency and answers with one of the ``*_cy/*.pyx``
+sources next to this script, optionally failing with injected 429 and 500
+errors.  Validation is switched off so the numbers measure scheduling, retries
+and backoff rather than the compilers.  Reports throughput and file-latency
+percentiles per setting; ``--json PATH`` also writes them as JSON.
+``--hedge-percentile`` turns on request hedging at that latency percentile
+and adds the number of hedged calls, the extra requests paid for the tail.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from recython.config import RecythonConfig
+from recython.engine import build_run_request, execute_run_with_pack
+from recython.hedging import TRACKERS
+from recython.jobs import HedgeRequest, SimulatedRequest, ValidationRequest
+from recython.prompts import load_prompt_pack
+from recython.ratelimit import LIMITERS
+
+ROOT = Path(__file__).parent
+RESPONSES = sorted(ROOT.glob("*_cy/*.pyx"))
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def run_setting(
+    workdir: Path, files: int, concurrency: int, settings: SimulatedRequest, hedge: HedgeRequest | None = None
+) -> dict[str, Any]:
+    source = workdir / "pkg"
+    if not source.exists():
+        source.mkdir()
+        for index in range(files):
+            (source / f"module_{index:03d}.py").write_text(f"def f{index}(x):\n    return x + {index}\n", "utf-8")
+    request = build_run_request(
+        source_root=source,
+        output_root=workdir / f"out_{concurrency}",
+        style="classic",
+        provider="simulated",
+        model="simulated",
+        temperature=0.0,
+        max_completion_tokens=4000,
+        exclude=[],
+        include=[],
+        prompt_profile="default",
+        max_attempts=1,
+        maintenance_mode=False,
+        baseline_manifest=None,
+        write_manifest=False,
+        dry_run=False,
+        validation=ValidationRequest(python_compile=False, ruff=False),
+        simulated=settings,
+        hedge=hedge,
+        concurrency=concurrency,
+    )
+    pack = load_prompt_pack(RecythonConfig(project_root=workdir))
+    LIMITERS.clear()  # each setting starts with a fresh rate-limit window
+    TRACKERS.clear()  # and learns its own hedging latencies
+    events: list[dict[str, Any]] = []
+    started = time.perf_counter()
+    execute_run_with_pack(request, pack, events.append)
+    wall = time.perf_counter() - started
+
+    finished = [event for event in events if event["event"] == "file_finished"]
+    latencies = [float(event["seconds"]) for event in finished]
+    tokens = sum(int(event.get("completion_tokens") or 0) for event in events if event["event"] == "llm_finished")
+    return {
+        "concurrency": concurrency,
+        "files": len(finished),
+        "failed": sum(not event["ok"] for event in finished),
+        "backoffs": sum(event["event"] == "backoff" for event in events),
+        "hedged": sum(int(event.get("hedged") or 0) for event in events if event["event"] == "llm_finished"),
+        "wall_seconds": wall,
+        "files_per_second": len(finished) / wall if wall > 0 else 0.0,
+        "tokens_per_second": tokens / wall if wall > 0 else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=16, help="Modules in the synthetic package.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8], help="Settings to compare.")
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-median", type=float, default=0.2, help="Median call latency in seconds.")
+    parser.add_argument("--latency-spread", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Decode rate added to each call.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls answered with 429.")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Fraction of calls answered with 500.")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with each 429.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--hedge-percentile", type=float, help="Hedge calls slower than this latency percentile.")
+    parser.add_argument("--json", type=Path, help="Also write the results as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    print(f"Converting {args.files} files per setting ({args.latency} latency, median {args.latency_median:g}s)...")
+    results = []
+    with tempfile.TemporaryDirectory(prefix="recython-scheduler-") as tmp:
+        for concurrency in args.concurrency:
+            settings = SimulatedRequest(
+                responses=list(RESPONSES),
+                latency=args.latency,
+                latency_median=args.latency_median,
+                latency_spread=args.latency_spread,
+                tokens_per_second=args.tokens_per_second,
+                rate_limit_rate=args.rate_limit_rate,
+                server_error_rate=args.server_error_rate,
+                retry_after=args.retry_after,
+                seed=args.seed,
+            )
+            hedge = None
+            if args.hedge_percentile is not None:
+                hedge = HedgeRequest(enabled=True, percentile=args.hedge_percentile, min_samples=5, min_delay=0.0)
+            row = run_setting(Path(tmp), args.files, concurrency, settings, hedge)
+            results.append(row)
+            print(
+                f"  concurrency {concurrency:3d}  {row['files_per_second']:7.2f} files/s  "
+                f"{row['tokens_per_second']:9.1f} tok/s  "
+                f"p50 {row['p50']:.2f}s  p95 {row['p95']:.2f}s  p99 {row['p99']:.2f}s  "
+                f"{row['failed']} failed, {row['backoffs']} backoff(s), {row['hedged']} hedged"
+            )
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,37 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+import hashlib
+import json
+import math
 import os
+from pathlib import Path
+import random
+import threading
 import time
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+from recython.hedging import HedgeCancelled, race, tracker_for
+from recython.jobs import HedgeRequest, RateLimitRequest, SimulatedRequest
+from recython.ratelimit import RateLimiter, account_key, limiter_for, retry_after
 
-import openai
+# The openai client takes longer to import than most commands take to run, so
+# it is imported on first use; only commands that call a model pay for it.
+if TYPE_CHECKING:
+    import httpx
+    import openai
+    from openai.types.chat import ChatCompletion
 
 CLIENTS: dict[tuple[str, str | None, str | None, float], openai.OpenAI] = {}
+CASSETTES: dict[Path, dict[str, str]] = {}
+PROVIDERS = ("openai", "openrouter", "replay", "simulated")
+REPLAY_MODES = ("strict", "fallthrough")
 DEFAULT_MODEL = os.environ.get("RECYTHON_OPENAI_MODEL", "gpt-4o-mini")
 DEFAULT_TIMEOUT = float(os.environ.get("RECYTHON_OPENAI_TIMEOUT", "60"))
 DEFAULT_MAX_RETRIES = int(os.environ.get("RECYTHON_OPENAI_MAX_RETRIES", "3"))
+# Headers of the last HTTP response received on this thread, for the rate limiter.
+_RESPONSE_HEADERS = threading.local()
 
 
 def _provider_settings(provider: str) -> tuple[str | None, str | None]:
@@ -29,12 +54,36 @@ def get_client(provider: str = "openai", *, timeout: float = DEFAULT_TIMEOUT) ->
     cache_key = (provider, api_key, base_url, timeout)
     client = CLIENTS.get(cache_key)
     if client is None:
-        client = openai.OpenAI(api_key=api_key, base_url=base_url, timeout=timeout)
+        import openai
+
+        # Retries happen in ``_provider_completion`` so the rate limiter sees every 429.
+        client = openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=timeout,
+            max_retries=0,
+            http_client=openai.DefaultHttpxClient(event_hooks={"response": [_capture_headers]}),
+        )
         CLIENTS[cache_key] = client
     return client
 
 
+def _capture_headers(response: httpx.Response) -> None:
+    _RESPONSE_HEADERS.value = {name.lower(): value for name, value in response.headers.items()}
+
+
+def _error_headers(exc: Exception) -> dict[str, str]:
+    headers = getattr(exc, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+    return {str(name).lower(): str(value) for name, value in (headers or {}).items()}
+
+
 def _should_retry(exc: Exception) -> bool:
+    if isinstance(exc, SimulatedAPIError):
+        return exc.status_code in {429, 500}
+    import openai
+
     return isinstance(
         exc,
         (
@@ -46,10 +95,148 @@ def _should_retry(exc: Exception) -> bool:
     )
 
 
+def _sleep(seconds: float, cancel: threading.Event | None) -> None:
+    """Sleep, or raise ``HedgeCancelled`` as soon as ``cancel`` is set."""
+    if cancel is None:
+        time.sleep(seconds)
+    elif cancel.wait(seconds):
+        raise HedgeCancelled
+
+
+def _record_usage(usage: dict[str, int], response: object, requests: int) -> None:
+    reported = getattr(response, "usage", None)
+    details = getattr(reported, "prompt_tokens_details", None)
+    for name, source in (("prompt_tokens", reported), ("completion_tokens", reported), ("cached_tokens", details)):
+        value = getattr(source, name, None)
+        usage[name] = value if isinstance(value, int) else 0
+    usage["requests"] = requests
+
+
 PURE_STYLE = 1
 CLASSIC_STYLE = 2
 
 
+class ReplayMiss(LookupError):
+    """A ``replay`` completion in strict mode found no recorded response for its prompt."""
+
+
+class SimulatedAPIError(Exception):
+    """An HTTP error injected by the ``simulated`` provider."""
+
+    def __init__(self, status_code: int, headers: dict[str, str] | None = None) -> None:
+        super().__init__(f"Simulated HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+# Returned by the simulated provider when no canned responses are configured.
+SIMULATED_FALLBACK = "cpdef long add(long a, long b):\n    return a + b\n"
+_SIMULATED_RESPONSES: dict[tuple[Path, ...], list[str]] = {}
+
+
+def _simulated_response(
+    prompt: str, settings: SimulatedRequest, cancel: threading.Event | None = None, attempt: int = 1
+) -> SimpleNamespace:
+    """Sleep for a sampled latency, then return a canned reply shaped like a chat completion.
+
+    The reply is picked by prompt hash, so a prompt always gets the same
+    output.  Latency and injected errors come from a generator of their own
+    per call, seeded from ``seed``, the prompt hash, and ``attempt``, so a
+    seeded run draws the same values whatever order concurrent calls run in.
+    """
+    key = tuple(settings.responses)
+    canned = _SIMULATED_RESPONSES.get(key)
+    if canned is None:
+        canned = [path.read_text(encoding="utf-8") for path in key] or [SIMULATED_FALLBACK]
+        _SIMULATED_RESPONSES[key] = canned
+    digest = prompt_hash(prompt)
+    rng = random.Random(None if settings.seed is None else f"{settings.seed}:{digest}:{attempt}")
+    text = canned[int(digest, 16) % len(canned)]
+    prompt_tokens, completion_tokens = len(prompt) // 4, len(text) // 4
+
+    if settings.latency == "fixed":
+        latency = settings.latency_median
+    elif settings.latency == "uniform":
+        latency = settings.latency_median * rng.uniform(1 - settings.latency_spread, 1 + settings.latency_spread)
+    elif settings.latency == "lognormal":
+        latency = settings.latency_median * math.exp(rng.gauss(0.0, settings.latency_spread))
+    else:
+        raise ValueError(f"Unsupported simulated latency distribution '{settings.latency}'.")
+    roll = rng.random()
+    if roll < settings.rate_limit_rate:
+        # Rejections come back quickly, before any decoding.
+        _sleep(latency * 0.1, cancel)
+        raise SimulatedAPIError(429, {"retry-after": f"{settings.retry_after:g}"})
+    if roll < settings.rate_limit_rate + settings.server_error_rate:
+        _sleep(latency, cancel)
+        raise SimulatedAPIError(500)
+    if settings.tokens_per_second > 0:
+        latency += completion_tokens / settings.tokens_per_second
+    _sleep(max(latency, 0.0), cancel)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=f"```cython\n{text}\n```"))],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=0),
+        ),
+    )
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def load_cassette(source: Path) -> dict[str, str]:
+    """Return recorded responses by prompt hash.
+
+    ``source`` is either a cassette written by ``record_exchange`` (JSON lines)
+    or a run directory under ``.recython/runs/``, whose ``prompts/*.md`` and
+    ``responses/*.txt`` snapshots pair up by file stem.
+    """
+    source = source.resolve()
+    cassette = CASSETTES.get(source)
+    if cassette is not None:
+        return cassette
+    cassette = {}
+    if source.is_dir():
+        for prompt_path in sorted((source / "prompts").glob("*.md")):
+            response_path = source / "responses" / f"{prompt_path.stem}.txt"
+            if response_path.exists():
+                cassette[prompt_hash(prompt_path.read_text(encoding="utf-8"))] = response_path.read_text(
+                    encoding="utf-8"
+                )
+    elif source.exists():
+        for line in source.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                cassette[entry["prompt_hash"]] = entry["response"]
+    CASSETTES[source] = cassette
+    return cassette
+
+
+def record_exchange(
+    path: Path, prompt: str, response: str, *, provider: str, model: str | None, usage: dict[str, int] | None = None
+) -> None:
+    """Append one request/response pair to the cassette at ``path`` unless its prompt is already there."""
+    cassette = load_cassette(path)
+    key = prompt_hash(prompt)
+    if key in cassette:
+        return
+    entry = {
+        "prompt_hash": key,
+        "provider": provider,
+        "model": model or DEFAULT_MODEL,
+        "prompt": prompt,
+        "response": response,
+        "usage": usage or {},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(entry) + "\n")
+    cassette[key] = response
+
+
 def completion(
     prompt: str,
     *,
@@ -59,33 +246,215 @@ def completion(
     temperature: float | None = None,
     timeout: float = DEFAULT_TIMEOUT,
     max_retries: int = DEFAULT_MAX_RETRIES,
+    usage: dict[str, int] | None = None,
+    on_backoff: Callable[[int, float, Exception], None] | None = None,
+    replay_source: Path | None = None,
+    replay_mode: str = "strict",
+    fallthrough_provider: str = "openai",
+    record_path: Path | None = None,
+    simulated: SimulatedRequest | None = None,
+    rate_limit: RateLimitRequest | None = None,
+    hedge: HedgeRequest | None = None,
+) -> str:
+    """Return the model's reply to ``prompt``.
+
+    When ``usage`` is given it is filled with the token counts the provider
+    reported (``prompt_tokens``, ``completion_tokens``, ``cached_tokens``) and
+    the number of ``requests`` made, retries included.  ``on_backoff`` is
+    called with the failed attempt number, the delay, and the error before
+    each retry sleep.
+
+    The ``replay`` provider answers from ``replay_source`` (see
+    ``load_cassette``) without any network call.  On a miss, ``strict`` mode
+    raises ``ReplayMiss`` and ``fallthrough`` mode asks
+    ``fallthrough_provider``.  With ``record_path`` every exchange is
+    appended to that cassette.
+
+    The ``simulated`` provider makes no network calls either: it answers
+    with canned outputs after a synthetic latency and can inject 429 and 500
+    errors, as configured by ``simulated``.
+
+    With ``rate_limit`` (and ``rate_limit.enabled``) every call to the
+    provider goes through the shared ``RateLimiter`` for the provider and
+    model, and ``usage`` also gets ``queued_ms``, the time spent waiting for
+    it, and ``rate_limited``, the number of 429 responses.  A ``Retry-After``
+    header sets the retry delay, up to ``rate_limit.max_retry_after``.
+
+    With ``hedge`` (and ``hedge.enabled``) a call that runs past the observed
+    latency percentile is duplicated and the first reply wins (see
+    ``recython.hedging``); ``usage`` then also gets ``hedged`` and
+    ``hedge_won``, and its token counts are the winner's.
+    """
+    if provider == "replay":
+        if replay_source is None:
+            raise ValueError("The replay provider needs a cassette or run directory to replay from.")
+        response = load_cassette(replay_source).get(prompt_hash(prompt))
+        if response is not None:
+            if usage is not None:
+                usage.update(prompt_tokens=0, completion_tokens=0, cached_tokens=0, requests=0, replayed=1)
+            if record_path is not None:
+                record_exchange(record_path, prompt, response, provider=provider, model=model)
+            return response
+        if replay_mode != "fallthrough":
+            raise ReplayMiss(f"No recorded response in {replay_source} for prompt {prompt_hash(prompt)[:12]}.")
+        provider = fallthrough_provider
+    call = dict(
+        max_completion_tokens=max_completion_tokens,
+        temperature=temperature,
+        timeout=timeout,
+        max_retries=max_retries,
+        on_backoff=on_backoff,
+        simulated=simulated,
+        rate_limit=rate_limit,
+    )
+    if hedge is not None and hedge.enabled:
+        response = _hedged_completion(prompt, provider=provider, model=model, usage=usage, hedge=hedge, **call)
+    else:
+        response = _timed_completion(prompt, provider=provider, model=model, usage=usage, **call)
+    if record_path is not None:
+        record_exchange(record_path, prompt, response, provider=provider, model=model, usage=usage)
+    return response
+
+
+def _timed_completion(prompt: str, *, provider: str, model: str | None, **call: object) -> str:
+    """``_provider_completion``, feeding the latency of each successful call to its hedging tracker."""
+    started = time.perf_counter()
+    response = _provider_completion(prompt, provider=provider, model=model, **call)  # type: ignore[arg-type]
+    tracker_for(provider, model or DEFAULT_MODEL).record(time.perf_counter() - started)
+    return response
+
+
+def _hedged_completion(
+    prompt: str,
+    *,
+    provider: str,
+    model: str | None,
+    usage: dict[str, int] | None,
+    hedge: HedgeRequest,
+    **call: object,
+) -> str:
+    tracker = tracker_for(provider, model or DEFAULT_MODEL)
+    delay = tracker.hedge_delay(hedge)
+    if delay is None:
+        response = _timed_completion(prompt, provider=provider, model=model, usage=usage, **call)
+        tracker.count(hedged=False, hedge_won=False)
+        return response
+    usages: list[dict[str, int]] = [{}, {}]
+
+    def primary(cancel: threading.Event) -> str:
+        return _timed_completion(prompt, provider=provider, model=model, usage=usages[0], cancel=cancel, **call)
+
+    def duplicate(cancel: threading.Event) -> str:
+        return _timed_completion(
+            prompt,
+            provider=hedge.provider or provider,
+            model=hedge.model or model,
+            usage=usages[1],
+            cancel=cancel,
+            **call,
+        )
+
+    response, hedged, hedge_won = race(primary, duplicate, delay)
+    tracker.count(hedged=hedged, hedge_won=hedge_won)
+    if usage is not None:
+        usage.update(usages[int(hedge_won)], hedged=int(hedged), hedge_won=int(hedge_won))
+    return response
+
+
+def _provider_completion(
+    prompt: str,
+    *,
+    provider: str,
+    model: str | None,
+    max_completion_tokens: int | None,
+    temperature: float | None,
+    timeout: float,
+    max_retries: int,
+    usage: dict[str, int] | None,
+    on_backoff: Callable[[int, float, Exception], None] | None,
+    simulated: SimulatedRequest | None = None,
+    rate_limit: RateLimitRequest | None = None,
+    cancel: threading.Event | None = None,
 ) -> str:
-    client = get_client(provider, timeout=timeout)
+    if provider == "simulated":
+        settings = simulated or SimulatedRequest()
+        client = None
+    else:
+        client = get_client(provider, timeout=timeout)
+    limits = rate_limit or RateLimitRequest()
+    limiter: RateLimiter | None = None
+    if rate_limit is not None and rate_limit.enabled:
+        # Processes sharing a budget are matched by credentials, never by the key itself.
+        api_key, base_url = _provider_settings(provider) if client is not None else (None, None)
+        model_name = model or DEFAULT_MODEL
+        account = account_key(provider, model_name, api_key, base_url)
+        limiter = limiter_for(provider, model_name, rate_limit, account=account)
+        if usage is not None:
+            usage.update(queued_ms=0, rate_limited=0)
+    # Providers count the completion budget against tokens per minute up front.
+    estimate = len(prompt) // 4 + (max_completion_tokens or 0)
     for attempt in range(1, max_retries + 1):
+        if cancel is not None and cancel.is_set():
+            raise HedgeCancelled
+        ticket = limiter.acquire(estimate) if limiter is not None else None
+        if ticket is not None and usage is not None:
+            usage["queued_ms"] += round(ticket.waited * 1000)
+        _RESPONSE_HEADERS.value = {}
+        response: ChatCompletion | SimpleNamespace
         try:
-            response = client.chat.completions.create(
-                model=model or DEFAULT_MODEL,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    },
-                ],
-                max_completion_tokens=max_completion_tokens,
-                temperature=temperature,
-            )
-            message = response.choices[0].message.content
-            if isinstance(message, str):
-                return message
-            if isinstance(message, list):
-                return "".join(
-                    part.get("text", "") if isinstance(part, dict) else getattr(part, "text", "") for part in message
+            if client is None:
+                response = _simulated_response(prompt, settings, cancel, attempt)
+            else:
+                response = client.chat.completions.create(
+                    model=model or DEFAULT_MODEL,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": prompt,
+                        },
+                    ],
+                    max_completion_tokens=max_completion_tokens,
+                    temperature=temperature,
                 )
-            return ""
         except Exception as exc:
-            if attempt >= max_retries or not _should_retry(exc):
+            headers = _error_headers(exc)
+            rate_limited = getattr(exc, "status_code", None) == 429
+            wait = retry_after(headers)
+            if limiter is not None and ticket is not None:
+                limiter.release(ticket, headers=headers, rate_limited=rate_limited, retry_after=wait)
+                if rate_limited and usage is not None:
+                    usage["rate_limited"] += 1
+            if attempt >= max_retries or not _should_retry(exc) or (cancel is not None and cancel.is_set()):
                 raise
-            time.sleep(min(2 ** (attempt - 1), 8))
+            delay = min(wait, limits.max_retry_after) if wait is not None else min(2 ** (attempt - 1), 8)
+            if on_backoff is not None:
+                on_backoff(attempt, delay, exc)
+            _sleep(delay, cancel)
+            continue
+        reported = getattr(response, "usage", None)
+        if limiter is not None and ticket is not None:
+            used = [
+                value
+                for value in (getattr(reported, "prompt_tokens", None), getattr(reported, "completion_tokens", None))
+                if isinstance(value, int)
+            ]
+            limiter.release(
+                ticket,
+                headers=getattr(_RESPONSE_HEADERS, "value", {}),
+                tokens_used=sum(used) if len(used) == 2 else ticket.tokens,
+            )
+        if usage is not None:
+            _record_usage(usage, response, attempt)
+        message = response.choices[0].message.content
+        if isinstance(message, str):
+            return message
+        if isinstance(message, list):
+            return "".join(
+                part.get("text", "") if isinstance(part, dict) else getattr(part, "text", "") for part in message
+            )
+        return ""
+    # Every attempt either returns or raises, so only a non-positive max_retries gets here.
+    raise RuntimeError(f"No model call was made: max_retries must be at least 1, got {max_retries}.")
 
 
 def short_completion(prompt: str) -> str:
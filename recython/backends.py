@@ -0,0 +1,309 @@
+"""Pluggable compilation backends and a side-by-side comparison across them.
+
+A backend turns a tree of module files into extension modules placed next to
+their sources.  ``cython-pure`` and ``mypyc`` compile the original ``.py``
+files as they are, so they cost no LLM tokens; ``cython-classic`` compiles the
+``.pyx`` files of a converted output tree and therefore needs a ``convert
+--style classic`` run first.  Given a ``convert --style pure`` output tree,
+``cython-pure`` compiles that instead and is costed as a conversion.  ``compare_backends`` builds a package with each
+requested backend and reports compile success, benchmark speedup, and import
+time per module, so the cheapest backend that is good enough can be picked
+module by module.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import shutil
+from abc import ABC, abstractmethod
+from dataclasses import replace
+from pathlib import Path
+
+from recython.benchmarks import compare_benchmarks, measure_import_time, relative_module_name, summarize_modules
+from recython.build import (
+    STAGED_SUFFIXES,
+    BuildTarget,
+    build_extensions,
+    build_mypyc_extensions,
+    build_targets_for,
+    default_build_dir,
+    discover_build_sources,
+    flag_profile_args,
+)
+from recython.jobs import BenchmarkCase, BuildRequest
+
+# A backend within this fraction of the best speedup counts as good enough, so
+# the cheaper one is recommended.
+GOOD_ENOUGH_RATIO = 0.9
+
+
+class CompileBackend(ABC):
+    """Base class for compilation backends; subclasses set ``name`` and implement ``build``."""
+
+    name = ""
+    needs_conversion = False
+    discovery_style = "pure"
+
+    def unavailable_reason(self) -> str | None:
+        """Return why this backend cannot run here, or ``None`` when it can."""
+        return None
+
+    def discover(self, tree: Path) -> list[Path]:
+        return discover_build_sources(tree, self.discovery_style)
+
+    @abstractmethod
+    def build(
+        self,
+        targets: list[BuildTarget],
+        *,
+        output_root: Path,
+        package_name: str,
+        build_dir: Path,
+        build: BuildRequest,
+        force: bool = False,
+    ) -> list[dict[str, object]]:
+        """Build ``targets`` in place under ``output_root`` and return one result dict per module."""
+
+
+class CythonBackend(CompileBackend):
+    def build(
+        self,
+        targets: list[BuildTarget],
+        *,
+        output_root: Path,
+        package_name: str,
+        build_dir: Path,
+        build: BuildRequest,
+        force: bool = False,
+    ) -> list[dict[str, object]]:
+        profile_compile_args, profile_link_args = flag_profile_args(build.flag_profile)
+        return build_extensions(
+            targets,
+            output_root=output_root,
+            package_name=package_name,
+            build_dir=build_dir,
+            compiler_directives=build.compiler_directives,
+            extra_compile_args=[*profile_compile_args, *build.extra_compile_args],
+            extra_link_args=[*profile_link_args, *build.extra_link_args],
+            jobs=build.jobs,
+            force=force,
+        )
+
+
+class CythonClassicBackend(CythonBackend):
+    name = "cython-classic"
+    needs_conversion = True
+    discovery_style = "classic"
+
+
+class CythonPureBackend(CythonBackend):
+    name = "cython-pure"
+
+
+class MypycBackend(CompileBackend):
+    name = "mypyc"
+
+    def unavailable_reason(self) -> str | None:
+        if importlib.util.find_spec("mypyc") is None:
+            return "mypyc is not installed; install mypy to use the mypyc backend."
+        return None
+
+    def build(
+        self,
+        targets: list[BuildTarget],
+        *,
+        output_root: Path,
+        package_name: str,
+        build_dir: Path,
+        build: BuildRequest,
+        force: bool = False,
+    ) -> list[dict[str, object]]:
+        return build_mypyc_extensions(
+            targets,
+            output_root=output_root,
+            package_name=package_name,
+            build_dir=build_dir,
+            jobs=build.jobs,
+        )
+
+
+BACKENDS: dict[str, CompileBackend] = {
+    backend.name: backend for backend in (CythonClassicBackend(), CythonPureBackend(), MypycBackend())
+}
+# The backend that builds each ``convert`` style's output tree.
+STYLE_BACKENDS = {
+    "classic": "cython-classic",
+    "pure": "cython-pure",
+    "pure_pxd": "cython-pure",
+    "compile-only": "cython-pure",
+}
+
+
+def get_backend(name: str) -> CompileBackend:
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown backend '{name}'. Expected one of: {', '.join(BACKENDS)}.") from None
+
+
+def build_with_profiles(
+    targets: list[BuildTarget],
+    *,
+    output_root: Path,
+    package_name: str,
+    style: str,
+    build: BuildRequest,
+    profiles: dict[str, str],
+    force: bool = False,
+) -> list[dict[str, object]]:
+    """Build ``targets``, grouping modules that share a chosen flag profile into one call.
+
+    ``profiles`` maps relative module names to a flag profile; other modules
+    use ``build.flag_profile``.
+    """
+    groups: dict[str, list[BuildTarget]] = {}
+    for target in targets:
+        module = relative_module_name(target.module_name, package_name)
+        groups.setdefault(profiles.get(module, build.flag_profile), []).append(target)
+    backend = get_backend(STYLE_BACKENDS[style])
+    results: list[dict[str, object]] = []
+    for flag_profile, group in groups.items():
+        results.extend(
+            backend.build(
+                group,
+                output_root=output_root,
+                package_name=package_name,
+                build_dir=default_build_dir(output_root, package_name),
+                build=replace(build, flag_profile=flag_profile),
+                force=force,
+            )
+        )
+    return results
+
+
+def _copy_tree(source: Path, destination: Path) -> None:
+    if destination.exists():
+        shutil.rmtree(destination)
+    destination.mkdir(parents=True)
+    for path in source.rglob("*"):
+        if path.is_file() and path.suffix in STAGED_SUFFIXES and "__pycache__" not in path.parts:
+            target = destination / path.relative_to(source)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, target)
+
+
+def recommend_backend(entries: dict[str, dict[str, object]]) -> str | None:
+    """Pick the cheapest backend whose speedup is within ``GOOD_ENOUGH_RATIO`` of the best.
+
+    Backends that need an LLM conversion cost more than ones that compile the
+    source as is.  Without benchmark data the cheapest backend that compiled wins.
+    """
+    compiled = [name for name, entry in entries.items() if entry["compiled"]]
+    if not compiled:
+        return None
+    measured = {
+        name: float(entries[name]["speedup"]) for name in compiled if entries[name]["speedup"]  # type: ignore[arg-type]
+    }
+    if measured:
+        best = max(measured.values())
+        compiled = [name for name in measured if measured[name] >= best * GOOD_ENOUGH_RATIO]
+    order = list(BACKENDS)
+
+    def needs_conversion(name: str) -> bool:
+        return bool(entries[name].get("needs_conversion", BACKENDS[name].needs_conversion))
+
+    return min(compiled, key=lambda name: (needs_conversion(name), -measured.get(name, 0.0), order.index(name)))
+
+
+def compare_backends(
+    backend_names: list[str],
+    *,
+    source_root: Path,
+    work_dir: Path,
+    inputs: dict[str, Path] | None = None,
+    benchmarks: list[BenchmarkCase] | None = None,
+    build: BuildRequest | None = None,
+) -> dict[str, object]:
+    """Build ``source_root`` with every named backend and compare them per module.
+
+    ``inputs`` maps a backend name to the tree it compiles; backends that do
+    not need a conversion default to ``source_root``.  A backend given a
+    converted tree is reported with ``needs_conversion`` set.  Each backend
+    compiles a private copy under ``work_dir`` so the trees never overwrite
+    each other.
+    """
+    package_name = source_root.name
+    inputs = inputs or {}
+    cases = benchmarks or []
+    build = build or BuildRequest()
+    backend_reports: dict[str, dict[str, object]] = {}
+    modules: dict[str, dict[str, object]] = {}
+    source_imports: dict[str, float | None] = {}
+
+    def import_seconds(module_name: str, search_path: list[Path]) -> float | None:
+        try:
+            timing = measure_import_time(module_name, package_name=package_name, search_path=search_path)
+        except Exception:
+            return None
+        return float(timing["seconds"])  # type: ignore[arg-type]
+
+    for name in backend_names:
+        backend = get_backend(name)
+        tree_input = inputs.get(name) or (None if backend.needs_conversion else source_root)
+        converted = backend.needs_conversion or name in inputs
+        reason = backend.unavailable_reason()
+        if reason is None and tree_input is None:
+            reason = f"{name} needs a converted output tree; run convert first and pass it in."
+        if reason is not None or tree_input is None:
+            backend_reports[name] = {
+                "backend": name,
+                "ok": False,
+                "error": reason,
+                "needs_conversion": converted,
+                "build": [],
+                "benchmarks": [],
+            }
+            continue
+
+        tree = work_dir / "trees" / name
+        _copy_tree(tree_input, tree)
+        targets = build_targets_for(tree, package_name, backend.discover(tree))
+        build_results = backend.build(
+            targets, output_root=tree, package_name=package_name, build_dir=work_dir / "build" / name, build=build
+        )
+        benchmark_results = compare_benchmarks(
+            cases, package_name=package_name, source_root=source_root, compiled_root=tree
+        )
+        module_rows = summarize_modules(cases, build_results, benchmark_results, package_name=package_name)
+        build_by_module = {str(item["module"]): item for item in build_results}
+        for row in module_rows:
+            module = str(row["module"])
+            module_name = f"{package_name}.{module}"
+            built = build_by_module.get(module_name)
+            if built is not None and module not in source_imports:
+                source_imports[module] = import_seconds(module_name, [source_root])
+            entry = modules.setdefault(module, {"module": module, "backends": {}})
+            entry["backends"][name] = {  # type: ignore[index]
+                "compiled": row["compiled"],
+                "needs_conversion": converted,
+                "build_status": row["build_status"],
+                "error": built["error"] if built else None,
+                "speedup": row["speedup"],
+                "import_seconds": (import_seconds(module_name, [tree, source_root]) if built and built["ok"] else None),
+            }
+        backend_reports[name] = {
+            "backend": name,
+            "ok": all(item["ok"] for item in build_results),
+            "error": None,
+            "needs_conversion": converted,
+            "build": build_results,
+            "benchmarks": benchmark_results,
+        }
+
+    rows: list[dict[str, object]] = []
+    for module in sorted(modules):
+        entry = modules[module]
+        entry["source_import_seconds"] = source_imports.get(module)
+        entry["recommended"] = recommend_backend(entry["backends"])  # type: ignore[arg-type]
+        rows.append(entry)
+    return {"package": package_name, "backends": list(backend_reports.values()), "modules": rows}
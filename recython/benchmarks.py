@@ -0,0 +1,614 @@
+"""Compare configured benchmark cases between source and compiled packages.
+
+Every case runs in a fresh interpreter so the pure and compiled variants never
+share ``sys.modules``.  The worker imports the package from an explicit search
+path: ``[source_root]`` for the pure run and ``[output_root, source_root]`` for
+the compiled run, so modules that were not converted fall back to the original
+source while converted modules resolve to their built extension first.
+
+``measure_case`` is the statistically careful path.  It spreads a case's samples
+over several worker processes and alternates pure and compiled workers, so a
+noisy moment on the machine hits both sides.  Each worker runs warmup calls,
+calibrates the loop count so one sample lasts at least ``min_time``, and can pin
+itself to chosen CPUs.  The pooled per-loop samples are then trimmed with Tukey
+fences and summarized as mean, median, standard deviation, and a confidence
+interval for the mean.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+from collections.abc import Mapping
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, TypedDict
+
+from recython.jobs import BenchmarkCase, BenchRequest
+
+# Registers ``payload["package"]`` as a package whose ``__path__`` is the given
+# search path, so submodules resolve against the compiled tree first.  An empty
+# package name skips the alias and leaves imports to ``sys.path``.
+PACKAGE_ALIAS = r"""
+import contextlib, importlib, importlib.machinery, importlib.util, io, json, sys, time, timeit
+from pathlib import Path
+
+payload = json.loads(sys.argv[1])
+name = payload["package"]
+search_path = payload["search_path"]
+init = next((Path(d) / "__init__.py" for d in search_path if (Path(d) / "__init__.py").exists()), None)
+if not name:
+    pass
+elif init is None:
+    spec = importlib.machinery.ModuleSpec(name, None, is_package=True)
+    spec.submodule_search_locations = list(search_path)
+    sys.modules[name] = importlib.util.module_from_spec(spec)
+else:
+    spec = importlib.util.spec_from_file_location(name, init, submodule_search_locations=list(search_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+"""
+
+# Times ``stmt`` and prints per-loop seconds for each repeat.  A ``number`` of 0
+# calibrates the loop count until one sample lasts at least ``min_time``.
+WORKER = PACKAGE_ALIAS + r"""
+import os
+
+if payload["affinity"] and hasattr(os, "sched_setaffinity"):
+    os.sched_setaffinity(0, payload["affinity"])
+with contextlib.redirect_stdout(io.StringIO()):
+    timer = timeit.Timer(stmt=payload["stmt"], setup=payload["setup"])
+    for _ in range(payload["warmup"]):
+        timer.timeit(1)
+    number = payload["number"]
+    if number <= 0:
+        number = 1
+        while (elapsed := timer.timeit(number)) < payload["min_time"]:
+            number = number * 10 if elapsed <= 0 else max(number * 2, int(number * payload["min_time"] / elapsed * 1.2))
+    times = [timer.timeit(number) / number for _ in range(payload["repeat"])]
+affinity = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+print(json.dumps({"times": times, "number": number, "affinity": affinity}))
+"""
+
+# Runs the case once and prints its value: ``check`` when given, otherwise the
+# value of ``stmt`` if it is an expression.  Values are reduced to JSON so the
+# pure and compiled runs can be compared structurally.
+EVAL_WORKER = PACKAGE_ALIAS + r"""
+import dataclasses
+
+def plain(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): plain(item) for key, item in value.items()}
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {field.name: plain(getattr(value, field.name)) for field in dataclasses.fields(value)}
+    if hasattr(value, "tolist"):
+        return plain(value.tolist())
+    return repr(value)
+
+namespace = {}
+with contextlib.redirect_stdout(io.StringIO()):
+    exec(payload["setup"], namespace)
+    try:
+        code = compile(payload["stmt"], "<stmt>", "eval")
+    except SyntaxError:
+        exec(payload["stmt"], namespace)
+        value = None
+    else:
+        value = eval(code, namespace)
+    if payload["check"]:
+        value = eval(payload["check"], namespace)
+print(json.dumps({"value": plain(value)}))
+"""
+
+# Runs ``stmt`` once after ``setup`` and reports what that call cost in memory.
+# The first call measures peak RSS growth and the objects and allocator blocks
+# still alive afterwards; a second call runs under tracemalloc for the peak
+# traced allocation, so tracemalloc's own bookkeeping stays out of the RSS.
+MEMORY_WORKER = PACKAGE_ALIAS + r"""
+import collections, gc, tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def peak_rss():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def object_types():
+    gc.collect()
+    return collections.Counter(type(item).__name__ for item in gc.get_objects())
+
+namespace = {}
+with contextlib.redirect_stdout(io.StringIO()):
+    exec(payload["setup"], namespace)
+    code = compile(payload["stmt"], "<stmt>", "exec")
+    before_types = object_types()
+    before_blocks = sys.getallocatedblocks()
+    before_rss = peak_rss()
+    exec(code, namespace)
+    after_rss = peak_rss()
+    after_types = object_types()
+    after_blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    exec(code, namespace)
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+deltas = {name: after_types[name] - before_types[name] for name in set(before_types) | set(after_types)}
+top = sorted((item for item in deltas.items() if item[1]), key=lambda item: (-abs(item[1]), item[0]))[:5]
+print(json.dumps({
+    "peak_rss_delta_bytes": None if before_rss is None else after_rss - before_rss,
+    "tracemalloc_peak_bytes": traced_peak,
+    "live_blocks_delta": after_blocks - before_blocks,
+    "gc_containers_delta": sum(after_types.values()) - sum(before_types.values()),
+    "top_container_deltas": dict(top),
+}))
+"""
+
+IMPORT_WORKER = PACKAGE_ALIAS + r"""
+with contextlib.redirect_stdout(io.StringIO()):
+    started = time.perf_counter()
+    importlib.import_module(payload["module"])
+    elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "file": getattr(sys.modules[payload["module"]], "__file__", None)}))
+"""
+
+
+def point_suffix(point: dict[str, Any]) -> str:
+    return "[" + ",".join(f"{key}={value!r}" for key, value in point.items()) + "]" if point else ""
+
+
+def grid_name(case: BenchmarkCase) -> str:
+    """Return the configured name of ``case``, without the grid point suffix ``expand_cases`` adds."""
+    return case.name.removesuffix(point_suffix(case.point))
+
+
+def expand_cases(cases: list[BenchmarkCase]) -> list[BenchmarkCase]:
+    """Replace every case that has ``params`` with one case per point of its grid.
+
+    Each point case is named ``name[n=100]``, records its values in ``point``,
+    and binds them as variables ahead of ``setup``, so ``setup``, ``stmt``, and
+    ``check`` can all refer to them.  Cases without ``params`` pass through.
+    """
+    expanded: list[BenchmarkCase] = []
+    for case in cases:
+        if not case.params:
+            expanded.append(case)
+            continue
+        for name in case.params:
+            if not name.isidentifier():
+                raise ValueError(f"Benchmark case '{case.name}' has invalid parameter name '{name}'.")
+        for values in itertools.product(*case.params.values()):
+            point = dict(zip(case.params, values, strict=True))
+            bindings = "".join(f"{key} = {value!r}\n" for key, value in point.items())
+            expanded.append(
+                replace(
+                    case,
+                    name=case.name + point_suffix(point),
+                    setup=bindings + case.setup,
+                    params={},
+                    point=point,
+                )
+            )
+    return expanded
+
+
+def run_benchmark_case(
+    case: BenchmarkCase,
+    *,
+    package_name: str,
+    search_path: list[Path],
+    python: str = sys.executable,
+    timeout: float | None = None,
+    env: dict[str, str] | None = None,
+    bench: BenchRequest | None = None,
+) -> list[float]:
+    """Run one case in a subprocess and return per-loop timings in seconds, one per repeat.
+
+    ``env`` entries are added to the worker's environment, for example
+    ``OMP_NUM_THREADS``.  ``bench`` supplies warmup, calibration, and CPU
+    affinity settings.
+    """
+    return [float(item) for item in _time_worker(case, package_name, search_path, python, timeout, env, bench)["times"]]
+
+
+def _time_worker(
+    case: BenchmarkCase,
+    package_name: str,
+    search_path: list[Path],
+    python: str,
+    timeout: float | None,
+    env: dict[str, str] | None,
+    bench: BenchRequest | None,
+) -> dict[str, Any]:
+    bench = bench or BenchRequest()
+    payload = {
+        "package": package_name,
+        "search_path": [str(path) for path in search_path],
+        "stmt": case.stmt,
+        "setup": case.setup,
+        "number": case.number,
+        "repeat": case.repeat,
+        "warmup": bench.warmup,
+        "min_time": bench.min_time,
+        "affinity": bench.cpu_affinity,
+    }
+    return _run_worker(WORKER, payload, python=python, timeout=timeout, env=env)
+
+
+class SampleSummary(TypedDict):
+    samples: int
+    kept: int
+    outliers: int
+    mean: float
+    median: float
+    stdev: float
+    min: float
+    max: float
+    confidence: float
+    ci_low: float
+    ci_high: float
+
+
+class MeasuredSummary(SampleSummary):
+    processes: int
+    numbers: list[int]
+    affinity: list[int]
+
+
+def summarize_samples(samples: list[float], *, confidence: float = 0.95, outlier_iqr: float = 1.5) -> SampleSummary:
+    """Summarize timing samples after dropping points outside the Tukey fences.
+
+    ``outlier_iqr`` scales the interquartile range that bounds kept samples;
+    0 keeps every sample.  The confidence interval is for the mean of the kept
+    samples and uses the normal approximation.
+    """
+    if not samples:
+        raise ValueError("No timing samples to summarize.")
+    kept = list(samples)
+    if outlier_iqr > 0 and len(samples) >= 4:
+        low, _, high = statistics.quantiles(samples, n=4)
+        spread = (high - low) * outlier_iqr
+        kept = [value for value in samples if low - spread <= value <= high + spread]
+    mean = statistics.fmean(kept)
+    stdev = statistics.stdev(kept) if len(kept) > 1 else 0.0
+    margin = statistics.NormalDist().inv_cdf(0.5 + confidence / 2) * stdev / math.sqrt(len(kept))
+    return {
+        "samples": len(samples),
+        "kept": len(kept),
+        "outliers": len(samples) - len(kept),
+        "mean": mean,
+        "median": statistics.median(kept),
+        "stdev": stdev,
+        "min": min(kept),
+        "max": max(kept),
+        "confidence": confidence,
+        "ci_low": mean - margin,
+        "ci_high": mean + margin,
+    }
+
+
+def measure_cases(
+    case: BenchmarkCase,
+    variants: dict[str, list[Path]],
+    *,
+    package_name: str,
+    bench: BenchRequest | None = None,
+    python: str = sys.executable,
+    timeout: float | None = None,
+    env: dict[str, str] | None = None,
+) -> dict[str, MeasuredSummary]:
+    """Measure one case under several search paths and return summary statistics per variant.
+
+    Workers for the variants are interleaved (``a, b, a, b, ...``) so drift in
+    machine load affects every variant alike.  Each summary also records the
+    loop count the workers calibrated to and the CPUs they ran on.
+    """
+    bench = bench or BenchRequest()
+    samples: dict[str, list[float]] = {name: [] for name in variants}
+    workers: dict[str, list[dict[str, Any]]] = {name: [] for name in variants}
+    for _ in range(max(bench.processes, 1)):
+        for name, search_path in variants.items():
+            run = _time_worker(case, package_name, search_path, python, timeout, env, bench)
+            samples[name].extend(float(item) for item in run["times"])
+            workers[name].append({"number": run["number"], "affinity": run["affinity"]})
+    return {
+        name: {
+            **summarize_samples(values, confidence=bench.confidence, outlier_iqr=bench.outlier_iqr),
+            "processes": len(workers[name]),
+            "numbers": [worker["number"] for worker in workers[name]],
+            "affinity": workers[name][0]["affinity"],
+        }
+        for name, values in samples.items()
+    }
+
+
+def measure_case(
+    case: BenchmarkCase,
+    *,
+    package_name: str,
+    search_path: list[Path],
+    bench: BenchRequest | None = None,
+    python: str = sys.executable,
+    timeout: float | None = None,
+    env: dict[str, str] | None = None,
+) -> MeasuredSummary:
+    """Measure one case in ``bench.processes`` isolated workers and return summary statistics."""
+    return measure_cases(
+        case, {"case": search_path}, package_name=package_name, bench=bench, python=python, timeout=timeout, env=env
+    )["case"]
+
+
+def evaluate_case(
+    case: BenchmarkCase,
+    *,
+    package_name: str,
+    search_path: list[Path],
+    python: str = sys.executable,
+    timeout: float | None = None,
+    env: dict[str, str] | None = None,
+) -> object:
+    """Run one case once in a subprocess and return its JSON-reduced value."""
+    payload = {
+        "package": package_name,
+        "search_path": [str(path) for path in search_path],
+        "stmt": case.stmt,
+        "setup": case.setup,
+        "check": case.check,
+    }
+    return _run_worker(EVAL_WORKER, payload, python=python, timeout=timeout, env=env)["value"]
+
+
+def _run_worker(
+    worker: str,
+    payload: Mapping[str, object],
+    *,
+    python: str,
+    timeout: float | None,
+    env: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    completed = subprocess.run(
+        [python, "-c", worker, json.dumps(payload)],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        check=False,
+        env={**os.environ, **env} if env else None,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip() or f"Benchmark worker exited with {completed.returncode}.")
+    result: dict[str, Any] = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result
+
+
+def results_match(expected: object, actual: object, *, rel_tol: float = 1e-9, abs_tol: float = 0.0) -> bool:
+    """Compare two JSON-reduced case values, allowing float drift within the tolerances."""
+    if isinstance(expected, bool) or isinstance(actual, bool):
+        return type(expected) is type(actual) and expected == actual
+    if isinstance(expected, int | float) and isinstance(actual, int | float):
+        return math.isclose(expected, actual, rel_tol=rel_tol, abs_tol=abs_tol)
+    if isinstance(expected, list) and isinstance(actual, list):
+        return len(expected) == len(actual) and all(
+            results_match(left, right, rel_tol=rel_tol, abs_tol=abs_tol)
+            for left, right in zip(expected, actual, strict=True)
+        )
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        return expected.keys() == actual.keys() and all(
+            results_match(expected[key], actual[key], rel_tol=rel_tol, abs_tol=abs_tol) for key in expected
+        )
+    return expected == actual
+
+
+def format_duration(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if abs(seconds) >= scale:
+            return f"{seconds / scale:.3f}{unit}"
+    return f"{seconds / 1e-9:.1f}ns"
+
+
+def format_bytes(value: float | None) -> str:
+    if value is None:
+        return "n/a"
+    for unit in ("B", "KiB", "MiB"):
+        if abs(value) < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}GiB"
+
+
+def measure_memory(
+    case: BenchmarkCase,
+    *,
+    package_name: str,
+    search_path: list[Path],
+    python: str = sys.executable,
+    timeout: float | None = None,
+    env: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """Run one call of ``case`` in a fresh interpreter and return its memory cost.
+
+    ``peak_rss_delta_bytes`` is the growth of the process's peak resident set
+    (``None`` where ``resource`` is unavailable).  ``ru_maxrss`` only ever
+    rises, so this reads 0 when setup already took the process past the peak
+    the call reaches; ``tracemalloc_peak_bytes`` is the reliable per-call
+    figure.  ``live_blocks_delta`` / ``gc_containers_delta`` are net counts of
+    allocator blocks and GC-tracked containers still alive after the call, not
+    the number of allocations it made, with the five container types whose
+    counts moved most.  ``gc.get_objects`` only sees containers: ints, floats,
+    strings and extension types without GC support only show up in the block
+    count.
+    """
+    payload = {
+        "package": package_name,
+        "search_path": [str(path) for path in search_path],
+        "stmt": case.stmt,
+        "setup": case.setup,
+    }
+    return _run_worker(MEMORY_WORKER, payload, python=python, timeout=timeout, env=env)
+
+
+def measure_import_time(
+    module_name: str,
+    *,
+    package_name: str,
+    search_path: list[Path],
+    python: str = sys.executable,
+    timeout: float | None = None,
+) -> dict[str, object]:
+    """Import ``module_name`` in a fresh interpreter and return its import time and file.
+
+    The package itself is imported before the clock starts, so the figure
+    covers only the module (and whatever it pulls in).
+    """
+    payload = {"package": package_name, "search_path": [str(path) for path in search_path], "module": module_name}
+    return _run_worker(IMPORT_WORKER, payload, python=python, timeout=timeout)
+
+
+def compare_benchmarks(
+    cases: list[BenchmarkCase],
+    *,
+    package_name: str,
+    source_root: Path,
+    compiled_root: Path,
+    bench: BenchRequest | None = None,
+) -> list[dict[str, object]]:
+    """Time every case against the pure source and the compiled output tree.
+
+    ``pure_seconds`` and ``compiled_seconds`` are per-loop medians; the full
+    summaries are kept under ``pure_stats`` and ``compiled_stats``.  The
+    speedup interval divides the ends of the two confidence intervals.  With
+    ``bench.memory`` set, ``pure_memory`` and ``compiled_memory`` hold
+    ``measure_memory`` results and ``memory_ratio`` is the pure tracemalloc
+    peak over the compiled one.  Cases with ``params`` are expanded with
+    ``expand_cases`` and each entry's ``params`` holds its grid point.
+    """
+    bench = bench or BenchRequest()
+    results: list[dict[str, object]] = []
+    for case in expand_cases(cases):
+        entry: dict[str, object] = {
+            "name": case.name,
+            "params": dict(case.point),
+            "pure_seconds": None,
+            "compiled_seconds": None,
+            "speedup": None,
+            "speedup_low": None,
+            "speedup_high": None,
+            "pure_stats": None,
+            "compiled_stats": None,
+            "pure_memory": None,
+            "compiled_memory": None,
+            "memory_ratio": None,
+            "ok": False,
+            "error": None,
+        }
+        try:
+            stats = measure_cases(
+                case,
+                {"pure": [source_root], "compiled": [compiled_root, source_root]},
+                package_name=package_name,
+                bench=bench,
+            )
+            if bench.memory:
+                entry["pure_memory"] = measure_memory(case, package_name=package_name, search_path=[source_root])
+                entry["compiled_memory"] = measure_memory(
+                    case, package_name=package_name, search_path=[compiled_root, source_root]
+                )
+        except Exception as exc:
+            entry["error"] = str(exc)
+            results.append(entry)
+            continue
+        if entry["pure_memory"] and entry["compiled_memory"]:
+            compiled_peak = entry["compiled_memory"]["tracemalloc_peak_bytes"]  # type: ignore[index]
+            if compiled_peak:
+                entry["memory_ratio"] = entry["pure_memory"]["tracemalloc_peak_bytes"] / compiled_peak  # type: ignore[index]
+        pure, compiled = stats["pure"], stats["compiled"]
+        entry.update(
+            pure_seconds=pure["median"],
+            compiled_seconds=compiled["median"],
+            speedup=pure["median"] / compiled["median"] if compiled["median"] > 0 else None,
+            speedup_low=pure["ci_low"] / compiled["ci_high"] if compiled["ci_high"] > 0 else None,
+            speedup_high=pure["ci_high"] / compiled["ci_low"] if compiled["ci_low"] > 0 else None,
+            pure_stats=pure,
+            compiled_stats=compiled,
+            ok=True,
+        )
+        results.append(entry)
+    return results
+
+
+def relative_module_name(module_name: str, package_name: str) -> str:
+    """Strip the package prefix from a dotted module name; the package itself is ``__init__``."""
+    if module_name == package_name:
+        return "__init__"
+    prefix = f"{package_name}."
+    return module_name[len(prefix) :] if module_name.startswith(prefix) else module_name
+
+
+def summarize_modules(
+    cases: list[BenchmarkCase],
+    build_results: list[dict[str, object]],
+    benchmark_results: list[dict[str, object]],
+    *,
+    package_name: str,
+    baseline: list[dict[str, object]] | None = None,
+) -> list[dict[str, object]]:
+    """Roll build outcomes and case speedups up to one row per module.
+
+    A module's speedup is the geometric mean over the cases that name it via
+    ``BenchmarkCase.module``; cases without a module count toward the package
+    row.  When ``baseline`` rows (for example from a compile-only run) are
+    given, each row also carries the baseline speedup and the ratio to it.
+    """
+    rows: dict[str, dict[str, object]] = {}
+    for item in build_results:
+        module = relative_module_name(str(item["module"]), package_name)
+        rows[module] = {
+            "module": module,
+            "compiled": bool(item["ok"]),
+            "build_status": item.get("status", "built" if item["ok"] else "failed"),
+            "cases": [],
+            "speedup": None,
+        }
+    speedups: dict[str, list[float]] = {}
+    case_names: dict[str, list[str]] = {}
+    by_name = {str(bench["name"]): bench for bench in benchmark_results}
+    for case in cases:
+        module = case.module or "(package)"
+        rows.setdefault(
+            module, {"module": module, "compiled": None, "build_status": None, "cases": [], "speedup": None}
+        )
+        case_names.setdefault(module, []).append(case.name)
+        bench = by_name.get(case.name)
+        if bench and bench["ok"] and bench["speedup"]:
+            speedups.setdefault(module, []).append(float(bench["speedup"]))  # type: ignore[arg-type]
+    for module, row in rows.items():
+        row["cases"] = case_names.get(module, [])
+    for module, values in speedups.items():
+        rows[module]["speedup"] = math.exp(sum(math.log(value) for value in values) / len(values))
+
+    baseline_by_module = {str(row["module"]): row for row in baseline or []}
+    for module, row in rows.items():
+        if baseline is None:
+            continue
+        baseline_speedup = baseline_by_module.get(module, {}).get("speedup")
+        row["baseline_speedup"] = baseline_speedup
+        row["vs_baseline"] = (
+            float(row["speedup"]) / float(baseline_speedup)  # type: ignore[arg-type]
+            if row["speedup"] and baseline_speedup
+            else None
+        )
+    return [rows[module] for module in sorted(rows)]
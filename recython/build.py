@@ -0,0 +1,515 @@
+"""Build compiled extensions from a generated output tree.
+
+Generated files live in ``output_root``, which mirrors the source package but
+does not carry the package name.  Cython resolves augmenting ``.pxd`` files and
+relative ``cimport`` statements by fully-qualified module name, so each build
+stages the output tree under ``<build_dir>/src/<package_name>/`` first, compiles
+there, and copies the finished extension modules back next to their sources.
+
+Builds are incremental.  Every target gets a fingerprint over its source, the
+package's ``.pxd``/``.pxi``/``.h`` files, the compiler directives and flags, and
+the toolchain.  Finished extension binaries are stored under
+``<build_dir>/objects/`` by fingerprint, so an unchanged module is restored
+from the cache instead of being cythonized and compiled again.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import importlib.metadata
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import sysconfig
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from setuptools import Extension  # type: ignore[import-untyped]
+
+    from recython.jobs import BuildRequest
+
+STAGED_SUFFIXES = (".py", ".pyx", ".pxd", ".pxi", ".h")
+DEPENDENCY_SUFFIXES = (".pxd", ".pxi", ".h")
+DEFAULT_DIRECTIVES: dict[str, object] = {"language_level": "3"}
+STATE_FILENAME = "state.json"
+
+# Named C compiler flag sets: profile -> (compile args, link args).  LTO needs
+# the flag at link time as well so the optimizer sees the whole extension.
+if sys.platform == "win32":
+    FLAG_PROFILES: dict[str, tuple[list[str], list[str]]] = {
+        "default": ([], []),
+        "O3": (["/O2"], []),
+        "native": (["/O2", "/arch:AVX2"], []),
+        "fast-math": (["/O2", "/fp:fast"], []),
+        "lto": (["/O2", "/GL"], ["/LTCG"]),
+    }
+    # MSVC links its OpenMP runtime on its own.
+    OPENMP_ARGS: tuple[list[str], list[str]] = (["/openmp"], [])
+else:
+    FLAG_PROFILES = {
+        "default": ([], []),
+        "O3": (["-O3"], []),
+        "native": (["-O3", "-march=native"], []),
+        "fast-math": (["-O3", "-ffast-math"], []),
+        "lto": (["-O3", "-flto"], ["-flto"]),
+    }
+    # GCC and Clang need the flag at link time too, to pull in the OpenMP runtime.
+    OPENMP_ARGS = (["-fopenmp"], ["-fopenmp"])
+
+
+@dataclass(slots=True)
+class BuildTarget:
+    module_name: str
+    source: Path
+
+
+def default_build_dir(output_root: Path, package_name: str) -> Path:
+    """Return the build cache directory shared by ``convert`` and ``build`` for one package."""
+    return output_root.parent / ".recython" / "build" / package_name
+
+
+def extension_suffix() -> str:
+    return str(sysconfig.get_config_var("EXT_SUFFIX") or ".so")
+
+
+def discover_build_sources(output_root: Path, style: str) -> list[Path]:
+    """Find the generated files in ``output_root`` that compile to extension modules."""
+    if style == "classic":
+        return sorted(path for path in output_root.rglob("*.pyx") if path.is_file())
+    if style in {"pure", "compile-only"}:
+        return sorted(path for path in output_root.rglob("*.py") if path.is_file() and path.name != "__init__.py")
+    if style == "pure_pxd":
+        return sorted(
+            path for path in output_root.rglob("*.py") if path.is_file() and path.with_suffix(".pxd").exists()
+        )
+    raise ValueError(f"Unsupported style '{style}'.")
+
+
+def build_targets_for(output_root: Path, package_name: str, sources: list[Path]) -> list[BuildTarget]:
+    """Map generated ``.py``/``.pyx`` files to dotted module names under ``package_name``."""
+    targets: list[BuildTarget] = []
+    for source in sources:
+        relative = source.relative_to(output_root).with_suffix("")
+        parts = [package_name, *relative.parts]
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        targets.append(BuildTarget(module_name=".".join(parts), source=source))
+    return targets
+
+
+def _stage_tree(output_root: Path, package_name: str, stage_root: Path) -> Path:
+    package_dir = stage_root / package_name
+    if package_dir.exists():
+        shutil.rmtree(package_dir)
+    package_dir.mkdir(parents=True)
+    for path in output_root.rglob("*"):
+        if path.is_file() and path.suffix in STAGED_SUFFIXES:
+            destination = package_dir / path.relative_to(output_root)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, destination)
+    init_file = package_dir / "__init__.py"
+    if not init_file.exists():
+        init_file.write_text("", encoding="utf-8")
+    return package_dir
+
+
+def _dependency_digest(package_dir: Path) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(package_dir.rglob("*")):
+        if path.is_file() and path.suffix in DEPENDENCY_SUFFIXES:
+            digest.update(path.relative_to(package_dir).as_posix().encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def build_fingerprint(
+    source: Path,
+    *,
+    module_name: str,
+    dependency_digest: str,
+    compiler_directives: dict[str, object],
+    extra_compile_args: list[str],
+    extra_link_args: list[str] | None = None,
+) -> str:
+    """Hash everything that can change the compiled output of one module."""
+    digest = hashlib.sha256()
+    digest.update(source.read_bytes())
+    digest.update(
+        json.dumps(
+            {
+                "module": module_name,
+                "dependencies": dependency_digest,
+                "directives": compiler_directives,
+                "compile_args": extra_compile_args,
+                "link_args": extra_link_args or [],
+                "cython": importlib.metadata.version("Cython"),
+                "python": sys.version,
+                "ext_suffix": extension_suffix(),
+                "cc": os.environ.get("CC", ""),
+                "cflags": os.environ.get("CFLAGS", ""),
+            },
+            sort_keys=True,
+            default=str,
+        ).encode("utf-8")
+    )
+    return digest.hexdigest()
+
+
+def _load_state(build_dir: Path) -> dict[str, str]:
+    state_path = build_dir / STATE_FILENAME
+    if not state_path.exists():
+        return {}
+    state: dict[str, str] = json.loads(state_path.read_text(encoding="utf-8"))
+    return state
+
+
+def _save_state(build_dir: Path, state: dict[str, str]) -> None:
+    build_dir.mkdir(parents=True, exist_ok=True)
+    (build_dir / STATE_FILENAME).write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def _cached_object(build_dir: Path, fingerprint: str) -> Path:
+    return build_dir / "objects" / fingerprint[:2] / f"{fingerprint}{extension_suffix()}"
+
+
+def _result(target: BuildTarget, status: str, *, path: Path | None = None, error: object = None) -> dict[str, object]:
+    return {
+        "module": target.module_name,
+        "source": str(target.source),
+        "ok": status != "failed",
+        "status": status,
+        "path": str(path) if path else None,
+        "error": str(error) if error is not None else None,
+    }
+
+
+def _cythonize(extensions: list[Extension], **options: Any) -> list[Extension]:
+    """Typed front for ``Cython.Build.cythonize``, which ships without annotations."""
+    from Cython.Build import cythonize
+
+    cythonized: list[Extension] = cythonize(extensions, **options)  # type: ignore[no-untyped-call]
+    return cythonized
+
+
+def _compile_extension(extension: Extension, *, package_name: str, build_dir: Path) -> Path:
+    from setuptools import Distribution
+
+    distribution = Distribution({"name": package_name, "ext_modules": [extension]})
+    command = distribution.get_command_obj("build_ext")
+    command.build_lib = str(build_dir / "lib")
+    command.build_temp = str(build_dir / "temp")
+    command.verbose = 0
+    # The fingerprint cache already decided this module needs compiling; do not let
+    # build_ext skip it because an older binary in build_lib looks newer than the C file.
+    command.force = True
+    command.ensure_finalized()
+    command.run()
+    return Path(command.get_ext_fullpath(extension.name))
+
+
+def _worker_pool(workers: int) -> ProcessPoolExecutor:
+    # Cython keeps per-file dependency and distutils caches for the whole
+    # process and merges each Extension's flags into them, and setuptools'
+    # build_ext is not safe to run from several threads.  Every build therefore
+    # cythonizes and compiles in freshly spawned worker processes.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _build_in_worker(
+    module_name: str,
+    staged_source: str,
+    *,
+    package_name: str,
+    stage_root: str,
+    build_dir: str,
+    compiler_directives: dict[str, object],
+    extra_compile_args: list[str],
+    extra_link_args: list[str],
+) -> tuple[Path | None, str | None]:
+    """Cythonize and compile one staged module; return the built binary or the error."""
+    from setuptools import Extension
+
+    extension = Extension(
+        module_name, [staged_source], extra_compile_args=extra_compile_args, extra_link_args=extra_link_args
+    )
+    try:
+        cythonized = _cythonize(
+            [extension],
+            include_path=[stage_root],
+            compiler_directives=compiler_directives,
+            build_dir=str(Path(build_dir) / "c"),
+            exclude_failures=True,
+            quiet=True,
+            force=True,
+        )
+        if not cythonized:
+            return None, "Cython compilation failed."
+        return _compile_extension(cythonized[0], package_name=package_name, build_dir=Path(build_dir)), None
+    except (Exception, SystemExit) as exc:  # pragma: no cover - compiler-specific failures
+        return None, str(exc)
+
+
+def _annotate_in_worker(
+    modules: list[tuple[str, str]], *, stage_root: str, build_dir: str, compiler_directives: dict[str, object]
+) -> dict[str, str]:
+    """Cythonize staged modules with annotation on; map each module to its HTML report."""
+    from setuptools import Extension
+
+    cythonized = _cythonize(
+        [Extension(name, [source]) for name, source in modules],
+        include_path=[stage_root],
+        compiler_directives=compiler_directives,
+        build_dir=str(Path(build_dir) / "annotate"),
+        annotate=True,
+        exclude_failures=True,
+        quiet=True,
+        force=True,
+    )
+    return {extension.name: str(Path(extension.sources[0]).with_suffix(".html")) for extension in cythonized}
+
+
+def flag_profile_args(name: str) -> tuple[list[str], list[str]]:
+    """Return copies of the compile and link args for flag profile ``name``."""
+    if name not in FLAG_PROFILES:
+        raise ValueError(f"Unknown flag profile '{name}'. Expected one of: {', '.join(FLAG_PROFILES)}.")
+    compile_args, link_args = FLAG_PROFILES[name]
+    return list(compile_args), list(link_args)
+
+
+def with_openmp(build: BuildRequest) -> BuildRequest:
+    """Return ``build`` with the OpenMP compile and link flags of this platform's compiler added."""
+    compile_args, link_args = OPENMP_ARGS
+    return replace(
+        build,
+        extra_compile_args=[*build.extra_compile_args, *compile_args],
+        extra_link_args=[*build.extra_link_args, *link_args],
+    )
+
+
+def build_extensions(
+    targets: list[BuildTarget],
+    *,
+    output_root: Path,
+    package_name: str,
+    build_dir: Path,
+    compiler_directives: dict[str, object] | None = None,
+    extra_compile_args: list[str] | None = None,
+    extra_link_args: list[str] | None = None,
+    jobs: int = 0,
+    force: bool = False,
+) -> list[dict[str, object]]:
+    """Compile each target into an extension module placed next to its source.
+
+    Each pending target is cythonized and compiled in a worker process;
+    ``jobs`` bounds the worker count and ``0`` means one per CPU.  Unchanged
+    targets are skipped (``up-to-date``) or restored from the object cache
+    (``cached``).
+    A broken module is reported as ``failed`` without aborting the rest.
+    """
+    workers = jobs or os.cpu_count() or 1
+    stage_root = build_dir / "src"
+    package_dir = _stage_tree(output_root, package_name, stage_root)
+    directives = {**DEFAULT_DIRECTIVES, **(compiler_directives or {})}
+    compile_args = list(extra_compile_args or [])
+    link_args = list(extra_link_args or [])
+    dependency_digest = _dependency_digest(package_dir)
+    state = _load_state(build_dir)
+    results: dict[str, dict[str, object]] = {}
+    fingerprints: dict[str, str] = {}
+    pending: list[BuildTarget] = []
+
+    for target in targets:
+        destination = target.source.with_name(target.source.stem + extension_suffix())
+        fingerprint = build_fingerprint(
+            target.source,
+            module_name=target.module_name,
+            dependency_digest=dependency_digest,
+            compiler_directives=directives,
+            extra_compile_args=compile_args,
+            extra_link_args=link_args,
+        )
+        fingerprints[target.module_name] = fingerprint
+        cached = _cached_object(build_dir, fingerprint)
+        if not force and cached.exists():
+            if state.get(target.module_name) == fingerprint and destination.exists():
+                results[target.module_name] = _result(target, "up-to-date", path=destination)
+            else:
+                shutil.copy2(cached, destination)
+                results[target.module_name] = _result(target, "cached", path=destination)
+            state[target.module_name] = fingerprint
+            continue
+        pending.append(target)
+
+    if pending:
+        with _worker_pool(min(workers, len(pending))) as pool:
+            futures = [
+                pool.submit(
+                    _build_in_worker,
+                    target.module_name,
+                    str(package_dir / target.source.relative_to(output_root)),
+                    package_name=package_name,
+                    stage_root=str(stage_root),
+                    build_dir=str(build_dir),
+                    compiler_directives=directives,
+                    extra_compile_args=compile_args,
+                    extra_link_args=link_args,
+                )
+                for target in pending
+            ]
+            for target, future in zip(pending, futures, strict=True):
+                try:
+                    built, error = future.result()
+                except Exception as exc:  # pragma: no cover - a worker process died
+                    built, error = None, str(exc)
+                if built is None:
+                    results[target.module_name] = _result(target, "failed", error=error)
+                    continue
+                destination = target.source.with_name(target.source.stem + extension_suffix())
+                cached = _cached_object(build_dir, fingerprints[target.module_name])
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(built, cached)
+                shutil.copy2(built, destination)
+                results[target.module_name] = _result(target, "built", path=destination)
+                state[target.module_name] = fingerprints[target.module_name]
+
+    _save_state(build_dir, state)
+    return [results[target.module_name] for target in targets]
+
+
+def annotate_extensions(
+    targets: list[BuildTarget],
+    *,
+    output_root: Path,
+    package_name: str,
+    build_dir: Path,
+    compiler_directives: dict[str, object] | None = None,
+) -> dict[str, Path]:
+    """Cythonize ``targets`` with annotation on and return each module's HTML report.
+
+    Only the C translation runs; nothing is compiled or copied back.  Modules
+    Cython rejects are missing from the result.
+    """
+    stage_root = build_dir / "src"
+    package_dir = _stage_tree(output_root, package_name, stage_root)
+    modules = [(target.module_name, str(package_dir / target.source.relative_to(output_root))) for target in targets]
+    with _worker_pool(1) as pool:
+        reports = pool.submit(
+            _annotate_in_worker,
+            modules,
+            stage_root=str(stage_root),
+            build_dir=str(build_dir),
+            compiler_directives={**DEFAULT_DIRECTIVES, **(compiler_directives or {})},
+        ).result()
+    return {name: Path(path) for name, path in reports.items() if Path(path).exists()}
+
+
+def build_mypyc_extensions(
+    targets: list[BuildTarget],
+    *,
+    output_root: Path,
+    package_name: str,
+    build_dir: Path,
+    opt_level: str = "3",
+    jobs: int = 0,
+) -> list[dict[str, object]]:
+    """Compile each target separately with mypyc and place the result next to its source.
+
+    Every module gets its own staged copy of the tree, so modules build
+    concurrently and one that fails type checking does not take the others
+    down.  mypyc writes a ``<module>__mypyc`` runtime library beside each
+    module; both binaries are copied back.
+    """
+    workers = jobs or os.cpu_count() or 1
+    suffix = extension_suffix()
+
+    def compile_one(target: BuildTarget) -> dict[str, object]:
+        stage_root = build_dir / "mypyc" / target.module_name
+        package_dir = _stage_tree(output_root, package_name, stage_root)
+        relative = target.source.relative_to(output_root)
+        completed = subprocess.run(
+            [sys.executable, "-m", "mypyc", (Path(package_name) / relative).as_posix()],
+            cwd=stage_root,
+            env={**os.environ, "MYPYC_OPT_LEVEL": opt_level},
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if completed.returncode != 0:
+            output = (completed.stdout + completed.stderr).strip()
+            return _result(target, "failed", error=output or f"mypyc exited with {completed.returncode}.")
+        built_dir = (package_dir / relative).parent
+        for built in built_dir.glob(f"{target.source.stem}*{suffix}"):
+            if built.name in {f"{target.source.stem}{suffix}", f"{target.source.stem}__mypyc{suffix}"}:
+                shutil.copy2(built, target.source.with_name(built.name))
+        return _result(target, "built", path=target.source.with_name(target.source.stem + suffix))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(compile_one, targets))
+
+
+def _wheel_tags() -> str:
+    python_tag = f"cp{sys.version_info.major}{sys.version_info.minor}"
+    platform_tag = sysconfig.get_platform().replace("-", "_").replace(".", "_")
+    return f"{python_tag}-{python_tag}-{platform_tag}"
+
+
+def _record_line(archive_name: str, data: bytes) -> str:
+    digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest()).rstrip(b"=").decode("ascii")
+    return f"{archive_name},sha256={digest},{len(data)}"
+
+
+def build_wheel(
+    *,
+    package_name: str,
+    version: str,
+    source_root: Path,
+    output_root: Path,
+    dist_dir: Path,
+) -> Path:
+    """Package the compiled output tree into a platform wheel.
+
+    The wheel carries the original package with every compiled module's ``.py``
+    replaced by its extension binary.  Files that were never converted are
+    taken from ``source_root`` unchanged.
+    """
+    suffix = extension_suffix()
+    files: dict[str, Path] = {}
+    for path in sorted(source_root.rglob("*")):
+        if path.is_file() and "__pycache__" not in path.parts and path.suffix != ".pyc":
+            files[path.relative_to(source_root).as_posix()] = path
+    for path in sorted(output_root.rglob(f"*{suffix}")):
+        relative = path.relative_to(output_root)
+        module_stem = relative.name[: -len(suffix)]
+        files.pop((relative.parent / f"{module_stem}.py").as_posix(), None)
+        files[relative.as_posix()] = path
+
+    distribution = package_name.replace("-", "_")
+    dist_info = f"{distribution}-{version}.dist-info"
+    wheel_name = f"{distribution}-{version}-{_wheel_tags()}.whl"
+    metadata = f"Metadata-Version: 2.1\nName: {package_name}\nVersion: {version}\n"
+    wheel_meta = f"Wheel-Version: 1.0\nGenerator: recython\nRoot-Is-Purelib: false\nTag: {_wheel_tags()}\n"
+
+    dist_dir.mkdir(parents=True, exist_ok=True)
+    wheel_path = dist_dir / wheel_name
+    records: list[str] = []
+    with zipfile.ZipFile(wheel_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for member, path in sorted(files.items()):
+            archive_name = f"{package_name}/{member}"
+            data = path.read_bytes()
+            archive.writestr(archive_name, data)
+            records.append(_record_line(archive_name, data))
+        for name, text in (("METADATA", metadata), ("WHEEL", wheel_meta)):
+            archive_name = f"{dist_info}/{name}"
+            archive.writestr(archive_name, text)
+            records.append(_record_line(archive_name, text.encode("utf-8")))
+        records.append(f"{dist_info}/RECORD,,")
+        archive.writestr(f"{dist_info}/RECORD", "\n".join(records) + "\n")
+    return wheel_path
@@ -2,14 +2,60 @@ from __future__ import annotations
 
 import argparse
 import json
+from dataclasses import asdict, replace
 from pathlib import Path
 
-from recython.config import apply_config_overrides, load_config, render_starter_config
+from recython.ai_calls import PROVIDERS, REPLAY_MODES
+from recython.build import (
+    FLAG_PROFILES,
+    annotate_extensions,
+    build_targets_for,
+    build_wheel,
+    default_build_dir,
+    discover_build_sources,
+    with_openmp,
+)
+from recython.benchmarks import (
+    SampleSummary,
+    compare_benchmarks,
+    expand_cases,
+    format_bytes,
+    format_duration,
+    grid_name,
+    relative_module_name,
+)
+from recython.backends import BACKENDS, build_with_profiles, compare_backends
+from recython.config import RecythonConfig, apply_config_overrides, load_config, render_starter_config
 from recython.engine import build_run_request, execute_run_with_pack, plan_run
-from recython.jobs import RunResult, ValidationRequest
+from recython.history import case_trend, compare_runs, history_path, load_run, record_run, resolve_run
+from recython.hotspots import collect_hotspots, load_profile_shares, render_hotspots_markdown
+from recython.jobs import (
+    BenchmarkCase,
+    BenchRequest,
+    BuildRequest,
+    HedgeRequest,
+    RateLimitRequest,
+    ReplayRequest,
+    RunResult,
+    SimulatedRequest,
+    ValidationRequest,
+)
+from recython.pgo import run_pgo
+from recython.progress import ProgressDisplay
 from recython.prompts import PROMPT_KEYS, list_prompt_profiles, load_prompt_pack
+from recython.scaling import render_scaling_chart, scaling_curves
+from recython.tracing import TYPES_FILENAME, TypeTracer, run_traced_command, write_type_evidence
+from recython.tune import search_package_flags, stored_flag_profiles, tune_package
 from recython.validation import validate_outputs
 
+STYLE_CHOICES = ("classic", "pure", "pure_pxd", "compile-only")
+TEMPLATE_LABELS = {
+    "classic-pyx": "classic_pyx",
+    "classic-pxd": "classic_pxd",
+    "pure": "pure",
+    "pure-pxd": "pure_pxd",
+}
+
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -23,7 +69,7 @@ def build_parser() -> argparse.ArgumentParser:
     convert.add_argument("output", nargs="?", type=Path, help="Destination folder for translated files.")
     convert.add_argument(
         "--style",
-        choices=("classic", "pure"),
+        choices=STYLE_CHOICES,
         help="Translation strategy to use.",
     )
     convert.add_argument(
@@ -40,14 +86,52 @@ def build_parser() -> argparse.ArgumentParser:
     )
     convert.add_argument("--include", action="append", default=[], metavar="TEXT", help="Limit work to matching files.")
     convert.add_argument("--model", help="Override the configured model for this run.")
-    convert.add_argument("--provider", choices=("openai", "openrouter"), help="Override the configured provider.")
+    convert.add_argument(
+        "--models", nargs="+", metavar="MODEL", help="Escalation ladder: move one model up after each failed attempt."
+    )
+    convert.add_argument("--provider", choices=PROVIDERS, help="Override the configured provider.")
+    convert.add_argument(
+        "--replay-from",
+        type=Path,
+        metavar="PATH",
+        help="Answer from a cassette or earlier run directory instead of the API (implies --provider replay).",
+    )
+    convert.add_argument(
+        "--replay-mode",
+        choices=REPLAY_MODES,
+        help="On a replay miss, fail (strict) or call the fallthrough provider (fallthrough).",
+    )
+    convert.add_argument(
+        "--record", type=Path, metavar="PATH", help="Append every prompt/response pair to this cassette."
+    )
     convert.add_argument("--prompt-profile", help="Select a bundled prompt profile.")
     convert.add_argument("--max-attempts", type=int, help="Maximum generation attempts per source file.")
+    convert.add_argument(
+        "--pack-tokens", type=int, help="Send small files together in prompts of up to this many source tokens."
+    )
+    convert.add_argument("--concurrency", type=int, help="Number of files to generate at once.")
+    convert.add_argument(
+        "--hedge", action="store_true", help="Duplicate model calls that run past the usual latency; first reply wins."
+    )
+    convert.add_argument(
+        "--shared-rate-limit",
+        action="store_true",
+        help="Share the rate-limit budget with other recython processes using the same credentials.",
+    )
     convert.add_argument(
         "--baseline-manifest",
         type=Path,
         help="Optional baseline manifest for maintenance-aware runs.",
     )
+    convert.add_argument(
+        "--pgo", action="store_true", help="Rebuild with profile-guided optimization trained on the benchmark cases."
+    )
+    convert.add_argument(
+        "--no-progress", action="store_true", help="Do not show live progress on stderr while files are generated."
+    )
+    convert.add_argument(
+        "--chrome-trace", action="store_true", help="Also write the run's timing spans as Chrome trace-event JSON."
+    )
     convert.add_argument("--pyproject", type=Path, help="Load configuration from a specific pyproject.toml.")
     convert.add_argument("--report-json", type=Path, help="Write the run result as JSON to this path.")
     convert.set_defaults(handler=handle_convert)
@@ -55,7 +139,7 @@ def build_parser() -> argparse.ArgumentParser:
     maintain = subparsers.add_parser("maintain", help="Regenerate only files changed since a baseline manifest.")
     maintain.add_argument("source", nargs="?", type=Path, help="Source package or module directory to translate.")
     maintain.add_argument("output", nargs="?", type=Path, help="Destination folder for translated files.")
-    maintain.add_argument("--style", choices=("classic", "pure"), help="Translation strategy to use.")
+    maintain.add_argument("--style", choices=STYLE_CHOICES, help="Translation strategy to use.")
     maintain.add_argument(
         "--exclude",
         action="append",
@@ -71,11 +155,46 @@ def build_parser() -> argparse.ArgumentParser:
         help="Limit work to matching files.",
     )
     maintain.add_argument("--model", help="Override the configured model for this run.")
-    maintain.add_argument("--provider", choices=("openai", "openrouter"), help="Override the configured provider.")
+    maintain.add_argument(
+        "--models", nargs="+", metavar="MODEL", help="Escalation ladder: move one model up after each failed attempt."
+    )
+    maintain.add_argument("--provider", choices=PROVIDERS, help="Override the configured provider.")
+    maintain.add_argument(
+        "--replay-from",
+        type=Path,
+        metavar="PATH",
+        help="Answer from a cassette or earlier run directory instead of the API (implies --provider replay).",
+    )
+    maintain.add_argument(
+        "--replay-mode",
+        choices=REPLAY_MODES,
+        help="On a replay miss, fail (strict) or call the fallthrough provider (fallthrough).",
+    )
+    maintain.add_argument(
+        "--record", type=Path, metavar="PATH", help="Append every prompt/response pair to this cassette."
+    )
     maintain.add_argument("--prompt-profile", help="Select a bundled prompt profile.")
     maintain.add_argument("--max-attempts", type=int, help="Maximum generation attempts per source file.")
+    maintain.add_argument("--concurrency", type=int, help="Number of files to generate at once.")
+    maintain.add_argument(
+        "--hedge", action="store_true", help="Duplicate model calls that run past the usual latency; first reply wins."
+    )
+    maintain.add_argument(
+        "--shared-rate-limit",
+        action="store_true",
+        help="Share the rate-limit budget with other recython processes using the same credentials.",
+    )
     maintain.add_argument("--baseline-manifest", type=Path, help="Baseline manifest to diff against.")
     maintain.add_argument("--dry-run", action="store_true", help="Preview changed files without calling the model.")
+    maintain.add_argument(
+        "--pgo", action="store_true", help="Rebuild with profile-guided optimization trained on the benchmark cases."
+    )
+    maintain.add_argument(
+        "--no-progress", action="store_true", help="Do not show live progress on stderr while files are generated."
+    )
+    maintain.add_argument(
+        "--chrome-trace", action="store_true", help="Also write the run's timing spans as Chrome trace-event JSON."
+    )
     maintain.add_argument("--pyproject", type=Path, help="Load configuration from a specific pyproject.toml.")
     maintain.add_argument("--report-json", type=Path, help="Write the run result as JSON to this path.")
     maintain.set_defaults(handler=handle_maintain)
@@ -83,12 +202,18 @@ def build_parser() -> argparse.ArgumentParser:
     plan = subparsers.add_parser("plan", help="Preview the files and outputs that would be touched.")
     plan.add_argument("source", nargs="?", type=Path, help="Source package or module directory to translate.")
     plan.add_argument("output", nargs="?", type=Path, help="Destination folder for translated files.")
-    plan.add_argument("--style", choices=("classic", "pure"), help="Translation strategy to use.")
-    plan.add_argument("--provider", choices=("openai", "openrouter"), help="Override the configured provider.")
+    plan.add_argument("--style", choices=STYLE_CHOICES, help="Translation strategy to use.")
+    plan.add_argument("--provider", choices=PROVIDERS, help="Override the configured provider.")
     plan.add_argument("--exclude", action="append", default=[], metavar="TEXT", help="Substring filter to skip files.")
     plan.add_argument("--include", action="append", default=[], metavar="TEXT", help="Limit work to matching files.")
+    plan.add_argument(
+        "--models", nargs="+", metavar="MODEL", help="Escalation ladder: move one model up after each failed attempt."
+    )
     plan.add_argument("--prompt-profile", help="Select a bundled prompt profile.")
     plan.add_argument("--max-attempts", type=int, help="Maximum generation attempts per source file.")
+    plan.add_argument(
+        "--pack-tokens", type=int, help="Send small files together in prompts of up to this many source tokens."
+    )
     plan.add_argument(
         "--baseline-manifest",
         type=Path,
@@ -100,11 +225,164 @@ def build_parser() -> argparse.ArgumentParser:
 
     validate = subparsers.add_parser("validate", help="Validate generated outputs.")
     validate.add_argument("target", nargs="?", type=Path, help="Output directory to validate.")
-    validate.add_argument("--style", choices=("classic", "pure"), help="Translation strategy to validate.")
+    validate.add_argument("--style", choices=STYLE_CHOICES, help="Translation strategy to validate.")
+    validate.add_argument("--prompt-profile", help="Also run the extra validator of this prompt profile.")
     validate.add_argument("--pyproject", type=Path, help="Load configuration from a specific pyproject.toml.")
     validate.add_argument("--report-json", type=Path, help="Write the validation result as JSON to this path.")
     validate.set_defaults(handler=handle_validate)
 
+    build = subparsers.add_parser("build", help="Compile the generated output tree into extension modules.")
+    build.add_argument("target", nargs="?", type=Path, help="Output directory to build. Defaults to output_root.")
+    build.add_argument("--style", choices=STYLE_CHOICES, help="Style of the generated output tree.")
+    build.add_argument("--source", type=Path, help="Original package directory. Defaults to [tool.recython].source.")
+    build.add_argument("--jobs", type=int, help="Parallel cythonize and C compile workers. 0 means one per CPU.")
+    build.add_argument("--force", action="store_true", help="Rebuild every module even when the cache is current.")
+    build.add_argument("--flag-profile", choices=list(FLAG_PROFILES), help="C compiler flag profile to build with.")
+    build.add_argument(
+        "--flag-search",
+        nargs="*",
+        choices=list(FLAG_PROFILES),
+        help="Benchmark each module under these flag profiles (all when none are named) and keep the fastest.",
+    )
+    build.add_argument(
+        "--pgo", action="store_true", help="Rebuild with profile-guided optimization trained on the benchmark cases."
+    )
+    build.add_argument("--wheel", action="store_true", help="Also package the compiled tree into a wheel.")
+    build.add_argument("--dist-dir", type=Path, help="Where to write the wheel. Defaults to ./dist.")
+    build.add_argument("--version", default="0.0.0", help="Version recorded in the wheel metadata.")
+    build.add_argument("--pyproject", type=Path, help="Load configuration from a specific pyproject.toml.")
+    build.add_argument("--report-json", type=Path, help="Write the build results as JSON to this path.")
+    build.set_defaults(handler=handle_build)
+
+    bench = subparsers.add_parser(
+        "bench", help="Time the configured benchmark cases against the source and the built output tree."
+    )
+    bench.add_argument("target", nargs="?", type=Path, help="Built output directory. Defaults to output_root.")
+    bench.add_argument("--source", type=Path, help="Original package directory. Defaults to [tool.recython].source.")
+    bench.add_argument("--case", action="append", default=[], metavar="NAME", help="Only run this case; repeatable.")
+    bench.add_argument("--processes", type=int, help="Worker processes per side and case.")
+    bench.add_argument("--warmup", type=int, help="Untimed calls in each worker before sampling.")
+    bench.add_argument("--min-time", type=float, help="Seconds one sample must last when calibrating loop counts.")
+    bench.add_argument(
+        "--affinity", type=_cpu_list, help="Comma-separated CPU ids to pin workers to, for example 2 or 2,3."
+    )
+    bench.add_argument(
+        "--compare",
+        metavar="BASELINE",
+        help="Compare against a stored run: a run id, a git revision prefix, or 'latest'. Exits 1 on regressions.",
+    )
+    bench.add_argument("--threshold", type=float, help="Relative speedup drop that counts as a regression.")
+    bench.add_argument("--no-record", action="store_true", help="Do not store this run in the benchmark history.")
+    bench.add_argument("--pyproject", type=Path, help="Load configuration from a specific pyproject.toml.")
+    bench.add_argument("--report-json", type=Path, help="Write the timing statistics as JSON to this path.")
+    bench.set_defaults(handler=handle_bench)
+
+    history = subparsers.add_parser("history", help="Show how benchmark speedups evolved across stored runs.")
+    history.add_argument("--case", help="Only show this benchmark case.")
+    history.add_argument("--limit", type=int, default=20, help="Most recent runs to show per case.")
+    history.add_argument("--pyproject", type=Path, help="Load configuration from a specific pyproject.toml.")
+    history.add_argument("--report-json", type=Path, help="Write the trend as JSON to this path.")
+    history.set_defaults(handler=handle_history)
+
+    report = subparsers.add_parser(
+        "report", help="Show the latest run report, or rank annotation hotspots across the package with --annotate."
+    )
+    report.add_argument("target", nargs="?", type=Path, help="Generated output directory. Defaults to output_root.")
+    report.add_argument(
+        "--annotate",
+        action="store_true",
+        help="Cythonize every generated module with annotation and rank lines by Python interaction.",
+    )
+    report.add_argument("--style", choices=STYLE_CHOICES, help="Style of the generated output tree.")
+    report.add_argument("--source", type=Path, help="Original package directory. Defaults to [tool.recython].source.")
+    report.add_argument(
+        "--profile",
+        type=Path,
+        help="cProfile/pstats file to weight functions by runtime share. Defaults to .recython/profile.pstats.",
+    )
+    report.add_argument("--top", type=int, default=20, help="Number of functions and lines to rank.")
+    report.add_argument("--pyproject", type=Path, help="Load configuration from a specific pyproject.toml.")
+    report.add_argument("--report-json", type=Path, help="Write the hotspots as JSON to this path.")
+    report.add_argument("--markdown", type=Path, help="Write the hotspots as markdown to this path.")
+    report.set_defaults(handler=handle_report)
+
+    tune = subparsers.add_parser(
+        "tune",
+        help="Search Cython compiler directives per module and write the fastest safe set back.",
+    )
+    tune.add_argument("target", nargs="?", type=Path, help="Output directory to tune. Defaults to output_root.")
+    tune.add_argument("--style", choices=STYLE_CHOICES, help="Style of the generated output tree.")
+    tune.add_argument("--source", type=Path, help="Original package directory. Defaults to [tool.recython].source.")
+    tune.add_argument(
+        "--module",
+        dest="modules",
+        action="append",
+        default=[],
+        help="Only tune this module (dotted, relative to the package). Repeat as needed.",
+    )
+    tune.add_argument("--exhaustive", action="store_true", help="Try every directive combination, not a greedy walk.")
+    tune.add_argument("--force", action="store_true", help="Re-tune modules whose stored results are still current.")
+    tune.add_argument("--jobs", type=int, help="Parallel build workers. 0 means one per CPU.")
+    tune.add_argument("--pyproject", type=Path, help="Load configuration from a specific pyproject.toml.")
+    tune.add_argument("--report-json", type=Path, help="Write the tuning results as JSON to this path.")
+    tune.set_defaults(handler=handle_tune)
+
+    backends = subparsers.add_parser(
+        "backends",
+        help="Build the source with several compilation backends and compare them per module.",
+    )
+    backends.add_argument("source", nargs="?", type=Path, help="Source package. Defaults to [tool.recython].source.")
+    backends.add_argument(
+        "--backend",
+        dest="backend_names",
+        action="append",
+        choices=tuple(BACKENDS),
+        default=[],
+        help="Backend to compare. Repeat as needed. Defaults to every backend.",
+    )
+    backends.add_argument(
+        "--classic-output",
+        type=Path,
+        help="Converted classic output tree for cython-classic. Defaults to output_root when style is classic.",
+    )
+    backends.add_argument(
+        "--pure-output",
+        type=Path,
+        help="Converted pure output tree for cython-pure. Defaults to output_root when style is pure, "
+        "else the unmodified source.",
+    )
+    backends.add_argument("--work-dir", type=Path, help="Scratch directory. Defaults to .recython/backends/<package>.")
+    backends.add_argument("--jobs", type=int, help="Parallel build workers per backend. 0 means one per CPU.")
+    backends.add_argument("--pyproject", type=Path, help="Load configuration from a specific pyproject.toml.")
+    backends.add_argument("--report-json", type=Path, help="Write the comparison as JSON to this path.")
+    backends.set_defaults(handler=handle_backends)
+
+    trace = subparsers.add_parser(
+        "trace",
+        help="Run a workload or test suite and record observed types for the conversion prompts.",
+    )
+    trace.add_argument(
+        "--source",
+        action="append",
+        type=Path,
+        default=[],
+        help="Only record functions defined under this path. Repeat as needed. Defaults to [tool.recython].source.",
+    )
+    trace.add_argument(
+        "--output",
+        type=Path,
+        help=f"Where to write the evidence. Defaults to .recython/{TYPES_FILENAME}.",
+    )
+    trace.add_argument("--replace", action="store_true", help="Overwrite existing evidence instead of merging into it.")
+    trace.add_argument("--pyproject", type=Path, help="Load configuration from a specific pyproject.toml.")
+    trace.add_argument(
+        "trace_command",
+        nargs=argparse.REMAINDER,
+        metavar="-- COMMAND",
+        help="Command to trace: '-m module args', 'script.py args', or an importable module such as pytest.",
+    )
+    trace.set_defaults(handler=handle_trace)
+
     prompts = subparsers.add_parser("prompts", help="Inspect bundled prompt templates.")
     prompts_subparsers = prompts.add_subparsers(dest="prompts_command", required=True)
 
@@ -114,7 +392,7 @@ def build_parser() -> argparse.ArgumentParser:
     prompts_show = prompts_subparsers.add_parser("show", help="Print a prompt template.")
     prompts_show.add_argument(
         "template",
-        choices=("classic-pyx", "classic-pxd", "pure"),
+        choices=tuple(TEMPLATE_LABELS),
         help="Template to print.",
     )
     prompts_show.add_argument("--profile", default="default", help="Prompt profile to inspect.")
@@ -136,15 +414,121 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def _benchmark_cases(config: RecythonConfig) -> list[BenchmarkCase]:
+    return expand_cases(
+        [
+            BenchmarkCase(
+                name=item.name,
+                stmt=item.stmt,
+                setup=item.setup,
+                number=item.number,
+                repeat=item.repeat,
+                module=item.module,
+                check=item.check,
+                params={key: list(values) for key, values in item.params.items()},
+            )
+            for item in config.benchmarks
+        ]
+    )
+
+
+def _cpu_list(text: str) -> list[int]:
+    try:
+        return [int(item) for item in text.split(",") if item.strip()]
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"Expected comma-separated CPU ids, got '{text}'.") from exc
+
+
+def _bench_request(config: RecythonConfig) -> BenchRequest:
+    return BenchRequest(
+        processes=config.bench.processes,
+        warmup=config.bench.warmup,
+        min_time=config.bench.min_time,
+        cpu_affinity=list(config.bench.cpu_affinity),
+        confidence=config.bench.confidence,
+        outlier_iqr=config.bench.outlier_iqr,
+        memory=config.bench.memory,
+        history=config.bench.history,
+        regression_threshold=config.bench.regression_threshold,
+    )
+
+
+def _build_request(config: RecythonConfig, jobs: int | None = None, pgo: bool = False) -> BuildRequest:
+    return BuildRequest(
+        jobs=config.build.jobs if jobs is None else jobs,
+        compiler_directives=dict(config.build.compiler_directives),
+        extra_compile_args=list(config.build.extra_compile_args),
+        extra_link_args=list(config.build.extra_link_args),
+        flag_profile=config.build.flag_profile,
+        flag_search=list(config.build.flag_search),
+        pgo=config.build.pgo or pgo,
+    )
+
+
+def _replay_request(config: RecythonConfig, args: argparse.Namespace) -> ReplayRequest:
+    return ReplayRequest(
+        source=getattr(args, "replay_from", None) or config.replay.source,
+        mode=getattr(args, "replay_mode", None) or config.replay.mode,
+        fallthrough_provider=config.replay.fallthrough_provider,
+        record=getattr(args, "record", None) or config.replay.record,
+    )
+
+
+def _simulated_request(config: RecythonConfig) -> SimulatedRequest:
+    settings = config.simulated
+    return SimulatedRequest(
+        responses=sorted({path for pattern in settings.responses for path in config.project_root.glob(pattern)}),
+        latency=settings.latency,
+        latency_median=settings.latency_median,
+        latency_spread=settings.latency_spread,
+        tokens_per_second=settings.tokens_per_second,
+        rate_limit_rate=settings.rate_limit_rate,
+        server_error_rate=settings.server_error_rate,
+        retry_after=settings.retry_after,
+        seed=settings.seed,
+    )
+
+
+def _rate_limit_request(config: RecythonConfig, args: argparse.Namespace) -> RateLimitRequest:
+    settings = config.rate_limit
+    return RateLimitRequest(
+        enabled=settings.enabled,
+        requests_per_minute=settings.requests_per_minute,
+        tokens_per_minute=settings.tokens_per_minute,
+        max_concurrency=settings.max_concurrency,
+        min_concurrency=settings.min_concurrency,
+        increase=settings.increase,
+        decrease=settings.decrease,
+        max_retry_after=settings.max_retry_after,
+        shared=settings.shared or getattr(args, "shared_rate_limit", False),
+        shared_path=settings.shared_path,
+    )
+
+
+def _hedge_request(config: RecythonConfig, args: argparse.Namespace) -> HedgeRequest:
+    settings = config.hedge
+    return HedgeRequest(
+        enabled=settings.enabled or getattr(args, "hedge", False),
+        percentile=settings.percentile,
+        min_samples=settings.min_samples,
+        min_delay=settings.min_delay,
+        provider=settings.provider,
+        model=settings.model,
+    )
+
+
 def _resolve_effective_request(args: argparse.Namespace):
     config = load_config(args.pyproject, start_path=Path.cwd())
     config = apply_config_overrides(
         config,
         style=getattr(args, "style", None),
-        provider=getattr(args, "provider", None),
+        provider=getattr(args, "provider", None) or ("replay" if getattr(args, "replay_from", None) else None),
         model=getattr(args, "model", None),
+        models=getattr(args, "models", None) or ([] if getattr(args, "model", None) else None),
         prompt_profile=getattr(args, "prompt_profile", None),
         max_attempts=getattr(args, "max_attempts", None),
+        concurrency=getattr(args, "concurrency", None),
+        pack_tokens=getattr(args, "pack_tokens", None),
         maintenance_mode=getattr(args, "maintenance_mode", None),
         baseline_manifest=getattr(args, "baseline_manifest", None),
     )
@@ -164,6 +548,7 @@ def _resolve_effective_request(args: argparse.Namespace):
         style=config.style,
         provider=config.provider,
         model=config.model,
+        models=config.models,
         temperature=config.temperature,
         max_completion_tokens=config.max_completion_tokens,
         exclude=merged_exclude,
@@ -174,12 +559,23 @@ def _resolve_effective_request(args: argparse.Namespace):
         baseline_manifest=config.baseline_manifest,
         write_manifest=config.write_manifest,
         dry_run=getattr(args, "dry_run", False),
+        chrome_trace=getattr(args, "chrome_trace", False),
         validation=ValidationRequest(
             python_compile=config.validation.python_compile,
             cython_compile=config.validation.cython_compile,
             ruff=config.validation.ruff,
             mypy=config.validation.mypy,
         ),
+        type_evidence=config.project_root / config.type_evidence,
+        benchmarks=_benchmark_cases(config),
+        build=_build_request(config, pgo=getattr(args, "pgo", False)),
+        bench=_bench_request(config),
+        replay=_replay_request(config, args),
+        simulated=_simulated_request(config),
+        rate_limit=_rate_limit_request(config, args),
+        hedge=_hedge_request(config, args),
+        concurrency=config.concurrency,
+        pack_tokens=config.pack_tokens,
     )
     return config, request
 
@@ -196,17 +592,100 @@ def _print_plan(result: RunResult) -> None:
     print(f"Planned {len(result.planned_files)} file(s) for {result.request.style} conversion.")
     for planned in result.planned_files:
         outputs = ", ".join(str(output.path) for output in planned.outputs)
-        print(f"{planned.source_path} -> {outputs}")
+        notes = []
+        if len(result.request.models) > 1:
+            notes.append(f"start at {result.request.models[planned.start_tier]}")
+        if planned.pack is not None:
+            notes.append(f"pack {planned.pack}")
+        suffix = f" ({', '.join(notes)})" if notes else ""
+        print(f"{planned.source_path} -> {outputs}{suffix}")
     if result.skipped_files:
         print("Skipped:")
         for skipped in result.skipped_files:
             print(f"{skipped.source_path} ({skipped.reason})")
 
 
+def _print_flag_results(results: list[dict[str, object]]) -> None:
+    if results:
+        print("Compiler flags:")
+    for row in results:
+        if row["status"] == "skipped" or row["error"]:
+            print(f"{row['module']}: {row['status']}: {row['error']}")
+            continue
+        speedup = f"{row['speedup']:.2f}x" if row["speedup"] else "n/a"
+        print(f"{row['module']}: {row['profile']} ({speedup} vs baseline)")
+
+
+def _print_pgo_results(result: dict[str, object]) -> None:
+    if not result:
+        return
+    if not result["ok"]:
+        print(f"PGO: error: {result['error']}")
+        return
+    kept = "PGO build kept" if result["kept"] else "no clear gain, plain build kept"
+    print(f"PGO ({result['profile_status']} profile, {kept}):")
+    for case in result["cases"]:  # type: ignore[attr-defined]
+        speedup = f"{case['speedup']:.2f}x" if case["speedup"] else "n/a"
+        print(f"{case['name']}: plain={case['baseline_seconds']:.6f}s pgo={case['pgo_seconds']:.6f}s speedup={speedup}")
+
+
+def _print_memory(bench: dict[str, object]) -> None:
+    for side in ("pure", "compiled"):
+        memory: dict[str, object] | None = bench.get(f"{side}_memory")  # type: ignore[assignment]
+        if not memory:
+            continue
+        print(
+            f"{bench['name']} [{side}]: peak alloc={format_bytes(memory['tracemalloc_peak_bytes'])} "  # type: ignore[arg-type]
+            f"peak RSS +{format_bytes(memory['peak_rss_delta_bytes'])} "  # type: ignore[arg-type]
+            f"live blocks {memory['live_blocks_delta']:+d} GC-tracked containers {memory['gc_containers_delta']:+d}"
+        )
+
+
+def _print_benchmarks(result: RunResult) -> None:
+    failed_builds = [item for item in result.build_results if not item["ok"]]
+    for failed in failed_builds:
+        print(f"Build failed for {failed['module']}: {failed['error']}")
+    if result.benchmark_results:
+        print("Benchmarks:")
+    for bench in result.benchmark_results:
+        if bench["ok"]:
+            print(
+                f"{bench['name']}: pure={bench['pure_seconds']:.6f}s "
+                f"compiled={bench['compiled_seconds']:.6f}s speedup={bench['speedup']:.2f}x"
+            )
+            _print_memory(bench)
+        else:
+            print(f"{bench['name']}: error: {bench['error']}")
+    if result.module_report:
+        print("Modules:")
+    for row in result.module_report:
+        speedup = f"{row['speedup']:.2f}x" if row["speedup"] else "n/a"
+        line = f"{row['module']}: compiled={row['compiled']} speedup={speedup}"
+        if row.get("baseline_speedup"):
+            line += f" compile-only={row['baseline_speedup']:.2f}x"
+        print(line)
+    if result.parallel_results:
+        print("Parallel scaling:")
+        for case in result.parallel_results["cases"]:
+            scaling = " ".join(
+                f"{count}t={speedup:.2f}x" for count, speedup in case["speedup"].items() if speedup is not None
+            )
+            status = "matches serial" if case["ok"] else f"error: {case['error']}"
+            print(f"{case['name']}: {scaling} ({status})")
+    _print_flag_results(result.flag_results)
+    _print_pgo_results(result.pgo_results)
+
+
+def _progress_display(args: argparse.Namespace) -> ProgressDisplay | None:
+    if args.dry_run or args.no_progress:
+        return None
+    return ProgressDisplay()
+
+
 def handle_convert(args: argparse.Namespace) -> int:
     config, request = _resolve_effective_request(args)
     prompt_pack = load_prompt_pack(config)
-    result = execute_run_with_pack(request, prompt_pack)
+    result = execute_run_with_pack(request, prompt_pack, _progress_display(args))
     _write_report_json(args.report_json, result)
 
     if args.dry_run:
@@ -216,8 +695,11 @@ def handle_convert(args: argparse.Namespace) -> int:
     print(f"Wrote {len(result.written_files)} file(s) to {request.output_root}")
     for path in result.written_files:
         print(path)
+    _print_benchmarks(result)
     if result.manifest_path is not None:
         print(f"Manifest: {result.manifest_path}")
+    if result.trace_path is not None:
+        print(f"Trace: {result.trace_path}")
     return 0
 
 
@@ -225,7 +707,7 @@ def handle_maintain(args: argparse.Namespace) -> int:
     args.maintenance_mode = True
     config, request = _resolve_effective_request(args)
     prompt_pack = load_prompt_pack(config)
-    result = execute_run_with_pack(request, prompt_pack)
+    result = execute_run_with_pack(request, prompt_pack, _progress_display(args))
     _write_report_json(args.report_json, result)
 
     if args.dry_run:
@@ -236,8 +718,11 @@ def handle_maintain(args: argparse.Namespace) -> int:
     print(f"Regenerated {len(result.written_files)} file(s) from {changed_count} changed source file(s).")
     for path in result.written_files:
         print(path)
+    _print_benchmarks(result)
     if result.manifest_path is not None:
         print(f"Manifest: {result.manifest_path}")
+    if result.trace_path is not None:
+        print(f"Trace: {result.trace_path}")
     return 0
 
 
@@ -252,13 +737,19 @@ def handle_plan(args: argparse.Namespace) -> int:
 
 def handle_validate(args: argparse.Namespace) -> int:
     config = load_config(args.pyproject, start_path=Path.cwd())
-    config = apply_config_overrides(config, style=getattr(args, "style", None))
+    config = apply_config_overrides(
+        config, style=getattr(args, "style", None), prompt_profile=getattr(args, "prompt_profile", None)
+    )
     target = (args.target or config.output_root).resolve()
     if not target.exists():
         raise FileNotFoundError(f"Validation target '{target}' does not exist.")
 
-    if config.style == "pure":
+    if config.style in {"pure", "compile-only"}:
         written_files = sorted(path for path in target.rglob("*.py") if path.is_file())
+    elif config.style == "pure_pxd":
+        written_files = sorted(
+            path for path in target.rglob("*.py") if path.is_file() and path.with_suffix(".pxd").exists()
+        )
     else:
         written_files = sorted(path for path in target.rglob("*") if path.is_file() and path.suffix in {".pyx", ".pxd"})
 
@@ -266,7 +757,8 @@ def handle_validate(args: argparse.Namespace) -> int:
         written_files,
         style=config.style,
         python_compile_enabled=config.validation.python_compile,
-        cython_compile_enabled=config.validation.cython_compile,
+        cython_compile_enabled=config.validation.cython_compile or config.style == "pure_pxd",
+        prompt_profile=config.prompt_profile,
     )
     if args.report_json is not None:
         args.report_json.parent.mkdir(parents=True, exist_ok=True)
@@ -281,12 +773,393 @@ def handle_validate(args: argparse.Namespace) -> int:
     return 0 if result["ok"] else 1
 
 
+def handle_build(args: argparse.Namespace) -> int:
+    config = load_config(args.pyproject, start_path=Path.cwd())
+    config = apply_config_overrides(config, style=args.style)
+    target = (args.target or config.output_root).resolve()
+    if not target.exists():
+        raise FileNotFoundError(f"Build target '{target}' does not exist.")
+    source = args.source or (config.source[0] if config.source else None)
+    package_name = source.name if source else target.name
+
+    build = _build_request(config, args.jobs, pgo=args.pgo)
+    if args.flag_profile:
+        build = replace(build, flag_profile=args.flag_profile)
+    if args.flag_search is not None:
+        build = replace(build, flag_search=args.flag_search or list(FLAG_PROFILES))
+    if config.prompt_profile == "parallel":
+        build = with_openmp(build)
+
+    # An explicit --flag-profile applies to every module; otherwise each module keeps its searched profile.
+    profiles = {} if args.flag_profile else stored_flag_profiles(target, package_name)
+    targets = build_targets_for(target, package_name, discover_build_sources(target, config.style))
+    results = build_with_profiles(
+        targets,
+        output_root=target,
+        package_name=package_name,
+        style=config.style,
+        build=build,
+        profiles=profiles,
+        force=args.force,
+    )
+    report: dict[str, object] = {"target": str(target), "package": package_name, "modules": results}
+
+    counts: dict[str, int] = {}
+    for item in results:
+        counts[str(item["status"])] = counts.get(str(item["status"]), 0) + 1
+        print(f"{item['module']} [{item['status']}]")
+        if item["error"]:
+            print(item["error"])
+    summary = ", ".join(f"{status}: {count}" for status, count in sorted(counts.items()))
+    print(f"Built {len(results)} module(s) ({summary or 'nothing to build'})")
+
+    failed = any(not item["ok"] for item in results)
+    if build.flag_search and not failed:
+        if source is None:
+            raise ValueError("--flag-search needs the original package; pass --source or set [tool.recython].source.")
+        report["flags"] = search_package_flags(
+            output_root=target,
+            source_root=source.resolve(),
+            style=config.style,
+            cases=_benchmark_cases(config),
+            build=build,
+            bench=_bench_request(config),
+        )
+        _print_flag_results(report["flags"])  # type: ignore[arg-type]
+    if build.pgo and not failed:
+        if source is None:
+            raise ValueError("--pgo needs the original package; pass --source or set [tool.recython].source.")
+        flags: list[dict[str, object]] = report.get("flags", [])  # type: ignore[assignment]
+        report["pgo"] = run_pgo(
+            targets,
+            _benchmark_cases(config),
+            output_root=target,
+            package_name=package_name,
+            source_root=source.resolve(),
+            style=config.style,
+            build=build,
+            profiles={**profiles, **{str(row["module"]): str(row["profile"]) for row in flags if "profile" in row}},
+            bench=_bench_request(config),
+            force=args.force,
+        )
+        _print_pgo_results(report["pgo"])  # type: ignore[arg-type]
+        failed = not report["pgo"]["ok"]  # type: ignore[index]
+    if args.wheel and not failed:
+        if source is None:
+            raise ValueError("--wheel needs the original package; pass --source or set [tool.recython].source.")
+        wheel = build_wheel(
+            package_name=package_name,
+            version=args.version,
+            source_root=source.resolve(),
+            output_root=target,
+            dist_dir=(args.dist_dir or Path.cwd() / "dist").resolve(),
+        )
+        report["wheel"] = str(wheel)
+        print(f"Wheel: {wheel}")
+
+    if args.report_json is not None:
+        args.report_json.parent.mkdir(parents=True, exist_ok=True)
+        args.report_json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 1 if failed else 0
+
+
+def handle_bench(args: argparse.Namespace) -> int:
+    config = load_config(args.pyproject, start_path=Path.cwd())
+    target = (args.target or config.output_root).resolve()
+    if not target.exists():
+        raise FileNotFoundError(f"Benchmark target '{target}' does not exist; run `recython build` first.")
+    source = args.source or (config.source[0] if config.source else None)
+    if source is None:
+        raise ValueError("bench needs the original package; pass --source or set [tool.recython].source.")
+    cases = [
+        case for case in _benchmark_cases(config) if not args.case or {case.name, grid_name(case)} & set(args.case)
+    ]
+    if not cases:
+        raise ValueError("No benchmark cases to run; add [[tool.recython.benchmarks]] or check --case names.")
+    settings = _bench_request(config)
+    overrides = {
+        "processes": args.processes,
+        "warmup": args.warmup,
+        "min_time": args.min_time,
+        "cpu_affinity": args.affinity,
+    }
+    settings = replace(settings, **{key: value for key, value in overrides.items() if value is not None})
+
+    results = compare_benchmarks(
+        cases,
+        package_name=source.name,
+        source_root=source.resolve(),
+        compiled_root=target,
+        bench=settings,
+    )
+    for bench in results:
+        if not bench["ok"]:
+            print(f"{bench['name']}: error: {bench['error']}")
+            continue
+        for side in ("pure", "compiled"):
+            stats: SampleSummary = bench[f"{side}_stats"]  # type: ignore[assignment]
+            print(
+                f"{bench['name']} [{side}]: median={format_duration(stats['median'])} "
+                f"mean={format_duration(stats['mean'])} stdev={format_duration(stats['stdev'])} "
+                f"{stats['confidence']:.0%} CI=[{format_duration(stats['ci_low'])}, "
+                f"{format_duration(stats['ci_high'])}] "
+                f"samples={stats['kept']}/{stats['samples']}"
+            )
+        interval = (
+            f" ({bench['speedup_low']:.2f}x-{bench['speedup_high']:.2f}x)"
+            if bench["speedup_low"] and bench["speedup_high"]
+            else ""
+        )
+        print(f"{bench['name']}: speedup={bench['speedup']:.2f}x{interval}")
+        _print_memory(bench)
+    curves = scaling_curves(cases, results)
+    if curves:
+        print(render_scaling_chart(curves), end="")
+
+    store = history_path(target)
+    run_id = None
+    if settings.history and not args.no_record:
+        run_id = record_run(store, results, cases, package=source.name, origin="bench", cwd=config.project_root)
+        print(f"Recorded run {run_id} in {store}")
+    comparison = None
+    if args.compare:
+        baseline = load_run(store, resolve_run(store, args.compare, package=source.name, exclude=run_id))
+        threshold = settings.regression_threshold if args.threshold is None else args.threshold
+        comparison = {
+            "baseline": baseline["run_id"],
+            "git_revision": baseline["git_revision"],
+            "threshold": threshold,
+            "cases": compare_runs(baseline, results, threshold=threshold, confidence=settings.confidence),
+        }
+        _print_comparison(comparison)
+
+    if args.report_json is not None:
+        report = {
+            "target": str(target),
+            "package": source.name,
+            "settings": asdict(settings),
+            "run_id": run_id,
+            "cases": results,
+            "scaling": curves,
+            "comparison": comparison,
+        }
+        args.report_json.parent.mkdir(parents=True, exist_ok=True)
+        args.report_json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    regressed = comparison is not None and any(row["regression"] for row in comparison["cases"])
+    return 1 if regressed or any(not bench["ok"] for bench in results) else 0
+
+
+def _print_comparison(comparison: dict[str, object]) -> None:
+    revision = f" @ {comparison['git_revision']}" if comparison["git_revision"] else ""
+    print(f"Compared with {comparison['baseline']}{revision} (threshold {comparison['threshold']:.0%}):")
+    for row in comparison["cases"]:  # type: ignore[attr-defined]
+        if row["change"] is None:
+            print(f"  {row['name']}: not comparable")
+            continue
+        verdict = "REGRESSION" if row["regression"] else "significant" if row["significant"] else "ok"
+        print(
+            f"  {row['name']}: {row['baseline_speedup']:.2f}x -> {row['speedup']:.2f}x "
+            f"({row['change']:+.1%}) [{verdict}]"
+        )
+
+
+def handle_history(args: argparse.Namespace) -> int:
+    config = load_config(args.pyproject, start_path=Path.cwd())
+    if not config.source:
+        raise ValueError("history needs [tool.recython].source to know which package to show.")
+    package = config.source[0].name
+    trends = case_trend(history_path(config.output_root), package=package, case_name=args.case, limit=args.limit)
+    if not trends:
+        print(f"No benchmark history for '{package}' yet; run `recython bench` first.")
+    for name, entries in trends.items():
+        print(f"{name}:")
+        first = next((entry["speedup"] for entry in entries if entry["speedup"]), None)
+        for entry in entries:
+            speedup = f"{entry['speedup']:.2f}x" if entry["speedup"] else "failed"
+            drift = f" ({entry['speedup'] / first - 1:+.1%})" if entry["speedup"] and first else ""
+            print(
+                f"  {entry['created_at'][:19]} {entry['git_revision'] or '-':<14} "
+                f"{entry['origin']:<8} {speedup}{drift}"
+            )
+
+    if args.report_json is not None:
+        args.report_json.parent.mkdir(parents=True, exist_ok=True)
+        args.report_json.write_text(json.dumps(trends, indent=2), encoding="utf-8")
+    return 0
+
+
+def handle_report(args: argparse.Namespace) -> int:
+    config = load_config(args.pyproject, start_path=Path.cwd())
+    config = apply_config_overrides(config, style=args.style)
+    target = (args.target or config.output_root).resolve()
+    store = target.parent / ".recython"
+    if not args.annotate:
+        run_reports = sorted((store / "runs").glob("*/report.md"))
+        if not run_reports:
+            print(f"No run reports under {store / 'runs'}; run `recython convert` first or pass --annotate.")
+            return 1
+        print(run_reports[-1].read_text(encoding="utf-8"), end="")
+        return 0
+    if not target.exists():
+        raise FileNotFoundError(f"Report target '{target}' does not exist.")
+    source = args.source or (config.source[0] if config.source else None)
+    package_name = source.name if source is not None else target.name
+
+    targets = build_targets_for(target, package_name, discover_build_sources(target, config.style))
+    annotations = annotate_extensions(
+        targets,
+        output_root=target,
+        package_name=package_name,
+        build_dir=default_build_dir(target, package_name),
+        compiler_directives=dict(config.build.compiler_directives),
+    )
+    profile_path = args.profile or store / "profile.pstats"
+    profile = None
+    if profile_path.exists():
+        roots = [target, *([source.resolve()] if source is not None else [])]
+        profile = load_profile_shares(profile_path, roots)
+    elif args.profile is not None:
+        raise FileNotFoundError(f"Profile '{profile_path}' does not exist.")
+    hotspots = collect_hotspots(
+        [
+            (relative_module_name(item.module_name, package_name), item.source, annotations.get(item.module_name))
+            for item in targets
+        ],
+        profile=profile,
+        top=args.top,
+    )
+    hotspots["profile"] = str(profile_path) if profile is not None else None
+
+    for row in hotspots["modules"]:
+        if not row["ok"]:
+            print(f"{row['module']}: annotation failed")
+    weighting = f" weighted by {profile_path}" if profile is not None else ""
+    print(f"Top {len(hotspots['lines'])} hotspot line(s){weighting}:")
+    for row in hotspots["lines"]:
+        weighted = f" weighted={row['weighted_score']:.2f}" if profile is not None else ""
+        print(f"  {row['path']}:{row['line']} [{row['function']}] score={row['score']}{weighted}  {row['code']}")
+
+    json_path = args.report_json or store / "hotspots" / f"{package_name}.json"
+    markdown_path = args.markdown or store / "hotspots" / f"{package_name}.md"
+    for path, text in (
+        (json_path, json.dumps(hotspots, indent=2)),
+        (markdown_path, render_hotspots_markdown(hotspots)),
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    print(f"Hotspots: {json_path} and {markdown_path}")
+    return 1 if any(not row["ok"] for row in hotspots["modules"]) else 0
+
+
+def handle_tune(args: argparse.Namespace) -> int:
+    config = load_config(args.pyproject, start_path=Path.cwd())
+    config = apply_config_overrides(config, style=args.style)
+    target = (args.target or config.output_root).resolve()
+    if not target.exists():
+        raise FileNotFoundError(f"Tune target '{target}' does not exist.")
+    source = args.source or (config.source[0] if config.source else None)
+    if source is None:
+        raise ValueError("tune needs the original package; pass --source or set [tool.recython].source.")
+    if not config.benchmarks:
+        raise ValueError("tune needs [[tool.recython.benchmarks]] cases that name a module.")
+    build = _build_request(config, args.jobs)
+    if config.prompt_profile == "parallel":
+        build = with_openmp(build)
+
+    results = tune_package(
+        output_root=target,
+        source_root=source.resolve(),
+        style=config.style,
+        cases=_benchmark_cases(config),
+        build=build,
+        bench=_bench_request(config),
+        modules=args.modules,
+        exhaustive=args.exhaustive,
+        force=args.force,
+    )
+    for item in results:
+        if item["status"] in {"tuned", "up-to-date"}:
+            tuned: dict[str, object] = item["directives"]  # type: ignore[assignment]
+            directives = ", ".join(f"{name}={value}" for name, value in tuned.items()) or "defaults"
+            speedup = f"{item['speedup']:.2f}x" if item.get("speedup") else "n/a"
+            print(f"{item['module']} [{item['status']}]: {directives} (speedup over defaults {speedup})")
+        else:
+            print(f"{item['module']} [{item['status']}]: {item['error']}")
+
+    if args.report_json is not None:
+        args.report_json.parent.mkdir(parents=True, exist_ok=True)
+        args.report_json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    return 1 if any(item["status"] == "failed" for item in results) else 0
+
+
+def _format_seconds(value: object) -> str:
+    return f"{float(value) * 1000:.1f}ms" if value is not None else "n/a"  # type: ignore[arg-type]
+
+
+def handle_backends(args: argparse.Namespace) -> int:
+    config = load_config(args.pyproject, start_path=Path.cwd())
+    source = args.source or (config.source[0] if config.source else None)
+    if source is None:
+        raise ValueError("A source path is required either on the CLI or in [tool.recython].source.")
+    source = source.resolve()
+    inputs: dict[str, Path] = {}
+    classic_output = args.classic_output or (config.output_root if config.style == "classic" else None)
+    if classic_output is not None and classic_output.exists():
+        inputs["cython-classic"] = classic_output.resolve()
+    pure_output = args.pure_output or (config.output_root if config.style == "pure" else None)
+    if pure_output is not None and pure_output.exists():
+        inputs["cython-pure"] = pure_output.resolve()
+
+    report = compare_backends(
+        args.backend_names or list(BACKENDS),
+        source_root=source,
+        work_dir=(args.work_dir or config.project_root / ".recython" / "backends" / source.name).resolve(),
+        inputs=inputs,
+        benchmarks=_benchmark_cases(config),
+        build=_build_request(config, args.jobs),
+    )
+
+    for backend in report["backends"]:  # type: ignore[attr-defined]
+        if backend["error"]:
+            print(f"{backend['backend']}: skipped: {backend['error']}")
+    for row in report["modules"]:  # type: ignore[attr-defined]
+        print(f"{row['module']} (source import {_format_seconds(row['source_import_seconds'])}):")
+        for name, entry in row["backends"].items():
+            speedup = f"{entry['speedup']:.2f}x" if entry["speedup"] else "n/a"
+            status = entry["build_status"] or "n/a"
+            print(f"  {name}: {status} speedup={speedup} import={_format_seconds(entry['import_seconds'])}")
+        print(f"  recommended: {row['recommended'] or 'none'}")
+
+    if args.report_json is not None:
+        args.report_json.parent.mkdir(parents=True, exist_ok=True)
+        args.report_json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+
+def handle_trace(args: argparse.Namespace) -> int:
+    config = load_config(args.pyproject, start_path=Path.cwd())
+    command = list(args.trace_command)
+    if command and command[0] == "--":
+        command = command[1:]
+    roots = [path.resolve() for path in args.source] or config.source or [config.project_root]
+    output = args.output or config.project_root / config.type_evidence
+
+    tracer = TypeTracer(roots)
+    exit_code = run_traced_command(command, tracer)
+    evidence = write_type_evidence(output, tracer.to_evidence(config.project_root), replace=args.replace)
+
+    function_count = sum(len(functions) for functions in evidence["modules"].values())
+    print(f"Recorded types for {function_count} function(s) in {len(evidence['modules'])} module(s).")
+    print(f"Type evidence: {output}")
+    return exit_code
+
+
 def handle_prompts_list(_args: argparse.Namespace) -> int:
     print("Profiles:")
     for profile in list_prompt_profiles():
         print(profile)
     print("Templates:")
-    for label in ("classic-pyx", "classic-pxd", "pure"):
+    for label in TEMPLATE_LABELS:
         print(label)
     return 0
 
@@ -294,11 +1167,7 @@ def handle_prompts_list(_args: argparse.Namespace) -> int:
 def handle_prompts_show(args: argparse.Namespace) -> int:
     config = apply_config_overrides(load_config(start_path=Path.cwd()), prompt_profile=args.profile)
     pack = load_prompt_pack(config)
-    template_key = {
-        "classic-pyx": "classic_pyx",
-        "classic-pxd": "classic_pxd",
-        "pure": "pure",
-    }[args.template]
+    template_key = TEMPLATE_LABELS[args.template]
     print(pack.templates[template_key].text)
     return 0
 
@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field, replace
 from pathlib import Path
 import tomllib
+from typing import Any
 
 
 @dataclass(slots=True)
@@ -13,6 +14,87 @@ class ValidationConfig:
     mypy: bool = False
 
 
+@dataclass(slots=True)
+class BuildConfig:
+    jobs: int = 0
+    compiler_directives: dict[str, object] = field(default_factory=dict)
+    extra_compile_args: list[str] = field(default_factory=list)
+    extra_link_args: list[str] = field(default_factory=list)
+    flag_profile: str = "default"
+    flag_search: list[str] = field(default_factory=list)
+    pgo: bool = False
+
+
+@dataclass(slots=True)
+class BenchConfig:
+    processes: int = 3
+    warmup: int = 1
+    min_time: float = 0.02
+    cpu_affinity: list[int] = field(default_factory=list)
+    confidence: float = 0.95
+    outlier_iqr: float = 1.5
+    memory: bool = True
+    history: bool = True
+    regression_threshold: float = 0.1
+
+
+@dataclass(slots=True)
+class ReplayConfig:
+    source: Path | None = None
+    mode: str = "strict"
+    fallthrough_provider: str = "openai"
+    record: Path | None = None
+
+
+@dataclass(slots=True)
+class SimulatedConfig:
+    responses: list[str] = field(default_factory=list)
+    latency: str = "lognormal"
+    latency_median: float = 1.0
+    latency_spread: float = 0.5
+    tokens_per_second: float = 0.0
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    retry_after: float = 1.0
+    seed: int | None = None
+
+
+@dataclass(slots=True)
+class RateLimitConfig:
+    enabled: bool = True
+    requests_per_minute: float = 0.0
+    tokens_per_minute: float = 0.0
+    max_concurrency: int = 0
+    min_concurrency: int = 1
+    increase: float = 1.0
+    decrease: float = 0.5
+    max_retry_after: float = 60.0
+    shared: bool = False
+    shared_path: Path | None = None
+
+
+@dataclass(slots=True)
+class HedgeConfig:
+    enabled: bool = False
+    percentile: float = 0.95
+    min_samples: int = 10
+    min_delay: float = 2.0
+    provider: str = ""
+    model: str = ""
+
+
+@dataclass(slots=True)
+class BenchmarkConfig:
+    name: str
+    stmt: str
+    setup: str = ""
+    number: int = 0
+    repeat: int = 5
+    module: str = ""
+    check: str = ""
+    params: dict[str, list[Any]] = field(default_factory=dict)
+
+
 @dataclass(slots=True)
 class RecythonConfig:
     project_root: Path
@@ -21,18 +103,29 @@ class RecythonConfig:
     style: str = "classic"
     provider: str = "openai"
     model: str = "gpt-4o-mini"
+    models: list[str] = field(default_factory=list)
     temperature: float = 0.0
     max_completion_tokens: int = 4000
     exclude: list[str] = field(default_factory=list)
     include: list[str] = field(default_factory=list)
     prompt_profile: str = "default"
     max_attempts: int = 1
+    concurrency: int = 1
+    pack_tokens: int = 0
     maintenance_mode: bool = False
     baseline_manifest: Path | None = None
     backup_originals: bool = False
     write_manifest: bool = True
     validation: ValidationConfig = field(default_factory=ValidationConfig)
     prompt_paths: dict[str, str] = field(default_factory=dict)
+    type_evidence: Path = Path(".recython/types.json")
+    benchmarks: list[BenchmarkConfig] = field(default_factory=list)
+    build: BuildConfig = field(default_factory=BuildConfig)
+    bench: BenchConfig = field(default_factory=BenchConfig)
+    replay: ReplayConfig = field(default_factory=ReplayConfig)
+    simulated: SimulatedConfig = field(default_factory=SimulatedConfig)
+    rate_limit: RateLimitConfig = field(default_factory=RateLimitConfig)
+    hedge: HedgeConfig = field(default_factory=HedgeConfig)
 
 
 def _find_pyproject(start_path: Path | None = None) -> Path | None:
@@ -65,6 +158,13 @@ def load_config(pyproject_path: Path | None = None, *, start_path: Path | None =
     raw_config = data.get("tool", {}).get("recython", {})
     raw_validation = raw_config.get("validation", {})
     raw_prompts = raw_config.get("prompts", {})
+    raw_benchmarks = raw_config.get("benchmarks", [])
+    raw_build = raw_config.get("build", {})
+    raw_bench = raw_config.get("bench", {})
+    raw_replay = raw_config.get("replay", {})
+    raw_simulated = raw_config.get("simulated", {})
+    raw_rate_limit = raw_config.get("rate_limit", {})
+    raw_hedge = raw_config.get("hedge", {})
 
     return RecythonConfig(
         project_root=project_root,
@@ -73,12 +173,15 @@ def load_config(pyproject_path: Path | None = None, *, start_path: Path | None =
         style=raw_config.get("style", defaults.style),
         provider=raw_config.get("provider", defaults.provider),
         model=raw_config.get("model", defaults.model),
+        models=[str(item) for item in raw_config.get("models", defaults.models)],
         temperature=float(raw_config.get("temperature", defaults.temperature)),
         max_completion_tokens=int(raw_config.get("max_completion_tokens", defaults.max_completion_tokens)),
         exclude=list(raw_config.get("exclude", defaults.exclude)),
         include=list(raw_config.get("include", defaults.include)),
         prompt_profile=raw_config.get("prompt_profile", defaults.prompt_profile),
         max_attempts=int(raw_config.get("max_attempts", defaults.max_attempts)),
+        concurrency=int(raw_config.get("concurrency", defaults.concurrency)),
+        pack_tokens=int(raw_config.get("pack_tokens", defaults.pack_tokens)),
         maintenance_mode=bool(raw_config.get("maintenance_mode", defaults.maintenance_mode)),
         baseline_manifest=(
             _resolve_path(project_root, raw_config["baseline_manifest"])
@@ -94,6 +197,83 @@ def load_config(pyproject_path: Path | None = None, *, start_path: Path | None =
             mypy=bool(raw_validation.get("mypy", defaults.validation.mypy)),
         ),
         prompt_paths={key: value for key, value in raw_prompts.items() if isinstance(value, str)},
+        type_evidence=_resolve_path(project_root, raw_config.get("type_evidence", str(defaults.type_evidence))),
+        benchmarks=[
+            BenchmarkConfig(
+                name=str(item["name"]),
+                stmt=str(item["stmt"]),
+                setup=str(item.get("setup", "")),
+                number=int(item.get("number", 0)),
+                repeat=int(item.get("repeat", 5)),
+                module=str(item.get("module", "")),
+                check=str(item.get("check", "")),
+                params={str(key): list(values) for key, values in item.get("params", {}).items()},
+            )
+            for item in raw_benchmarks
+        ],
+        build=BuildConfig(
+            jobs=int(raw_build.get("jobs", defaults.build.jobs)),
+            compiler_directives=dict(raw_build.get("compiler_directives", {})),
+            extra_compile_args=[str(item) for item in raw_build.get("extra_compile_args", [])],
+            extra_link_args=[str(item) for item in raw_build.get("extra_link_args", [])],
+            flag_profile=str(raw_build.get("flag_profile", defaults.build.flag_profile)),
+            flag_search=[str(item) for item in raw_build.get("flag_search", [])],
+            pgo=bool(raw_build.get("pgo", defaults.build.pgo)),
+        ),
+        bench=BenchConfig(
+            processes=int(raw_bench.get("processes", defaults.bench.processes)),
+            warmup=int(raw_bench.get("warmup", defaults.bench.warmup)),
+            min_time=float(raw_bench.get("min_time", defaults.bench.min_time)),
+            cpu_affinity=[int(item) for item in raw_bench.get("cpu_affinity", [])],
+            confidence=float(raw_bench.get("confidence", defaults.bench.confidence)),
+            outlier_iqr=float(raw_bench.get("outlier_iqr", defaults.bench.outlier_iqr)),
+            memory=bool(raw_bench.get("memory", defaults.bench.memory)),
+            history=bool(raw_bench.get("history", defaults.bench.history)),
+            regression_threshold=float(raw_bench.get("regression_threshold", defaults.bench.regression_threshold)),
+        ),
+        replay=ReplayConfig(
+            source=_resolve_path(project_root, raw_replay["source"]) if "source" in raw_replay else None,
+            mode=str(raw_replay.get("mode", defaults.replay.mode)),
+            fallthrough_provider=str(raw_replay.get("fallthrough_provider", defaults.replay.fallthrough_provider)),
+            record=_resolve_path(project_root, raw_replay["record"]) if "record" in raw_replay else None,
+        ),
+        simulated=SimulatedConfig(
+            responses=[str(item) for item in raw_simulated.get("responses", [])],
+            latency=str(raw_simulated.get("latency", defaults.simulated.latency)),
+            latency_median=float(raw_simulated.get("latency_median", defaults.simulated.latency_median)),
+            latency_spread=float(raw_simulated.get("latency_spread", defaults.simulated.latency_spread)),
+            tokens_per_second=float(raw_simulated.get("tokens_per_second", defaults.simulated.tokens_per_second)),
+            rate_limit_rate=float(raw_simulated.get("rate_limit_rate", defaults.simulated.rate_limit_rate)),
+            server_error_rate=float(raw_simulated.get("server_error_rate", defaults.simulated.server_error_rate)),
+            retry_after=float(raw_simulated.get("retry_after", defaults.simulated.retry_after)),
+            seed=int(raw_simulated["seed"]) if "seed" in raw_simulated else None,
+        ),
+        rate_limit=RateLimitConfig(
+            enabled=bool(raw_rate_limit.get("enabled", defaults.rate_limit.enabled)),
+            requests_per_minute=float(
+                raw_rate_limit.get("requests_per_minute", defaults.rate_limit.requests_per_minute)
+            ),
+            tokens_per_minute=float(raw_rate_limit.get("tokens_per_minute", defaults.rate_limit.tokens_per_minute)),
+            max_concurrency=int(raw_rate_limit.get("max_concurrency", defaults.rate_limit.max_concurrency)),
+            min_concurrency=int(raw_rate_limit.get("min_concurrency", defaults.rate_limit.min_concurrency)),
+            increase=float(raw_rate_limit.get("increase", defaults.rate_limit.increase)),
+            decrease=float(raw_rate_limit.get("decrease", defaults.rate_limit.decrease)),
+            max_retry_after=float(raw_rate_limit.get("max_retry_after", defaults.rate_limit.max_retry_after)),
+            shared=bool(raw_rate_limit.get("shared", defaults.rate_limit.shared)),
+            shared_path=(
+                _resolve_path(project_root, str(Path(raw_rate_limit["shared_path"]).expanduser()))
+                if "shared_path" in raw_rate_limit
+                else None
+            ),
+        ),
+        hedge=HedgeConfig(
+            enabled=bool(raw_hedge.get("enabled", defaults.hedge.enabled)),
+            percentile=float(raw_hedge.get("percentile", defaults.hedge.percentile)),
+            min_samples=int(raw_hedge.get("min_samples", defaults.hedge.min_samples)),
+            min_delay=float(raw_hedge.get("min_delay", defaults.hedge.min_delay)),
+            provider=str(raw_hedge.get("provider", defaults.hedge.provider)),
+            model=str(raw_hedge.get("model", defaults.hedge.model)),
+        ),
     )
 
 
@@ -110,15 +290,19 @@ output_root = ".recython/build"
 style = "classic"
 provider = "openai"
 model = "gpt-4o-mini"
+# models = ["gpt-4o-mini", "gpt-4o"]  # escalation ladder: start cheap, move up a model after each failed attempt
 temperature = 0.0
 max_completion_tokens = 4000
 exclude = ["tests", "__init__", "migrations"]
 include = []
 prompt_profile = "default"
 max_attempts = 1
+concurrency = 1  # files generated at once
+pack_tokens = 0  # source tokens of small files sent together in one prompt; 0 sends every file on its own
 maintenance_mode = false
 backup_originals = false
 write_manifest = true
+type_evidence = ".recython/types.json"
 
 [tool.recython.validation]
 python_compile = true
@@ -130,4 +314,76 @@ mypy = false
 classic_pyx = "prompts/classic_pyx.md"
 classic_pxd = "prompts/classic_pxd.md"
 pure = "prompts/pure.md"
+pure_pxd = "prompts/pure_pxd.md"
+
+[tool.recython.build]
+jobs = 0
+extra_compile_args = []
+extra_link_args = []
+flag_profile = "default"  # default, O3, native, fast-math or lto
+# flag_search = ["default", "O3", "native", "fast-math", "lto"]  # benchmark each profile per module, keep the fastest
+pgo = false  # rebuild with profile-guided optimization trained on the benchmark cases (GCC/Clang)
+
+# How benchmark cases are timed.  Each case runs in `processes` fresh workers per side.
+[tool.recython.bench]
+processes = 3
+warmup = 1
+min_time = 0.02  # seconds; cases with number = 0 calibrate their loop count to this
+cpu_affinity = []  # e.g. [2] to pin workers to one core (Linux)
+confidence = 0.95
+outlier_iqr = 1.5  # Tukey fence multiplier; 0 keeps every sample
+memory = true  # also record peak RSS, tracemalloc peak, and live object and block deltas per case
+history = true  # store results in .recython/history.sqlite3 for `bench --compare` and `recython history`
+regression_threshold = 0.1  # `bench --compare` fails when a speedup drops by more than this fraction
+
+# provider = "replay" answers from a recorded cassette or a previous run directory instead of the API.
+[tool.recython.replay]
+# source = ".recython/cassette.jsonl"  # or a run directory such as ".recython/runs/20250101T000000Z"
+mode = "strict"  # strict fails a prompt with no recording; fallthrough asks fallthrough_provider instead
+fallthrough_provider = "openai"
+# record = ".recython/cassette.jsonl"  # append every prompt/response pair, with any provider
+
+# provider = "simulated" returns canned outputs with synthetic latency and errors, for load-testing.
+[tool.recython.simulated]
+responses = []  # globs of canned outputs, picked per prompt; empty returns a stub module
+latency = "lognormal"  # fixed, uniform or lognormal
+latency_median = 1.0  # seconds
+latency_spread = 0.5  # lognormal sigma, or the +/- fraction for uniform
+tokens_per_second = 0.0  # completion decode rate added to the latency; 0 disables
+rate_limit_rate = 0.0  # fraction of requests answered with 429 and a Retry-After header
+server_error_rate = 0.0  # fraction of requests answered with 500
+retry_after = 1.0  # seconds
+
+# Client-side limits per provider and model. 0 learns the limits from the provider's x-ratelimit-* headers.
+[tool.recython.rate_limit]
+enabled = true
+requests_per_minute = 0
+tokens_per_minute = 0
+max_concurrency = 0  # cap on model calls in flight; 0 leaves it to `concurrency`
+min_concurrency = 1
+increase = 1.0  # calls added to the in-flight window per window's worth of successes
+decrease = 0.5  # window multiplier after a 429
+max_retry_after = 60.0  # longest Retry-After honoured, in seconds
+shared = false  # share the budget with other recython processes using the same credentials
+# shared_path = "~/.recython/ratelimit.sqlite3"
+
+# Send a duplicate of any model call still running past the latency percentile; the first reply wins.
+[tool.recython.hedge]
+enabled = false
+percentile = 0.95  # of the latencies observed for the provider and model
+min_samples = 10  # calls observed before hedging starts
+min_delay = 2.0  # never hedge sooner than this, in seconds
+provider = ""  # alternate provider for the duplicate, e.g. "openrouter"; empty uses the same one
+model = ""  # model for the duplicate; empty uses the same one
+
+# Benchmarks run against the source package and the compiled output after each run.
+# [[tool.recython.benchmarks]]
+# name = "hot_path"
+# setup = "from mypkg.core import build_inputs, hot_path\\nargs = build_inputs()"
+# stmt = "hot_path(*args)"
+# module = "core"
+# check = "hot_path(*args)"  # optional expression compared between pure and compiled runs
+# number = 1
+# repeat = 5
+# params = { n = [100, 1000, 10000] }  # run once per value; `n` is bound before setup, results include a scaling fit
 """.strip()
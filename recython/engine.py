@@ -1,16 +1,74 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 import hashlib
 import json
 from pathlib import Path
+import threading
+import time
+from typing import Any
 
 import recython.ai_calls as ai
+from recython.benchmarks import compare_benchmarks, format_bytes, relative_module_name, summarize_modules
+from recython.backends import build_with_profiles
+from recython.build import build_targets_for, with_openmp
 from recython.config import RecythonConfig
-from recython.jobs import PlannedFile, PlannedOutput, RunRequest, RunResult, SkippedFile, ValidationRequest
-from recython.prompts import PromptPack, load_prompt_pack, render_prompt
-from recython.tidy import extract_code_block, has_code_fence
+from recython.escalation import (
+    escalation_path,
+    load_escalation,
+    measure_source,
+    model_tier,
+    predict_start_tier,
+    record_escalation,
+)
+from recython.hedging import tracker_snapshots
+from recython.history import history_path, record_run
+from recython.jobs import (
+    BenchmarkCase,
+    BenchRequest,
+    BuildRequest,
+    HedgeRequest,
+    PlannedFile,
+    PlannedOutput,
+    RateLimitRequest,
+    ReplayRequest,
+    RunRequest,
+    RunResult,
+    SimulatedRequest,
+    SkippedFile,
+    ValidationRequest,
+)
+from recython.prompts import PromptPack, load_prompt_pack, render_pack_prompt, render_prompt
+from recython.tidy import extract_code_block, extract_code_blocks, has_code_fence
+from recython.tracing import load_type_evidence, render_type_evidence
+from recython.pgo import run_pgo
+from recython.ratelimit import limiter_snapshots
+from recython.scaling import render_scaling_chart, scaling_curves
+from recython.telemetry import Telemetry, trace_events
+from recython.tune import (
+    apply_stored_directives,
+    load_tuning,
+    search_package_flags,
+    stored_flag_profiles,
+    tuning_key,
+    tuning_path,
+)
 from recython.validation import validate_outputs
+from recython.validation.parallel import check_parallel_scaling
+
+RunEventHandler = Callable[[dict[str, Any]], None]
+# Files generate concurrently, but the Cython compiler keeps module-global
+# state, so validation runs one file at a time.
+_VALIDATION_LOCK = threading.Lock()
+
+# The template that drives generation for each style; it doubles as the kind of
+# the planned output that the model writes.
+STYLE_TEMPLATES = {"classic": "classic_pyx", "pure": "pure", "pure_pxd": "pure_pxd"}
+STYLE_FENCES = {"classic": "cython", "pure": "python", "pure_pxd": "cython"}
+# Files sent together in one packed prompt, at most; keeps the reply within the completion budget.
+MAX_PACK_FILES = 8
 
 
 def build_run_request(
@@ -30,7 +88,19 @@ def build_run_request(
     baseline_manifest: Path | None,
     write_manifest: bool,
     dry_run: bool,
+    chrome_trace: bool = False,
     validation: ValidationRequest | None = None,
+    type_evidence: Path | None = None,
+    benchmarks: list[BenchmarkCase] | None = None,
+    build: BuildRequest | None = None,
+    bench: BenchRequest | None = None,
+    replay: ReplayRequest | None = None,
+    simulated: SimulatedRequest | None = None,
+    rate_limit: RateLimitRequest | None = None,
+    hedge: HedgeRequest | None = None,
+    concurrency: int = 1,
+    models: list[str] | None = None,
+    pack_tokens: int = 0,
 ) -> RunRequest:
     return RunRequest(
         source_root=source_root.resolve(),
@@ -48,7 +118,19 @@ def build_run_request(
         baseline_manifest=baseline_manifest.resolve() if baseline_manifest else None,
         write_manifest=write_manifest,
         dry_run=dry_run,
+        chrome_trace=chrome_trace,
         validation=validation or ValidationRequest(),
+        type_evidence=type_evidence.resolve() if type_evidence else None,
+        benchmarks=list(benchmarks or []),
+        build=build or BuildRequest(),
+        bench=bench or BenchRequest(),
+        replay=replay or ReplayRequest(),
+        simulated=simulated or SimulatedRequest(),
+        rate_limit=rate_limit or RateLimitRequest(),
+        hedge=hedge or HedgeRequest(),
+        concurrency=max(1, concurrency),
+        models=list(models or []),
+        pack_tokens=max(0, pack_tokens),
     )
 
 
@@ -131,6 +213,17 @@ def _planned_outputs(style: str, output_root: Path, relative_path: Path) -> tupl
         )
     if style == "pure":
         return ([PlannedOutput(kind="pure", path=output_root / relative_path)], ["pure"])
+    if style == "pure_pxd":
+        source_copy = output_root / relative_path
+        return (
+            [
+                PlannedOutput(kind="pure_source", path=source_copy),
+                PlannedOutput(kind="pure_pxd", path=source_copy.with_suffix(".pxd")),
+            ],
+            ["pure_pxd"],
+        )
+    if style == "compile-only":
+        return ([PlannedOutput(kind="compile_only", path=output_root / relative_path)], [])
     raise ValueError(f"Unsupported style '{style}'.")
 
 
@@ -185,9 +278,20 @@ def plan_run(request: RunRequest) -> RunResult:
                 relative_path=relative_path,
                 outputs=outputs,
                 prompt_keys=prompt_keys,
+                **measure_source(result.source_contents[relative_key]),
             )
         )
 
+    if len(request.models) > 1:
+        records = load_escalation(escalation_path(request.output_root, request.source_root.name))
+        for planned in result.planned_files:
+            planned.start_tier = predict_start_tier(
+                records, lines=planned.lines, complexity=planned.complexity, models=request.models
+            )
+
+    if request.pack_tokens > 0 and request.style in STYLE_TEMPLATES and not request.maintenance_mode:
+        _assign_packs(result, request.pack_tokens)
+
     result.prompts_used = sorted({key for item in result.planned_files for key in item.prompt_keys})
     if request.maintenance_mode:
         result.maintenance_summary = {
@@ -200,6 +304,31 @@ def plan_run(request: RunRequest) -> RunResult:
     return result
 
 
+def _assign_packs(result: RunResult, budget: int) -> None:
+    """Group small planned files, in order, into packs of up to ``budget`` source tokens.
+
+    A file is small when it takes at most half the budget, so every pack has
+    room for two.  Only files that start on the same model share a pack, and
+    a group that ends up with a single file is sent on its own.
+    """
+    groups: list[list[PlannedFile]] = []
+    open_groups: dict[int, tuple[list[PlannedFile], list[int]]] = {}
+    for planned in result.planned_files:
+        tokens = len(result.source_contents[str(planned.relative_path).replace("\\", "/")]) // 4
+        if tokens > budget // 2:
+            continue
+        group, sizes = open_groups.get(planned.start_tier, ([], []))
+        if not group or sum(sizes) + tokens > budget or len(group) >= MAX_PACK_FILES:
+            group, sizes = [], []
+            open_groups[planned.start_tier] = (group, sizes)
+            groups.append(group)
+        group.append(planned)
+        sizes.append(tokens)
+    for index, group in enumerate(group for group in groups if len(group) > 1):
+        for planned in group:
+            planned.pack = index
+
+
 def _make_artifacts_dir(request: RunRequest) -> Path:
     stamp = datetime.now(UTC).strftime("%Y%m%d-%H%M%S-%f")
     run_dir = request.output_root.parent / ".recython" / "runs" / stamp
@@ -235,10 +364,9 @@ def _render_repair_prompt(
     previous_output: str,
     validation_result: dict[str, object],
 ) -> str:
-    template_key = "pure" if style == "pure" else "classic_pyx"
-    base_prompt = render_prompt(prompt_pack, template_key, XXXCODEXXX=source_text)
+    base_prompt = render_prompt(prompt_pack, STYLE_TEMPLATES[style], XXXCODEXXX=source_text)
     feedback = _format_validation_feedback(validation_result)
-    fence = "python" if style == "pure" else "cython"
+    fence = STYLE_FENCES[style]
     return (
         f"{base_prompt}\n\n"
         "The previous generated output failed validation.\n"
@@ -258,9 +386,8 @@ def _render_maintenance_prompt(
     old_source_text: str,
     previous_output: str,
 ) -> str:
-    template_key = "pure" if style == "pure" else "classic_pyx"
-    base_prompt = render_prompt(prompt_pack, template_key, XXXCODEXXX=source_text)
-    fence = "python" if style == "pure" else "cython"
+    base_prompt = render_prompt(prompt_pack, STYLE_TEMPLATES[style], XXXCODEXXX=source_text)
+    fence = STYLE_FENCES[style]
     return (
         f"{base_prompt}\n\n"
         "This is a maintenance cythonization pass.\n"
@@ -275,13 +402,24 @@ def _render_maintenance_prompt(
     )
 
 
+def _with_type_evidence(prompt: str, type_notes: str) -> str:
+    if not type_notes:
+        return prompt
+    return f"{prompt}\n\n{type_notes}"
+
+
 def _write_run_artifacts(result: RunResult) -> None:
     if result.artifacts_dir is None:
         return
 
+    telemetry = result.telemetry.summarize()
     manifest_path = result.artifacts_dir / "manifest.json"
     manifest_path.write_text(json.dumps(result.to_dict(), indent=2), encoding="utf-8")
     result.manifest_path = manifest_path
+    if result.request.chrome_trace:
+        trace_path = result.artifacts_dir / "trace.json"
+        trace_path.write_text(json.dumps(trace_events(result.telemetry.spans)), encoding="utf-8")
+        result.trace_path = trace_path
 
     report_lines = [
         "# Recython Run Report",
@@ -310,16 +448,363 @@ def _write_run_artifacts(result: RunResult) -> None:
         if result.maintenance_summary.get("manual_review"):
             for review in result.maintenance_summary["manual_review"]:
                 report_lines.append(f"- manual review: {review}")
+    if result.build_results:
+        failed_builds = [item for item in result.build_results if not item["ok"]]
+        report_lines.extend(["", "## Build", f"Built modules: {len(result.build_results) - len(failed_builds)}"])
+        for failed in failed_builds:
+            report_lines.append(f"- failed: {failed['module']}: {failed['error']}")
+    if result.benchmark_results:
+        report_lines.extend(
+            [
+                "",
+                "## Benchmarks",
+                "",
+                f"Median per-call times; the interval divides the ends of the {result.request.bench.confidence:.0%} "
+                "confidence intervals.",
+                "",
+                "| Case | Pure (s) | Compiled (s) | Speedup | Interval | Peak alloc (pure / compiled) "
+                "| Live blocks (pure / compiled) |",
+                "|---|---|---|---|---|---|---|",
+            ]
+        )
+        for bench in result.benchmark_results:
+            if bench["ok"]:
+                interval = (
+                    f"{bench['speedup_low']:.2f}x-{bench['speedup_high']:.2f}x"
+                    if bench.get("speedup_low") and bench.get("speedup_high")
+                    else "n/a"
+                )
+                pure_memory, compiled_memory = bench.get("pure_memory"), bench.get("compiled_memory")
+                if pure_memory and compiled_memory:
+                    peaks = (
+                        f"{format_bytes(pure_memory['tracemalloc_peak_bytes'])} / "
+                        f"{format_bytes(compiled_memory['tracemalloc_peak_bytes'])}"
+                    )
+                    blocks = f"{pure_memory['live_blocks_delta']:+d} / {compiled_memory['live_blocks_delta']:+d}"
+                else:
+                    peaks = blocks = "n/a"
+                report_lines.append(
+                    f"| {bench['name']} | {bench['pure_seconds']:.6f} | {bench['compiled_seconds']:.6f} "
+                    f"| {bench['speedup']:.2f}x | {interval} | {peaks} | {blocks} |"
+                )
+            else:
+                report_lines.append(f"| {bench['name']} | error | error | {bench['error']} | | | |")
+        if result.scaling_results:
+            report_lines.extend(
+                ["", "## Scaling", "", "```text", render_scaling_chart(result.scaling_results).rstrip(), "```"]
+            )
+        if result.history_run_id:
+            report_lines.extend(
+                ["", f"Recorded as benchmark history run `{result.history_run_id}`; compare with `recython history`."]
+            )
+    if result.module_report:
+        report_lines.extend(
+            ["", "## Modules", "", "| Module | Compiled | Speedup | Compile-only baseline |", "|---|---|---|---|"]
+        )
+        for row in result.module_report:
+            speedup = f"{row['speedup']:.2f}x" if row["speedup"] else "n/a"
+            baseline = f"{row['baseline_speedup']:.2f}x" if row.get("baseline_speedup") else "n/a"
+            report_lines.append(f"| {row['module']} | {row['compiled']} | {speedup} | {baseline} |")
+    if result.parallel_results:
+        counts = result.parallel_results["thread_counts"]
+        report_lines.extend(
+            [
+                "",
+                "## Parallel scaling",
+                "",
+                "| Case | Matches serial | " + " | ".join(f"{count} thread(s)" for count in counts) + " |",
+                "|---|---|" + "---|" * len(counts),
+            ]
+        )
+        for case in result.parallel_results["cases"]:
+            cells = [
+                (
+                    f"{case['seconds'][str(count)]:.6f}s ({case['speedup'][str(count)]:.2f}x)"
+                    if str(count) in case["seconds"] and case["speedup"].get(str(count))
+                    else "n/a"
+                )
+                for count in counts
+            ]
+            report_lines.append(f"| {case['name']} | {case['ok']} | " + " | ".join(cells) + " |")
+    if result.flag_results:
+        report_lines.extend(
+            ["", "## Compiler flags", "", "| Module | Profile | Speedup vs baseline | Note |", "|---|---|---|---|"]
+        )
+        for row in result.flag_results:
+            speedup = f"{row['speedup']:.2f}x" if row.get("speedup") else "n/a"
+            report_lines.append(f"| {row['module']} | {row.get('profile', 'n/a')} | {speedup} | {row['error'] or ''} |")
+    if result.pgo_results:
+        report_lines.extend(["", "## Profile-guided optimization", ""])
+        if result.pgo_results["ok"]:
+            report_lines.extend(
+                [
+                    f"Profile: {result.pgo_results['profile_status']} ({result.pgo_results['profile_dir']}). "
+                    + ("PGO build kept." if result.pgo_results["kept"] else "No clear gain; plain build kept."),
+                    "",
+                    "| Case | Plain | PGO | Speedup |",
+                    "|---|---|---|---|",
+                ]
+            )
+            for case in result.pgo_results["cases"]:
+                speedup = f"{case['speedup']:.2f}x" if case["speedup"] else "n/a"
+                report_lines.append(
+                    f"| {case['name']} | {case['baseline_seconds']:.6f}s | {case['pgo_seconds']:.6f}s | {speedup} |"
+                )
+        else:
+            report_lines.append(f"PGO build failed: {result.pgo_results['error']}")
+    if result.packs:
+        report_lines.extend(["", "## Packed requests", "", "| Pack | Model | Files | Answered |", "|---|---|---|---|"])
+        for pack in result.packs:
+            answered = pack["error"] or f"{len(pack['returned'])}/{len(pack['files'])}"
+            report_lines.append(f"| {pack['pack']} | {pack['model']} | {', '.join(pack['files'])} | {answered} |")
+    if result.escalation:
+        report_lines.extend(["", "## Model escalation", "", f"Ladder: {' -> '.join(result.escalation['models'])}", ""])
+        report_lines.extend(["| File | Started at | Finished at | Attempts | OK |", "|---|---|---|---|---|"])
+        for name, row in result.escalation["files"].items():
+            started = row["models"][row["start_tier"]]
+            report_lines.append(f"| {name} | {started} | {row['model']} | {row['attempts']} | {row['ok']} |")
     if result.skipped_files:
         report_lines.extend(["", "## Skipped"])
         for skipped in result.skipped_files:
             report_lines.append(f"- {skipped.source_path}: {skipped.reason}")
+    if telemetry["phases"]:
+        report_lines.extend(_telemetry_report_lines(telemetry))
     report_path = result.artifacts_dir / "report.md"
     report_path.write_text("\n".join(report_lines) + "\n", encoding="utf-8")
     result.report_path = report_path
 
 
-def execute_run(request: RunRequest) -> RunResult:
+def _telemetry_report_lines(telemetry: dict[str, Any]) -> list[str]:
+    tokens = telemetry["tokens"]
+    lines = [
+        "",
+        "## Telemetry",
+        "",
+        f"Total: {telemetry['total_seconds']:.2f}s. Tokens: {tokens['prompt_tokens']} prompt "
+        f"({tokens['cached_tokens']} cached), {tokens['completion_tokens']} completion over {tokens['calls']} call(s).",
+        "",
+        "| Phase | Count | Seconds |",
+        "|---|---|---|",
+    ]
+    for category, phase in telemetry["phases"].items():
+        lines.append(f"| {category} | {phase['count']} | {phase['seconds']:.3f} |")
+    if telemetry["validators"]:
+        lines.extend(["", "| Validator | Count | Seconds |", "|---|---|---|"])
+        for name, validator in telemetry["validators"].items():
+            lines.append(f"| {name} | {validator['count']} | {validator['seconds']:.3f} |")
+    rate_limit = telemetry["rate_limit"]
+    if rate_limit["limiters"]:
+        lines.extend(
+            [
+                "",
+                f"Rate limits: {rate_limit['rate_limited']} call(s) rejected with 429, "
+                f"{rate_limit['queued_seconds']:.2f}s queued in the limiter.",
+                "",
+                "| Limiter | Calls | 429s | Window | Peak in flight | Requests/min | Tokens/min |",
+                "|---|---|---|---|---|---|---|",
+            ]
+        )
+        for name, limiter in rate_limit["limiters"].items():
+            lines.append(
+                f"| {name} | {limiter['calls']} | {limiter['rate_limited']} | {limiter['window'] or '-'} "
+                f"| {limiter['peak_in_flight']} | {limiter['requests_per_minute'] or '-'} "
+                f"| {limiter['tokens_per_minute'] or '-'} |"
+            )
+    hedge = telemetry["hedge"]
+    if hedge["trackers"]:
+        lines.extend(
+            [
+                "",
+                f"Hedging: {hedge['hedged']} call(s) hedged, {hedge['hedge_wins']} won by the hedge.",
+                "",
+                "| Model | Calls | Hedged | Hedge wins | Median (s) |",
+                "|---|---|---|---|---|",
+            ]
+        )
+        for name, tracker in hedge["trackers"].items():
+            median = f"{tracker['median_seconds']:.2f}" if tracker["median_seconds"] is not None else "-"
+            lines.append(f"| {name} | {tracker['calls']} | {tracker['hedged']} | {tracker['hedge_wins']} | {median} |")
+    if telemetry["files"]:
+        lines.extend(
+            [
+                "",
+                "| File | Attempts | Seconds | LLM (s) | Prompt tokens | Completion tokens | Cached tokens |",
+                "|---|---|---|---|---|---|---|",
+            ]
+        )
+        for name, row in sorted(telemetry["files"].items(), key=lambda item: -item[1]["seconds"]):
+            lines.append(
+                f"| {name} | {row['attempts']} | {row['seconds']:.3f} | {row['phases'].get('llm', 0.0):.3f} "
+                f"| {row['prompt_tokens']} | {row['completion_tokens']} | {row['cached_tokens']} |"
+            )
+    return lines
+
+
+def _build_sources(result: RunResult) -> list[Path]:
+    """Return the generated file for each planned source that Cython should compile."""
+    sources: list[Path] = []
+    for planned in result.planned_files:
+        primary = planned.outputs[0].path
+        if primary.exists():
+            sources.append(primary)
+    return sources
+
+
+def _record_validation_failure(result: RunResult, validator: str, path: str, error: object) -> None:
+    summary = result.validation_results
+    summary["ok"] = False
+    summary["checked"] = summary.get("checked", 0) + 1
+    summary["failed"] = summary.get("failed", 0) + 1
+    summary.setdefault("files", []).append({"path": path, "validator": validator, "ok": False, "error": error})
+
+
+def _reapply_tuned_directives(result: RunResult) -> None:
+    """Carry directive sets chosen by ``recython tune`` over to regenerated modules."""
+    request = result.request
+    store = load_tuning(tuning_path(request.output_root, request.source_root.name))
+    if not store:
+        return
+    applied: dict[str, object] = {}
+    for planned in result.planned_files:
+        module = tuning_key(request.output_root, request.source_root.name, planned.outputs[0].path)
+        directives = apply_stored_directives(planned.outputs[0].path, module, store)
+        if directives is not None:
+            applied[module] = directives
+    result.maintenance_summary["tuned_directives"] = applied
+
+
+def _compile_only_baseline_path(request: RunRequest) -> Path:
+    package_name = request.source_root.name
+    return request.output_root.parent / ".recython" / "baselines" / f"{package_name}.compile-only.json"
+
+
+def _build_and_benchmark(result: RunResult) -> None:
+    request = result.request
+    package_name = request.source_root.name
+    targets = build_targets_for(request.output_root, package_name, _build_sources(result))
+    build = request.build
+    if request.prompt_profile == "parallel":
+        build = with_openmp(build)
+    profiles = stored_flag_profiles(request.output_root, package_name)
+    result.build_results = build_with_profiles(
+        targets,
+        output_root=request.output_root,
+        package_name=package_name,
+        style=request.style,
+        build=build,
+        profiles=profiles,
+    )
+    if build.flag_search and request.benchmarks:
+        result.flag_results = search_package_flags(
+            output_root=request.output_root,
+            source_root=request.source_root,
+            style=request.style,
+            cases=request.benchmarks,
+            build=build,
+            modules=[
+                relative_module_name(str(item["module"]), package_name) for item in result.build_results if item["ok"]
+            ],
+            bench=request.bench,
+        )
+    if build.pgo and request.benchmarks:
+        # run_pgo restores the plain build when PGO fails, so the tree stays usable either way.
+        built = {item["module"] for item in result.build_results if item["ok"]}
+        result.pgo_results = run_pgo(
+            [target for target in targets if target.module_name in built],
+            request.benchmarks,
+            output_root=request.output_root,
+            package_name=package_name,
+            source_root=request.source_root,
+            style=request.style,
+            build=build,
+            profiles={**profiles, **{row["module"]: row["profile"] for row in result.flag_results if "profile" in row}},
+            bench=request.bench,
+        )
+    result.benchmark_results = compare_benchmarks(
+        request.benchmarks,
+        package_name=package_name,
+        source_root=request.source_root,
+        compiled_root=request.output_root,
+        bench=request.bench,
+    )
+    result.scaling_results = scaling_curves(request.benchmarks, result.benchmark_results)
+    if request.bench.history and result.benchmark_results:
+        result.history_run_id = record_run(
+            history_path(request.output_root),
+            result.benchmark_results,
+            request.benchmarks,
+            package=package_name,
+            origin=request.style,
+            cwd=request.source_root,
+            run_id=result.artifacts_dir.name if result.artifacts_dir is not None else None,
+        )
+    if request.prompt_profile == "parallel":
+        result.parallel_results = check_parallel_scaling(
+            request.benchmarks,
+            package_name=package_name,
+            source_root=request.source_root,
+            compiled_root=request.output_root,
+        )
+        for case in result.parallel_results["cases"]:
+            if not case["ok"]:
+                _record_validation_failure(result, "parallel_equivalence", case["name"], case["error"])
+
+    # compile-only runs record the zero-LLM baseline; every other style is
+    # compared against the most recent baseline for the same package.
+    baseline_path = _compile_only_baseline_path(request)
+    baseline = None
+    if request.style != "compile-only" and baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["modules"]
+    result.module_report = summarize_modules(
+        request.benchmarks,
+        result.build_results,
+        result.benchmark_results,
+        package_name=package_name,
+        baseline=baseline,
+    )
+    if request.style == "compile-only":
+        _write_text(
+            baseline_path,
+            json.dumps(
+                {
+                    "package": package_name,
+                    "created": datetime.now(UTC).isoformat(),
+                    "modules": result.module_report,
+                    "benchmarks": result.benchmark_results,
+                },
+                indent=2,
+            ),
+        )
+
+
+def _execute_compile_only(result: RunResult) -> RunResult:
+    """Copy the sources unmodified, compile them with Cython, and benchmark them.
+
+    No prompts are rendered and no model is called; the output is the free
+    speedup plain cythonization gives, per module.
+    """
+    request = result.request
+    for planned in result.planned_files:
+        output = planned.outputs[0].path
+        _write_text(output, planned.source_path.read_text(encoding="utf-8"))
+        result.written_files.append(output)
+
+    result.validation_results = validate_outputs(
+        result.written_files,
+        style=request.style,
+        python_compile_enabled=request.validation.python_compile,
+        cython_compile_enabled=False,
+    )
+    if result.planned_files:
+        _build_and_benchmark(result)
+        failed_builds = [item for item in result.build_results if not item["ok"]]
+        if failed_builds:
+            result.validation_results["ok"] = False
+    _write_run_artifacts(result)
+    return result
+
+
+def execute_run(request: RunRequest, on_event: RunEventHandler | None = None) -> RunResult:
     prompt_pack = load_prompt_pack(
         RecythonConfig(
             project_root=request.source_root,
@@ -327,251 +812,573 @@ def execute_run(request: RunRequest) -> RunResult:
             provider=request.provider,
         )
     )
-    return execute_run_with_pack(request, prompt_pack)
+    return execute_run_with_pack(request, prompt_pack, on_event)
 
 
-def execute_run_with_pack(request: RunRequest, prompt_pack: PromptPack) -> RunResult:
-    if request.provider not in {"openai", "openrouter"}:
-        raise ValueError(f"Unsupported provider '{request.provider}'.")
+def _ignore_event(_event: dict[str, Any]) -> None:
+    pass
 
-    result = plan_run(request)
-    if request.write_manifest:
-        result.artifacts_dir = _make_artifacts_dir(request)
 
-    if request.dry_run:
-        _write_run_artifacts(result)
-        return result
+def _complete(
+    result: RunResult,
+    prompt: str,
+    *,
+    label: str,
+    file: str,
+    attempt: int,
+    model: str | None = None,
+    emit: RunEventHandler = _ignore_event,
+    reply: str | None = None,
+) -> tuple[str, str]:
+    """Ask ``model`` (the request's by default) for one output and extract its code block, timing both steps.
 
-    # When retries are enabled, also run the Cython compiler so errors feed
-    # back into the repair prompt on the next attempt.
-    effective_cython_compile = request.validation.cython_compile or (request.max_attempts > 1)
+    ``reply`` is an answer already received for this file from a packed
+    prompt; it is used instead of calling the model.
+    """
+    if reply is not None:
+        with result.telemetry.span("extract", label, file=file, attempt=attempt):
+            return reply, extract_code_block(reply)
+    request = result.request
+    model = model or request.model
+    usage: dict[str, int] = {}
 
-    validation_summary = {
-        "ok": True,
-        "checked": 0,
-        "failed": 0,
-        "files": [],
-        "attempts": {},
-    }
-    baseline_manifest = _load_baseline_manifest(request.baseline_manifest) if request.maintenance_mode else None
+    def on_backoff(retry: int, delay: float, exc: Exception) -> None:
+        emit(
+            {
+                "event": "backoff",
+                "file": file,
+                "attempt": attempt,
+                "label": label,
+                "retry": retry,
+                "delay": delay,
+                "error": type(exc).__name__,
+            }
+        )
 
-    for planned in result.planned_files:
-        source_text = planned.source_path.read_text(encoding="utf-8")
-        snapshot_prefix = _snapshot_stem(planned.relative_path)
-        attempts: list[dict[str, object]] = []
-        final_outputs: list[Path] = []
-        file_validation: dict[str, object] = {"ok": True, "checked": 0, "failed": 0, "files": []}
-        pyx_contents = ""
-        pure_contents = ""
-        relative_key = str(planned.relative_path).replace("\\", "/")
-        old_source_text = ""
-        previous_generated_output = ""
-        if request.maintenance_mode and baseline_manifest is not None:
-            previous_run_outputs = baseline_manifest.get("generated_outputs", {})
-            old_source_text = baseline_manifest.get("source_contents", {}).get(relative_key, "")
+    started = time.perf_counter()
+    with result.telemetry.span("llm", label, file=file, attempt=attempt) as args:
+        response = ai.completion(
+            prompt,
+            provider=request.provider,
+            model=model,
+            max_completion_tokens=request.max_completion_tokens,
+            temperature=request.temperature,
+            usage=usage,
+            on_backoff=on_backoff,
+            replay_source=request.replay.source,
+            replay_mode=request.replay.mode,
+            fallthrough_provider=request.replay.fallthrough_provider,
+            record_path=request.replay.record,
+            simulated=request.simulated,
+            rate_limit=request.rate_limit,
+            hedge=request.hedge,
+        )
+        args.update(usage, model=model)
+    seconds = time.perf_counter() - started
+    emit(
+        {"event": "llm_finished", "file": file, "attempt": attempt, "label": label, "model": model, "seconds": seconds}
+        | usage
+    )
+    with result.telemetry.span("extract", label, file=file, attempt=attempt):
+        contents = extract_code_block(response)
+    return response, contents
+
+
+def _record_validator_spans(
+    telemetry: Telemetry, validation: dict[str, Any], *, start: float, file: str, attempt: int
+) -> None:
+    """Lay the per-check timings ``validate_outputs`` reports end to end from ``start``."""
+    for item in validation["files"]:
+        seconds = float(item.get("seconds") or 0.0)
+        telemetry.add("validator", str(item["validator"]), start=start, seconds=seconds, file=file, attempt=attempt)
+        start += seconds
+
+
+def _generate_file(
+    result: RunResult,
+    planned: PlannedFile,
+    *,
+    prompt_pack: PromptPack,
+    baseline_manifest: dict[str, Any] | None,
+    type_evidence: dict[str, Any] | None,
+    effective_cython_compile: bool,
+    emit: RunEventHandler,
+    packed: str | None = None,
+) -> tuple[list[Path], dict[str, object], list[dict[str, object]]]:
+    """Generate one planned file, retrying until it validates; return its outputs, validation, and attempts.
+
+    ``packed`` is the file's reply from its packed prompt, used for the first
+    attempt; that attempt renders no prompt of its own, and its prompt and
+    reply are only in the pack's snapshots.  Retries and repairs are always
+    single-file requests.
+    """
+    request = result.request
+    telemetry = result.telemetry
+    source_text = planned.source_path.read_text(encoding="utf-8")
+    type_notes = render_type_evidence(type_evidence, planned.source_path)
+    snapshot_prefix = _snapshot_stem(planned.relative_path)
+    attempts: list[dict[str, object]] = []
+    final_outputs: list[Path] = []
+    file_validation: dict[str, Any] = {"ok": True, "checked": 0, "failed": 0, "files": []}
+    pyx_contents = ""
+    pure_contents = ""
+    pxd_contents = ""
+    response_text = ""
+    relative_key = str(planned.relative_path).replace("\\", "/")
+    old_source_text = ""
+    previous_generated_output = ""
+    if request.maintenance_mode and baseline_manifest is not None:
+        previous_run_outputs = baseline_manifest.get("generated_outputs", {})
+        old_source_text = baseline_manifest.get("source_contents", {}).get(relative_key, "")
+        previous_generated_output = previous_run_outputs.get(relative_key, {}).get(STYLE_TEMPLATES[request.style], "")
+
+    # With a model ladder, every tier above the starting one gets at least one attempt.
+    ladder = request.models or [request.model]
+    start_tier = min(planned.start_tier, len(ladder) - 1)
+    max_attempts = max(request.max_attempts, len(ladder) - start_tier)
+    tier = start_tier
+    file_started = time.perf_counter()
+    try:
+        for attempt_index in range(1, max_attempts + 1):
+            tier = model_tier(ladder, start_tier, attempt_index)
+            model = ladder[tier]
+            emit({"event": "attempt_started", "file": relative_key, "attempt": attempt_index, "model": model})
+            from_pack = packed if attempt_index == 1 else None
             if request.style == "classic":
-                previous_generated_output = previous_run_outputs.get(relative_key, {}).get("classic_pyx", "")
-            else:
-                previous_generated_output = previous_run_outputs.get(relative_key, {}).get("pure", "")
-
-        try:
-            for attempt_index in range(1, request.max_attempts + 1):
-                if request.style == "classic":
-                    if attempt_index == 1:
-                        if request.maintenance_mode and old_source_text and previous_generated_output:
-                            pyx_prompt = _render_maintenance_prompt(
+                if from_pack is not None:
+                    pyx_prompt = ""
+                else:
+                    with telemetry.span("render", "classic_pyx", file=relative_key, attempt=attempt_index):
+                        if attempt_index == 1:
+                            if request.maintenance_mode and old_source_text and previous_generated_output:
+                                pyx_prompt = _render_maintenance_prompt(
+                                    prompt_pack=prompt_pack,
+                                    style=request.style,
+                                    source_text=source_text,
+                                    old_source_text=old_source_text,
+                                    previous_output=previous_generated_output,
+                                )
+                            else:
+                                pyx_prompt = render_prompt(prompt_pack, "classic_pyx", XXXCODEXXX=source_text)
+                        else:
+                            pyx_prompt = _render_repair_prompt(
                                 prompt_pack=prompt_pack,
                                 style=request.style,
                                 source_text=source_text,
-                                old_source_text=old_source_text,
-                                previous_output=previous_generated_output,
+                                previous_output=pyx_contents,
+                                validation_result=file_validation,
                             )
-                        else:
-                            pyx_prompt = render_prompt(prompt_pack, "classic_pyx", XXXCODEXXX=source_text)
-                    else:
-                        pyx_prompt = _render_repair_prompt(
-                            prompt_pack=prompt_pack,
-                            style=request.style,
-                            source_text=source_text,
-                            previous_output=pyx_contents,
-                            validation_result=file_validation,
-                        )
-                    pyx_response = ai.completion(
-                        pyx_prompt,
-                        provider=request.provider,
-                        model=request.model,
-                        max_completion_tokens=request.max_completion_tokens,
-                        temperature=request.temperature,
+                        pyx_prompt = _with_type_evidence(pyx_prompt, type_notes)
+                pyx_response, pyx_contents = _complete(
+                    result,
+                    pyx_prompt,
+                    label="classic_pyx",
+                    file=relative_key,
+                    attempt=attempt_index,
+                    model=model,
+                    emit=emit,
+                    reply=from_pack,
+                )
+
+                pxd_prompt = render_prompt(prompt_pack, "classic_pxd", XXXRESULTXXX=pyx_response)
+                if attempt_index > 1 and any(
+                    item["validator"] == "cython_compile" and str(item["path"]).endswith(".pxd") and not item["ok"]
+                    for item in file_validation["files"]
+                ):
+                    previous_pxd = (
+                        planned.outputs[1].path.read_text(encoding="utf-8") if planned.outputs[1].path.exists() else ""
                     )
-                    pyx_contents = extract_code_block(pyx_response)
-
-                    pxd_prompt = render_prompt(prompt_pack, "classic_pxd", XXXRESULTXXX=pyx_response)
-                    if attempt_index > 1 and any(
-                        item["validator"] == "cython_compile" and str(item["path"]).endswith(".pxd") and not item["ok"]
-                        for item in file_validation["files"]
-                    ):
-                        previous_pxd = (
-                            planned.outputs[1].path.read_text(encoding="utf-8")
-                            if planned.outputs[1].path.exists()
-                            else ""
-                        )
-                        pxd_prompt = (
-                            f"{pxd_prompt}\n\n"
-                            "The previous generated .pxd failed validation.\n"
-                            "Fix the declaration file issues below and return the full corrected .pxd file only.\n\n"
-                            "Validation feedback:\n"
-                            f"{_format_validation_feedback(file_validation)}\n\n"
-                            "Previous generated .pxd output:\n"
-                            f"```cython\n{previous_pxd}\n```"
-                        )
-                    pxd_response = ai.completion(
-                        pxd_prompt,
-                        provider=request.provider,
-                        model=request.model,
-                        max_completion_tokens=request.max_completion_tokens,
-                        temperature=request.temperature,
+                    pxd_prompt = (
+                        f"{pxd_prompt}\n\n"
+                        "The previous generated .pxd failed validation.\n"
+                        "Fix the declaration file issues below and return the full corrected .pxd file only.\n\n"
+                        "Validation feedback:\n"
+                        f"{_format_validation_feedback(file_validation)}\n\n"
+                        "Previous generated .pxd output:\n"
+                        f"```cython\n{previous_pxd}\n```"
                     )
-                    pxd_contents = extract_code_block(pxd_response)
-                    pyx_output = planned.outputs[0].path
-                    pxd_output = planned.outputs[1].path
-                    _write_text(pyx_output, pyx_contents)
-                    _write_text(pxd_output, pxd_contents)
-                    final_outputs = [pyx_output, pxd_output]
-
-                    if result.artifacts_dir is not None:
-                        suffix = f".attempt{attempt_index}"
+                pxd_response, pxd_contents = _complete(
+                    result,
+                    pxd_prompt,
+                    label="classic_pxd",
+                    file=relative_key,
+                    attempt=attempt_index,
+                    model=model,
+                    emit=emit,
+                )
+                response_text = pyx_response
+                pyx_output = planned.outputs[0].path
+                pxd_output = planned.outputs[1].path
+                _write_text(pyx_output, pyx_contents)
+                _write_text(pxd_output, pxd_contents)
+                final_outputs = [pyx_output, pxd_output]
+
+                if result.artifacts_dir is not None:
+                    suffix = f".attempt{attempt_index}"
+                    if from_pack is None:
                         _write_text(
                             result.artifacts_dir / "prompts" / f"{snapshot_prefix}{suffix}.classic_pyx.md",
                             pyx_prompt,
                         )
-                        _write_text(
-                            result.artifacts_dir / "prompts" / f"{snapshot_prefix}{suffix}.classic_pxd.md",
-                            pxd_prompt,
-                        )
                         _write_text(
                             result.artifacts_dir / "responses" / f"{snapshot_prefix}{suffix}.classic_pyx.txt",
                             pyx_response,
                         )
-                        _write_text(
-                            result.artifacts_dir / "responses" / f"{snapshot_prefix}{suffix}.classic_pxd.txt",
-                            pxd_response,
-                        )
+                    _write_text(
+                        result.artifacts_dir / "prompts" / f"{snapshot_prefix}{suffix}.classic_pxd.md",
+                        pxd_prompt,
+                    )
+                    _write_text(
+                        result.artifacts_dir / "responses" / f"{snapshot_prefix}{suffix}.classic_pxd.txt",
+                        pxd_response,
+                    )
+            elif request.style == "pure_pxd":
+                if from_pack is not None:
+                    pxd_prompt = ""
                 else:
-                    if attempt_index == 1:
-                        if request.maintenance_mode and old_source_text and previous_generated_output:
-                            pure_prompt = _render_maintenance_prompt(
+                    with telemetry.span("render", "pure_pxd", file=relative_key, attempt=attempt_index):
+                        if attempt_index == 1:
+                            if request.maintenance_mode and old_source_text and previous_generated_output:
+                                pxd_prompt = _render_maintenance_prompt(
+                                    prompt_pack=prompt_pack,
+                                    style=request.style,
+                                    source_text=source_text,
+                                    old_source_text=old_source_text,
+                                    previous_output=previous_generated_output,
+                                )
+                            else:
+                                pxd_prompt = render_prompt(prompt_pack, "pure_pxd", XXXCODEXXX=source_text)
+                        else:
+                            pxd_prompt = _render_repair_prompt(
                                 prompt_pack=prompt_pack,
                                 style=request.style,
                                 source_text=source_text,
-                                old_source_text=old_source_text,
-                                previous_output=previous_generated_output,
+                                previous_output=pxd_contents,
+                                validation_result=file_validation,
                             )
+                        pxd_prompt = _with_type_evidence(pxd_prompt, type_notes)
+                pxd_response, pxd_contents = _complete(
+                    result,
+                    pxd_prompt,
+                    label="pure_pxd",
+                    file=relative_key,
+                    attempt=attempt_index,
+                    model=model,
+                    emit=emit,
+                    reply=from_pack,
+                )
+                response_text = pxd_response
+                # The .py is copied verbatim; only the augmenting .pxd is generated.
+                source_output = planned.outputs[0].path
+                pxd_output = planned.outputs[1].path
+                _write_text(source_output, source_text)
+                _write_text(pxd_output, pxd_contents)
+                final_outputs = [source_output, pxd_output]
+
+                if result.artifacts_dir is not None and from_pack is None:
+                    suffix = f".attempt{attempt_index}"
+                    _write_text(
+                        result.artifacts_dir / "prompts" / f"{snapshot_prefix}{suffix}.pure_pxd.md",
+                        pxd_prompt,
+                    )
+                    _write_text(
+                        result.artifacts_dir / "responses" / f"{snapshot_prefix}{suffix}.pure_pxd.txt",
+                        pxd_response,
+                    )
+            else:
+                if from_pack is not None:
+                    pure_prompt = ""
+                else:
+                    with telemetry.span("render", "pure", file=relative_key, attempt=attempt_index):
+                        if attempt_index == 1:
+                            if request.maintenance_mode and old_source_text and previous_generated_output:
+                                pure_prompt = _render_maintenance_prompt(
+                                    prompt_pack=prompt_pack,
+                                    style=request.style,
+                                    source_text=source_text,
+                                    old_source_text=old_source_text,
+                                    previous_output=previous_generated_output,
+                                )
+                            else:
+                                pure_prompt = render_prompt(prompt_pack, "pure", XXXCODEXXX=source_text)
                         else:
-                            pure_prompt = render_prompt(prompt_pack, "pure", XXXCODEXXX=source_text)
-                    else:
-                        pure_prompt = _render_repair_prompt(
-                            prompt_pack=prompt_pack,
-                            style=request.style,
-                            source_text=source_text,
-                            previous_output=pure_contents,
-                            validation_result=file_validation,
-                        )
-                    pure_response = ai.completion(
+                            pure_prompt = _render_repair_prompt(
+                                prompt_pack=prompt_pack,
+                                style=request.style,
+                                source_text=source_text,
+                                previous_output=pure_contents,
+                                validation_result=file_validation,
+                            )
+                        pure_prompt = _with_type_evidence(pure_prompt, type_notes)
+                pure_response, pure_contents = _complete(
+                    result,
+                    pure_prompt,
+                    label="pure",
+                    file=relative_key,
+                    attempt=attempt_index,
+                    model=model,
+                    emit=emit,
+                    reply=from_pack,
+                )
+                response_text = pure_response
+                pure_output = planned.outputs[0].path
+                _write_text(pure_output, pure_contents)
+                final_outputs = [pure_output]
+
+                if result.artifacts_dir is not None and from_pack is None:
+                    suffix = f".attempt{attempt_index}"
+                    _write_text(
+                        result.artifacts_dir / "prompts" / f"{snapshot_prefix}{suffix}.pure.md",
                         pure_prompt,
-                        provider=request.provider,
-                        model=request.model,
-                        max_completion_tokens=request.max_completion_tokens,
-                        temperature=request.temperature,
                     )
-                    pure_contents = extract_code_block(pure_response)
-                    pure_output = planned.outputs[0].path
-                    _write_text(pure_output, pure_contents)
-                    final_outputs = [pure_output]
-
-                    if result.artifacts_dir is not None:
-                        suffix = f".attempt{attempt_index}"
-                        _write_text(
-                            result.artifacts_dir / "prompts" / f"{snapshot_prefix}{suffix}.pure.md",
-                            pure_prompt,
-                        )
-                        _write_text(
-                            result.artifacts_dir / "responses" / f"{snapshot_prefix}{suffix}.pure.txt",
-                            pure_response,
-                        )
+                    _write_text(
+                        result.artifacts_dir / "responses" / f"{snapshot_prefix}{suffix}.pure.txt",
+                        pure_response,
+                    )
 
-                # Check that every expected file was written and is non-empty
-                # before running the more expensive validation steps.  Also
-                # treat a response with no code fence as a generation failure
-                # so the retry loop fires even if the fallback wrote prose.
-                fence_problems: list[str] = []
-                if request.style == "classic":
-                    if not has_code_fence(pyx_response):
-                        fence_problems.append(
-                            f"{planned.outputs[0].path}: LLM response contained no code fence for .pyx"
-                        )
-                else:
-                    if not has_code_fence(pure_response):
-                        fence_problems.append(
-                            f"{planned.outputs[0].path}: LLM response contained no code fence for pure output"
-                        )
-                missing_problems = fence_problems or _check_expected_outputs(planned.outputs)
-                if missing_problems:
-                    file_validation = {
-                        "ok": False,
-                        "checked": len(planned.outputs),
-                        "failed": len(missing_problems),
-                        "files": [
-                            {
-                                "path": str(planned.outputs[i].path),
-                                "validator": "expected_outputs",
-                                "ok": False,
-                                "error": missing_problems[i] if i < len(missing_problems) else None,
-                            }
-                            for i in range(len(planned.outputs))
-                        ],
-                    }
-                    attempts.append(
+            # Check that every expected file was written and is non-empty
+            # before running the more expensive validation steps.  Also
+            # treat a response with no code fence as a generation failure
+            # so the retry loop fires even if the fallback wrote prose.
+            fence_problems: list[str] = []
+            if not has_code_fence(response_text):
+                generated = planned.outputs[-1] if request.style == "pure_pxd" else planned.outputs[0]
+                label = {"classic": ".pyx", "pure": "pure output", "pure_pxd": ".pxd"}[request.style]
+                fence_problems.append(f"{generated.path}: LLM response contained no code fence for {label}")
+            missing_problems = fence_problems or _check_expected_outputs(planned.outputs)
+            if missing_problems:
+                file_validation = {
+                    "ok": False,
+                    "checked": len(planned.outputs),
+                    "failed": len(missing_problems),
+                    "files": [
                         {
-                            "attempt": attempt_index,
+                            "path": str(planned.outputs[i].path),
+                            "validator": "expected_outputs",
                             "ok": False,
-                            "failed": len(missing_problems),
+                            "error": missing_problems[i] if i < len(missing_problems) else None,
                         }
-                    )
-                    continue
-
-                file_validation = validate_outputs(
-                    final_outputs,
-                    style=request.style,
-                    python_compile_enabled=request.validation.python_compile,
-                    cython_compile_enabled=effective_cython_compile,
-                )
+                        for i in range(len(planned.outputs))
+                    ],
+                }
                 attempts.append(
                     {
                         "attempt": attempt_index,
-                        "ok": file_validation["ok"],
-                        "failed": file_validation["failed"],
+                        "model": model,
+                        "tier": tier,
+                        "ok": False,
+                        "failed": len(missing_problems),
                     }
                 )
-                if file_validation["ok"]:
-                    break
-        except Exception as exc:
-            validation_summary["ok"] = False
-            error_result = {
-                "path": str(planned.source_path),
-                "validator": "generation",
-                "ok": False,
-                "error": str(exc),
-            }
-            file_validation = {"ok": False, "checked": 1, "failed": 1, "files": [error_result]}
+                continue
+
+            with _VALIDATION_LOCK:
+                validate_started = time.perf_counter()
+                with telemetry.span("validate", file=relative_key, attempt=attempt_index):
+                    file_validation = validate_outputs(
+                        final_outputs,
+                        style=request.style,
+                        python_compile_enabled=request.validation.python_compile,
+                        cython_compile_enabled=effective_cython_compile,
+                        prompt_profile=request.prompt_profile,
+                        sources={path: planned.source_path for path in final_outputs},
+                    )
+            _record_validator_spans(
+                telemetry, file_validation, start=validate_started, file=relative_key, attempt=attempt_index
+            )
             attempts.append(
                 {
-                    "attempt": len(attempts) + 1,
-                    "ok": False,
-                    "failed": 1,
-                    "error": str(exc),
+                    "attempt": attempt_index,
+                    "model": model,
+                    "tier": tier,
+                    "ok": file_validation["ok"],
+                    "failed": file_validation["failed"],
                 }
             )
+            if file_validation["ok"]:
+                break
+    except Exception as exc:
+        error_result = {
+            "path": str(planned.source_path),
+            "validator": "generation",
+            "ok": False,
+            "error": str(exc),
+        }
+        file_validation = {"ok": False, "checked": 1, "failed": 1, "files": [error_result]}
+        attempts.append(
+            {
+                "attempt": len(attempts) + 1,
+                "model": ladder[tier],
+                "tier": tier,
+                "ok": False,
+                "failed": 1,
+                "error": str(exc),
+            }
+        )
+
+    emit(
+        {
+            "event": "file_finished",
+            "file": relative_key,
+            "ok": bool(file_validation["ok"]),
+            "attempts": len(attempts),
+            "seconds": time.perf_counter() - file_started,
+        }
+    )
+    return final_outputs, file_validation, attempts
+
+
+def _generate_pack(
+    result: RunResult,
+    index: int,
+    files: list[PlannedFile],
+    *,
+    prompt_pack: PromptPack,
+    type_evidence: dict[str, Any] | None,
+    emit: RunEventHandler,
+) -> dict[str, str]:
+    """Send one packed prompt for ``files``; return each file's reply, fenced, by relative key.
+
+    Files whose block is missing from the reply, or every file if the call
+    fails, are left out and fall back to their own request.
+    """
+    request = result.request
+    template = STYLE_TEMPLATES[request.style]
+    fence = STYLE_FENCES[request.style]
+    keys = [str(planned.relative_path).replace("\\", "/") for planned in files]
+    label = f"pack-{index}"
+    ladder = request.models or [request.model]
+    model = ladder[min(files[0].start_tier, len(ladder) - 1)]
+    record: dict[str, Any] = {"pack": index, "files": keys, "model": model, "returned": [], "error": None}
+    result.packs.append(record)
+    with result.telemetry.span("render", template, file=label, attempt=1):
+        prompt = render_pack_prompt(
+            prompt_pack, template, [(key, result.source_contents[key]) for key in keys], fence=fence
+        )
+        for key, planned in zip(keys, files, strict=True):
+            type_notes = render_type_evidence(type_evidence, planned.source_path)
+            if type_notes:
+                prompt = f"{prompt}\n\nFor `{key}`: {type_notes}"
+    # Written before the call so a failed pack still leaves its prompt behind.
+    if result.artifacts_dir is not None:
+        _write_text(result.artifacts_dir / "prompts" / f"{label}.{template}.md", prompt)
+    try:
+        response, _contents = _complete(result, prompt, label=template, file=label, attempt=1, model=model, emit=emit)
+    except Exception as exc:
+        record["error"] = str(exc)
+        return {}
+    if result.artifacts_dir is not None:
+        _write_text(result.artifacts_dir / "responses" / f"{label}.{template}.txt", response)
+    with result.telemetry.span("extract", template, file=label, attempt=1):
+        blocks = {name.removeprefix("./"): code for name, code in extract_code_blocks(response).items()}
+    replies = {key: f"```{fence}\n{blocks[key]}\n```" for key in keys if blocks.get(key)}
+    record["returned"] = list(replies)
+    return replies
+
+
+def execute_run_with_pack(
+    request: RunRequest, prompt_pack: PromptPack, on_event: RunEventHandler | None = None
+) -> RunResult:
+    """Generate, validate, and optionally benchmark every planned file.
+
+    Up to ``request.concurrency`` files are generated at once.  ``on_event``
+    receives the progress feed described in ``recython.progress``; with
+    concurrency it is called from worker threads.
+    """
+    if request.provider not in ai.PROVIDERS:
+        raise ValueError(f"Unsupported provider '{request.provider}'.")
+    if request.provider == "replay" and request.replay.source is None:
+        raise ValueError("The replay provider needs [tool.recython.replay].source or --replay-from.")
+    if request.replay.mode not in ai.REPLAY_MODES:
+        raise ValueError(f"Unsupported replay mode '{request.replay.mode}'.")
+
+    started = time.perf_counter()
+    result = plan_run(request)
+    result.telemetry.origin = started
+    result.telemetry.add("plan", "plan", start=started, seconds=time.perf_counter() - started)
+    if request.write_manifest:
+        result.artifacts_dir = _make_artifacts_dir(request)
+
+    if request.dry_run:
+        _write_run_artifacts(result)
+        return result
+
+    if request.style == "compile-only":
+        return _execute_compile_only(result)
+
+    # When retries are enabled, also run the Cython compiler so errors feed
+    # back into the repair prompt on the next attempt.
+    # Augmenting .pxd files are only meaningful once Cython compiles the .py
+    # against them, so that check is always on for pure_pxd.
+    effective_cython_compile = (
+        request.validation.cython_compile or request.max_attempts > 1 or request.style == "pure_pxd"
+    )
 
+    validation_summary = {
+        "ok": True,
+        "checked": 0,
+        "failed": 0,
+        "files": [],
+        "attempts": {},
+    }
+    baseline_manifest = _load_baseline_manifest(request.baseline_manifest) if request.maintenance_mode else None
+    type_evidence = load_type_evidence(request.type_evidence)
+    telemetry = result.telemetry
+    emit = on_event or _ignore_event
+    emit({"event": "run_started", "files": len(result.planned_files)})
+
+    # Packed prompts go out first; their replies become the first attempt of each file in the pack.
+    packs: dict[int, list[PlannedFile]] = {}
+    for planned in result.planned_files:
+        if planned.pack is not None:
+            packs.setdefault(planned.pack, []).append(planned)
+    packed: dict[str, str] = {}
+
+    def generate_pack(index: int) -> dict[str, str]:
+        return _generate_pack(
+            result, index, packs[index], prompt_pack=prompt_pack, type_evidence=type_evidence, emit=emit
+        )
+
+    def generate(planned: PlannedFile) -> tuple[list[Path], dict[str, object], list[dict[str, object]]]:
+        return _generate_file(
+            result,
+            planned,
+            prompt_pack=prompt_pack,
+            baseline_manifest=baseline_manifest,
+            type_evidence=type_evidence,
+            effective_cython_compile=effective_cython_compile,
+            emit=emit,
+            packed=packed.get(str(planned.relative_path).replace("\\", "/")),
+        )
+
+    if request.concurrency > 1 and len(result.planned_files) > 1:
+        with ThreadPoolExecutor(max_workers=request.concurrency) as pool:
+            for replies in pool.map(generate_pack, sorted(packs)):
+                packed.update(replies)
+            result.packs.sort(key=lambda pack: pack["pack"])
+            outcomes = list(pool.map(generate, result.planned_files))
+    else:
+        for index in sorted(packs):
+            packed.update(generate_pack(index))
+        outcomes = [generate(planned) for planned in result.planned_files]
+    telemetry.rate_limits = limiter_snapshots()
+    if request.hedge.enabled:
+        telemetry.hedges = tracker_snapshots()
+
+    escalation: dict[str, dict[str, Any]] = {}
+    for planned, (final_outputs, file_validation, attempts) in zip(result.planned_files, outcomes, strict=True):
+        relative_key = str(planned.relative_path).replace("\\", "/")
+        if len(request.models) > 1 and attempts:
+            escalation[relative_key] = {
+                "models": request.models,
+                "lines": planned.lines,
+                "complexity": planned.complexity,
+                "start_tier": planned.start_tier,
+                "tier": attempts[-1]["tier"],
+                "model": attempts[-1]["model"],
+                "attempts": len(attempts),
+                "ok": bool(file_validation["ok"]),
+            }
         result.written_files.extend(final_outputs)
         validation_summary["checked"] += int(file_validation["checked"])
         validation_summary["failed"] += int(file_validation["failed"])
@@ -583,6 +1390,11 @@ def execute_run_with_pack(request: RunRequest, prompt_pack: PromptPack) -> RunRe
                 result.maintenance_summary["manual_review"].append(relative_key)
 
     result.validation_results = validation_summary
+    if escalation:
+        result.escalation = {"models": request.models, "files": escalation}
+        record_escalation(escalation_path(request.output_root, request.source_root.name), list(escalation.values()))
+    if request.maintenance_mode:
+        _reapply_tuned_directives(result)
     result.source_snapshot = result.source_snapshot or {
         str(path.relative_to(request.source_root)).replace("\\", "/"): _file_hash(path)
         for path in result.examined_files
@@ -598,5 +1410,10 @@ def execute_run_with_pack(request: RunRequest, prompt_pack: PromptPack) -> RunRe
     if result.maintenance_summary:
         result.maintenance_summary["regenerated_files"] = list(generated_outputs)
 
+    if request.benchmarks and result.planned_files:
+        with telemetry.span("benchmark"):
+            _build_and_benchmark(result)
+
     _write_run_artifacts(result)
+    emit({"event": "run_finished", "ok": bool(validation_summary["ok"])})
     return result
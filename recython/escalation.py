@@ -0,0 +1,107 @@
+"""Model escalation ladder and its per-package tier history.
+
+With ``models = ["small", "medium", "large"]`` the first attempt on a file
+uses the first model (tier 0), and every attempt that fails validation moves
+one tier up the list.  Each finished file is recorded in
+``.recython/escalation/<package>.json`` next to the output tree: its size,
+its complexity, the tier it started at, and the tier it finished on.
+
+``predict_start_tier`` reads that history back for ``plan``: files are
+grouped into bands by a score that combines complexity and length, and once a
+band has ``MIN_SAMPLES`` successful files, a new file in it starts at the
+median tier those files needed instead of at tier 0.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import statistics
+from pathlib import Path
+from typing import Any
+
+ESCALATION_VERSION = 1
+# Successful files a band needs before its tiers are trusted.
+MIN_SAMPLES = 3
+# Records kept per package; older ones drop off as the code and the models change.
+MAX_RECORDS = 500
+# Source lines that weigh as much as one branch in the band score.
+LINES_PER_BRANCH = 25
+_BRANCHES = (
+    ast.If,
+    ast.IfExp,
+    ast.For,
+    ast.AsyncFor,
+    ast.While,
+    ast.Try,
+    ast.With,
+    ast.AsyncWith,
+    ast.BoolOp,
+    ast.comprehension,
+    ast.ExceptHandler,
+    ast.Match,
+)
+
+
+def escalation_path(output_root: Path, package_name: str) -> Path:
+    return output_root.parent / ".recython" / "escalation" / f"{package_name}.json"
+
+
+def measure_source(text: str) -> dict[str, int]:
+    """Non-blank lines, plus a cyclomatic-style complexity: one more than the branch points."""
+    lines = sum(1 for line in text.splitlines() if line.strip())
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        return {"lines": lines, "complexity": 1}
+    return {"lines": lines, "complexity": 1 + sum(isinstance(node, _BRANCHES) for node in ast.walk(tree))}
+
+
+def complexity_band(lines: int, complexity: int) -> int:
+    """Bucket files whose score is within a factor of two of each other."""
+    return (complexity + lines // LINES_PER_BRANCH).bit_length()
+
+
+def model_tier(models: list[str], start_tier: int, attempt: int) -> int:
+    """The tier attempt number ``attempt`` (from 1) uses; the top model is kept for any further attempts."""
+    return min(start_tier + attempt - 1, len(models) - 1)
+
+
+def load_escalation(path: Path) -> list[dict[str, Any]]:
+    if not path.exists():
+        return []
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != ESCALATION_VERSION:
+        return []
+    records: list[dict[str, Any]] = data["records"]
+    return records
+
+
+def record_escalation(path: Path, records: list[dict[str, Any]]) -> None:
+    """Append ``records`` to the history at ``path``, keeping the newest ``MAX_RECORDS``."""
+    if not records:
+        return
+    history = (load_escalation(path) + records)[-MAX_RECORDS:]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"version": ESCALATION_VERSION, "records": history}, indent=2), encoding="utf-8")
+
+
+def predict_start_tier(records: list[dict[str, Any]], *, lines: int, complexity: int, models: list[str]) -> int:
+    """The tier a file of this size and complexity should start at, from past successes in its band.
+
+    Only records made with the same ladder count, since a tier means a
+    different model otherwise.  A file that passed on its first attempt at
+    a raised starting tier might have passed one tier lower, so it counts
+    one tier lower; otherwise a prediction could only ever go up.
+    """
+    band = complexity_band(lines, complexity)
+    tiers = [
+        int(record["tier"]) - (record["attempts"] == 1 and record["start_tier"] > 0)
+        for record in records
+        if record["ok"]
+        and record["models"] == models
+        and complexity_band(record["lines"], record["complexity"]) == band
+    ]
+    if len(tiers) < MIN_SAMPLES:
+        return 0
+    return min(int(statistics.median_low(tiers)), len(models) - 1)
@@ -0,0 +1,120 @@
+"""Request hedging for model calls.
+
+A handful of calls in every run take several times the median latency.  With
+hedging enabled, ``completion`` waits for a call up to the ``percentile`` of
+the latencies observed so far for its provider and model (but at least
+``min_delay`` seconds); if the call is still running by then it sends a
+duplicate, optionally to another provider or model, and uses whichever
+succeeds first.  The loser is cancelled: it makes no further retries, and
+the ``simulated`` provider stops at once.  An HTTP request that is already in
+flight cannot be interrupted from another thread, so a real provider call
+finishes in the background and its reply is dropped.
+
+Nothing is hedged until a provider and model have ``min_samples`` successful
+calls on record.  Each ``LatencyTracker`` counts the hedges it fired and how
+many of them won, for the run telemetry.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+import threading
+from typing import Any, TypeVar
+
+from recython.jobs import HedgeRequest
+
+T = TypeVar("T")
+TRACKERS: dict[tuple[str, str], LatencyTracker] = {}
+_TRACKERS_LOCK = threading.Lock()
+# Latencies kept per provider and model; older ones drop off as conditions change.
+SAMPLE_LIMIT = 200
+
+
+class HedgeCancelled(Exception):
+    """Raised inside the losing call of a hedged pair once the other one has won."""
+
+
+@dataclass(slots=True)
+class LatencyTracker:
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=SAMPLE_LIMIT))
+    calls: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, seconds: float) -> None:
+        with self.lock:
+            self.samples.append(seconds)
+
+    def hedge_delay(self, settings: HedgeRequest) -> float | None:
+        """Seconds to wait before hedging, or ``None`` while there are too few samples."""
+        with self.lock:
+            if len(self.samples) < max(settings.min_samples, 1):
+                return None
+            ordered = sorted(self.samples)
+        rank = min(len(ordered) - 1, max(0, round(settings.percentile * len(ordered)) - 1))
+        return max(ordered[rank], settings.min_delay)
+
+    def count(self, *, hedged: bool, hedge_won: bool) -> None:
+        with self.lock:
+            self.calls += 1
+            self.hedged += hedged
+            self.hedge_wins += hedge_won
+
+    def snapshot(self) -> dict[str, Any]:
+        with self.lock:
+            ordered = sorted(self.samples)
+            calls, hedged, hedge_wins = self.calls, self.hedged, self.hedge_wins
+        return {
+            "calls": calls,
+            "hedged": hedged,
+            "hedge_wins": hedge_wins,
+            "samples": len(ordered),
+            "median_seconds": ordered[len(ordered) // 2] if ordered else None,
+        }
+
+
+def tracker_for(provider: str, model: str) -> LatencyTracker:
+    with _TRACKERS_LOCK:
+        tracker = TRACKERS.get((provider, model))
+        if tracker is None:
+            tracker = TRACKERS[(provider, model)] = LatencyTracker()
+        return tracker
+
+
+def tracker_snapshots() -> dict[str, dict[str, Any]]:
+    with _TRACKERS_LOCK:
+        trackers = dict(TRACKERS)
+    return {f"{provider}/{model}": tracker.snapshot() for (provider, model), tracker in trackers.items()}
+
+
+def race(
+    primary: Callable[[threading.Event], T], hedge: Callable[[threading.Event], T], delay: float
+) -> tuple[T, bool, bool]:
+    """Run ``primary``, start ``hedge`` if it is still running after ``delay``, and return the first success.
+
+    Each callable receives an event that is set once its result is no longer
+    wanted.  Returns the result, whether the hedge was started, and whether it
+    won.  When every started call fails, the primary's error is raised.
+    """
+    cancels = [threading.Event(), threading.Event()]
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="recython-hedge")
+    try:
+        futures: list[Future[T]] = [pool.submit(primary, cancels[0])]
+        done, pending = wait(futures, timeout=delay)
+        if not done:
+            futures.append(pool.submit(hedge, cancels[1]))
+            pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=futures.index):
+                if future.exception() is None:
+                    return future.result(), len(futures) > 1, future is not futures[0]
+        return futures[0].result(), len(futures) > 1, False
+    finally:
+        for event in cancels:
+            event.set()
+        pool.shutdown(wait=False, cancel_futures=True)
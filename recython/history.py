@@ -0,0 +1,258 @@
+"""Local SQLite history of benchmark results with regression checks.
+
+Every ``bench`` run and every conversion run that benchmarks is stored in
+``.recython/history.sqlite3`` next to the output tree: one ``runs`` row with
+the git revision and toolchain, and one ``results`` row per case with the
+pure and compiled timing summaries.
+
+Comparisons use each case's speedup rather than raw seconds, so a baseline
+recorded on a busier or faster machine still compares fairly.  A case has
+regressed when its speedup fell by more than ``threshold`` and the drop is
+significant: the difference of log speedups, scaled by the standard error
+derived from both runs' sample statistics, must exceed the one-sided normal
+quantile for ``confidence``.
+"""
+
+from __future__ import annotations
+
+import importlib.metadata
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import uuid
+from contextlib import closing
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from recython.jobs import BenchmarkCase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    package TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    git_revision TEXT,
+    toolchain TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    module TEXT NOT NULL,
+    case_name TEXT NOT NULL,
+    ok INTEGER NOT NULL,
+    pure_seconds REAL,
+    compiled_seconds REAL,
+    speedup REAL,
+    pure_stats TEXT,
+    compiled_stats TEXT,
+    memory_ratio REAL,
+    PRIMARY KEY (run_id, case_name)
+);
+CREATE INDEX IF NOT EXISTS results_by_case ON results (case_name, module);
+"""
+
+
+def history_path(output_root: Path) -> Path:
+    return output_root.parent / ".recython" / "history.sqlite3"
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def git_revision(cwd: Path) -> str | None:
+    """Return the short ``HEAD`` revision of the repository at ``cwd``, suffixed ``-dirty`` when modified."""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=cwd, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{revision}-dirty" if status.strip() else revision
+
+
+def toolchain() -> dict[str, str]:
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "cython": importlib.metadata.version("Cython"),
+        "cc": os.environ.get("CC", ""),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def record_run(
+    path: Path,
+    results: list[dict[str, object]],
+    cases: list[BenchmarkCase],
+    *,
+    package: str,
+    origin: str,
+    cwd: Path,
+    run_id: str | None = None,
+) -> str:
+    """Store one run's ``compare_benchmarks`` results and return its run id."""
+    run_id = run_id or f"{datetime.now(UTC):%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+    modules = {case.name: case.module for case in cases}
+    with closing(_connect(path)) as connection, connection:
+        connection.execute(
+            "INSERT INTO runs (run_id, created_at, package, origin, git_revision, toolchain) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                run_id,
+                datetime.now(UTC).isoformat(),
+                package,
+                origin,
+                git_revision(cwd),
+                json.dumps(toolchain(), sort_keys=True),
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO results (run_id, module, case_name, ok, pure_seconds, compiled_seconds, speedup, "
+            "pure_stats, compiled_stats, memory_ratio) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    run_id,
+                    modules.get(str(bench["name"]), ""),
+                    bench["name"],
+                    int(bool(bench["ok"])),
+                    bench["pure_seconds"],
+                    bench["compiled_seconds"],
+                    bench["speedup"],
+                    json.dumps(bench.get("pure_stats")),
+                    json.dumps(bench.get("compiled_stats")),
+                    bench.get("memory_ratio"),
+                )
+                for bench in results
+            ],
+        )
+    return run_id
+
+
+def resolve_run(path: Path, baseline: str, *, package: str, exclude: str | None = None) -> str:
+    """Find a run by id, by git revision prefix, or ``latest`` for the newest run of ``package``.
+
+    ``exclude`` skips one run id, so ``latest`` can mean "before the run just recorded".
+    """
+    with closing(_connect(path)) as connection:
+        row = connection.execute("SELECT run_id FROM runs WHERE run_id = ?", (baseline,)).fetchone()
+        if row is None:
+            query = "SELECT run_id FROM runs WHERE package = ? AND run_id IS NOT ?"
+            parameters: list[object] = [package, exclude]
+            if baseline != "latest":
+                query += " AND git_revision LIKE ?"
+                parameters.append(f"{baseline}%")
+            row = connection.execute(query + " ORDER BY created_at DESC LIMIT 1", parameters).fetchone()
+    if row is None:
+        raise ValueError(f"No benchmark run matches '{baseline}' for package '{package}'.")
+    return str(row["run_id"])
+
+
+def load_run(path: Path, run_id: str) -> dict[str, Any]:
+    with closing(_connect(path)) as connection:
+        run = connection.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        rows = connection.execute("SELECT * FROM results WHERE run_id = ? ORDER BY case_name", (run_id,)).fetchall()
+    return {
+        **dict(run),
+        "toolchain": json.loads(run["toolchain"]),
+        "results": [
+            {
+                **dict(row),
+                "pure_stats": json.loads(row["pure_stats"]),
+                "compiled_stats": json.loads(row["compiled_stats"]),
+            }
+            for row in rows
+        ],
+    }
+
+
+def _log_speedup_variance(pure: dict[str, Any] | None, compiled: dict[str, Any] | None) -> float | None:
+    """Approximate the variance of log(pure mean / compiled mean) from both sample summaries."""
+    if not pure or not compiled or not pure["mean"] or not compiled["mean"]:
+        return None
+    pure_term: float = (pure["stdev"] / pure["mean"]) ** 2 / pure["kept"]
+    compiled_term: float = (compiled["stdev"] / compiled["mean"]) ** 2 / compiled["kept"]
+    return pure_term + compiled_term
+
+
+def compare_runs(
+    baseline: dict[str, Any],
+    current: list[dict[str, object]],
+    *,
+    threshold: float = 0.1,
+    confidence: float = 0.95,
+) -> list[dict[str, object]]:
+    """Compare each current case's speedup with the baseline run's.
+
+    ``change`` is the relative change in speedup (negative is slower); a case
+    is a ``regression`` when it dropped by more than ``threshold`` and the drop
+    is significant at ``confidence``.
+    """
+    critical = statistics.NormalDist().inv_cdf(confidence)
+    by_name = {row["case_name"]: row for row in baseline["results"]}
+    rows: list[dict[str, object]] = []
+    for bench in current:
+        before = by_name.get(bench["name"])
+        row: dict[str, object] = {
+            "name": bench["name"],
+            "baseline_speedup": before["speedup"] if before else None,
+            "speedup": bench["speedup"],
+            "change": None,
+            "z": None,
+            "significant": False,
+            "regression": False,
+        }
+        rows.append(row)
+        if not before or not before["speedup"] or not bench["ok"] or not bench["speedup"]:
+            continue
+        row["change"] = float(bench["speedup"]) / before["speedup"] - 1  # type: ignore[arg-type]
+        variances = [
+            _log_speedup_variance(before["pure_stats"], before["compiled_stats"]),
+            _log_speedup_variance(bench.get("pure_stats"), bench.get("compiled_stats")),  # type: ignore[arg-type]
+        ]
+        if None in variances:
+            continue
+        spread = math.sqrt(sum(variances))  # type: ignore[arg-type]
+        drop = math.log(before["speedup"]) - math.log(float(bench["speedup"]))  # type: ignore[arg-type]
+        row["z"] = drop / spread if spread > 0 else (math.inf if drop > 0 else 0.0)
+        row["significant"] = row["z"] > critical  # type: ignore[operator]
+        row["regression"] = bool(row["significant"]) and row["change"] < -threshold  # type: ignore[operator]
+    return rows
+
+
+def case_trend(
+    path: Path, *, package: str, case_name: str | None = None, limit: int = 20
+) -> dict[str, list[dict[str, Any]]]:
+    """Return the last ``limit`` results per case, oldest first, with their run's revision and date."""
+    query = (
+        "SELECT results.case_name, results.module, results.speedup, results.compiled_seconds, results.ok, "
+        "runs.run_id, runs.created_at, runs.git_revision, runs.origin FROM results "
+        "JOIN runs ON runs.run_id = results.run_id WHERE runs.package = ?"
+    )
+    parameters: list[object] = [package]
+    if case_name:
+        query += " AND results.case_name = ?"
+        parameters.append(case_name)
+    with closing(_connect(path)) as connection:
+        rows = connection.execute(query + " ORDER BY runs.created_at", parameters).fetchall()
+    trends: dict[str, list[dict[str, Any]]] = {}
+    for row in rows:
+        trends.setdefault(row["case_name"], []).append(dict(row))
+    return {name: entries[-limit:] for name, entries in trends.items()}
@@ -0,0 +1,201 @@
+"""Rank the lines of a converted package that still talk to the Python C-API.
+
+Cython's annotation report scores every source line by how much Python
+object interaction its generated C performs (the shade of yellow in the HTML
+view).  ``collect_hotspots`` reads those scores from the reports
+``annotate_extensions`` writes, rolls them up per function and per module,
+and ranks them.
+
+With a ``cProfile`` / ``pstats`` file, each function's score is also weighted
+by its share of the profiled self time.  A heavily scored function that
+barely runs then ranks below a lightly scored one on the hot path.  Profiles
+are matched by module path and function name, so one taken of the pure source
+package (``python -m cProfile -o .recython/profile.pstats ...``) applies to
+the generated modules with the same layout.
+"""
+
+from __future__ import annotations
+
+import pstats
+import re
+from pathlib import Path
+from typing import Any
+
+SCORE_LINE = re.compile(r'<pre class="cython line score-(\d+)"[^>]*>[^<]*<span class="">(\d+)</span>')
+# ``def``, ``cpdef`` and ``cdef`` functions (with any return type) and classes.
+FUNCTION_LINE = re.compile(r"^(\s*)(?:async\s+)?(?:def|cpdef|cdef)\b[^:=]*?\b(\w+)\s*\(")
+CLASS_LINE = re.compile(r"^(\s*)(?:cdef\s+)?class\s+(\w+)")
+MODULE_SCOPE = "<module>"
+
+
+def parse_annotation(report: str) -> dict[int, int]:
+    """Return the Cython interaction score per 1-based source line of an annotation HTML report."""
+    return {int(line): int(score) for score, line in SCORE_LINE.findall(report)}
+
+
+def function_spans(source: str) -> list[tuple[str, int, int]]:
+    """Return ``(qualified name, first line, last line)`` for every function in ``source``.
+
+    Scopes are found by indentation, which works for ``.py`` and ``.pyx``
+    alike; a nested function belongs to itself, not to its parent.
+    """
+    lines = source.splitlines()
+    scopes: list[tuple[int, str, bool, int]] = []  # indent, name, is_function, first line
+    spans: list[tuple[str, int, int]] = []
+
+    def close(indent: int, last: int) -> None:
+        while scopes and scopes[-1][0] >= indent:
+            _, name, is_function, first = scopes.pop()
+            if is_function:
+                spans.append((name, first, last))
+
+    last_code = 0
+    for number, text in enumerate(lines, start=1):
+        stripped = text.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(text) - len(text.lstrip())
+        close(indent, last_code)
+        last_code = number
+        match = FUNCTION_LINE.match(text) or CLASS_LINE.match(text)
+        if match:
+            name = f"{scopes[-1][1]}.{match.group(2)}" if scopes else match.group(2)
+            scopes.append((indent, name, match.re is FUNCTION_LINE, number))
+    close(0, last_code)
+    return sorted(spans, key=lambda span: span[1])
+
+
+def load_profile_shares(path: Path, roots: list[Path]) -> dict[tuple[str, str], float]:
+    """Map ``(relative module, function name)`` to its share of the profile's total self time.
+
+    Only functions in files under one of ``roots`` are kept; the share is
+    still relative to everything the profile recorded.
+    """
+    stats = pstats.Stats(str(path)).stats  # type: ignore[attr-defined]
+    total = sum(entry[2] for entry in stats.values()) or 1.0
+    shares: dict[tuple[str, str], float] = {}
+    resolved = [root.resolve() for root in roots]
+    for (filename, _, function), entry in stats.items():
+        file = Path(filename)
+        if not file.is_absolute():
+            continue
+        for root in resolved:
+            if file.is_relative_to(root):
+                relative = file.relative_to(root).with_suffix("")
+                module = ".".join(relative.parts[:-1] if relative.name == "__init__" else relative.parts) or "__init__"
+                key = (module, function)
+                shares[key] = shares.get(key, 0.0) + entry[2] / total
+                break
+    return shares
+
+
+def _owner(spans: list[tuple[str, int, int]], number: int) -> str:
+    """Return the innermost function containing line ``number``."""
+    inside = [span for span in spans if span[1] <= number <= span[2]]
+    return max(inside, key=lambda span: span[1])[0] if inside else MODULE_SCOPE
+
+
+def collect_hotspots(
+    modules: list[tuple[str, Path, Path | None]],
+    *,
+    profile: dict[tuple[str, str], float] | None = None,
+    top: int = 20,
+) -> dict[str, Any]:
+    """Aggregate annotation scores for ``(relative module, source, annotation report)`` triples.
+
+    A missing report marks the module as failed.  Functions and lines are
+    ranked by ``weighted_score``: the raw score, times the function's profile
+    share when ``profile`` is given.  ``top`` bounds the ranked lists.
+    """
+    module_rows: list[dict[str, Any]] = []
+    functions: list[dict[str, Any]] = []
+    lines: list[dict[str, Any]] = []
+    for module, source, report in modules:
+        if report is None:
+            module_rows.append({"module": module, "path": str(source), "ok": False, "score": None, "functions": 0})
+            continue
+        text = source.read_text(encoding="utf-8")
+        code = text.splitlines()
+        scores = parse_annotation(report.read_text(encoding="utf-8"))
+        spans = function_spans(text)
+
+        by_function: dict[str, dict[str, Any]] = {}
+        for number, score in sorted(scores.items()):
+            if score <= 0:
+                continue
+            function = _owner(spans, number)
+            weight = 1.0 if profile is None else profile.get((module, function.rsplit(".", 1)[-1]), 0.0)
+            row = by_function.setdefault(
+                function,
+                {
+                    "module": module,
+                    "function": function,
+                    "line": next((span[1] for span in spans if span[0] == function), 1),
+                    "score": 0,
+                    "weight": weight,
+                    "weighted_score": 0.0,
+                    "lines": 0,
+                },
+            )
+            row["score"] += score
+            row["weighted_score"] += score * weight
+            row["lines"] += 1
+            lines.append(
+                {
+                    "module": module,
+                    "function": function,
+                    "path": str(source),
+                    "line": number,
+                    "score": score,
+                    "weighted_score": score * weight,
+                    "code": code[number - 1].strip() if number <= len(code) else "",
+                }
+            )
+        functions.extend(by_function.values())
+        module_rows.append(
+            {
+                "module": module,
+                "path": str(source),
+                "ok": True,
+                "score": sum(scores.values()),
+                "weighted_score": sum(row["weighted_score"] for row in by_function.values()),
+                "functions": len(by_function),
+            }
+        )
+
+    def rank(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return sorted(rows, key=lambda row: (-(row.get("weighted_score") or 0.0), -(row["score"] or 0)))
+
+    return {
+        "weighted": profile is not None,
+        "modules": rank(module_rows),
+        "functions": rank(functions)[:top],
+        "lines": rank(lines)[:top],
+    }
+
+
+def render_hotspots_markdown(report: dict[str, Any]) -> str:
+    weighting = "annotation score x profile self-time share" if report["weighted"] else "annotation score"
+    out = ["# Annotation hotspots", "", f"Ranked by {weighting}.", "", "## Lines", ""]
+    out.extend(["| Rank | Location | Function | Score | Weighted | Code |", "|---|---|---|---|---|---|"])
+    for rank, row in enumerate(report["lines"], start=1):
+        code = row["code"].replace("|", "\\|")
+        out.append(
+            f"| {rank} | `{row['path']}:{row['line']}` | `{row['function']}` | {row['score']} "
+            f"| {row['weighted_score']:.2f} | `{code}` |"
+        )
+    out.extend(["", "## Functions", "", "| Rank | Module | Function | Score | Weight | Weighted | Lines |"])
+    out.append("|---|---|---|---|---|---|---|")
+    for rank, row in enumerate(report["functions"], start=1):
+        weight = f"{row['weight']:.1%}" if report["weighted"] else "-"
+        out.append(
+            f"| {rank} | {row['module']} | `{row['function']}` (line {row['line']}) | {row['score']} "
+            f"| {weight} | {row['weighted_score']:.2f} | {row['lines']} |"
+        )
+    out.extend(["", "## Modules", "", "| Module | Score | Weighted | Functions |", "|---|---|---|---|"])
+    for row in report["modules"]:
+        if row["ok"]:
+            out.append(f"| {row['module']} | {row['score']} | {row['weighted_score']:.2f} | {row['functions']} |")
+        else:
+            out.append(f"| {row['module']} | annotation failed | | |")
+    return "\n".join(out) + "\n"
@@ -2,7 +2,13 @@ from __future__ import annotations
 
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+from recython.telemetry import Telemetry
+
+if TYPE_CHECKING:
+    from recython.scaling import ScalingCurve
+    from recython.validation.parallel import ParallelScaling
 
 
 @dataclass(slots=True)
@@ -13,6 +19,43 @@ class ValidationRequest:
     mypy: bool = False
 
 
+@dataclass(slots=True)
+class BuildRequest:
+    jobs: int = 0
+    compiler_directives: dict[str, Any] = field(default_factory=dict)
+    extra_compile_args: list[str] = field(default_factory=list)
+    extra_link_args: list[str] = field(default_factory=list)
+    flag_profile: str = "default"
+    flag_search: list[str] = field(default_factory=list)
+    pgo: bool = False
+
+
+@dataclass(slots=True)
+class BenchRequest:
+    processes: int = 3
+    warmup: int = 1
+    min_time: float = 0.02
+    cpu_affinity: list[int] = field(default_factory=list)
+    confidence: float = 0.95
+    outlier_iqr: float = 1.5
+    memory: bool = True
+    history: bool = True
+    regression_threshold: float = 0.1
+
+
+@dataclass(slots=True)
+class BenchmarkCase:
+    name: str
+    stmt: str
+    setup: str = ""
+    number: int = 0
+    repeat: int = 5
+    module: str = ""
+    check: str = ""
+    params: dict[str, list[Any]] = field(default_factory=dict)
+    point: dict[str, Any] = field(default_factory=dict)
+
+
 def _json_ready(value: Any) -> Any:
     if isinstance(value, Path):
         return str(value)
@@ -35,6 +78,10 @@ class PlannedFile:
     relative_path: Path
     outputs: list[PlannedOutput]
     prompt_keys: list[str]
+    lines: int = 0
+    complexity: int = 0
+    start_tier: int = 0
+    pack: int | None = None
 
 
 @dataclass(slots=True)
@@ -43,6 +90,51 @@ class SkippedFile:
     reason: str
 
 
+@dataclass(slots=True)
+class ReplayRequest:
+    source: Path | None = None
+    mode: str = "strict"
+    fallthrough_provider: str = "openai"
+    record: Path | None = None
+
+
+@dataclass(slots=True)
+class SimulatedRequest:
+    responses: list[Path] = field(default_factory=list)
+    latency: str = "lognormal"
+    latency_median: float = 1.0
+    latency_spread: float = 0.5
+    tokens_per_second: float = 0.0
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    retry_after: float = 1.0
+    seed: int | None = None
+
+
+@dataclass(slots=True)
+class RateLimitRequest:
+    enabled: bool = True
+    requests_per_minute: float = 0.0
+    tokens_per_minute: float = 0.0
+    max_concurrency: int = 0
+    min_concurrency: int = 1
+    increase: float = 1.0
+    decrease: float = 0.5
+    max_retry_after: float = 60.0
+    shared: bool = False
+    shared_path: Path | None = None
+
+
+@dataclass(slots=True)
+class HedgeRequest:
+    enabled: bool = False
+    percentile: float = 0.95
+    min_samples: int = 10
+    min_delay: float = 2.0
+    provider: str = ""
+    model: str = ""
+
+
 @dataclass(slots=True)
 class RunRequest:
     source_root: Path
@@ -50,17 +142,29 @@ class RunRequest:
     style: str
     provider: str = "openai"
     model: str = "gpt-4o-mini"
+    models: list[str] = field(default_factory=list)
     temperature: float = 0.0
     max_completion_tokens: int = 4000
     exclude: list[str] = field(default_factory=list)
     include: list[str] = field(default_factory=list)
     prompt_profile: str = "default"
     max_attempts: int = 1
+    concurrency: int = 1
+    pack_tokens: int = 0
     maintenance_mode: bool = False
     baseline_manifest: Path | None = None
     write_manifest: bool = True
     dry_run: bool = False
+    chrome_trace: bool = False
     validation: ValidationRequest = field(default_factory=ValidationRequest)
+    type_evidence: Path | None = None
+    benchmarks: list[BenchmarkCase] = field(default_factory=list)
+    build: BuildRequest = field(default_factory=BuildRequest)
+    bench: BenchRequest = field(default_factory=BenchRequest)
+    replay: ReplayRequest = field(default_factory=ReplayRequest)
+    simulated: SimulatedRequest = field(default_factory=SimulatedRequest)
+    rate_limit: RateLimitRequest = field(default_factory=RateLimitRequest)
+    hedge: HedgeRequest = field(default_factory=HedgeRequest)
 
     def to_dict(self) -> dict[str, Any]:
         return _json_ready(asdict(self))
@@ -79,9 +183,21 @@ class RunResult:
     source_contents: dict[str, str] = field(default_factory=dict)
     generated_outputs: dict[str, dict[str, str]] = field(default_factory=dict)
     maintenance_summary: dict[str, Any] = field(default_factory=dict)
+    build_results: list[dict[str, Any]] = field(default_factory=list)
+    benchmark_results: list[dict[str, Any]] = field(default_factory=list)
+    module_report: list[dict[str, Any]] = field(default_factory=list)
+    parallel_results: ParallelScaling | None = None
+    flag_results: list[dict[str, Any]] = field(default_factory=list)
+    pgo_results: dict[str, Any] = field(default_factory=dict)
+    scaling_results: list[ScalingCurve] = field(default_factory=list)
+    history_run_id: str | None = None
+    escalation: dict[str, Any] = field(default_factory=dict)
+    packs: list[dict[str, Any]] = field(default_factory=list)
+    telemetry: Telemetry = field(default_factory=Telemetry)
     artifacts_dir: Path | None = None
     manifest_path: Path | None = None
     report_path: Path | None = None
+    trace_path: Path | None = None
 
     def to_dict(self) -> dict[str, Any]:
         return _json_ready(asdict(self))
@@ -0,0 +1,246 @@
+"""Profile-guided optimization builds driven by the configured benchmark cases.
+
+A PGO build has three steps: compile the extensions with
+``-fprofile-generate``, run every benchmark case against that instrumented
+tree so the compiler's runtime writes its profile data, then compile again
+with ``-fprofile-use``.  The non-PGO build is measured first and the PGO build
+afterwards, both with ``measure_case`` across isolated workers, and every case
+is checked against the pure source.  The PGO build is kept only when its
+summed confidence interval lies entirely below the plain build's; otherwise
+the plain build is restored.
+
+Profiles live under ``.recython/pgo/<package>/<key>/`` where ``key`` hashes
+the generated sources, directives, and flags.  Editing any module changes the
+key, so stale profiles are never fed to the compiler; an unchanged tree
+reuses its profile without running the workload again.
+
+GCC writes ``.gcda`` files that ``-fprofile-use`` reads directly.  Clang
+writes ``.profraw`` files that are merged with ``llvm-profdata`` first.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import sysconfig
+from dataclasses import replace
+from datetime import UTC, datetime
+from pathlib import Path
+
+from recython.backends import build_with_profiles
+from recython.benchmarks import MeasuredSummary, evaluate_case, measure_case, results_match, run_benchmark_case
+from recython.build import BuildTarget
+from recython.jobs import BenchmarkCase, BenchRequest, BuildRequest
+
+PGO_VERSION = 1
+PROFILE_FILENAME = "profile.json"
+
+
+def compiler_family() -> str:
+    """Return ``gcc``, ``clang``, or ``msvc`` for the compiler extensions are built with."""
+    if sys.platform == "win32":
+        return "msvc"
+    compiler = os.environ.get("CC") or str(sysconfig.get_config_var("CC") or "")
+    return "clang" if "clang" in compiler else "gcc"
+
+
+def pgo_args(stage: str, profile_dir: Path, family: str | None = None) -> tuple[list[str], list[str]]:
+    """Return the compile and link args for the ``generate`` or ``use`` stage."""
+    family = family or compiler_family()
+    if family == "msvc":
+        raise ValueError("PGO builds need GCC or Clang; MSVC is not supported.")
+    if stage == "generate":
+        flags = [f"-fprofile-generate={profile_dir}"]
+        return flags, list(flags)
+    if stage == "use":
+        # Modules the workload never reaches have no profile; that is expected.
+        # Cython records the compile args in a comment at the top of the C file,
+        # so line numbers shift between the two stages even though the code does
+        # not; GCC still uses the counters but errors on the moved locations.
+        if family == "clang":
+            quiet = ["-Wno-profile-instr-unprofiled", "-Wno-profile-instr-out-of-date"]
+        else:
+            quiet = ["-fprofile-correction", "-Wno-missing-profile", "-Wno-coverage-mismatch"]
+        return [f"-fprofile-use={profile_dir}", *quiet], [f"-fprofile-use={profile_dir}"]
+    raise ValueError(f"Unknown PGO stage '{stage}'. Expected 'generate' or 'use'.")
+
+
+def profile_key(targets: list[BuildTarget], build: BuildRequest, profiles: dict[str, str] | None = None) -> str:
+    """Hash the generated sources and build settings a profile was collected for."""
+    digest = hashlib.sha256()
+    for target in sorted(targets, key=lambda item: item.module_name):
+        digest.update(target.module_name.encode("utf-8"))
+        digest.update(target.source.read_bytes())
+    settings = {
+        "directives": build.compiler_directives,
+        "compile_args": build.extra_compile_args,
+        "link_args": build.extra_link_args,
+        "flag_profile": build.flag_profile,
+        "profiles": profiles or {},
+        "version": PGO_VERSION,
+    }
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def pgo_root(output_root: Path, package_name: str) -> Path:
+    return output_root.parent / ".recython" / "pgo" / package_name
+
+
+def _merge_clang_profiles(profile_dir: Path) -> None:
+    tool = shutil.which("llvm-profdata")
+    if tool is None:
+        raise RuntimeError("Clang PGO needs llvm-profdata on PATH to merge .profraw files.")
+    raw = sorted(str(path) for path in profile_dir.glob("*.profraw"))
+    if not raw:
+        raise RuntimeError("The instrumented workload wrote no .profraw files.")
+    subprocess.run(
+        [tool, "merge", f"-output={profile_dir / 'default.profdata'}", *raw],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+def _time_cases(
+    cases: list[BenchmarkCase],
+    expected: list[object],
+    *,
+    package_name: str,
+    search_path: list[Path],
+    bench: BenchRequest | None = None,
+) -> list[MeasuredSummary]:
+    stats: list[MeasuredSummary] = []
+    for case, value in zip(cases, expected, strict=True):
+        actual = evaluate_case(case, package_name=package_name, search_path=search_path)
+        if not results_match(value, actual, rel_tol=1e-9, abs_tol=1e-12):
+            raise ValueError(f"Case '{case.name}' no longer matches the pure source.")
+        stats.append(measure_case(case, package_name=package_name, search_path=search_path, bench=bench))
+    return stats
+
+
+def pgo_wins(baseline: list[MeasuredSummary], tuned: list[MeasuredSummary]) -> bool:
+    """Return whether the PGO build is faster beyond noise: its summed interval clears the plain one."""
+    return sum(item["ci_high"] for item in tuned) < sum(item["ci_low"] for item in baseline)
+
+
+def run_pgo(
+    targets: list[BuildTarget],
+    cases: list[BenchmarkCase],
+    *,
+    output_root: Path,
+    package_name: str,
+    source_root: Path,
+    style: str,
+    build: BuildRequest,
+    profiles: dict[str, str] | None = None,
+    bench: BenchRequest | None = None,
+    force: bool = False,
+) -> dict[str, object]:
+    """Build ``targets`` with PGO and report the speedup over the plain build per case.
+
+    ``profiles`` maps relative module names to the flag profile each was tuned
+    to; other modules use ``build.flag_profile``.  The PGO build is left in
+    place (``kept``) when it succeeds, still matches the pure source, and is
+    faster by ``pgo_wins``; otherwise the plain build is restored from the
+    build cache.
+    """
+    profiles = profiles or {}
+    key = profile_key(targets, build, profiles)
+    profile_dir = pgo_root(output_root, package_name) / key
+    result: dict[str, object] = {
+        "ok": False,
+        "error": None,
+        "profile_dir": str(profile_dir),
+        "profile_status": "cached",
+        "kept": False,
+        "cases": [],
+    }
+    search_path = [output_root, source_root]
+
+    def build_tree(with_build: BuildRequest, *, force: bool = False) -> list[dict[str, object]]:
+        return build_with_profiles(
+            targets,
+            output_root=output_root,
+            package_name=package_name,
+            style=style,
+            build=with_build,
+            profiles=profiles,
+            force=force,
+        )
+
+    def failed_build(results: list[dict[str, object]]) -> str | None:
+        errors = [f"{item['module']}: {item['error']}" for item in results if not item["ok"]]
+        return "\n".join(errors) or None
+
+    try:
+        expected = [evaluate_case(case, package_name=package_name, search_path=[source_root]) for case in cases]
+        error = failed_build(build_tree(build))
+        if error:
+            raise RuntimeError(error)
+        baseline = _time_cases(cases, expected, package_name=package_name, search_path=search_path, bench=bench)
+
+        family = compiler_family()
+        marker = profile_dir / PROFILE_FILENAME
+        if force or not marker.exists():
+            result["profile_status"] = "collected"
+            shutil.rmtree(profile_dir, ignore_errors=True)
+            profile_dir.mkdir(parents=True)
+            compile_args, link_args = pgo_args("generate", profile_dir, family)
+            instrumented = replace(
+                build,
+                extra_compile_args=[*build.extra_compile_args, *compile_args],
+                extra_link_args=[*build.extra_link_args, *link_args],
+            )
+            error = failed_build(build_tree(instrumented, force=True))
+            if error:
+                raise RuntimeError(f"Instrumented build failed:\n{error}")
+            for case in cases:
+                run_benchmark_case(case, package_name=package_name, search_path=search_path)
+            if family == "clang":
+                _merge_clang_profiles(profile_dir)
+            marker.write_text(
+                json.dumps(
+                    {"key": key, "cases": [case.name for case in cases], "collected_at": datetime.now(UTC).isoformat()},
+                    indent=2,
+                ),
+                encoding="utf-8",
+            )
+
+        compile_args, link_args = pgo_args("use", profile_dir, family)
+        optimized = replace(
+            build,
+            extra_compile_args=[*build.extra_compile_args, *compile_args],
+            extra_link_args=[*build.extra_link_args, *link_args],
+        )
+        # A fresh profile under an unchanged key would otherwise restore the cached binary.
+        fresh = result["profile_status"] == "collected"
+        error = failed_build(build_tree(optimized, force=fresh))
+        if error:
+            raise RuntimeError(f"PGO build failed:\n{error}")
+        tuned = _time_cases(cases, expected, package_name=package_name, search_path=search_path, bench=bench)
+    except Exception as exc:
+        result["error"] = str(exc)
+        build_tree(build)
+        return result
+
+    result["kept"] = pgo_wins(baseline, tuned)
+    if not result["kept"]:
+        build_tree(build)
+    result["cases"] = [
+        {
+            "name": case.name,
+            "baseline_seconds": before["median"],
+            "baseline_ci": [before["ci_low"], before["ci_high"]],
+            "pgo_seconds": after["median"],
+            "pgo_ci": [after["ci_low"], after["ci_high"]],
+            "speedup": before["median"] / after["median"] if after["median"] > 0 else None,
+        }
+        for case, before, after in zip(cases, baseline, tuned, strict=True)
+    ]
+    result["ok"] = True
+    return result
@@ -0,0 +1,138 @@
+"""Live progress for ``convert`` and ``maintain`` runs.
+
+``execute_run_with_pack`` reports what it is doing through an ``on_event``
+callback, one dict per event:
+
+``run_started``     ``files``: number of planned files
+``attempt_started`` ``file``, ``attempt``
+``llm_finished``    ``file``, ``attempt``, ``label``, ``seconds`` and the token counts
+``backoff``         ``file``, ``attempt``, ``label``, ``retry``, ``delay``, ``error``:
+                    a model call failed transiently and is about to be retried
+``file_finished``   ``file``, ``ok``, ``attempts``, ``seconds``
+``run_finished``    ``ok``
+
+``ProgressDisplay`` turns that feed into a status line that is redrawn in
+place on a terminal, or into one plain line per finished file and backoff
+when the stream is not a TTY (CI logs, redirected output).
+"""
+
+from __future__ import annotations
+
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, TextIO
+
+# Finished files the ETA's rolling mean latency is taken over.
+ETA_WINDOW = 20
+
+
+def format_eta(seconds: float | None) -> str:
+    if seconds is None:
+        return "--"
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{secs:02d}s"
+
+
+class ProgressDisplay:
+    """Render the engine's event feed as live progress on ``stream``."""
+
+    def __init__(self, stream: TextIO | None = None, *, live: bool | None = None) -> None:
+        self.stream = stream or sys.stderr
+        self.live = self.stream.isatty() if live is None else live
+        self.started = time.perf_counter()
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.in_flight: dict[str, int] = {}
+        self.completion_tokens = 0
+        self.backoffs = 0
+        self.hedged = 0
+        self.latencies: deque[float] = deque(maxlen=ETA_WINDOW)
+        self._width = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict[str, Any]) -> None:
+        # Concurrent runs report from several worker threads.
+        with self._lock:
+            self._handle(event)
+
+    def _handle(self, event: dict[str, Any]) -> None:
+        kind = event["event"]
+        if kind == "run_started":
+            self.started = time.perf_counter()
+            self.total = int(event["files"])
+        elif kind == "attempt_started":
+            self.in_flight[event["file"]] = int(event["attempt"])
+        elif kind == "llm_finished":
+            self.completion_tokens += int(event.get("completion_tokens") or 0)
+            self.hedged += int(event.get("hedged") or 0)
+        elif kind == "backoff":
+            self.backoffs += 1
+            if not self.live:
+                self._line(
+                    f"backoff {event['file']} ({event['label']}): retry {event['retry']} "
+                    f"in {event['delay']:.1f}s after {event['error']}"
+                )
+        elif kind == "file_finished":
+            self.in_flight.pop(event["file"], None)
+            self.done += 1
+            self.failed += 0 if event["ok"] else 1
+            self.latencies.append(float(event["seconds"]))
+            if not self.live:
+                status = "ok" if event["ok"] else "FAILED"
+                self._line(
+                    f"[{self.done}/{self.total}] {status} {event['file']} "
+                    f"({event['attempts']} attempt(s), {event['seconds']:.1f}s) | {self.summary()}"
+                )
+        elif kind == "run_finished":
+            if self.live:
+                self._redraw()
+                self.stream.write("\n")
+                self.stream.flush()
+            return
+        if self.live:
+            self._redraw()
+
+    def tokens_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.completion_tokens / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> float | None:
+        """Remaining files times the rolling mean file latency, spread over the files in flight."""
+        if not self.latencies:
+            return None
+        remaining = self.total - self.done
+        return remaining * (sum(self.latencies) / len(self.latencies)) / max(1, len(self.in_flight))
+
+    def summary(self) -> str:
+        parts = [f"{self.tokens_per_second():.1f} tok/s", f"ETA {format_eta(self.eta())}"]
+        if self.failed:
+            parts.insert(0, f"{self.failed} failed")
+        if self.backoffs:
+            parts.append(f"{self.backoffs} backoff(s)")
+        if self.hedged:
+            parts.append(f"{self.hedged} hedged")
+        return " | ".join(parts)
+
+    def status(self) -> str:
+        flight = ", ".join(f"{name}#{attempt}" for name, attempt in self.in_flight.items())
+        return (
+            f"[{self.done}/{self.total}] {len(self.in_flight)} in flight"
+            + (f" ({flight})" if flight else "")
+            + f" | {self.summary()}"
+        )
+
+    def _redraw(self) -> None:
+        width = shutil.get_terminal_size().columns - 1
+        text = self.status()[:width]
+        self.stream.write("\r" + text.ljust(self._width))
+        self.stream.flush()
+        self._width = len(text)
+
+    def _line(self, text: str) -> None:
+        self.stream.write(text + "\n")
+        self.stream.flush()
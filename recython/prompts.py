@@ -7,17 +7,19 @@ from recython.config import RecythonConfig
 from recython.filesystem import load_template
 
 
-PROMPT_KEYS = ("classic_pyx", "classic_pxd", "pure")
-PROFILE_NAMES = ("default", "safe", "performance", "minimal-diff", "maintenance")
+PROMPT_KEYS = ("classic_pyx", "classic_pxd", "pure", "pure_pxd")
+PROFILE_NAMES = ("default", "safe", "performance", "minimal-diff", "maintenance", "memoryview", "parallel")
 PLACEHOLDERS = {
     "classic_pyx": ("XXXCODEXXX",),
     "classic_pxd": ("XXXRESULTXXX",),
     "pure": ("XXXCODEXXX",),
+    "pure_pxd": ("XXXCODEXXX",),
 }
 BUNDLED_FILES = {
     "classic_pyx": "cython_style_pyx.md",
     "classic_pxd": "cython_style_pxd.md",
     "pure": "cython_pure_python_style.md",
+    "pure_pxd": "cython_pure_pxd_style.md",
 }
 PROFILE_INSTRUCTIONS = {
     "default": "",
@@ -37,8 +39,48 @@ PROFILE_INSTRUCTIONS = {
         "\n\nAdditional guidance:\n"
         "Prefer minimal maintenance updates and preserve previously generated structure when possible."
     ),
+    "memoryview": (
+        "\n\nAdditional guidance:\n"
+        "Numeric sequence inputs (for example `list[list[float]]` or `list[float]`) must become contiguous typed "
+        "memoryviews: `double[:, ::1]` / `double[::1]` in .pyx code, `cython.double[:, ::1]` in pure Python mode.\n"
+        "- Keep every public `def`/`cpdef` signature exactly as in the source, with the same parameter names, and "
+        "keep accepting plain Python lists; never type a public parameter as a memoryview.\n"
+        "- Convert each sequence input once, at the top of the public function, into a buffer: "
+        "`numpy.ascontiguousarray(x, dtype=numpy.float64)` if the module already imports NumPy, otherwise an "
+        "`array.array('d', ...)` (1-D) or a `cython.view.array(shape=(rows, cols), itemsize=sizeof(double), "
+        "format='d')` filled once (2-D).\n"
+        "- Move the loops into `cdef` kernels that take the memoryviews, decorated with "
+        "`@cython.boundscheck(False)` and `@cython.wraparound(False)`; index with `Py_ssize_t` variables.\n"
+        "- Convert results back to the Python types the source returned (for example a `list[float]`).\n"
+        "- If the module has no numeric sequence code, leave it unchanged and add the comment "
+        "`# recython: no memoryview`."
+    ),
+    "parallel": (
+        "\n\nAdditional guidance:\n"
+        "Parallelize loops whose iterations are independent (for example per-body or per-row work) with OpenMP.\n"
+        "- Use `from cython.parallel cimport prange` (`cython.parallel.prange` in pure Python mode) inside a "
+        "`with nogil:` block or a `nogil` function; do not pass `num_threads`, so `OMP_NUM_THREADS` controls it.\n"
+        "- Only C-typed data may be touched inside the loop: copy Python objects into typed memoryviews or C "
+        "arrays before it and write results back after it.\n"
+        "- Accumulate with in-place operators (`total += ...`) so Cython turns them into reductions; write "
+        "per-iteration results to distinct indices, never to shared scalars.\n"
+        "- Keep loops with cross-iteration dependencies (for example time steps) serial around the parallel "
+        "inner loop.\n"
+        "- Do not add `# distutils:` compiler or linker flags; the build adds the right OpenMP flags for the "
+        "compiler.\n"
+        "- If no loop is independent, leave the code serial and add the comment `# recython: no parallel loop`."
+    ),
 }
 
+# Several small modules can share one prompt; each starts with this marker line.
+PACK_MARKER = "# ==== module: {name} ===="
+PACK_INSTRUCTIONS = (
+    "\n\nThe source above contains {count} separate modules, each starting with a "
+    "`# ==== module: <path> ====` line. Translate each module on its own, following every instruction above, "
+    "and answer with one fenced code block per module, in the same order. Open each block with the module's "
+    "path exactly as given, for example:\n\n```{fence} file={example}\n...\n```"
+)
+
 
 @dataclass(slots=True)
 class PromptTemplate:
@@ -103,3 +145,15 @@ def render_prompt(pack: PromptPack, template_key: str, **replacements: str) -> s
     for placeholder, value in replacements.items():
         rendered = rendered.replace(placeholder, value)
     return rendered
+
+
+def render_pack_prompt(pack: PromptPack, template_key: str, modules: list[tuple[str, str]], *, fence: str) -> str:
+    """Render ``template_key`` for several ``(name, source)`` modules at once.
+
+    The sources share the template's code placeholder, separated by
+    ``PACK_MARKER`` lines, and the reply is asked for one ``file=<name>``
+    block per module (see ``recython.tidy.extract_code_blocks``).
+    """
+    bundle = "\n\n".join(f"{PACK_MARKER.format(name=name)}\n{source.rstrip()}" for name, source in modules)
+    rendered = render_prompt(pack, template_key, XXXCODEXXX=bundle)
+    return rendered + PACK_INSTRUCTIONS.format(count=len(modules), fence=fence, example=modules[0][0])
@@ -0,0 +1,459 @@
+"""Client-side rate limiting for model calls.
+
+Each provider and model gets one ``RateLimiter`` per process (see
+``limiter_for``), shared by every thread that calls it.  Before a call starts
+the limiter waits for three things:
+
+- room in the requests-per-minute and tokens-per-minute buckets.  Their sizes
+  come from ``[tool.recython.rate_limit]``, or are learned from the provider's
+  ``x-ratelimit-limit-*`` headers, and the buckets are drained to the
+  ``x-ratelimit-remaining-*`` values each response reports;
+- the end of the latest ``Retry-After`` pause, which holds back every caller
+  and not only the one that was rejected;
+- a free slot in the in-flight window.  The window is AIMD-controlled: it
+  grows by ``increase / window`` per successful call and is multiplied by
+  ``decrease`` after a 429, so concurrency settles just below what the
+  provider accepts.
+
+With ``shared`` enabled, the limiters of every recython process on the
+machine that use the same credentials and model also draw on one
+``SharedBudget``, a small SQLite database (``~/.recython/ratelimit.sqlite3``
+unless ``shared_path`` says otherwise).  It holds the account-wide buckets,
+the limits learned from headers, and the latest ``Retry-After`` deadline.
+Each process's local buckets are sized to its fair share of the limits, the
+limits divided by the number of processes currently drawing on the account.
+"""
+
+from __future__ import annotations
+
+import atexit
+from collections import deque
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+import email.utils
+import hashlib
+import math
+import os
+from pathlib import Path
+import re
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from recython.jobs import RateLimitRequest
+
+LIMITERS: dict[tuple[str, str], RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+# Window changes kept for the run telemetry.
+HISTORY_LENGTH = 200
+SHARED_PATH = Path.home() / ".recython" / "ratelimit.sqlite3"
+# A process that has not touched a shared budget for this long no longer counts toward the fair share.
+MEMBER_TIMEOUT = 120.0
+SHARED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS budgets (
+    account TEXT PRIMARY KEY,
+    requests_per_minute REAL NOT NULL,
+    tokens_per_minute REAL NOT NULL,
+    requests REAL NOT NULL,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    blocked_until REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    account TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    seen REAL NOT NULL,
+    PRIMARY KEY (account, pid)
+);
+"""
+
+
+def parse_duration(value: str) -> float | None:
+    """Seconds in a header value such as ``"2"``, ``"0.5"``, ``"6m0s"``, ``"250ms"``, or an HTTP date."""
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def retry_after(headers: Mapping[str, str]) -> float | None:
+    """The wait a rejected call was told to observe, or ``None`` if the headers do not say.
+
+    ``retry-after-ms`` wins over ``retry-after``; without either, the reset
+    time of an exhausted ``x-ratelimit-remaining-*`` limit is used.
+    """
+    if "retry-after-ms" in headers:
+        milliseconds = parse_duration(headers["retry-after-ms"])
+        if milliseconds is not None:
+            return milliseconds / 1000
+    if "retry-after" in headers:
+        return parse_duration(headers["retry-after"])
+    for kind in ("requests", "tokens"):
+        if headers.get(f"x-ratelimit-remaining-{kind}") == "0" and f"x-ratelimit-reset-{kind}" in headers:
+            return parse_duration(headers[f"x-ratelimit-reset-{kind}"])
+    return None
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> float | None:
+    try:
+        return float(headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+@dataclass(slots=True)
+class TokenBucket:
+    """``per_minute`` units that refill continuously; ``per_minute = 0`` means unlimited."""
+
+    per_minute: float = 0.0
+    level: float = 0.0
+    updated: float = 0.0
+
+    def refill(self, now: float) -> None:
+        if self.per_minute > 0:
+            self.level = min(self.per_minute, self.level + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available; a request bigger than the bucket waits for a full one."""
+        if self.per_minute <= 0:
+            return 0.0
+        return max(0.0, (min(amount, self.per_minute) - self.level) * 60 / self.per_minute)
+
+    def take(self, amount: float) -> None:
+        if self.per_minute > 0:
+            self.level -= amount
+
+    def resize(self, per_minute: float, now: float) -> None:
+        self.level = min(self.level, per_minute) if self.per_minute > 0 else per_minute
+        self.per_minute = per_minute
+        self.updated = now
+
+
+@dataclass(slots=True)
+class Ticket:
+    """One admitted call: when it started, the tokens reserved for it, and how long it queued."""
+
+    started: float
+    tokens: int
+    waited: float
+
+
+def account_key(provider: str, model: str, api_key: str | None = None, base_url: str | None = None) -> str:
+    """Name the rate-limit budget of a set of credentials and a model without storing the key itself."""
+    digest = hashlib.sha256(f"{provider}\0{api_key or ''}\0{base_url or ''}".encode()).hexdigest()[:16]
+    return f"{provider}:{digest}/{model}"
+
+
+class SharedBudget:
+    """The account-wide side of the limits, shared through SQLite by every process that uses ``account``."""
+
+    def __init__(self, path: Path, account: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.account = account
+        self.pid = os.getpid()
+        # Threads share the connection; transactions are explicit and serialized by ``_lock``.
+        self._connection = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._connection.executescript(SHARED_SCHEMA)
+        self._lock = threading.Lock()
+        atexit.register(self.leave)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def _buckets(self, db: sqlite3.Connection, now: float) -> tuple[TokenBucket, TokenBucket, float]:
+        row = db.execute(
+            "SELECT requests_per_minute, tokens_per_minute, requests, tokens, updated, blocked_until "
+            "FROM budgets WHERE account = ?",
+            (self.account,),
+        ).fetchone()
+        if row is None:
+            row = (0.0, 0.0, 0.0, 0.0, now, 0.0)
+            db.execute("INSERT INTO budgets VALUES (?, ?, ?, ?, ?, ?, ?)", (self.account, *row))
+        requests_per_minute, tokens_per_minute, requests, tokens, updated, blocked_until = row
+        return (
+            TokenBucket(requests_per_minute, requests, updated),
+            TokenBucket(tokens_per_minute, tokens, updated),
+            blocked_until,
+        )
+
+    def _store(self, db: sqlite3.Connection, requests: TokenBucket, tokens: TokenBucket, blocked_until: float) -> None:
+        db.execute(
+            "UPDATE budgets SET requests_per_minute = ?, tokens_per_minute = ?, requests = ?, tokens = ?, "
+            "updated = ?, blocked_until = ? WHERE account = ?",
+            (
+                requests.per_minute,
+                tokens.per_minute,
+                requests.level,
+                tokens.level,
+                requests.updated,
+                blocked_until,
+                self.account,
+            ),
+        )
+
+    def take(self, tokens: int, limits: Mapping[str, float]) -> tuple[float, int, dict[str, float]]:
+        """Reserve one request and ``tokens`` tokens from the account's buckets if they allow it.
+
+        ``limits`` are this process's known limits per minute (``requests``,
+        ``tokens``; 0 for unknown); the shared buckets grow to the larger of
+        those and their own.  Returns the seconds to wait, 0.0 once the reservation is made,
+        the number of live processes, and the account's limits.
+        """
+        now = time.time()
+        with self._transaction() as db:
+            db.execute("INSERT OR REPLACE INTO members VALUES (?, ?, ?)", (self.account, self.pid, now))
+            db.execute("DELETE FROM members WHERE seen < ?", (now - MEMBER_TIMEOUT,))
+            (members,) = db.execute("SELECT COUNT(*) FROM members WHERE account = ?", (self.account,)).fetchone()
+            request_bucket, token_bucket, blocked_until = self._buckets(db, now)
+            for bucket, kind in ((request_bucket, "requests"), (token_bucket, "tokens")):
+                bucket.refill(now)
+                if limits[kind] > bucket.per_minute:
+                    bucket.resize(limits[kind], now)
+            wait = max(blocked_until - now, request_bucket.delay(1), token_bucket.delay(tokens))
+            if wait <= 0:
+                request_bucket.take(1)
+                token_bucket.take(tokens)
+            self._store(db, request_bucket, token_bucket, blocked_until)
+        shared_limits = {"requests": request_bucket.per_minute, "tokens": token_bucket.per_minute}
+        return max(0.0, wait), int(members), shared_limits
+
+    def update(
+        self,
+        *,
+        limits: Mapping[str, float] | None = None,
+        remaining: Mapping[str, float] | None = None,
+        refund: float = 0.0,
+        pause: float = 0.0,
+    ) -> None:
+        """Publish what one call taught this process: limits, remaining budget, unused tokens, a pause."""
+        now = time.time()
+        with self._transaction() as db:
+            request_bucket, token_bucket, blocked_until = self._buckets(db, now)
+            buckets = {"requests": request_bucket, "tokens": token_bucket}
+            for kind, bucket in buckets.items():
+                bucket.refill(now)
+                if limits and limits.get(kind, 0.0) > bucket.per_minute:
+                    bucket.resize(limits[kind], now)
+                if remaining and kind in remaining and bucket.per_minute > 0:
+                    bucket.level = min(bucket.level, remaining[kind])
+            token_bucket.take(-refund)
+            self._store(db, request_bucket, token_bucket, max(blocked_until, now + pause if pause else 0.0))
+
+    def leave(self) -> None:
+        """Stop counting this process toward the fair share."""
+        try:
+            with self._transaction() as db:
+                db.execute("DELETE FROM members WHERE account = ? AND pid = ?", (self.account, self.pid))
+        except sqlite3.Error:
+            pass
+
+
+class RateLimiter:
+    """Admit model calls for one provider and model; see the module docstring."""
+
+    def __init__(self, settings: RateLimitRequest, shared: SharedBudget | None = None) -> None:
+        now = time.monotonic()
+        self.settings = settings
+        self.shared = shared
+        self.created = now
+        # Account-wide limits per minute, configured or learned; the local buckets hold this process's share.
+        self.limits = {"requests": settings.requests_per_minute, "tokens": settings.tokens_per_minute}
+        self.members = 1
+        self.requests = TokenBucket(settings.requests_per_minute, settings.requests_per_minute, now)
+        self.tokens = TokenBucket(settings.tokens_per_minute, settings.tokens_per_minute, now)
+        # Unbounded until the first success shows how many calls are actually in flight.
+        self.window = float(settings.max_concurrency) if settings.max_concurrency > 0 else math.inf
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.calls = 0
+        self.rate_limited = 0
+        self.queued_seconds = 0.0
+        self.remaining: dict[str, float] = {}
+        self.history: deque[tuple[float, float]] = deque(maxlen=HISTORY_LENGTH)
+        self._condition = threading.Condition()
+
+    def acquire(self, tokens: int) -> Ticket:
+        """Block until a call estimated at ``tokens`` tokens may start.
+
+        The local reservation is made under the lock; the shared one runs
+        outside it, since SQLite may wait up to its busy timeout.  When the
+        shared budget says wait, the local reservation is handed back and the
+        local state is checked again afterwards.
+        """
+        started = time.monotonic()
+        while True:
+            with self._condition:
+                while True:
+                    now = time.monotonic()
+                    self.requests.refill(now)
+                    self.tokens.refill(now)
+                    wait = max(self.blocked_until - now, self.requests.delay(1), self.tokens.delay(tokens))
+                    if wait <= 0 and self.in_flight + 1 <= max(1.0, self.window):
+                        break
+                    # A release also wakes the waiters, so a full window needs no timeout.
+                    self._condition.wait(timeout=wait if wait > 0 else None)
+                self.requests.take(1)
+                self.tokens.take(tokens)
+                self.in_flight += 1
+                limits = dict(self.limits)
+            if self.shared is None:
+                break
+            wait, members, shared_limits = self.shared.take(tokens, limits)
+            with self._condition:
+                self.members = members
+                self._set_limits(shared_limits, time.monotonic())
+                if wait <= 0:
+                    break
+                self.requests.take(-1)
+                self.tokens.take(-tokens)
+                self.in_flight -= 1
+                self._condition.notify_all()
+                self._condition.wait(timeout=wait)
+        with self._condition:
+            now = time.monotonic()
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.calls += 1
+            self.queued_seconds += now - started
+            return Ticket(started=now, tokens=tokens, waited=now - started)
+
+    def release(
+        self,
+        ticket: Ticket,
+        *,
+        headers: Mapping[str, str] | None = None,
+        tokens_used: int | None = None,
+        rate_limited: bool = False,
+        retry_after: float | None = None,
+    ) -> None:
+        """Finish a call: learn from its headers, refund unused tokens, and move the window.
+
+        Pass ``tokens_used`` for a successful call and ``rate_limited`` for a
+        429, which refunds every reserved token; other failures only free the
+        slot.  The shared budget is updated after the lock is released.
+        """
+        refund: float | None = None
+        with self._condition:
+            now = time.monotonic()
+            self.in_flight -= 1
+            if headers:
+                self._sync(headers, now)
+            pause = min(retry_after or 0.0, self.settings.max_retry_after)
+            if rate_limited:
+                self.rate_limited += 1
+                if pause:
+                    self.blocked_until = max(self.blocked_until, now + pause)
+                # Calls started before the last decrease belong to the burst that caused it.
+                if ticket.started >= self.last_decrease:
+                    self.last_decrease = now
+                    in_flight = self.in_flight + 1
+                    self._set_window(
+                        max(self.settings.min_concurrency, min(self.window, in_flight) * self.settings.decrease)
+                    )
+                # A rejected call consumed none of the tokens it reserved.
+                refund = ticket.tokens
+                self.tokens.take(-refund)
+            elif tokens_used is not None:
+                refund = ticket.tokens - tokens_used
+                self.tokens.take(-refund)
+                ceiling = float(self.peak_in_flight + 1)
+                if self.settings.max_concurrency > 0:
+                    ceiling = min(ceiling, self.settings.max_concurrency)
+                window = self.window if math.isfinite(self.window) else ceiling
+                self._set_window(min(window + self.settings.increase / window, ceiling))
+            limits, remaining = dict(self.limits), dict(self.remaining)
+            self._condition.notify_all()
+        if self.shared is not None and refund is not None:
+            self.shared.update(limits=limits, remaining=remaining, refund=refund, pause=pause)
+
+    def _set_window(self, window: float) -> None:
+        if not math.isfinite(self.window) or math.floor(window) != math.floor(self.window):
+            self.history.append((time.monotonic() - self.created, math.floor(window)))
+        self.window = window
+
+    def _set_limits(self, limits: Mapping[str, float], now: float) -> None:
+        """Adopt account-wide ``limits`` and resize the local buckets to this process's share of them."""
+        configured = {"requests": self.settings.requests_per_minute, "tokens": self.settings.tokens_per_minute}
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            self.limits[kind] = configured[kind] or limits[kind]
+            share = self.limits[kind] / max(1, self.members)
+            if share != bucket.per_minute:
+                bucket.resize(share, now)
+
+    def _sync(self, headers: Mapping[str, str], now: float) -> None:
+        limits = dict(self.limits)
+        for kind in limits:
+            limit = _header_number(headers, f"x-ratelimit-limit-{kind}")
+            if limit:
+                limits[kind] = limit
+        self._set_limits(limits, now)
+        for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            remaining = _header_number(headers, f"x-ratelimit-remaining-{kind}")
+            if remaining is not None:
+                self.remaining[kind] = remaining
+                if bucket.per_minute > 0:
+                    bucket.level = min(bucket.level, remaining)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                "window": math.floor(self.window) if math.isfinite(self.window) else None,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "calls": self.calls,
+                "rate_limited": self.rate_limited,
+                "queued_seconds": self.queued_seconds,
+                "requests_per_minute": self.limits["requests"],
+                "tokens_per_minute": self.limits["tokens"],
+                "shared": str(self.shared.path) if self.shared is not None else None,
+                "processes": self.members,
+                "remaining_requests": self.remaining.get("requests"),
+                "remaining_tokens": self.remaining.get("tokens"),
+                "window_history": [list(point) for point in self.history],
+            }
+
+
+def limiter_for(provider: str, model: str, settings: RateLimitRequest, *, account: str | None = None) -> RateLimiter:
+    """Return the process-wide limiter for ``provider`` and ``model``, created with ``settings`` on first use.
+
+    ``account`` (see ``account_key``) names the shared budget to join when
+    ``settings.shared`` is set.
+    """
+    with _LIMITERS_LOCK:
+        limiter = LIMITERS.get((provider, model))
+        if limiter is None:
+            shared = None
+            if settings.shared:
+                shared = SharedBudget(settings.shared_path or SHARED_PATH, account or account_key(provider, model))
+            limiter = LIMITERS[(provider, model)] = RateLimiter(settings, shared)
+        return limiter
+
+
+def limiter_snapshots() -> dict[str, dict[str, Any]]:
+    with _LIMITERS_LOCK:
+        limiters = dict(LIMITERS)
+    return {f"{provider}/{model}": limiter.snapshot() for (provider, model), limiter in limiters.items()}
@@ -0,0 +1,186 @@
+"""Speedup-vs-size curves and fitted complexity for parametrized benchmark cases.
+
+A case with ``params`` runs once per grid point (see ``expand_cases``).  The
+first parameter whose values are numbers and vary becomes the curve's size
+axis; every combination of the remaining parameters gets its own curve.
+
+Complexity is fitted twice per side: a least-squares line through
+``log(seconds)`` against ``log(size)`` gives the empirical exponent, and each
+of the usual classes ``O(1)`` .. ``O(n^3)`` is scaled to the points to find
+the one with the smallest log residual.  A pure side fitted as ``O(n^2)``
+whose compiled side is still ``O(n^2)`` sped up by a constant factor; a
+speedup that grows with size means the compiled code also lowered overhead
+that scales with the input.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Callable
+from typing import Any, TypedDict
+
+from recython.benchmarks import expand_cases, format_duration, grid_name
+from recython.jobs import BenchmarkCase
+
+COMPLEXITY_CLASSES: dict[str, Callable[[float], float]] = {
+    "O(1)": lambda n: 1.0,
+    "O(log n)": lambda n: math.log2(max(n, 2.0)),
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * math.log2(max(n, 2.0)),
+    "O(n^2)": lambda n: n * n,
+    "O(n^3)": lambda n: n * n * n,
+}
+
+
+class ScalingPoint(TypedDict):
+    size: float
+    ok: bool
+    pure_seconds: float | None
+    compiled_seconds: float | None
+    speedup: float | None
+
+
+class ComplexityFit(TypedDict):
+    exponent: float
+    r_squared: float
+    best_fit: str
+    residuals: dict[str, float]
+
+
+class ScalingCurve(TypedDict):
+    case: str
+    axis: str
+    fixed: dict[str, Any]
+    points: list[ScalingPoint]
+    pure_fit: ComplexityFit | None
+    compiled_fit: ComplexityFit | None
+
+
+def fit_complexity(sizes: list[float], seconds: list[float]) -> ComplexityFit | None:
+    """Fit per-call ``seconds`` against input ``sizes``; ``None`` with fewer than two distinct sizes.
+
+    ``exponent`` is the slope of the log-log line and ``r_squared`` its fit;
+    ``best_fit`` names the complexity class with the smallest RMS error in log
+    space, and ``residuals`` lists that error for every class.
+    """
+    points = [(float(size), float(value)) for size, value in zip(sizes, seconds, strict=True) if size > 0 and value > 0]
+    if len({size for size, _ in points}) < 2:
+        return None
+    xs = [math.log(size) for size, _ in points]
+    ys = [math.log(value) for _, value in points]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys, strict=True)) / spread
+    total = sum((y - mean_y) ** 2 for y in ys)
+    error = sum((y - mean_y - slope * (x - mean_x)) ** 2 for x, y in zip(xs, ys, strict=True))
+
+    residuals: dict[str, float] = {}
+    for name, shape in COMPLEXITY_CLASSES.items():
+        logs = [y - math.log(shape(size)) for (size, _), y in zip(points, ys, strict=True)]
+        scale = sum(logs) / len(logs)
+        residuals[name] = math.sqrt(sum((value - scale) ** 2 for value in logs) / len(logs))
+    return {
+        "exponent": slope,
+        "r_squared": 1 - error / total if total > 0 else 1.0,
+        "best_fit": min(residuals, key=residuals.__getitem__),
+        "residuals": residuals,
+    }
+
+
+def _is_number(value: object) -> bool:
+    return isinstance(value, int | float) and not isinstance(value, bool)
+
+
+def scaling_curves(cases: list[BenchmarkCase], results: list[dict[str, Any]]) -> list[ScalingCurve]:
+    """Group ``compare_benchmarks`` results of grid cases into one curve per case and fixed parameters.
+
+    Every curve has ``case``, ``axis``, ``fixed`` (the other parameters),
+    ``points`` sorted by size with pure/compiled seconds and speedup, and
+    ``pure_fit`` / ``compiled_fit`` from ``fit_complexity``.
+    """
+    by_name = {str(result["name"]): result for result in results}
+    grids: dict[str, list[BenchmarkCase]] = {}
+    for case in expand_cases(cases):
+        if case.point and case.name in by_name:
+            grids.setdefault(grid_name(case), []).append(case)
+
+    curves: list[ScalingCurve] = []
+    for name, points in grids.items():
+        axis = next(
+            (
+                key
+                for key in points[0].point
+                if all(_is_number(case.point.get(key)) for case in points)
+                and len({case.point[key] for case in points}) > 1
+            ),
+            None,
+        )
+        if axis is None:
+            continue
+        groups: dict[str, tuple[dict[str, Any], list[BenchmarkCase]]] = {}
+        for case in points:
+            fixed = {key: value for key, value in case.point.items() if key != axis}
+            groups.setdefault(repr(fixed), (fixed, []))[1].append(case)
+        for fixed, group in groups.values():
+            rows: list[ScalingPoint] = []
+            for case in sorted(group, key=lambda item: item.point[axis]):
+                result = by_name[case.name]
+                rows.append(
+                    {
+                        "size": case.point[axis],
+                        "ok": bool(result["ok"]),
+                        "pure_seconds": result["pure_seconds"],
+                        "compiled_seconds": result["compiled_seconds"],
+                        "speedup": result["speedup"],
+                    }
+                )
+            curves.append(scaling_curve(name, axis, rows, fixed=fixed))
+    return curves
+
+
+def scaling_curve(
+    name: str, axis: str, points: list[ScalingPoint], *, fixed: dict[str, Any] | None = None
+) -> ScalingCurve:
+    """Build one curve from ``points`` with ``size``, ``pure_seconds``, ``compiled_seconds``, and ``speedup``."""
+    timed = [
+        (point["size"], pure, compiled)
+        for point in points
+        if (pure := point["pure_seconds"]) and (compiled := point["compiled_seconds"])
+    ]
+    sizes = [size for size, _pure, _compiled in timed]
+    return {
+        "case": name,
+        "axis": axis,
+        "fixed": dict(fixed or {}),
+        "points": points,
+        "pure_fit": fit_complexity(sizes, [pure for _size, pure, _compiled in timed]),
+        "compiled_fit": fit_complexity(sizes, [compiled for _size, _pure, compiled in timed]),
+    }
+
+
+def render_scaling_chart(curves: list[ScalingCurve], *, width: int = 40) -> str:
+    """Render curves as a plain-text table with one speedup bar per size."""
+    lines: list[str] = []
+    for curve in curves:
+        fixed = "".join(f"; {key}={value!r}" for key, value in curve["fixed"].items())
+        lines.append(f"{curve['case']} (by {curve['axis']}{fixed})")
+        fits = []
+        for side, fit in (("pure", curve["pure_fit"]), ("compiled", curve["compiled_fit"])):
+            if fit:
+                fits.append(f"{side} {fit['best_fit']} (exponent {fit['exponent']:.2f})")
+        if fits:
+            lines.append("  " + ", ".join(fits))
+        top = max((point["speedup"] or 0.0 for point in curve["points"]), default=0.0)
+        lines.append(f"  {curve['axis']:>10} {'pure':>10} {'compiled':>10} {'speedup':>8}")
+        for point in curve["points"]:
+            speedup, pure, compiled = point["speedup"], point["pure_seconds"], point["compiled_seconds"]
+            if not speedup or pure is None or compiled is None:
+                lines.append(f"  {point['size']!s:>10} {'failed':>10}")
+                continue
+            bar = "#" * max(1, round(width * speedup / top)) if top else ""
+            lines.append(
+                f"  {point['size']!s:>10} {format_duration(pure):>10} "
+                f"{format_duration(compiled):>10} {speedup:>7.2f}x |{bar}"
+            )
+        lines.append("")
+    return "\n".join(lines).rstrip() + "\n" if lines else ""
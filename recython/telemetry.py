@@ -0,0 +1,161 @@
+"""Timing and token telemetry for conversion runs.
+
+Each phase of a run is recorded as a span: ``plan``, ``render`` (prompt
+rendering), ``llm`` (one model call, with its token usage), ``extract`` (code
+block extraction), ``validate`` with one ``validator`` span per check, and
+``benchmark`` for the build-and-benchmark step.  Spans carry the file and
+attempt they belong to, so ``summarize`` can roll them up per file, per phase,
+and per validator.  ``rate_limits`` holds the end-of-run state of the
+rate limiters (``recython.ratelimit``); the time each model call queued for
+its limiter and the 429s it received are in the ``llm`` span args.
+``hedges`` likewise holds the hedging trackers (``recython.hedging``), and
+the ``llm`` span args say whether each call was hedged and whether the hedge
+won.
+``trace_events`` turns the spans into Chrome trace-event JSON
+(``chrome://tracing``, Perfetto) with one lane per file.
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+TOKEN_FIELDS = ("prompt_tokens", "completion_tokens", "cached_tokens")
+
+
+@dataclass(slots=True)
+class Telemetry:
+    origin: float = field(default_factory=time.perf_counter)
+    spans: list[dict[str, Any]] = field(default_factory=list)
+    summary: dict[str, Any] = field(default_factory=dict)
+    rate_limits: dict[str, Any] = field(default_factory=dict)
+    hedges: dict[str, Any] = field(default_factory=dict)
+
+    def add(
+        self,
+        category: str,
+        name: str,
+        *,
+        start: float,
+        seconds: float,
+        file: str | None = None,
+        attempt: int | None = None,
+        **args: Any,
+    ) -> dict[str, Any]:
+        """Record a finished span; ``start`` is a ``time.perf_counter()`` value."""
+        span = {
+            "category": category,
+            "name": name,
+            "file": file,
+            "attempt": attempt,
+            "start": start - self.origin,
+            "seconds": seconds,
+            "args": args,
+        }
+        self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(
+        self, category: str, name: str = "", *, file: str | None = None, attempt: int | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Time the block; the yielded dict becomes the span's ``args`` (token counts, for example)."""
+        args: dict[str, Any] = {}
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(
+                category,
+                name or category,
+                start=start,
+                seconds=time.perf_counter() - start,
+                file=file,
+                attempt=attempt,
+                **args,
+            )
+
+    def summarize(self) -> dict[str, Any]:
+        """Fill and return ``summary``: totals per phase, per validator, per file, and for tokens."""
+        phases: dict[str, dict[str, float]] = {}
+        validators: dict[str, dict[str, float]] = {}
+        files: dict[str, dict[str, Any]] = {}
+        tokens = {name: 0 for name in TOKEN_FIELDS} | {"calls": 0}
+        queued_seconds = 0.0
+        rate_limited = 0
+        hedged = 0
+        hedge_wins = 0
+        for span in self.spans:
+            phase = phases.setdefault(span["category"], {"count": 0, "seconds": 0.0})
+            phase["count"] += 1
+            phase["seconds"] += span["seconds"]
+            if span["category"] == "validator":
+                validator = validators.setdefault(span["name"], {"count": 0, "seconds": 0.0})
+                validator["count"] += 1
+                validator["seconds"] += span["seconds"]
+            if span["category"] == "llm":
+                tokens["calls"] += 1
+                for name in TOKEN_FIELDS:
+                    tokens[name] += int(span["args"].get(name) or 0)
+                queued_seconds += int(span["args"].get("queued_ms") or 0) / 1000
+                rate_limited += int(span["args"].get("rate_limited") or 0)
+                hedged += int(span["args"].get("hedged") or 0)
+                hedge_wins += int(span["args"].get("hedge_won") or 0)
+            if span["file"] is None:
+                continue
+            row = files.setdefault(
+                span["file"],
+                {"attempts": 0, "seconds": 0.0, "phases": {}} | {name: 0 for name in TOKEN_FIELDS},
+            )
+            row["attempts"] = max(row["attempts"], span["attempt"] or 0)
+            if span["category"] != "validator":  # already inside its validate span
+                row["seconds"] += span["seconds"]
+                row["phases"][span["category"]] = row["phases"].get(span["category"], 0.0) + span["seconds"]
+            if span["category"] == "llm":
+                for name in TOKEN_FIELDS:
+                    row[name] += int(span["args"].get(name) or 0)
+        self.summary = {
+            "total_seconds": max((span["start"] + span["seconds"] for span in self.spans), default=0.0),
+            "phases": phases,
+            "validators": validators,
+            "tokens": tokens,
+            "rate_limit": {
+                "queued_seconds": queued_seconds,
+                "rate_limited": rate_limited,
+                "limiters": self.rate_limits,
+            },
+            "hedge": {"hedged": hedged, "hedge_wins": hedge_wins, "trackers": self.hedges},
+            "files": files,
+        }
+        return self.summary
+
+
+def trace_events(spans: list[dict[str, Any]]) -> dict[str, Any]:
+    """Convert telemetry spans to Chrome trace-event JSON, one thread lane per file."""
+    lanes: dict[str, int] = {"run": 0}
+    events: list[dict[str, Any]] = []
+    for span in spans:
+        lane = lanes.setdefault(span["file"] or "run", len(lanes))
+        args = dict(span["args"])
+        if span["attempt"] is not None:
+            args["attempt"] = span["attempt"]
+        events.append(
+            {
+                "name": span["name"],
+                "cat": span["category"],
+                "ph": "X",
+                "ts": round(span["start"] * 1e6, 3),
+                "dur": round(span["seconds"] * 1e6, 3),
+                "pid": 1,
+                "tid": lane,
+                "args": args,
+            }
+        )
+    metadata = [
+        {"name": "thread_name", "ph": "M", "pid": 1, "tid": lane, "args": {"name": name}}
+        for name, lane in lanes.items()
+    ]
+    return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
@@ -67,6 +67,46 @@ def extract_code_block(text: str, start_marker: str = "```cython", end_marker: s
     return text[chosen_start:end_pos].strip()
 
 
+def _fence_name(info: str) -> str:
+    """The file name in a fence info string such as ``cython file=pkg/mod.py``, or ``""``."""
+    for token in info.replace(",", " ").split():
+        key, sep, value = token.partition("=")
+        if sep and key in ("file", "name", "path", "title"):
+            return value.strip("\"'`")
+        if not sep and ("/" in token or token.endswith((".py", ".pyx", ".pxd"))):
+            return token.strip("\"'`")
+    return ""
+
+
+def extract_code_blocks(text: str) -> dict[str, str]:
+    """Extract every named fenced code block from LLM output, keyed by name.
+
+    Multi-file prompts ask for one block per file, named in its opening
+    fence (```` ```cython file=pkg/mod.py ````); a bare path token also
+    works.  Unnamed blocks are skipped, and a name that appears twice keeps
+    its last block.
+    """
+    blocks: dict[str, str] = {}
+    name = ""
+    body: list[str] = []
+    inside = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not inside:
+            if stripped.startswith("```"):
+                inside = True
+                name = _fence_name(stripped[3:])
+                body = []
+            continue
+        if stripped == "```":
+            inside = False
+            if name:
+                blocks[name] = "\n".join(body).strip()
+            continue
+        body.append(line)
+    return blocks
+
+
 def run():
     with capture_output() as _captured:
         # Test the function
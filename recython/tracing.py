@@ -0,0 +1,321 @@
+"""Runtime type tracing for feeding observed types into conversion prompts.
+
+``recython trace`` runs a workload (a script, a module, or a test suite) in
+process and records the concrete argument, return, and local types seen for
+every function defined under the traced source roots.  The evidence lands in
+``.recython/types.json`` and the engine renders it into each conversion prompt
+so the model does not have to guess C types from annotations alone.
+
+On Python 3.12+ the tracer uses ``sys.monitoring`` and disables itself per code
+object once enough samples have been collected.  Older interpreters, and runs
+where another tool (cProfile, coverage) already holds the profiler tool ID,
+fall back to ``sys.setprofile`` with the same sampling cap.
+"""
+
+from __future__ import annotations
+
+import json
+import runpy
+import sys
+import threading
+import traceback
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any
+
+TYPES_FILENAME = "types.json"
+EVIDENCE_VERSION = 1
+DEFAULT_MAX_SAMPLES = 64
+_MAX_DESCRIBE_DEPTH = 2
+
+
+def describe_type(value: object, depth: int = 0) -> str:
+    """Return a compact, annotation-like description of ``value``'s type.
+
+    Only exact builtin containers are inspected so user-defined ``__iter__``
+    implementations are never triggered by the tracer.
+    """
+    if value is None:
+        return "None"
+    value_type = type(value)
+    if value_type.__module__ == "builtins":
+        name = value_type.__qualname__
+    else:
+        name = f"{value_type.__module__}.{value_type.__qualname__}"
+    if depth >= _MAX_DESCRIBE_DEPTH:
+        return name
+    if value_type in (list, set, frozenset) and value:
+        first = next(iter(value))  # type: ignore[call-overload]
+        return f"{name}[{describe_type(first, depth + 1)}]"
+    if value_type is tuple and value:
+        items: tuple[object, ...] = value  # type: ignore[assignment]
+        if len(items) <= 4:
+            return f"{name}[{', '.join(describe_type(item, depth + 1) for item in items)}]"
+        return f"{name}[{describe_type(items[0], depth + 1)}, ...]"
+    if value_type is dict and value:
+        key, item = next(iter(value.items()))  # type: ignore[attr-defined]
+        return f"{name}[{describe_type(key, depth + 1)}, {describe_type(item, depth + 1)}]"
+    return name
+
+
+def _bump(counter: dict[str, int], key: str, amount: int = 1) -> None:
+    counter[key] = counter.get(key, 0) + amount
+
+
+class TypeTracer:
+    """Collect observed types for functions defined under ``roots``."""
+
+    def __init__(self, roots: list[Path], *, max_samples: int = DEFAULT_MAX_SAMPLES) -> None:
+        self.roots = [root.resolve() for root in roots]
+        self.max_samples = max_samples
+        self.modules: dict[str, dict[str, dict[str, Any]]] = {}
+        self._wanted: dict[CodeType, bool] = {}
+        self._lock = threading.Lock()
+        self._active = False
+        self._monitoring = False
+
+    def _wants(self, code: CodeType) -> bool:
+        wanted = self._wanted.get(code)
+        if wanted is None:
+            wanted = False
+            # Skip module bodies, lambdas, and comprehensions; only named functions get typed.
+            if not code.co_filename.startswith("<") and not code.co_qualname.endswith(">"):
+                filename = Path(code.co_filename).resolve()
+                if "site-packages" not in filename.parts:
+                    wanted = any(filename.is_relative_to(root) for root in self.roots)
+            self._wanted[code] = wanted
+        return wanted
+
+    def _record_for(self, code: CodeType) -> dict[str, Any]:
+        functions = self.modules.setdefault(str(Path(code.co_filename).resolve()), {})
+        record = functions.get(code.co_qualname)
+        if record is None:
+            record = {"calls": 0, "args": {}, "return": {}, "locals": {}}
+            functions[code.co_qualname] = record
+        return record
+
+    @staticmethod
+    def _argument_names(code: CodeType) -> tuple[str, ...]:
+        count = code.co_argcount + code.co_kwonlyargcount
+        # CO_VARARGS (0x04) and CO_VARKEYWORDS (0x08) each add one more name.
+        count += bool(code.co_flags & 0x04) + bool(code.co_flags & 0x08)
+        return code.co_varnames[:count]
+
+    def _saturated(self, code: CodeType) -> bool:
+        calls: int = self._record_for(code)["calls"]
+        return calls >= self.max_samples
+
+    def record_call(self, code: CodeType, frame: FrameType) -> None:
+        with self._lock:
+            record = self._record_for(code)
+            record["calls"] += 1
+            frame_locals = frame.f_locals
+            for name in self._argument_names(code):
+                if name in frame_locals:
+                    _bump(record["args"].setdefault(name, {}), describe_type(frame_locals[name]))
+
+    def record_return(self, code: CodeType, frame: FrameType, value: object) -> None:
+        with self._lock:
+            record = self._record_for(code)
+            _bump(record["return"], describe_type(value))
+            arguments = set(self._argument_names(code))
+            for name, local_value in frame.f_locals.items():
+                if name not in arguments:
+                    _bump(record["locals"].setdefault(name, {}), describe_type(local_value))
+
+    # -- sys.monitoring backend (3.12+) -------------------------------------
+
+    if sys.version_info >= (3, 12):
+
+        def _on_start(self, code: CodeType, _offset: int) -> object:
+            if not self._wants(code) or self._saturated(code):
+                return sys.monitoring.DISABLE
+            self.record_call(code, sys._getframe(1))
+            return None
+
+        def _on_return(self, code: CodeType, _offset: int, value: object) -> object:
+            if not self._wants(code):
+                return sys.monitoring.DISABLE
+            record = self._record_for(code)
+            if sum(record["return"].values()) >= self.max_samples:
+                return sys.monitoring.DISABLE
+            self.record_return(code, sys._getframe(1), value)
+            return None
+
+        def _start_monitoring(self) -> bool:
+            monitoring = sys.monitoring
+            tool_id = monitoring.PROFILER_ID
+            try:
+                monitoring.use_tool_id(tool_id, "recython")
+            except ValueError:
+                # cProfile or coverage already holds the profiler slot.
+                return False
+            monitoring.register_callback(tool_id, monitoring.events.PY_START, self._on_start)
+            monitoring.register_callback(tool_id, monitoring.events.PY_RETURN, self._on_return)
+            monitoring.set_events(tool_id, monitoring.events.PY_START | monitoring.events.PY_RETURN)
+            monitoring.restart_events()
+            return True
+
+        def _stop_monitoring(self) -> None:
+            monitoring = sys.monitoring
+            tool_id = monitoring.PROFILER_ID
+            monitoring.set_events(tool_id, 0)
+            monitoring.register_callback(tool_id, monitoring.events.PY_START, None)
+            monitoring.register_callback(tool_id, monitoring.events.PY_RETURN, None)
+            monitoring.free_tool_id(tool_id)
+
+    # -- sys.setprofile fallback --------------------------------------------
+
+    def _profile(self, frame: FrameType, event: str, arg: object) -> None:
+        code = frame.f_code
+        if not self._wants(code):
+            return
+        if event == "call" and not self._saturated(code):
+            self.record_call(code, frame)
+        elif event == "return" and sum(self._record_for(code)["return"].values()) < self.max_samples:
+            self.record_return(code, frame, arg)
+
+    def start(self) -> None:
+        if self._active:
+            return
+        self._monitoring = sys.version_info >= (3, 12) and self._start_monitoring()
+        if not self._monitoring:
+            threading.setprofile(self._profile)
+            sys.setprofile(self._profile)
+        self._active = True
+
+    def stop(self) -> None:
+        if not self._active:
+            return
+        if sys.version_info >= (3, 12) and self._monitoring:
+            self._stop_monitoring()
+        else:
+            sys.setprofile(None)
+            threading.setprofile(None)
+        self._active = False
+
+    def to_evidence(self, project_root: Path) -> dict[str, Any]:
+        """Return the JSON-ready evidence with module paths relative to ``project_root``."""
+        root = project_root.resolve()
+        modules: dict[str, dict[str, Any]] = {}
+        for filename, functions in sorted(self.modules.items()):
+            path = Path(filename)
+            key = path.relative_to(root).as_posix() if path.is_relative_to(root) else path.as_posix()
+            modules[key] = {name: record for name, record in sorted(functions.items()) if record["calls"]}
+        return {"version": EVIDENCE_VERSION, "root": str(root), "modules": modules}
+
+
+def merge_type_evidence(existing: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    """Add the counts from ``new`` onto ``existing`` and return the merged evidence."""
+    merged_modules: dict[str, dict[str, Any]] = json.loads(json.dumps(existing.get("modules", {})))
+    for module_key, functions in new.get("modules", {}).items():
+        target_functions = merged_modules.setdefault(module_key, {})
+        for qualname, record in functions.items():
+            target = target_functions.setdefault(qualname, {"calls": 0, "args": {}, "return": {}, "locals": {}})
+            target["calls"] += record["calls"]
+            for type_name, count in record["return"].items():
+                _bump(target["return"], type_name, count)
+            for section in ("args", "locals"):
+                for name, counts in record[section].items():
+                    for type_name, count in counts.items():
+                        _bump(target[section].setdefault(name, {}), type_name, count)
+    return {"version": EVIDENCE_VERSION, "root": new.get("root", existing.get("root")), "modules": merged_modules}
+
+
+def load_type_evidence(path: Path | None) -> dict[str, Any] | None:
+    if path is None or not path.exists():
+        return None
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != EVIDENCE_VERSION:
+        raise ValueError(f"Unsupported type evidence version in '{path}'.")
+    evidence: dict[str, Any] = data
+    return evidence
+
+
+def write_type_evidence(path: Path, evidence: dict[str, Any], *, replace: bool = False) -> dict[str, Any]:
+    if not replace and path.exists():
+        evidence = merge_type_evidence(load_type_evidence(path) or {}, evidence)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(evidence, indent=2), encoding="utf-8")
+    return evidence
+
+
+def _format_counts(counts: dict[str, int]) -> str:
+    ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return " | ".join(name for name, _count in ordered)
+
+
+def render_type_evidence(evidence: dict[str, Any] | None, source_path: Path) -> str:
+    """Render the observed types for one source file as a prompt section.
+
+    Returns an empty string when no evidence was recorded for ``source_path``.
+    """
+    if not evidence:
+        return ""
+    root = Path(evidence.get("root", "."))
+    resolved = source_path.resolve()
+    key = resolved.relative_to(root).as_posix() if resolved.is_relative_to(root) else resolved.as_posix()
+    functions = evidence.get("modules", {}).get(key)
+    if not functions:
+        return ""
+
+    lines = [
+        "Observed runtime types (recorded by `recython trace`; prefer these over guesses when choosing C types):",
+    ]
+    for qualname, record in functions.items():
+        params = ", ".join(f"{name}: {_format_counts(counts)}" for name, counts in record["args"].items())
+        returns = _format_counts(record["return"]) or "None"
+        lines.append(f"- {qualname}({params}) -> {returns}  [{record['calls']} call(s) sampled]")
+        if record["locals"]:
+            local_types = ", ".join(f"{name}: {_format_counts(counts)}" for name, counts in record["locals"].items())
+            lines.append(f"  locals: {local_types}")
+    if len(lines) == 1:
+        return ""
+    return "\n".join(lines)
+
+
+def run_traced_command(command: list[str], tracer: TypeTracer) -> int:
+    """Run ``command`` in this interpreter under ``tracer`` and return its exit code.
+
+    ``command`` is either ``-m module [args]``, ``path/to/script.py [args]``, or
+    the name of an importable module such as ``pytest``.
+    """
+    if not command:
+        raise ValueError("trace needs a command to run, for example: recython trace -- -m pytest tests")
+    if command[0] == "-m":
+        if len(command) < 2:
+            raise ValueError("trace -m needs a module name.")
+        target, argv, is_module = command[1], command[1:], True
+    elif command[0].endswith(".py") or Path(command[0]).is_file():
+        target, argv, is_module = command[0], command, False
+    else:
+        target, argv, is_module = command[0], command, True
+
+    saved_argv = sys.argv[:]
+    saved_path = sys.path[:]
+    sys.argv = list(argv)
+    if not is_module:
+        sys.path.insert(0, str(Path(target).resolve().parent))
+    exit_code = 0
+    tracer.start()
+    try:
+        if is_module:
+            runpy.run_module(target, run_name="__main__", alter_sys=True)
+        else:
+            runpy.run_path(target, run_name="__main__")
+    except SystemExit as exc:
+        if exc.code is None:
+            exit_code = 0
+        elif isinstance(exc.code, int):
+            exit_code = exc.code
+        else:
+            exit_code = 1
+    except Exception:
+        # Keep the evidence gathered so far; a crashing workload still tells us something.
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        tracer.stop()
+        sys.argv = saved_argv
+        sys.path[:] = saved_path
+    return exit_code
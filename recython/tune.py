@@ -0,0 +1,461 @@
+"""Search Cython compiler directives per module and keep the fastest safe set.
+
+``recython tune`` rebuilds one generated module at a time under candidate
+directive sets, runs the benchmark cases that name the module, and checks each
+case's value against the pure source.  A candidate is *safe* when every case
+still matches; it is kept only when it is also measurably faster.  The winner
+is written back into the module as a ``# cython:`` header, and every trial is
+stored under ``.recython/tuning/`` so later runs can skip unchanged modules and
+maintenance runs can re-apply the chosen directives to regenerated code.
+
+The default search is greedy: starting from Cython's defaults, each directive
+is flipped to its fast value in turn and kept if it helps.  ``exhaustive``
+tries every combination instead.
+
+The same trial loop also searches C compiler flag profiles (``-O3``,
+``-march=native``, ``-ffast-math``, LTO): each module is rebuilt under every
+candidate profile, values are checked the same way, and the fastest safe
+profile is left built.  The chosen profiles are stored under ``.recython/flags/``
+so later builds compile each module with its own profile.
+
+Every candidate is timed with ``measure_case`` across isolated workers and
+ranked by the median; it replaces the current best only when its median is
+``MIN_IMPROVEMENT`` faster and its confidence interval clears the best's.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import re
+from dataclasses import replace
+from datetime import UTC, datetime
+from pathlib import Path
+
+from recython.backends import STYLE_BACKENDS, get_backend
+from recython.benchmarks import evaluate_case, measure_case, relative_module_name, results_match
+from recython.build import (
+    FLAG_PROFILES,
+    BuildTarget,
+    build_targets_for,
+    default_build_dir,
+    discover_build_sources,
+    flag_profile_args,
+)
+from recython.jobs import BenchmarkCase, BenchRequest, BuildRequest
+
+# Directive -> (Cython default, value tried for speed).
+TUNABLE_DIRECTIVES: dict[str, tuple[object, object]] = {
+    "boundscheck": (True, False),
+    "wraparound": (True, False),
+    "cdivision": (False, True),
+    "initializedcheck": (True, False),
+    "infer_types": (None, True),
+}
+# A candidate must beat the current best by this fraction to be kept.
+MIN_IMPROVEMENT = 0.02
+TUNING_VERSION = 1
+FLAGS_VERSION = 1
+HEADER_LINE = re.compile(r"^#\s*cython\s*:(.*)$")
+
+
+def tuning_path(output_root: Path, package_name: str) -> Path:
+    return output_root.parent / ".recython" / "tuning" / f"{package_name}.json"
+
+
+def load_tuning(path: Path) -> dict[str, dict[str, object]]:
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != TUNING_VERSION:
+        return {}
+    modules: dict[str, dict[str, object]] = data["modules"]
+    return modules
+
+
+def save_tuning(path: Path, modules: dict[str, dict[str, object]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"version": TUNING_VERSION, "modules": modules}, indent=2), encoding="utf-8")
+
+
+def flags_path(output_root: Path, package_name: str) -> Path:
+    return output_root.parent / ".recython" / "flags" / f"{package_name}.json"
+
+
+def load_flags(path: Path) -> dict[str, dict[str, object]]:
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != FLAGS_VERSION:
+        return {}
+    modules: dict[str, dict[str, object]] = data["modules"]
+    return modules
+
+
+def save_flags(path: Path, modules: dict[str, dict[str, object]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"version": FLAGS_VERSION, "modules": modules}, indent=2), encoding="utf-8")
+
+
+def stored_flag_profiles(output_root: Path, package_name: str) -> dict[str, str]:
+    """Map each module to the flag profile a previous search chose for it."""
+    store = load_flags(flags_path(output_root, package_name))
+    return {module: str(entry["profile"]) for module, entry in store.items()}
+
+
+def strip_directive_header(text: str) -> str:
+    """Remove tunable directives from the leading ``# cython:`` comment lines of ``text``."""
+    lines = text.splitlines(keepends=True)
+    kept: list[str] = []
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped and not stripped.startswith("#"):
+            kept.extend(lines[index:])
+            break
+        match = HEADER_LINE.match(stripped)
+        if not match:
+            kept.append(line)
+            continue
+        entries = [entry.strip() for entry in match.group(1).split(",") if entry.strip()]
+        remaining = [entry for entry in entries if entry.split("=")[0].strip() not in TUNABLE_DIRECTIVES]
+        if remaining:
+            kept.append(f"# cython: {', '.join(remaining)}\n")
+    return "".join(kept)
+
+
+def apply_directive_header(text: str, directives: dict[str, object]) -> str:
+    """Replace the tunable directives in ``text``'s header with ``directives``."""
+    body = strip_directive_header(text)
+    if not directives:
+        return body
+    header = ", ".join(f"{name}={value}" for name, value in directives.items())
+    return f"# cython: {header}\n{body}"
+
+
+def tuning_key(output_root: Path, package_name: str, source: Path) -> str:
+    """Name a generated module the way the tuning and flag stores do: ``sub`` for ``sub/__init__``."""
+    (target,) = build_targets_for(output_root, package_name, [source])
+    return relative_module_name(target.module_name, package_name)
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(strip_directive_header(text).encode("utf-8")).hexdigest()
+
+
+def _beats(trial: dict[str, object], best: dict[str, object]) -> bool:
+    if not trial["safe"]:
+        return False
+    faster = float(trial["seconds"]) < float(best["seconds"]) * (1 - MIN_IMPROVEMENT)  # type: ignore[arg-type]
+    return faster and float(trial["ci_high"]) < float(best["ci_low"])  # type: ignore[arg-type]
+
+
+def _candidates_exhaustive() -> list[dict[str, object]]:
+    names = list(TUNABLE_DIRECTIVES)
+    candidates = []
+    for flips in itertools.product((False, True), repeat=len(names)):
+        candidates.append({name: TUNABLE_DIRECTIVES[name][1] for name, flip in zip(names, flips, strict=True) if flip})
+    return candidates
+
+
+def _build_one(target: BuildTarget, *, style: str, build: BuildRequest, output_root: Path) -> dict[str, object]:
+    package_name = target.module_name.split(".")[0]
+    (built,) = get_backend(STYLE_BACKENDS[style]).build(
+        [target],
+        output_root=output_root,
+        package_name=package_name,
+        build_dir=default_build_dir(output_root, package_name),
+        build=build,
+    )
+    return built
+
+
+def _run_trial(
+    target: BuildTarget,
+    cases: list[BenchmarkCase],
+    expected: list[object],
+    *,
+    source_root: Path,
+    style: str,
+    build: BuildRequest,
+    output_root: Path,
+    bench: BenchRequest | None = None,
+    rel_tol: float = 1e-9,
+) -> dict[str, object]:
+    """Build ``target`` as it is on disk, check every case against ``expected``, and time the cases.
+
+    ``seconds`` is the sum of the per-case medians; ``ci_low`` and ``ci_high``
+    sum the per-case confidence bounds.
+    """
+    package_name = target.module_name.split(".")[0]
+    search_path = [output_root, source_root]
+    trial: dict[str, object] = {"seconds": None, "ci_low": None, "ci_high": None, "safe": False, "error": None}
+    built = _build_one(target, style=style, build=build, output_root=output_root)
+    if not built["ok"]:
+        trial["error"] = built["error"]
+        return trial
+    try:
+        for case, value in zip(cases, expected, strict=True):
+            actual = evaluate_case(case, package_name=package_name, search_path=search_path)
+            if not results_match(value, actual, rel_tol=rel_tol, abs_tol=1e-12):
+                raise ValueError(f"Case '{case.name}' no longer matches the pure source.")
+        stats = [measure_case(case, package_name=package_name, search_path=search_path, bench=bench) for case in cases]
+        trial["seconds"] = sum(item["median"] for item in stats)
+        trial["ci_low"] = sum(item["ci_low"] for item in stats)
+        trial["ci_high"] = sum(item["ci_high"] for item in stats)
+        trial["safe"] = True
+    except Exception as exc:
+        trial["error"] = str(exc)
+    return trial
+
+
+def tune_module(
+    source: Path,
+    cases: list[BenchmarkCase],
+    *,
+    output_root: Path,
+    package_name: str,
+    source_root: Path,
+    style: str,
+    build: BuildRequest,
+    bench: BenchRequest | None = None,
+    exhaustive: bool = False,
+) -> dict[str, object]:
+    """Search directive sets for one generated module and leave the best one applied and built."""
+    (target,) = build_targets_for(output_root, package_name, [source])
+    original = source.read_text(encoding="utf-8")
+    expected = [evaluate_case(case, package_name=package_name, search_path=[source_root]) for case in cases]
+    trials: list[dict[str, object]] = []
+
+    def measure(directives: dict[str, object]) -> dict[str, object]:
+        source.write_text(apply_directive_header(original, directives), encoding="utf-8")
+        trial = {
+            "directives": directives,
+            **_run_trial(
+                target,
+                cases,
+                expected,
+                source_root=source_root,
+                style=style,
+                build=build,
+                output_root=output_root,
+                bench=bench,
+            ),
+        }
+        trials.append(trial)
+        return trial
+
+    # Trials rewrite the module's header in place; if the search fails the original text is put back.
+    final_text = original
+    try:
+        baseline = measure({})
+        best_directives: dict[str, object] = {}
+        best = baseline
+        if baseline["safe"]:
+            if exhaustive:
+                for candidate in _candidates_exhaustive()[1:]:
+                    trial = measure(candidate)
+                    if _beats(trial, best):
+                        best_directives, best = candidate, trial
+            else:
+                for name, (_default, fast) in TUNABLE_DIRECTIVES.items():
+                    candidate = {**best_directives, name: fast}
+                    trial = measure(candidate)
+                    if _beats(trial, best):
+                        best_directives, best = candidate, trial
+        final_text = apply_directive_header(original, best_directives)
+    finally:
+        source.write_text(final_text, encoding="utf-8")
+    _build_one(target, style=style, build=build, output_root=output_root)
+    return {
+        "module": relative_module_name(target.module_name, package_name),
+        "status": "tuned" if baseline["safe"] else "failed",
+        "error": None if baseline["safe"] else baseline["error"],
+        "directives": best_directives,
+        "baseline_seconds": baseline["seconds"],
+        "seconds": best["seconds"],
+        "speedup": (
+            float(baseline["seconds"]) / float(best["seconds"])  # type: ignore[arg-type]
+            if baseline["safe"] and best["seconds"]
+            else None
+        ),
+        "source_hash": _text_hash(final_text),
+        "tuned_at": datetime.now(UTC).isoformat(),
+        "trials": trials,
+    }
+
+
+def tune_package(
+    *,
+    output_root: Path,
+    source_root: Path,
+    style: str,
+    cases: list[BenchmarkCase],
+    build: BuildRequest,
+    bench: BenchRequest | None = None,
+    modules: list[str] | None = None,
+    exhaustive: bool = False,
+    force: bool = False,
+) -> list[dict[str, object]]:
+    """Tune every generated module that has benchmark cases and store the results.
+
+    Modules whose generated code is unchanged since their last tuning are
+    reported as ``up-to-date`` unless ``force`` is set.
+    """
+    package_name = source_root.name
+    store_path = tuning_path(output_root, package_name)
+    store = load_tuning(store_path)
+    results: list[dict[str, object]] = []
+    for source in discover_build_sources(output_root, style):
+        module = tuning_key(output_root, package_name, source)
+        if modules and module not in modules:
+            continue
+        module_cases = [case for case in cases if case.module == module]
+        if not module_cases:
+            results.append({"module": module, "status": "skipped", "error": "No benchmark cases name this module."})
+            continue
+        previous = store.get(module)
+        if not force and previous and previous.get("source_hash") == _text_hash(source.read_text(encoding="utf-8")):
+            results.append({**previous, "status": "up-to-date"})
+            continue
+        outcome = tune_module(
+            source,
+            module_cases,
+            output_root=output_root,
+            package_name=package_name,
+            source_root=source_root,
+            style=style,
+            build=build,
+            bench=bench,
+            exhaustive=exhaustive,
+        )
+        if outcome["status"] == "tuned":
+            store[module] = outcome
+            save_tuning(store_path, store)
+        results.append(outcome)
+    return results
+
+
+def search_flag_profiles(
+    source: Path,
+    cases: list[BenchmarkCase],
+    *,
+    output_root: Path,
+    package_name: str,
+    source_root: Path,
+    style: str,
+    build: BuildRequest,
+    profiles: list[str],
+    bench: BenchRequest | None = None,
+) -> dict[str, object]:
+    """Build one generated module under each flag profile and leave the fastest safe one built.
+
+    ``build.flag_profile`` is the baseline; another profile is chosen only when
+    every case still matches the pure source and it beats the current best by
+    ``MIN_IMPROVEMENT``.
+    """
+    for name in profiles:
+        flag_profile_args(name)
+    (target,) = build_targets_for(output_root, package_name, [source])
+    expected = [evaluate_case(case, package_name=package_name, search_path=[source_root]) for case in cases]
+    candidates = [build.flag_profile, *(name for name in profiles if name != build.flag_profile)]
+    trials: list[dict[str, object]] = []
+    for name in candidates:
+        trials.append(
+            {
+                "profile": name,
+                **_run_trial(
+                    target,
+                    cases,
+                    expected,
+                    source_root=source_root,
+                    style=style,
+                    build=replace(build, flag_profile=name),
+                    output_root=output_root,
+                    bench=bench,
+                ),
+            }
+        )
+
+    baseline = trials[0]
+    best = baseline
+    if baseline["safe"]:
+        for trial in trials[1:]:
+            if _beats(trial, best):
+                best = trial
+    chosen = str(best["profile"])
+    _build_one(target, style=style, build=replace(build, flag_profile=chosen), output_root=output_root)
+    compile_args, link_args = flag_profile_args(chosen)
+    return {
+        "module": relative_module_name(target.module_name, package_name),
+        "status": "tuned" if baseline["safe"] else "failed",
+        "error": None if baseline["safe"] else baseline["error"],
+        "profile": chosen,
+        "compile_args": compile_args,
+        "link_args": link_args,
+        "baseline_seconds": baseline["seconds"],
+        "seconds": best["seconds"],
+        "speedup": (
+            float(baseline["seconds"]) / float(best["seconds"])  # type: ignore[arg-type]
+            if baseline["safe"] and best["seconds"]
+            else None
+        ),
+        "trials": trials,
+    }
+
+
+def search_package_flags(
+    *,
+    output_root: Path,
+    source_root: Path,
+    style: str,
+    cases: list[BenchmarkCase],
+    build: BuildRequest,
+    profiles: list[str] | None = None,
+    modules: list[str] | None = None,
+    bench: BenchRequest | None = None,
+) -> list[dict[str, object]]:
+    """Search flag profiles for every generated module that has benchmark cases.
+
+    ``profiles`` defaults to ``build.flag_search`` and then to every known
+    profile.  Each module's chosen profile is stored for later builds.
+    """
+    package_name = source_root.name
+    profiles = profiles or build.flag_search or list(FLAG_PROFILES)
+    store_path = flags_path(output_root, package_name)
+    store = load_flags(store_path)
+    results: list[dict[str, object]] = []
+    for source in discover_build_sources(output_root, style):
+        module = tuning_key(output_root, package_name, source)
+        if modules is not None and module not in modules:
+            continue
+        module_cases = [case for case in cases if case.module == module]
+        if not module_cases:
+            results.append({"module": module, "status": "skipped", "error": "No benchmark cases name this module."})
+            continue
+        outcome = search_flag_profiles(
+            source,
+            module_cases,
+            output_root=output_root,
+            package_name=package_name,
+            source_root=source_root,
+            style=style,
+            build=build,
+            profiles=profiles,
+            bench=bench,
+        )
+        if outcome["status"] == "tuned":
+            store[module] = outcome
+            save_flags(store_path, store)
+        results.append(outcome)
+    return results
+
+
+def apply_stored_directives(path: Path, module: str, store: dict[str, dict[str, object]]) -> dict[str, object] | None:
+    """Re-apply a module's stored directive set to regenerated output; return the directives applied."""
+    entry = store.get(module)
+    if not entry or not path.exists():
+        return None
+    directives: dict[str, object] = entry["directives"]  # type: ignore[assignment]
+    path.write_text(apply_directive_header(path.read_text(encoding="utf-8"), directives), encoding="utf-8")
+    return directives
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
 import ast
+from collections.abc import Callable
 from copy import deepcopy
 from pathlib import Path
 from tempfile import TemporaryDirectory
+import time
 
-from Cython.Compiler.Main import CompilationOptions, compile_single, default_options
+from recython.validation.memoryview import validate_memoryview_file
+from recython.validation.parallel import validate_parallel_file
+
+# Generated files each prompt profile's extra validator applies to, by style.
+PROFILE_VALIDATED_SUFFIXES = {
+    "memoryview": {"classic": ".pyx", "pure": ".py", "pure_pxd": ".pxd"},
+    "parallel": {"classic": ".pyx", "pure": ".py"},
+}
 
 
 def _success_result(path: Path, validator: str) -> dict[str, object]:
@@ -34,14 +43,18 @@ def validate_python_file(path: Path) -> dict[str, object]:
     return _success_result(path, "python_compile")
 
 
-def validate_cython_file(path: Path) -> dict[str, object]:
+def validate_cython_file(path: Path, *, module_name: str | None = None) -> dict[str, object]:
+    # Imported here: the Cython compiler is slow to load and only this check needs it.
+    from Cython.Compiler.Main import compile_single
+    from Cython.Compiler.Options import CompilationOptions, default_options
+
     try:
         with TemporaryDirectory() as temp_dir:
             options_template = deepcopy(default_options)
             output_file = str(Path(temp_dir) / f"{path.stem}.c")
-            options = CompilationOptions(options_template, output_file=output_file)
-            module_name = ".".join(path.with_suffix("").parts[-3:]).replace("-", "_")
-            result = compile_single(str(path), options, module_name)
+            options = CompilationOptions(options_template, output_file=output_file)  # type: ignore[no-untyped-call]
+            module_name = module_name or ".".join(path.with_suffix("").parts[-3:]).replace("-", "_")
+            result = compile_single(str(path), options, module_name)  # type: ignore[no-untyped-call]
             if getattr(result, "num_errors", 0):
                 raise ValueError(f"Cython reported {result.num_errors} error(s).")
     except Exception as exc:  # pragma: no cover - library-specific exception tree
@@ -49,20 +62,60 @@ def validate_cython_file(path: Path) -> dict[str, object]:
     return _success_result(path, "cython_compile")
 
 
+def _package_module_name(path: Path) -> str:
+    """Dotted name of ``path`` within the packages that contain it, as Cython derives it.
+
+    Cython looks up a module's augmenting ``.pxd`` and resolves relative
+    ``cimport`` statements from this name, so ``sub/mod.py`` must compile as
+    ``sub.mod`` rather than ``mod``.
+    """
+    parts = [] if path.stem == "__init__" else [path.stem]
+    directory = path.parent
+    while any((directory / f"__init__{suffix}").exists() for suffix in (".py", ".pyx", ".pxd")):
+        if directory.parent == directory:
+            break
+        parts.insert(0, directory.name)
+        directory = directory.parent
+    return ".".join(parts) or path.stem
+
+
+def _timed(check: Callable[..., dict[str, object]], path: Path, **kwargs: object) -> dict[str, object]:
+    """Run one validator and record how long it took under ``seconds``."""
+    started = time.perf_counter()
+    result = check(path, **kwargs)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
 def validate_outputs(
     written_files: list[Path],
     *,
     style: str,
     python_compile_enabled: bool,
     cython_compile_enabled: bool,
+    prompt_profile: str = "default",
+    sources: dict[Path, Path] | None = None,
 ) -> dict[str, object]:
+    """Run the enabled validators over ``written_files``.
+
+    ``sources`` maps a generated file to the source it came from, for profile
+    validators that compare the two.  Each result records its wall time under
+    ``seconds``.
+    """
+    profile_suffix = PROFILE_VALIDATED_SUFFIXES.get(prompt_profile, {}).get(style)
     file_results: list[dict[str, object]] = []
 
     for path in written_files:
         if python_compile_enabled and path.suffix == ".py":
-            file_results.append(validate_python_file(path))
+            file_results.append(_timed(validate_python_file, path))
         if cython_compile_enabled and style == "classic" and path.suffix in {".pyx", ".pxd"}:
-            file_results.append(validate_cython_file(path))
+            file_results.append(_timed(validate_cython_file, path))
+        if cython_compile_enabled and style == "pure_pxd" and path.suffix == ".py":
+            file_results.append(_timed(validate_cython_file, path, module_name=_package_module_name(path)))
+        if prompt_profile == "memoryview" and path.suffix == profile_suffix:
+            file_results.append(_timed(validate_memoryview_file, path, source_path=(sources or {}).get(path)))
+        if prompt_profile == "parallel" and path.suffix == profile_suffix:
+            file_results.append(_timed(validate_parallel_file, path))
 
     failed = [item for item in file_results if not item["ok"]]
     return {
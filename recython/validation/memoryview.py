@@ -0,0 +1,189 @@
+"""Static checks for output generated under the ``memoryview`` prompt profile.
+
+The profile asks for sequence inputs to be converted once at the public
+boundary into contiguous typed memoryviews, for the kernels to run with bounds
+checking disabled, and for the Python-facing signatures to stay unchanged.
+These checks read the generated ``.pyx``/``.py``/``.pxd`` text and, when the
+original source is known, compare its public function signatures against the
+output.
+
+Memoryviews and disabled bounds checks are only required of modules whose
+source takes sequence parameters or indexes inside loops (or whose output
+declares memoryviews anyway), and never of files carrying
+``NO_MEMORYVIEW_MARKER``; constants, helpers, and ``__init__`` modules pass.
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+from pathlib import Path
+
+CONTIGUOUS_MEMORYVIEW = re.compile(r"\b(?:cython\.)?\w+\s*\[\s*(?::\s*,\s*)*::\s*1\s*\]")
+ANY_MEMORYVIEW = re.compile(r"\b(?:cython\.)?\w+\s*\[\s*:[\s:,1]*\]")
+BOUNDSCHECK_OFF = re.compile(r"boundscheck\s*[=(]\s*False")
+TOP_LEVEL_DEF = re.compile(r"^(?:cpdef|def)\s+(?:[\w.\[\]:, ]+?\s+)?(\w+)\s*\(", re.MULTILINE)
+NO_MEMORYVIEW_MARKER = "# recython: no memoryview"
+# Annotation names that mark a parameter as a sequence or buffer input.
+SEQUENCE_ANNOTATIONS = {
+    "list",
+    "List",
+    "tuple",
+    "Tuple",
+    "Sequence",
+    "MutableSequence",
+    "array",
+    "ndarray",
+    "NDArray",
+    "ArrayLike",
+    "memoryview",
+    "bytearray",
+    "Buffer",
+}
+
+
+def _split_top_level(text: str, separator: str) -> list[str]:
+    parts: list[str] = []
+    depth = 0
+    current: list[str] = []
+    for char in text:
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        if char == separator and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+def _parameters(raw: str) -> list[tuple[str, str]]:
+    """Return ``(name, declaration)`` for each parameter of a def/cpdef signature."""
+    parameters: list[tuple[str, str]] = []
+    for part in _split_top_level(raw, ","):
+        declaration = _split_top_level(part, "=")[0].strip()
+        if not declaration or declaration in {"*", "/"}:
+            continue
+        declaration = re.sub(r"\s+(?:not|or)\s+None$", "", declaration)
+        annotated = _split_top_level(declaration, ":")
+        if len(annotated) > 1:
+            name = annotated[0].strip()
+        else:
+            match = re.search(r"(\*{0,2}\w+)$", declaration)
+            name = match.group(1) if match else declaration
+        parameters.append((name, declaration))
+    return parameters
+
+
+def public_signatures(text: str) -> dict[str, list[tuple[str, str]]]:
+    """Find the top-level ``def``/``cpdef`` functions of Cython or Python text and their parameters."""
+    signatures: dict[str, list[tuple[str, str]]] = {}
+    for match in TOP_LEVEL_DEF.finditer(text):
+        name = match.group(1)
+        if name.startswith("_"):
+            continue
+        depth = 1
+        index = match.end()
+        while index < len(text) and depth:
+            depth += {"(": 1, ")": -1}.get(text[index], 0)
+            index += 1
+        signatures[name] = _parameters(text[match.end() : index - 1])
+    return signatures
+
+
+def _source_signatures(source_path: Path) -> dict[str, list[str]]:
+    tree = ast.parse(source_path.read_text(encoding="utf-8"), filename=str(source_path))
+    signatures: dict[str, list[str]] = {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef) and not node.name.startswith("_"):
+            arguments = node.args
+            names = [arg.arg for arg in [*arguments.posonlyargs, *arguments.args]]
+            if arguments.vararg:
+                names.append(f"*{arguments.vararg.arg}")
+            names.extend(arg.arg for arg in arguments.kwonlyargs)
+            if arguments.kwarg:
+                names.append(f"**{arguments.kwarg.arg}")
+            signatures[node.name] = names
+    return signatures
+
+
+def _annotation_names(annotation: ast.expr) -> set[str]:
+    names: set[str] = set()
+    for part in ast.walk(annotation):
+        if isinstance(part, ast.Name):
+            names.add(part.id)
+        elif isinstance(part, ast.Attribute):
+            names.add(part.attr)
+    return names
+
+
+def uses_sequences(source_text: str) -> bool:
+    """Whether source code takes sequence or buffer parameters, or indexes anything inside a loop."""
+    tree = ast.parse(source_text)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef | ast.AsyncFunctionDef):
+            arguments = node.args
+            for arg in [*arguments.posonlyargs, *arguments.args, *arguments.kwonlyargs]:
+                if arg.annotation is not None and _annotation_names(arg.annotation) & SEQUENCE_ANNOTATIONS:
+                    return True
+        if isinstance(node, ast.For | ast.AsyncFor | ast.While) and any(
+            isinstance(inner, ast.Subscript) for inner in ast.walk(node)
+        ):
+            return True
+    return False
+
+
+def memoryview_problems(text: str, source_path: Path | None = None, *, compare_signatures: bool = True) -> list[str]:
+    """Return human-readable problems with generated text under the memoryview profile.
+
+    ``compare_signatures`` is off for ``.pxd`` declarations, which list only
+    the functions they type.
+    """
+    problems: list[str] = []
+    needs_views = source_path is not None and uses_sequences(source_path.read_text(encoding="utf-8"))
+    if NO_MEMORYVIEW_MARKER not in text and (needs_views or ANY_MEMORYVIEW.search(text)):
+        if not CONTIGUOUS_MEMORYVIEW.search(text):
+            problems.append(
+                "No contiguous typed memoryview (for example `double[:, ::1]`) is declared; "
+                f"add '{NO_MEMORYVIEW_MARKER}' if the module has no numeric sequence code."
+            )
+        if not BOUNDSCHECK_OFF.search(text):
+            problems.append(
+                "Bounds checking is never disabled; decorate the kernels with `@cython.boundscheck(False)`."
+            )
+
+    generated = public_signatures(text)
+    for name, parameters in generated.items():
+        for parameter, declaration in parameters:
+            if ANY_MEMORYVIEW.search(declaration):
+                problems.append(
+                    f"Public function '{name}' types '{parameter}' as a memoryview, so list callers break; "
+                    "convert at the boundary instead."
+                )
+    if source_path is not None and compare_signatures:
+        for name, expected in _source_signatures(source_path).items():
+            if name not in generated:
+                problems.append(f"Public function '{name}' is missing or no longer callable from Python.")
+                continue
+            actual = [parameter for parameter, _declaration in generated[name]]
+            if actual != expected:
+                problems.append(
+                    f"Public function '{name}' changed its parameters from ({', '.join(expected)}) "
+                    f"to ({', '.join(actual)})."
+                )
+    return problems
+
+
+def validate_memoryview_file(path: Path, *, source_path: Path | None = None) -> dict[str, object]:
+    problems = memoryview_problems(
+        path.read_text(encoding="utf-8"), source_path, compare_signatures=path.suffix != ".pxd"
+    )
+    return {
+        "path": str(path),
+        "validator": "memoryview",
+        "ok": not problems,
+        "error": "\n".join(problems) if problems else None,
+    }
@@ -0,0 +1,113 @@
+"""Checks for output generated under the ``parallel`` prompt profile.
+
+The static check reads the generated text for ``prange`` loops inside
+``nogil`` code.  The threaded check runs after the OpenMP build: every
+benchmark case is evaluated against the pure source once and against the
+compiled tree at several ``OMP_NUM_THREADS`` settings, the values must agree
+within a tolerance (parallel reductions reorder float additions), and the
+timings at each thread count are kept so scaling lands in the manifest.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import TypedDict
+
+from recython.benchmarks import evaluate_case, results_match, run_benchmark_case
+from recython.jobs import BenchmarkCase
+
+DEFAULT_THREAD_COUNTS = (1, 2, 4)
+NO_PARALLEL_MARKER = "# recython: no parallel loop"
+PRANGE = re.compile(r"\bprange\s*\(")
+NOGIL = re.compile(r"\bnogil\b")
+
+
+class ParallelCase(TypedDict):
+    name: str
+    ok: bool
+    error: str | None
+    seconds: dict[str, float]
+    speedup: dict[str, float | None]
+
+
+class ParallelScaling(TypedDict):
+    thread_counts: list[int]
+    ok: bool
+    cases: list[ParallelCase]
+
+
+def thread_counts(counts: tuple[int, ...] = DEFAULT_THREAD_COUNTS) -> list[int]:
+    """Return the thread counts to measure: ``counts`` plus one per CPU, deduplicated."""
+    return sorted({*counts, os.cpu_count() or 1})
+
+
+def parallel_problems(text: str) -> list[str]:
+    if NO_PARALLEL_MARKER in text:
+        return []
+    problems: list[str] = []
+    if not PRANGE.search(text):
+        problems.append(
+            f"No `prange` loop found; parallelize an independent loop or add '{NO_PARALLEL_MARKER}' if none exists."
+        )
+    if not NOGIL.search(text):
+        problems.append("No `nogil` code found; prange loops must run without the GIL.")
+    return problems
+
+
+def validate_parallel_file(path: Path) -> dict[str, object]:
+    problems = parallel_problems(path.read_text(encoding="utf-8"))
+    return {
+        "path": str(path),
+        "validator": "parallel",
+        "ok": not problems,
+        "error": "\n".join(problems) if problems else None,
+    }
+
+
+def check_parallel_scaling(
+    cases: list[BenchmarkCase],
+    *,
+    package_name: str,
+    source_root: Path,
+    compiled_root: Path,
+    counts: list[int] | None = None,
+    rel_tol: float = 1e-6,
+    abs_tol: float = 1e-9,
+) -> ParallelScaling:
+    """Compare each case with the serial source at several thread counts and time it.
+
+    ``speedup`` per thread count is relative to the compiled run with one thread.
+    """
+    counts = counts or thread_counts()
+    results: list[ParallelCase] = []
+    for case in cases:
+        entry: ParallelCase = {"name": case.name, "ok": False, "error": None, "seconds": {}, "speedup": {}}
+        seconds = entry["seconds"]
+        mismatched: list[int] = []
+        try:
+            expected = evaluate_case(case, package_name=package_name, search_path=[source_root])
+            for count in counts:
+                env = {"OMP_NUM_THREADS": str(count)}
+                search_path = [compiled_root, source_root]
+                actual = evaluate_case(case, package_name=package_name, search_path=search_path, env=env)
+                if not results_match(expected, actual, rel_tol=rel_tol, abs_tol=abs_tol):
+                    mismatched.append(count)
+                seconds[str(count)] = min(
+                    run_benchmark_case(case, package_name=package_name, search_path=search_path, env=env)
+                )
+        except Exception as exc:
+            entry["error"] = str(exc)
+            results.append(entry)
+            continue
+        serial = seconds[str(counts[0])]
+        entry["speedup"] = {count: serial / value if value > 0 else None for count, value in seconds.items()}
+        if mismatched:
+            entry["error"] = (
+                f"Results differ from the serial source at {', '.join(map(str, mismatched))} thread(s) "
+                f"(rel_tol={rel_tol}, abs_tol={abs_tol})."
+            )
+        entry["ok"] = not mismatched
+        results.append(entry)
+    return {"thread_counts": counts, "ok": all(item["ok"] for item in results), "cases": results}
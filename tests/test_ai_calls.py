@@ -37,6 +37,13 @@ def test_short_completion(mock_openai_client):
     mock_openai_client.chat.completions.create.assert_called_once()
 
 
+def test_completion_without_attempts_raises(mock_openai_client):
+    with pytest.raises(RuntimeError, match="max_retries"):
+        completion("Test prompt", max_retries=0)
+
+    mock_openai_client.chat.completions.create.assert_not_called()
+
+
 def test_get_client_uses_openrouter_settings():
     ai_calls.CLIENTS.clear()
 
@@ -49,11 +56,14 @@ def test_get_client_uses_openrouter_settings():
                 result = get_client("openrouter", timeout=12)
 
     assert result is client
-    openai_client.assert_called_once_with(
-        api_key="ROUTER-KEY",
-        base_url="https://openrouter.ai/api/v1",
-        timeout=12,
+    openai_client.assert_called_once()
+    kwargs = openai_client.call_args.kwargs
+    assert (kwargs["api_key"], kwargs["base_url"], kwargs["timeout"]) == (
+        "ROUTER-KEY",
+        "https://openrouter.ai/api/v1",
+        12,
     )
+    assert kwargs["max_retries"] == 0  # retries, and their 429s, go through the rate limiter
 
 
 def test_completion_retries_retryable_errors():
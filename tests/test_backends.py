@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from recython.backends import compare_backends, get_backend, recommend_backend
+from recython.cli import main
+from recython.jobs import BenchmarkCase
+
+TYPED_SOURCE = "def total(n: int) -> int:\n    acc = 0\n    for i in range(n):\n        acc += i\n    return acc\n"
+
+
+def _entry(compiled: bool, speedup: float | None) -> dict[str, object]:
+    return {"compiled": compiled, "build_status": "built", "error": None, "speedup": speedup, "import_seconds": None}
+
+
+def test_recommend_backend_prefers_cheapest_good_enough_backend():
+    assert recommend_backend({"cython-classic": _entry(True, 2.0), "cython-pure": _entry(True, 1.9)}) == "cython-pure"
+    assert recommend_backend({"cython-classic": _entry(True, 5.0), "mypyc": _entry(True, 2.0)}) == "cython-classic"
+    assert recommend_backend({"cython-pure": _entry(True, 1.5), "mypyc": _entry(True, 3.0)}) == "mypyc"
+    assert recommend_backend({"cython-classic": _entry(True, None), "cython-pure": _entry(True, None)}) == "cython-pure"
+    assert recommend_backend({"mypyc": _entry(False, None)}) is None
+    converted_pure = {**_entry(True, 2.0), "needs_conversion": True}
+    assert recommend_backend({"cython-pure": converted_pure, "mypyc": _entry(True, 1.9)}) == "mypyc"
+    with pytest.raises(ValueError, match="Unknown backend"):
+        get_backend("nuitka")
+
+
+def test_compare_backends_reports_per_module_and_skips_missing_conversion(tmp_path: Path):
+    source = tmp_path / "loops"
+    source.mkdir()
+    (source / "core.py").write_text(TYPED_SOURCE, encoding="utf-8")
+    cases = [BenchmarkCase(name="total", setup="from loops.core import total", stmt="total(2000)", module="core")]
+
+    report = compare_backends(
+        ["cython-pure", "cython-classic"], source_root=source, work_dir=tmp_path / "work", benchmarks=cases
+    )
+
+    by_backend = {item["backend"]: item for item in report["backends"]}
+    assert "needs a converted output tree" in by_backend["cython-classic"]["error"]
+    assert by_backend["cython-pure"]["ok"] is True
+    (row,) = report["modules"]
+    assert row["module"] == "core"
+    assert row["source_import_seconds"] is not None
+    pure = row["backends"]["cython-pure"]
+    assert pure["compiled"] is True
+    assert pure["speedup"] is not None
+    assert pure["import_seconds"] is not None
+    assert row["recommended"] == "cython-pure"
+    assert pure["needs_conversion"] is False
+    assert not list(source.glob("*.so")), "backends must never build inside the source tree"
+
+
+def test_compare_backends_compiles_a_converted_pure_tree(tmp_path: Path):
+    source = tmp_path / "loops"
+    source.mkdir()
+    (source / "core.py").write_text(TYPED_SOURCE, encoding="utf-8")
+    converted = tmp_path / "pure"
+    converted.mkdir()
+    (converted / "core.py").write_text(
+        "import cython\n\n\n@cython.ccall\ndef total(n: cython.int) -> cython.long:\n"
+        "    acc: cython.long = 0\n    i: cython.int\n    for i in range(n):\n        acc += i\n    return acc\n",
+        encoding="utf-8",
+    )
+
+    report = compare_backends(
+        ["cython-pure"], source_root=source, work_dir=tmp_path / "work", inputs={"cython-pure": converted}
+    )
+
+    (backend,) = report["backends"]
+    assert backend["ok"] is True
+    assert backend["needs_conversion"] is True
+    assert "acc: cython.long" in (tmp_path / "work" / "trees" / "cython-pure" / "core.py").read_text(encoding="utf-8")
+    assert report["modules"][0]["backends"]["cython-pure"]["needs_conversion"] is True
+
+
+def test_backends_command_builds_with_mypyc(tmp_path: Path, capsys):
+    pytest.importorskip("mypyc")
+    source = tmp_path / "loops"
+    source.mkdir()
+    (source / "core.py").write_text(TYPED_SOURCE, encoding="utf-8")
+    (tmp_path / "pyproject.toml").write_text('[tool.recython]\nsource = ["loops"]\n', encoding="utf-8")
+    report_path = tmp_path / "backends.json"
+
+    with patch("pathlib.Path.cwd", return_value=tmp_path):
+        exit_code = main(["backends", "--backend", "mypyc", "--report-json", str(report_path)])
+
+    assert exit_code == 0
+    assert "mypyc: built" in capsys.readouterr().out
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    entry = report["modules"][0]["backends"]["mypyc"]
+    assert entry["compiled"] is True, entry["error"]
+    assert entry["import_seconds"] is not None
+    assert report["modules"][0]["recommended"] == "mypyc"
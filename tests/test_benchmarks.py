@@ -0,0 +1,143 @@
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from recython.benchmarks import (
+    compare_benchmarks,
+    measure_case,
+    measure_memory,
+    run_benchmark_case,
+    summarize_samples,
+)
+from recython.cli import main
+from recython.jobs import BenchmarkCase, BenchRequest
+
+
+def _write_package(root: Path, body: str) -> None:
+    root.mkdir(parents=True)
+    (root / "__init__.py").write_text("", encoding="utf-8")
+    (root / "core.py").write_text(body, encoding="utf-8")
+
+
+def test_compiled_search_path_prefers_output_and_falls_back_to_source(tmp_path: Path):
+    source = tmp_path / "src" / "pkg"
+    compiled = tmp_path / "out"
+    _write_package(source, "VALUE = 'source'\n")
+    (source / "helper.py").write_text("NAME = 'helper'\n", encoding="utf-8")
+    compiled.mkdir()
+    (compiled / "core.py").write_text("VALUE = 'compiled'\n", encoding="utf-8")
+
+    case = BenchmarkCase(
+        name="probe",
+        setup="from pkg.core import VALUE\nfrom pkg.helper import NAME\nassert NAME == 'helper'",
+        stmt="assert VALUE == 'compiled'",
+        repeat=1,
+    )
+
+    timings = run_benchmark_case(case, package_name="pkg", search_path=[compiled, source])
+    assert len(timings) == 1
+
+
+def test_compare_benchmarks_reports_speedup_and_errors(tmp_path: Path):
+    source = tmp_path / "src" / "pkg"
+    compiled = tmp_path / "out"
+    _write_package(source, "def work():\n    return sum(range(1000))\n")
+    compiled.mkdir()
+
+    results = compare_benchmarks(
+        [
+            BenchmarkCase(name="work", setup="from pkg.core import work", stmt="work()", number=5, repeat=2),
+            BenchmarkCase(name="broken", setup="from pkg.core import missing", stmt="missing()"),
+        ],
+        package_name="pkg",
+        source_root=source,
+        compiled_root=compiled,
+    )
+
+    assert results[0]["ok"] is True
+    assert results[0]["speedup"] > 0
+    assert results[1]["ok"] is False
+    assert "missing" in results[1]["error"]
+
+
+def test_summarize_samples_rejects_outliers_and_reports_interval():
+    samples = [1.0, 1.1, 0.9, 1.05, 0.95, 1.0, 9.0]
+
+    stats = summarize_samples(samples)
+
+    assert stats["samples"] == 7
+    assert stats["outliers"] == 1
+    assert stats["max"] == 1.1
+    assert stats["median"] == 1.0
+    assert stats["ci_low"] < stats["mean"] < stats["ci_high"]
+    assert summarize_samples(samples, outlier_iqr=0)["outliers"] == 0
+    assert summarize_samples([2.0])["stdev"] == 0.0
+
+
+def test_measure_case_calibrates_loops_across_worker_processes(tmp_path: Path):
+    source = tmp_path / "src" / "pkg"
+    _write_package(source, "def work():\n    return sum(range(100))\n")
+    case = BenchmarkCase(name="work", setup="from pkg.core import work", stmt="work()", repeat=3)
+    affinity = [sorted(os.sched_getaffinity(0))[0]] if hasattr(os, "sched_getaffinity") else []
+
+    stats = measure_case(
+        case,
+        package_name="pkg",
+        search_path=[source],
+        bench=BenchRequest(processes=2, min_time=0.005, cpu_affinity=affinity),
+    )
+
+    assert stats["processes"] == 2
+    assert stats["samples"] == 6
+    assert all(number > 1 for number in stats["numbers"])
+    assert stats["median"] < 0.005
+    if affinity:
+        assert stats["affinity"] == affinity
+
+
+def test_bench_command_writes_json_statistics(tmp_path: Path, capsys):
+    source = tmp_path / "pkg"
+    _write_package(source, "def work():\n    return sum(range(100))\n")
+    (tmp_path / "out").mkdir()
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.recython]\nsource = ["pkg"]\noutput_root = "out"\n\n'
+        "[tool.recython.bench]\nprocesses = 1\nmin_time = 0.002\n\n"
+        '[[tool.recython.benchmarks]]\nname = "work"\nsetup = "from pkg.core import work"\nstmt = "work()"\n'
+        "repeat = 4\n",
+        encoding="utf-8",
+    )
+    report_path = tmp_path / "bench.json"
+
+    with patch("pathlib.Path.cwd", return_value=tmp_path):
+        assert main(["bench", "--processes", "2", "--report-json", str(report_path)]) == 0
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert report["settings"]["processes"] == 2
+    (case,) = report["cases"]
+    assert case["pure_stats"]["samples"] == 8
+    assert case["compiled_stats"]["processes"] == 2
+    assert 0 < case["speedup_low"] <= case["speedup_high"]
+    assert case["pure_memory"]["tracemalloc_peak_bytes"] >= 0
+    assert case["memory_ratio"] is not None
+    output = capsys.readouterr().out
+    assert "work [pure]: median=" in output
+    assert "work [compiled]: peak alloc=" in output
+
+
+def test_measure_memory_counts_objects_kept_alive(tmp_path: Path):
+    source = tmp_path / "src" / "pkg"
+    _write_package(source, "class Point:\n    def __init__(self, x):\n        self.x = x\n")
+    case = BenchmarkCase(
+        name="points", setup="from pkg.core import Point\nkept = []", stmt="kept.extend(Point(i) for i in range(2000))"
+    )
+
+    memory = measure_memory(case, package_name="pkg", search_path=[source])
+
+    assert memory["gc_containers_delta"] >= 2000
+    assert memory["top_container_deltas"]["Point"] == 2000
+    assert memory["live_blocks_delta"] >= 2000
+    assert memory["tracemalloc_peak_bytes"] > 2000 * 16
+    if sys.platform != "win32":
+        assert memory["peak_rss_delta_bytes"] >= 0
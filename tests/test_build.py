@@ -0,0 +1,93 @@
+from pathlib import Path
+
+from recython.build import build_extensions, build_targets_for, extension_suffix
+
+
+def test_build_targets_for_maps_paths_to_dotted_names(tmp_path: Path):
+    sources = [tmp_path / "core.pyx", tmp_path / "sub" / "util.py", tmp_path / "sub" / "__init__.py"]
+
+    targets = build_targets_for(tmp_path, "pkg", sources)
+
+    assert [target.module_name for target in targets] == ["pkg.core", "pkg.sub.util", "pkg.sub"]
+
+
+def test_build_extensions_places_modules_next_to_sources(tmp_path: Path):
+    output_root = tmp_path / "out"
+    output_root.mkdir()
+    (output_root / "good.pyx").write_text("cpdef int twice(int x):\n    return x * 2\n", encoding="utf-8")
+    (output_root / "bad.pyx").write_text("cdef int broken(:\n", encoding="utf-8")
+
+    results = build_extensions(
+        build_targets_for(output_root, "pkg", [output_root / "good.pyx", output_root / "bad.pyx"]),
+        output_root=output_root,
+        package_name="pkg",
+        build_dir=tmp_path / "build",
+    )
+
+    good, bad = results
+    assert good["ok"] is True
+    assert Path(good["path"]) == output_root / f"good{extension_suffix()}"
+    assert Path(good["path"]).exists()
+    assert bad["ok"] is False
+
+
+def test_build_extensions_is_incremental_and_restores_from_cache(tmp_path: Path):
+    output_root = tmp_path / "out"
+    output_root.mkdir()
+    (output_root / "alpha.pyx").write_text("cpdef int one():\n    return 1\n", encoding="utf-8")
+    (output_root / "beta.pyx").write_text("cpdef int two():\n    return 2\n", encoding="utf-8")
+    options = dict(output_root=output_root, package_name="pkg", build_dir=tmp_path / "build", jobs=2)
+    targets = build_targets_for(output_root, "pkg", [output_root / "alpha.pyx", output_root / "beta.pyx"])
+
+    first = build_extensions(targets, **options)
+    second = build_extensions(targets, **options)
+    (output_root / "beta.pyx").write_text("cpdef int two():\n    return 22\n", encoding="utf-8")
+    (output_root / f"alpha{extension_suffix()}").unlink()
+    third = build_extensions(targets, **options)
+    with_flags = build_extensions(targets, extra_compile_args=["-O1"], **options)
+
+    assert [item["status"] for item in first] == ["built", "built"]
+    assert [item["status"] for item in second] == ["up-to-date", "up-to-date"]
+    assert [item["status"] for item in third] == ["cached", "built"]
+    assert [item["status"] for item in with_flags] == ["built", "built"]
+
+
+def test_build_command_builds_in_place_and_writes_wheel(tmp_path: Path, capsys):
+    import zipfile
+
+    from recython.cli import main
+
+    source = tmp_path / "src" / "pkg"
+    source.mkdir(parents=True)
+    (source / "__init__.py").write_text("", encoding="utf-8")
+    (source / "core.py").write_text("def one():\n    return 1\n", encoding="utf-8")
+    (source / "helpers.py").write_text("X = 1\n", encoding="utf-8")
+    output_root = tmp_path / "out"
+    output_root.mkdir()
+    (output_root / "core.pyx").write_text("cpdef int one():\n    return 1\n", encoding="utf-8")
+
+    exit_code = main(
+        [
+            "build",
+            str(output_root),
+            "--style",
+            "classic",
+            "--source",
+            str(source),
+            "--wheel",
+            "--dist-dir",
+            str(tmp_path / "dist"),
+            "--version",
+            "1.2.3",
+        ]
+    )
+
+    captured = capsys.readouterr()
+    assert exit_code == 0
+    assert "pkg.core [built]" in captured.out
+    wheel = next((tmp_path / "dist").glob("pkg-1.2.3-*.whl"))
+    names = zipfile.ZipFile(wheel).namelist()
+    assert f"pkg/core{extension_suffix()}" in names
+    assert "pkg/core.py" not in names
+    assert "pkg/helpers.py" in names
+    assert "pkg-1.2.3.dist-info/RECORD" in names
@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+from recython.benchmarks import summarize_modules
+from recython.config import RecythonConfig
+from recython.engine import build_run_request, execute_run_with_pack
+from recython.jobs import BenchmarkCase, ValidationRequest
+from recython.prompts import load_prompt_pack
+
+SOURCE = "def total(n):\n    acc = 0\n    for i in range(n):\n        acc += i\n    return acc\n"
+
+
+def _request(tmp_path: Path, source: Path, style: str, benchmarks: list[BenchmarkCase]):
+    return build_run_request(
+        source_root=source,
+        output_root=tmp_path / "out",
+        style=style,
+        provider="openai",
+        model="gpt-4o-mini",
+        temperature=0.0,
+        max_completion_tokens=4000,
+        exclude=[],
+        include=[],
+        prompt_profile="default",
+        max_attempts=1,
+        maintenance_mode=False,
+        baseline_manifest=None,
+        write_manifest=True,
+        dry_run=False,
+        validation=ValidationRequest(),
+        benchmarks=benchmarks,
+    )
+
+
+def test_compile_only_builds_without_llm_and_writes_baseline(tmp_path: Path):
+    source = tmp_path / "loops"
+    source.mkdir()
+    (source / "core.py").write_text(SOURCE, encoding="utf-8")
+    cases = [BenchmarkCase(name="total", setup="from loops.core import total", stmt="total(2000)", module="core")]
+    pack = load_prompt_pack(RecythonConfig(project_root=tmp_path))
+
+    with patch("recython.ai_calls.completion") as completion:
+        result = execute_run_with_pack(_request(tmp_path, source, "compile-only", cases), pack)
+
+    completion.assert_not_called()
+    assert (tmp_path / "out" / "core.py").read_text(encoding="utf-8") == SOURCE
+    assert result.prompts_used == []
+    assert result.build_results[0]["ok"] is True
+    assert result.benchmark_results[0]["ok"] is True, result.benchmark_results[0]["error"]
+    row = result.module_report[0]
+    assert row["module"] == "core"
+    assert row["compiled"] is True
+    assert row["speedup"] > 0
+    baseline = json.loads((tmp_path / ".recython" / "baselines" / "loops.compile-only.json").read_text("utf-8"))
+    assert baseline["modules"][0]["module"] == "core"
+    assert "## Modules" in result.report_path.read_text(encoding="utf-8")
+
+
+def test_summarize_modules_compares_against_baseline():
+    cases = [
+        BenchmarkCase(name="a", stmt="", module="core"),
+        BenchmarkCase(name="b", stmt="", module="core"),
+        BenchmarkCase(name="c", stmt=""),
+    ]
+    build_results = [{"module": "pkg.core", "ok": True, "status": "built"}]
+    benchmark_results = [
+        {"name": "a", "ok": True, "speedup": 2.0},
+        {"name": "b", "ok": True, "speedup": 8.0},
+        {"name": "c", "ok": False, "speedup": None},
+    ]
+
+    rows = summarize_modules(
+        cases,
+        build_results,
+        benchmark_results,
+        package_name="pkg",
+        baseline=[{"module": "core", "speedup": 2.0}],
+    )
+
+    by_module = {row["module"]: row for row in rows}
+    assert by_module["core"]["speedup"] == 4.0
+    assert by_module["core"]["vs_baseline"] == 2.0
+    assert by_module["(package)"]["speedup"] is None
@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from recython.config import load_config
+from recython.config import load_config, render_starter_config
 from recython.prompts import load_prompt_pack
 
 
@@ -51,3 +51,45 @@ def test_prompt_profile_changes_loaded_prompt_text(tmp_path: Path):
 
     assert default_pack.templates["pure"].text != safe_pack.templates["pure"].text
     assert "Prefer correctness and readability" in safe_pack.templates["pure"].text
+
+
+def test_load_config_reads_benchmark_cases(tmp_path: Path):
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(
+        """
+[tool.recython]
+style = "pure_pxd"
+
+[[tool.recython.benchmarks]]
+name = "fit"
+setup = "from pkg.core import fit"
+stmt = "fit()"
+repeat = 3
+
+[tool.recython.bench]
+processes = 5
+cpu_affinity = [0]
+""".strip(),
+        encoding="utf-8",
+    )
+
+    config = load_config(pyproject)
+
+    assert config.style == "pure_pxd"
+    assert len(config.benchmarks) == 1
+    assert config.benchmarks[0].name == "fit"
+    assert config.benchmarks[0].repeat == 3
+    assert config.benchmarks[0].number == 0
+    assert config.bench.processes == 5
+    assert config.bench.cpu_affinity == [0]
+    assert config.bench.min_time == 0.02
+
+
+def test_starter_config_loads(tmp_path: Path):
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(render_starter_config(), encoding="utf-8")
+
+    config = load_config(pyproject, start_path=tmp_path)
+
+    assert config.simulated.responses == []
+    assert config.benchmarks == []
@@ -480,3 +480,108 @@ def test_execute_run_retries_when_output_file_missing(tmp_path: Path):
 
     assert mock_completion.call_count == 2
     assert (tmp_path / "out" / "module.py").read_text(encoding="utf-8") == "x = 1"
+
+
+def test_small_files_share_a_packed_prompt_and_fall_back_per_file(tmp_path: Path):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    for name in ("a", "b", "c"):
+        (source / f"{name}.py").write_text(f"{name} = 1\n", encoding="utf-8")
+    (source / "large.py").write_text("x = 1\n" * 200, encoding="utf-8")
+
+    request = build_run_request(
+        source_root=source,
+        output_root=tmp_path / "out",
+        style="pure",
+        provider="openai",
+        model="gpt-4o-mini",
+        temperature=0.0,
+        max_completion_tokens=4000,
+        exclude=[],
+        include=[],
+        prompt_profile="default",
+        max_attempts=2,
+        maintenance_mode=False,
+        baseline_manifest=None,
+        write_manifest=True,
+        dry_run=False,
+        validation=ValidationRequest(),
+        pack_tokens=200,
+    )
+    pack = load_prompt_pack(RecythonConfig(project_root=tmp_path))
+    prompts: list[str] = []
+
+    def completion(prompt: str, **_kwargs: object) -> str:
+        prompts.append(prompt)
+        if "# ==== module: a.py ====" in prompt:
+            return "```python file=a.py\na = 2\n```\n```python file=b.py\ndef broken(:\n```"
+        return "```python\nprint('single')\n```"
+
+    with patch("recython.ai_calls.completion", side_effect=completion):
+        result = execute_run_with_pack(request, pack)
+
+    assert [planned.pack for planned in result.planned_files] == [0, 0, 0, None]
+    assert len(prompts) == 4  # the pack, b's repair, c's own request, large.py
+    assert "# ==== module: c.py ====" in prompts[0]
+    assert (tmp_path / "out" / "a.py").read_text(encoding="utf-8") == "a = 2"
+    assert (tmp_path / "out" / "b.py").read_text(encoding="utf-8") == "print('single')"
+    assert (tmp_path / "out" / "c.py").read_text(encoding="utf-8") == "print('single')"
+    assert len(result.validation_results["attempts"][str(source / "b.py")]) == 2
+    assert result.packs == [
+        {
+            "pack": 0,
+            "files": ["a.py", "b.py", "c.py"],
+            "model": "gpt-4o-mini",
+            "returned": ["a.py", "b.py"],
+            "error": None,
+        }
+    ]
+    assert (result.artifacts_dir / "responses" / "pack-0.pure.txt").exists()
+    assert sorted(path.name for path in (result.artifacts_dir / "prompts").glob("*.pure.md")) == [
+        "b.py.attempt2.pure.md",
+        "c.py.attempt1.pure.md",
+        "large.py.attempt1.pure.md",
+        "pack-0.pure.md",
+    ]
+
+
+def test_failed_pack_keeps_its_prompt_and_falls_back_per_file(tmp_path: Path):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    for name in ("a", "b"):
+        (source / f"{name}.py").write_text(f"{name} = 1\n", encoding="utf-8")
+
+    request = build_run_request(
+        source_root=source,
+        output_root=tmp_path / "out",
+        style="pure",
+        provider="openai",
+        model="gpt-4o-mini",
+        temperature=0.0,
+        max_completion_tokens=4000,
+        exclude=[],
+        include=[],
+        prompt_profile="default",
+        max_attempts=1,
+        maintenance_mode=False,
+        baseline_manifest=None,
+        write_manifest=True,
+        dry_run=False,
+        validation=ValidationRequest(),
+        pack_tokens=200,
+    )
+    pack = load_prompt_pack(RecythonConfig(project_root=tmp_path))
+
+    def completion(prompt: str, **_kwargs: object) -> str:
+        if "# ==== module: a.py ====" in prompt:
+            raise RuntimeError("pack rejected")
+        return "```python\nprint('single')\n```"
+
+    with patch("recython.ai_calls.completion", side_effect=completion):
+        result = execute_run_with_pack(request, pack)
+
+    assert result.packs[0]["error"] == "pack rejected"
+    pack_prompt = (result.artifacts_dir / "prompts" / "pack-0.pure.md").read_text(encoding="utf-8")
+    assert "# ==== module: b.py ====" in pack_prompt
+    assert not (result.artifacts_dir / "responses" / "pack-0.pure.txt").exists()
+    assert (tmp_path / "out" / "a.py").read_text(encoding="utf-8") == "print('single')"
@@ -0,0 +1,78 @@
+from pathlib import Path
+from unittest.mock import patch
+
+from recython.config import RecythonConfig
+from recython.engine import build_run_request, execute_run_with_pack, plan_run
+from recython.escalation import (
+    complexity_band,
+    escalation_path,
+    load_escalation,
+    measure_source,
+    predict_start_tier,
+    record_escalation,
+)
+from recython.jobs import ValidationRequest
+from recython.prompts import load_prompt_pack
+
+LADDER = ["small", "medium", "large"]
+
+
+def _request(source: Path, output: Path, *, dry_run: bool = False):
+    return build_run_request(
+        source_root=source,
+        output_root=output,
+        style="pure",
+        provider="openai",
+        model="small",
+        models=LADDER,
+        temperature=0.0,
+        max_completion_tokens=4000,
+        exclude=[],
+        include=[],
+        prompt_profile="default",
+        max_attempts=1,
+        maintenance_mode=False,
+        baseline_manifest=None,
+        write_manifest=True,
+        dry_run=dry_run,
+        validation=ValidationRequest(),
+    )
+
+
+def test_failed_attempts_climb_the_ladder_and_are_recorded(tmp_path: Path):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "module.py").write_text("def f(x):\n    return x\n", encoding="utf-8")
+    request = _request(source, tmp_path / "out")
+    responses = ["```python\ndef broken(:\n```", "```python\ndef broken(:\n```", "```python\nprint('ok')\n```"]
+
+    with patch("recython.ai_calls.completion", side_effect=responses) as completion:
+        result = execute_run_with_pack(request, load_prompt_pack(RecythonConfig(project_root=tmp_path)))
+
+    assert [call.kwargs["model"] for call in completion.call_args_list] == LADDER  # max_attempts raised to 3
+    row = result.escalation["files"]["module.py"]
+    assert (row["start_tier"], row["tier"], row["model"], row["ok"]) == (0, 2, "large", True)
+    assert "## Model escalation" in result.report_path.read_text(encoding="utf-8")
+    (record,) = load_escalation(escalation_path(request.output_root, "pkg"))
+    assert record["attempts"] == 3 and record["models"] == LADDER
+
+
+def test_plan_starts_files_at_the_tier_their_band_needed(tmp_path: Path):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    text = "def f(x):\n    if x:\n        return 1\n    return 2\n"
+    (source / "module.py").write_text(text, encoding="utf-8")
+    size = measure_source(text)
+    assert size == {"lines": 4, "complexity": 2}
+    record = {"models": LADDER, **size, "start_tier": 0, "attempts": 2, "ok": True}
+    record_escalation(escalation_path(tmp_path / "out", "pkg"), [{**record, "tier": 1}] * 3)
+
+    (planned,) = plan_run(_request(source, tmp_path / "out", dry_run=True)).planned_files
+
+    assert planned.start_tier == 1
+    bigger = {"lines": 400, "complexity": 40}
+    assert complexity_band(**bigger) != complexity_band(**size)
+    assert predict_start_tier([{**record, "tier": 1}] * 3, models=LADDER, **bigger) == 0  # another band
+    assert predict_start_tier([{**record, "tier": 1}] * 3, models=["other"], **size) == 0  # another ladder
+    passed_at_start = {**record, "start_tier": 1, "tier": 1, "attempts": 1}
+    assert predict_start_tier([passed_at_start] * 3, models=LADDER, **size) == 0  # probes one tier lower
@@ -0,0 +1,90 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from recython import hedging
+from recython.ai_calls import _simulated_response, completion
+from recython.hedging import HedgeCancelled, LatencyTracker, race, tracker_for
+from recython.jobs import HedgeRequest, SimulatedRequest
+
+
+@pytest.fixture(autouse=True)
+def fresh_trackers():
+    hedging.TRACKERS.clear()
+    yield
+    hedging.TRACKERS.clear()
+
+
+def test_hedge_delay_waits_for_samples_and_uses_the_percentile():
+    tracker = LatencyTracker()
+    settings = HedgeRequest(percentile=0.9, min_samples=10, min_delay=0.5)
+    for seconds in range(1, 10):
+        tracker.record(float(seconds))
+    assert tracker.hedge_delay(settings) is None
+
+    tracker.record(10.0)
+    assert tracker.hedge_delay(settings) == 9.0
+    assert tracker.hedge_delay(HedgeRequest(percentile=0.1, min_samples=10, min_delay=2.5)) == 2.5
+
+
+def test_race_takes_the_first_success_and_cancels_the_loser():
+    cancelled = threading.Event()
+
+    def slow(cancel: threading.Event) -> str:
+        if cancel.wait(2.0):
+            cancelled.set()
+            raise HedgeCancelled
+        return "slow"
+
+    started = time.perf_counter()
+    assert race(slow, lambda _cancel: "fast", 0.05) == ("fast", True, True)
+    assert time.perf_counter() - started < 1.0
+    assert cancelled.wait(1.0)
+    assert race(lambda _cancel: "quick", slow, 1.0) == ("quick", False, False)
+
+
+def test_completion_hedges_a_slow_call_to_the_alternate_model():
+    def create(*, model: str, **_kwargs: object) -> SimpleNamespace:
+        time.sleep(1.0 if model == "slow" else 0.0)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=model))],
+            usage=SimpleNamespace(prompt_tokens=3, completion_tokens=2, prompt_tokens_details=None),
+        )
+
+    client = MagicMock()
+    client.chat.completions.create.side_effect = create
+    for _ in range(3):
+        tracker_for("openai", "slow").record(0.05)
+    usage: dict[str, int] = {}
+
+    with patch("recython.ai_calls.get_client", return_value=client):
+        started = time.perf_counter()
+        reply = completion(
+            "prompt",
+            model="slow",
+            usage=usage,
+            hedge=HedgeRequest(enabled=True, min_samples=3, min_delay=0.0, model="fast"),
+        )
+
+    assert reply == "fast"
+    assert time.perf_counter() - started < 0.8
+    assert (usage["hedged"], usage["hedge_won"], usage["completion_tokens"]) == (1, 1, 2)
+    assert tracker_for("openai", "slow").snapshot() | {"median_seconds": None} == {
+        "calls": 1,
+        "hedged": 1,
+        "hedge_wins": 1,
+        "samples": 3,
+        "median_seconds": None,
+    }
+
+
+def test_simulated_calls_stop_when_cancelled():
+    cancel = threading.Event()
+    cancel.set()
+    started = time.perf_counter()
+    with pytest.raises(HedgeCancelled):
+        _simulated_response("prompt", SimulatedRequest(latency="fixed", latency_median=5.0), cancel)
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,106 @@
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from recython.cli import main
+from recython.history import case_trend, compare_runs, history_path, load_run, record_run, resolve_run
+from recython.jobs import BenchmarkCase
+
+FAST = "def work():\n    return sum(range(50))\n"
+SLOW = "def work():\n    return sum(sum(range(50)) for _ in range(40)) // 40\n"
+
+
+def _stats(mean: float, stdev: float, kept: int = 10) -> dict[str, float]:
+    return {"mean": mean, "median": mean, "stdev": stdev, "kept": kept}
+
+
+def _result(name: str, pure: float, compiled: float, stdev: float) -> dict[str, object]:
+    return {
+        "name": name,
+        "ok": True,
+        "error": None,
+        "pure_seconds": pure,
+        "compiled_seconds": compiled,
+        "speedup": pure / compiled,
+        "pure_stats": _stats(pure, pure * stdev),
+        "compiled_stats": _stats(compiled, compiled * stdev),
+        "memory_ratio": None,
+    }
+
+
+def test_compare_runs_flags_only_significant_drops(tmp_path: Path):
+    store = history_path(tmp_path / "out")
+    cases = [BenchmarkCase(name="steady", stmt="x"), BenchmarkCase(name="noisy", stmt="x", module="core")]
+    baseline = record_run(
+        store,
+        [_result("steady", 1.0, 0.1, 0.01), _result("noisy", 1.0, 0.1, 0.01)],
+        cases,
+        package="pkg",
+        origin="bench",
+        cwd=tmp_path,
+    )
+
+    rows = compare_runs(
+        load_run(store, baseline),
+        [_result("steady", 1.0, 0.2, 0.01), _result("noisy", 1.0, 0.2, 3.0), _result("new", 1.0, 0.2, 0.01)],
+        threshold=0.1,
+    )
+
+    steady, noisy, new = rows
+    assert steady["change"] == pytest.approx(-0.5)
+    assert steady["regression"] is True
+    assert noisy["change"] == pytest.approx(-0.5)
+    assert noisy["significant"] is False and noisy["regression"] is False
+    assert new["change"] is None and new["regression"] is False
+    assert load_run(store, baseline)["results"][0]["module"] == "core"
+
+
+def test_resolve_run_and_trend(tmp_path: Path):
+    store = history_path(tmp_path / "out")
+    cases = [BenchmarkCase(name="work", stmt="x")]
+    first = record_run(store, [_result("work", 1.0, 0.5, 0.01)], cases, package="pkg", origin="bench", cwd=tmp_path)
+    second = record_run(store, [_result("work", 1.0, 0.25, 0.01)], cases, package="pkg", origin="bench", cwd=tmp_path)
+
+    assert resolve_run(store, "latest", package="pkg") == second
+    assert resolve_run(store, "latest", package="pkg", exclude=second) == first
+    assert resolve_run(store, first, package="pkg") == first
+    with pytest.raises(ValueError, match="No benchmark run matches"):
+        resolve_run(store, "latest", package="other")
+    trend = case_trend(store, package="pkg")
+    assert [entry["speedup"] for entry in trend["work"]] == [2.0, 4.0]
+    assert [entry["run_id"] for entry in case_trend(store, package="pkg", limit=1)["work"]] == [second]
+
+
+def test_bench_compare_exits_non_zero_on_regression(tmp_path: Path, capsys):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "__init__.py").write_text("", encoding="utf-8")
+    (source / "core.py").write_text(SLOW, encoding="utf-8")
+    output_root = tmp_path / "out"
+    output_root.mkdir()
+    (output_root / "core.py").write_text(FAST, encoding="utf-8")
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.recython]\nsource = ["pkg"]\noutput_root = "out"\n\n'
+        "[tool.recython.bench]\nprocesses = 2\nmin_time = 0.002\nmemory = false\n\n"
+        '[[tool.recython.benchmarks]]\nname = "work"\nsetup = "from pkg.core import work"\nstmt = "work()"\n'
+        "repeat = 5\n",
+        encoding="utf-8",
+    )
+    report_path = tmp_path / "bench.json"
+
+    with patch("pathlib.Path.cwd", return_value=tmp_path):
+        assert main(["bench"]) == 0
+        (output_root / "core.py").write_text(SLOW, encoding="utf-8")
+        assert main(["bench", "--compare", "latest", "--report-json", str(report_path)]) == 1
+        capsys.readouterr()
+        assert main(["history", "--case", "work"]) == 0
+
+    comparison = json.loads(report_path.read_text(encoding="utf-8"))["comparison"]
+    (row,) = comparison["cases"]
+    assert row["regression"] is True
+    assert row["change"] < -0.1
+    output = capsys.readouterr().out
+    assert output.startswith("work:\n")
+    assert output.count(" bench ") == 2
@@ -0,0 +1,113 @@
+import cProfile
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+from recython.cli import main
+from recython.hotspots import collect_hotspots, function_spans, load_profile_shares, parse_annotation
+
+GENERATED = """def typed(int n):
+    cdef double acc = 0.0
+    cdef int i
+    for i in range(n):
+        acc += i * 0.5
+    return acc
+
+
+def untyped(values):
+    total = 0
+    for value in values:
+        total += value * 2
+    return total
+"""
+
+
+def test_function_spans_follow_indentation_and_cdef_signatures():
+    source = (
+        "cdef class Body:\n    cdef double x\n\n    cpdef double step(self, double dt):\n"
+        "        def inner():\n            return dt\n        return inner()\n\n"
+        "cdef inline double square(double y) nogil:\n    return y * y\n"
+    )
+
+    assert function_spans(source) == [("Body.step", 4, 7), ("Body.step.inner", 5, 6), ("square", 9, 10)]
+
+
+def test_parse_annotation_reads_line_scores():
+    report = (
+        '<pre class="cython line score-12" onclick="x">+<span class="">01</span>: def f():</pre>\n'
+        '<pre class="cython line score-0">&#xA0;<span class="">02</span>: pass</pre>\n'
+    )
+
+    assert parse_annotation(report) == {1: 12, 2: 0}
+
+
+def test_collect_hotspots_weights_by_profile_share(tmp_path: Path):
+    source = tmp_path / "core.pyx"
+    source.write_text(GENERATED, encoding="utf-8")
+    report = tmp_path / "core.html"
+    report.write_text(
+        "".join(
+            f'<pre class="cython line score-{score}">+<span class="">{line:02d}</span>: x</pre>\n'
+            for line, score in {1: 30, 4: 2, 9: 30, 11: 20, 12: 25}.items()
+        ),
+        encoding="utf-8",
+    )
+    modules = [("core", source, report), ("broken", tmp_path / "broken.pyx", None)]
+
+    plain = collect_hotspots(modules)
+    weighted = collect_hotspots(modules, profile={("core", "typed"): 0.9, ("core", "untyped"): 0.01}, top=2)
+
+    assert [row["function"] for row in plain["functions"]] == ["untyped", "typed"]
+    assert plain["lines"][0] == {
+        "module": "core",
+        "function": "typed",
+        "path": str(source),
+        "line": 1,
+        "score": 30,
+        "weighted_score": 30.0,
+        "code": "def typed(int n):",
+    }
+    assert [row["function"] for row in weighted["functions"]] == ["typed", "untyped"]
+    assert len(weighted["lines"]) == 2
+    assert {row["module"]: row["ok"] for row in weighted["modules"]} == {"core": True, "broken": False}
+
+
+def test_load_profile_shares_maps_files_to_modules(tmp_path: Path):
+    package = tmp_path / "pkg"
+    package.mkdir()
+    (package / "core.py").write_text("def spin(n):\n    return sum(i * i for i in range(n))\n", encoding="utf-8")
+    namespace: dict[str, object] = {}
+    exec(compile((package / "core.py").read_text(), str(package / "core.py"), "exec"), namespace)
+    profiler = cProfile.Profile()
+    profiler.runcall(namespace["spin"], 20000)
+    profile_path = tmp_path / "profile.pstats"
+    profiler.dump_stats(profile_path)
+
+    shares = load_profile_shares(profile_path, [package])
+
+    assert 0 < shares[("core", "spin")] <= 1
+    assert all(module == "core" for module, _ in shares)
+
+
+def test_report_annotate_ranks_generated_lines(tmp_path: Path, capsys):
+    output_root = tmp_path / "out"
+    output_root.mkdir()
+    (output_root / "core.pyx").write_text(GENERATED, encoding="utf-8")
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.recython]\nsource = ["pkg"]\noutput_root = "out"\nstyle = "classic"\n', encoding="utf-8"
+    )
+    report_path = tmp_path / "hotspots.json"
+
+    with patch("pathlib.Path.cwd", return_value=tmp_path):
+        assert main(["report", "--annotate", "--top", "5", "--report-json", str(report_path)]) == 0
+
+    hotspots = json.loads(report_path.read_text(encoding="utf-8"))
+    assert hotspots["weighted"] is False
+    (module,) = hotspots["modules"]
+    assert module["module"] == "core" and module["score"] > 0
+    assert hotspots["functions"][0]["function"] == "untyped"
+    assert len(hotspots["lines"]) == 5
+    assert (
+        (tmp_path / ".recython" / "hotspots" / "pkg.md").read_text(encoding="utf-8").startswith("# Annotation hotspots")
+    )
+    assert f"{output_root / 'core.pyx'}:" in capsys.readouterr().out
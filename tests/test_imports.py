@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+# Libraries that take longer to import than the commands below take to run.
+HEAVY_MODULES = ("openai", "Cython.Compiler.Main", "Cython.Build", "setuptools")
+# Cumulative import time of the ``recython`` modules per subcommand, in milliseconds.
+# About 100 ms on a warm developer machine; the slack absorbs slow CI runners.
+IMPORT_BUDGETS_MS = {
+    ("prompts", "list"): 400,
+    ("config", "init"): 400,
+    ("plan", "pkg", "out", "--style", "pure"): 400,
+}
+
+
+def _import_times(args: tuple[str, ...], cwd: Path) -> dict[str, int]:
+    """Run ``python -X importtime -m recython *args`` and return the cumulative microseconds per top-level import."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")]))}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "recython", *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name[1:].rstrip()] = int(cumulative)  # nested imports keep their indentation
+    return times
+
+
+@pytest.mark.parametrize("args", list(IMPORT_BUDGETS_MS), ids=" ".join)
+def test_non_llm_commands_skip_heavy_imports(args: tuple[str, ...], tmp_path: Path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "module.py").write_text("print('hi')", encoding="utf-8")
+
+    times = _import_times(args, tmp_path)
+
+    imported = {name.strip() for name in times}
+    assert not imported & set(HEAVY_MODULES)
+    top_level = sum(value for name, value in times.items() if name.startswith("recython"))
+    assert top_level / 1000 < IMPORT_BUDGETS_MS[args]
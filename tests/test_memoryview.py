@@ -0,0 +1,167 @@
+from pathlib import Path
+from unittest.mock import patch
+
+from recython.config import RecythonConfig
+from recython.engine import build_run_request, execute_run_with_pack
+from recython.jobs import ValidationRequest
+from recython.prompts import load_prompt_pack
+from recython.validation import validate_outputs
+from recython.validation.compile import validate_cython_file
+from recython.validation.memoryview import NO_MEMORYVIEW_MARKER, memoryview_problems, public_signatures
+
+SOURCE = """
+def score(features: list[list[float]], weights: list[float], bias: float = 0.0) -> float:
+    total = 0.0
+    for row in features:
+        for index, value in enumerate(row):
+            total += weights[index] * value + bias
+    return total
+"""
+
+GOOD_PYX = """
+cimport cython
+from cython.view cimport array as cvarray
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef double _score(double[:, ::1] features, double[::1] weights, double bias):
+    cdef Py_ssize_t i, j
+    cdef double total = 0.0
+    for i in range(features.shape[0]):
+        for j in range(features.shape[1]):
+            total += weights[j] * features[i, j] + bias
+    return total
+
+
+def score(features, weights, double bias=0.0):
+    cdef Py_ssize_t rows = len(features), cols = len(features[0]), i, j
+    cdef double[:, ::1] matrix = cvarray(shape=(rows, cols), itemsize=sizeof(double), format="d")
+    cdef double[::1] vector = cvarray(shape=(cols,), itemsize=sizeof(double), format="d")
+    for i in range(rows):
+        for j in range(cols):
+            matrix[i, j] = features[i][j]
+    for j in range(cols):
+        vector[j] = weights[j]
+    return _score(matrix, vector, bias)
+"""
+
+PXD = "```cython\n# No declarations\n```"
+
+BAD_PYX = """
+def score(double[:, ::1] features, weights):
+    return 0.0
+"""
+
+
+def test_public_signatures_parse_cython_declarations():
+    signatures = public_signatures("cpdef list fit(double[:, ::1] x not None, int n=3, *args):\n    pass\n")
+    assert [name for name, _ in signatures["fit"]] == ["x", "n", "*args"]
+
+
+def test_memoryview_validator_accepts_boundary_conversion(tmp_path: Path):
+    source = tmp_path / "model.py"
+    source.write_text(SOURCE, encoding="utf-8")
+    generated = tmp_path / "model.pyx"
+    generated.write_text(GOOD_PYX, encoding="utf-8")
+
+    assert memoryview_problems(GOOD_PYX, source) == []
+    assert validate_cython_file(generated)["ok"] is True
+
+
+def test_memoryview_validator_reports_each_problem(tmp_path: Path):
+    source = tmp_path / "model.py"
+    source.write_text(SOURCE, encoding="utf-8")
+
+    problems = "\n".join(memoryview_problems(BAD_PYX, source))
+
+    assert "Bounds checking is never disabled" in problems
+    assert "types 'features' as a memoryview" in problems
+    assert "changed its parameters from (features, weights, bias) to (features, weights)" in problems
+    assert memoryview_problems("def other(x):\n    return x\n", source)[0].startswith("No contiguous")
+
+
+def test_memoryview_profile_prompts_and_repairs(tmp_path: Path):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "model.py").write_text(SOURCE, encoding="utf-8")
+    request = build_run_request(
+        source_root=source,
+        output_root=tmp_path / "out",
+        style="classic",
+        provider="openai",
+        model="gpt-4o-mini",
+        temperature=0.0,
+        max_completion_tokens=4000,
+        exclude=[],
+        include=[],
+        prompt_profile="memoryview",
+        max_attempts=2,
+        maintenance_mode=False,
+        baseline_manifest=None,
+        write_manifest=False,
+        dry_run=False,
+        validation=ValidationRequest(),
+    )
+    pack = load_prompt_pack(RecythonConfig(project_root=tmp_path, prompt_profile="memoryview"))
+    responses = [f"```cython\n{BAD_PYX}\n```", PXD, f"```cython\n{GOOD_PYX}\n```", PXD]
+
+    with patch("recython.ai_calls.completion", side_effect=responses) as completion:
+        result = execute_run_with_pack(request, pack)
+
+    assert "double[:, ::1]" in completion.call_args_list[0].args[0]
+    assert "types 'features' as a memoryview" in completion.call_args_list[2].args[0]
+    attempts = result.validation_results["attempts"][str(source / "model.py")]
+    assert [attempt["ok"] for attempt in attempts] == [False, True]
+    assert result.validation_results["ok"] is True
+
+
+def test_validate_outputs_runs_memoryview_only_for_that_profile(tmp_path: Path):
+    generated = tmp_path / "model.pyx"
+    generated.write_text(BAD_PYX, encoding="utf-8")
+
+    default = validate_outputs([generated], style="classic", python_compile_enabled=True, cython_compile_enabled=False)
+    profiled = validate_outputs(
+        [generated],
+        style="classic",
+        python_compile_enabled=True,
+        cython_compile_enabled=False,
+        prompt_profile="memoryview",
+    )
+
+    assert default["checked"] == 0
+    assert profiled["files"][0]["validator"] == "memoryview"
+    assert profiled["ok"] is False
+
+
+def test_memoryview_validator_skips_modules_without_sequence_code(tmp_path: Path):
+    source = tmp_path / "constants.py"
+    source.write_text("SCALE = 2.0\n\n\ndef scaled(x: float) -> float:\n    return x * SCALE\n", encoding="utf-8")
+    generated = "SCALE = 2.0\n\n\ncpdef double scaled(double x):\n    return x * SCALE\n"
+
+    assert memoryview_problems(generated, source) == []
+    assert memoryview_problems(f"{NO_MEMORYVIEW_MARKER}\n{BAD_PYX}", None) == [
+        "Public function 'score' types 'features' as a memoryview, so list callers break; "
+        "convert at the boundary instead."
+    ]
+
+
+def test_memoryview_profile_checks_pure_pxd_declarations(tmp_path: Path):
+    source = tmp_path / "model.py"
+    source.write_text(SOURCE, encoding="utf-8")
+    pxd = tmp_path / "model.pxd"
+    pxd.write_text("cpdef double score(list features, list weights, double bias=*)\n", encoding="utf-8")
+
+    result = validate_outputs(
+        [pxd],
+        style="pure_pxd",
+        python_compile_enabled=False,
+        cython_compile_enabled=False,
+        prompt_profile="memoryview",
+        sources={pxd: source},
+    )
+
+    (item,) = result["files"]
+    assert item["validator"] == "memoryview"
+    assert "No contiguous typed memoryview" in item["error"]
+    assert "missing or no longer callable" not in item["error"]
@@ -0,0 +1,82 @@
+from pathlib import Path
+from unittest.mock import patch
+
+from recython.benchmarks import results_match
+from recython.config import RecythonConfig
+from recython.engine import build_run_request, execute_run_with_pack
+from recython.jobs import BenchmarkCase, ValidationRequest
+from recython.prompts import load_prompt_pack
+from recython.validation.parallel import NO_PARALLEL_MARKER, parallel_problems, thread_counts
+
+SOURCE = "def total(n):\n    acc = 0.0\n    for i in range(n):\n        acc += i * 0.5\n    return acc\n"
+
+PARALLEL_PYX = """
+from cython.parallel cimport prange
+
+
+def total(n):
+    cdef Py_ssize_t i, count = n
+    cdef double acc = 0.0
+    for i in prange(count, nogil=True):
+        acc += i * 0.5
+    return acc
+"""
+
+
+def test_parallel_problems_require_prange_and_nogil():
+    assert parallel_problems(PARALLEL_PYX) == []
+    assert parallel_problems(f"{NO_PARALLEL_MARKER}\ndef f(x):\n    return x\n") == []
+    problems = parallel_problems("def total(n):\n    return n\n")
+    assert len(problems) == 2
+    assert "prange" in problems[0]
+
+
+def test_results_match_allows_float_drift_only():
+    assert results_match([1.0, {"x": 2.0}], [1.0 + 1e-12, {"x": 2.0}], rel_tol=1e-9)
+    assert not results_match([1.0, 2.0], [1.0], rel_tol=1e-9)
+    assert not results_match({"x": 2.0}, {"x": 2.1}, rel_tol=1e-9)
+    assert not results_match(True, 1)
+    assert 1 in thread_counts()
+
+
+def test_parallel_profile_builds_with_openmp_and_records_scaling(tmp_path: Path):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "core.py").write_text(SOURCE, encoding="utf-8")
+    cases = [BenchmarkCase(name="total", setup="from pkg.core import total", stmt="total(200000)", repeat=2)]
+    request = build_run_request(
+        source_root=source,
+        output_root=tmp_path / "out",
+        style="classic",
+        provider="openai",
+        model="gpt-4o-mini",
+        temperature=0.0,
+        max_completion_tokens=4000,
+        exclude=[],
+        include=[],
+        prompt_profile="parallel",
+        max_attempts=1,
+        maintenance_mode=False,
+        baseline_manifest=None,
+        write_manifest=True,
+        dry_run=False,
+        validation=ValidationRequest(),
+        benchmarks=cases,
+    )
+    pack = load_prompt_pack(RecythonConfig(project_root=tmp_path, prompt_profile="parallel"))
+    responses = [f"```cython\n{PARALLEL_PYX}\n```", "```cython\n# No declarations\n```"]
+
+    with patch("recython.ai_calls.completion", side_effect=responses) as completion:
+        result = execute_run_with_pack(request, pack)
+
+    assert "prange" in completion.call_args_list[0].args[0]
+    assert result.build_results[0]["ok"] is True, result.build_results[0]["error"]
+    assert result.validation_results["ok"] is True, result.validation_results["files"]
+    scaling = result.parallel_results
+    assert scaling["thread_counts"] == thread_counts()
+    (case,) = scaling["cases"]
+    assert case["ok"] is True, case["error"]
+    assert set(case["seconds"]) == {str(count) for count in thread_counts()}
+    assert case["speedup"]["1"] == 1.0
+    assert "## Parallel scaling" in result.report_path.read_text(encoding="utf-8")
+    assert '"parallel_results"' in result.manifest_path.read_text(encoding="utf-8")
@@ -0,0 +1,87 @@
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from recython.build import build_targets_for
+from recython.cli import main
+from recython.jobs import BuildRequest
+from recython.pgo import pgo_args, pgo_wins, profile_key
+
+SOURCE = """def total(n):
+    acc = 0.0
+    for i in range(n):
+        if i % 3:
+            acc += i * 0.5
+        else:
+            acc -= 1.0
+    return acc
+"""
+
+
+def test_pgo_args_per_stage_and_compiler(tmp_path: Path):
+    compile_args, link_args = pgo_args("generate", tmp_path, "gcc")
+    assert compile_args == link_args == [f"-fprofile-generate={tmp_path}"]
+    compile_args, link_args = pgo_args("use", tmp_path, "clang")
+    assert compile_args[0] == f"-fprofile-use={tmp_path}"
+    assert "-Wno-missing-profile" not in compile_args
+    with pytest.raises(ValueError, match="MSVC"):
+        pgo_args("use", tmp_path, "msvc")
+    with pytest.raises(ValueError, match="Unknown PGO stage"):
+        pgo_args("train", tmp_path, "gcc")
+
+
+def test_profile_key_changes_with_source(tmp_path: Path):
+    (tmp_path / "core.py").write_text(SOURCE, encoding="utf-8")
+    targets = build_targets_for(tmp_path, "pkg", [tmp_path / "core.py"])
+    before = profile_key(targets, BuildRequest())
+
+    assert profile_key(targets, BuildRequest(flag_profile="O3")) != before
+    (tmp_path / "core.py").write_text(SOURCE + "\n", encoding="utf-8")
+    assert profile_key(targets, BuildRequest()) != before
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="PGO builds need GCC or Clang")
+def test_pgo_wins_only_when_intervals_separate():
+    plain = [{"ci_low": 0.9, "ci_high": 1.1}, {"ci_low": 1.9, "ci_high": 2.1}]
+    faster = [{"ci_low": 0.6, "ci_high": 0.7}, {"ci_low": 1.6, "ci_high": 1.8}]
+    overlapping = [{"ci_low": 0.7, "ci_high": 1.0}, {"ci_low": 1.8, "ci_high": 2.0}]
+
+    assert pgo_wins(plain, faster) is True
+    assert pgo_wins(plain, overlapping) is False
+
+
+def test_build_pgo_collects_once_and_reports_speedup(tmp_path: Path, capsys):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "core.py").write_text(SOURCE, encoding="utf-8")
+    output_root = tmp_path / "out"
+    output_root.mkdir()
+    (output_root / "core.py").write_text(SOURCE, encoding="utf-8")
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.recython]\nsource = ["pkg"]\noutput_root = "out"\nstyle = "pure"\n\n'
+        "[[tool.recython.benchmarks]]\n"
+        'name = "total"\nsetup = "from pkg.core import total"\nstmt = "total(20000)"\nrepeat = 2\n',
+        encoding="utf-8",
+    )
+    report_path = tmp_path / "build.json"
+
+    with patch("pathlib.Path.cwd", return_value=tmp_path):
+        assert main(["build", "--pgo", "--report-json", str(report_path)]) == 0
+        first = json.loads(report_path.read_text(encoding="utf-8"))["pgo"]
+        assert main(["build", "--pgo", "--report-json", str(report_path)]) == 0
+        second = json.loads(report_path.read_text(encoding="utf-8"))["pgo"]
+
+    assert first["ok"] is True, first["error"]
+    assert first["profile_status"] == "collected"
+    assert second["profile_status"] == "cached"
+    assert second["profile_dir"] == first["profile_dir"]
+    assert (Path(first["profile_dir"]) / "profile.json").exists()
+    (case,) = second["cases"]
+    assert case["name"] == "total"
+    assert case["speedup"] > 0
+    assert case["baseline_ci"][0] <= case["baseline_seconds"] <= case["baseline_ci"][1]
+    assert isinstance(second["kept"], bool)
+    assert "PGO (cached profile, " in capsys.readouterr().out
@@ -0,0 +1,117 @@
+import io
+from pathlib import Path
+from unittest.mock import patch
+
+from recython.config import RecythonConfig
+from recython.engine import build_run_request, execute_run_with_pack
+from recython.jobs import ValidationRequest
+from recython.progress import ProgressDisplay, format_eta
+from recython.prompts import load_prompt_pack
+
+
+def test_run_emits_progress_events(tmp_path: Path):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "a.py").write_text("print('a')", encoding="utf-8")
+    (source / "b.py").write_text("print('b')", encoding="utf-8")
+    request = build_run_request(
+        source_root=source,
+        output_root=tmp_path / "out",
+        style="pure",
+        provider="openai",
+        model="gpt-4o-mini",
+        temperature=0.0,
+        max_completion_tokens=4000,
+        exclude=[],
+        include=[],
+        prompt_profile="default",
+        max_attempts=2,
+        maintenance_mode=False,
+        baseline_manifest=None,
+        write_manifest=False,
+        dry_run=False,
+        validation=ValidationRequest(),
+    )
+    pack = load_prompt_pack(RecythonConfig(project_root=tmp_path))
+    responses = iter(["no fence here", "```python\nx = 1\n```", "```python\ny = 2\n```"])
+
+    def fake_completion(prompt: str, *, usage: dict[str, int], on_backoff, **_kwargs: object) -> str:
+        if len(events) < 3:
+            on_backoff(1, 1.0, TimeoutError())
+        usage.update(prompt_tokens=10, completion_tokens=5, cached_tokens=0, requests=1)
+        return next(responses)
+
+    events: list[dict[str, object]] = []
+    with patch("recython.ai_calls.completion", side_effect=fake_completion):
+        execute_run_with_pack(request, pack, events.append)
+
+    kinds = [event["event"] for event in events]
+    assert kinds[0] == "run_started" and events[0]["files"] == 2
+    assert kinds[-1] == "run_finished"
+    assert kinds.count("backoff") == 1
+    assert [(event["file"], event["attempt"]) for event in events if event["event"] == "attempt_started"] == [
+        ("a.py", 1),
+        ("a.py", 2),
+        ("b.py", 1),
+    ]
+    finished = [event for event in events if event["event"] == "file_finished"]
+    assert [(event["file"], event["ok"], event["attempts"]) for event in finished] == [
+        ("a.py", True, 2),
+        ("b.py", True, 1),
+    ]
+
+
+def test_plain_progress_prints_a_line_per_file_and_backoff():
+    stream = io.StringIO()
+    display = ProgressDisplay(stream)
+
+    display({"event": "run_started", "files": 2})
+    display({"event": "attempt_started", "file": "a.py", "attempt": 1})
+    display(
+        {
+            "event": "backoff",
+            "file": "a.py",
+            "attempt": 1,
+            "label": "pure",
+            "retry": 1,
+            "delay": 2.0,
+            "error": "RateLimitError",
+        }
+    )
+    display(
+        {
+            "event": "llm_finished",
+            "file": "a.py",
+            "attempt": 1,
+            "label": "pure",
+            "seconds": 1.0,
+            "completion_tokens": 40,
+        }
+    )
+    display({"event": "file_finished", "file": "a.py", "ok": False, "attempts": 1, "seconds": 3.0})
+    display({"event": "run_finished", "ok": False})
+
+    backoff, finished = stream.getvalue().splitlines()
+    assert backoff == "backoff a.py (pure): retry 1 in 2.0s after RateLimitError"
+    assert finished.startswith("[1/2] FAILED a.py (1 attempt(s), 3.0s) | 1 failed | ")
+    assert finished.endswith("ETA 0m03s | 1 backoff(s)")
+    assert display.completion_tokens == 40
+
+
+def test_live_progress_redraws_one_status_line():
+    stream = io.StringIO()
+    display = ProgressDisplay(stream, live=True)
+
+    display({"event": "run_started", "files": 3})
+    display({"event": "attempt_started", "file": "a.py", "attempt": 2})
+
+    assert "\n" not in stream.getvalue()
+    assert display.status().startswith("[0/3] 1 in flight (a.py#2) | ")
+    display({"event": "run_finished", "ok": True})
+    assert stream.getvalue().endswith("\n")
+
+
+def test_format_eta():
+    assert format_eta(None) == "--"
+    assert format_eta(75) == "1m15s"
+    assert format_eta(3 * 3600 + 120) == "3h02m"
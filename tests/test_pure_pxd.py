@@ -0,0 +1,114 @@
+from pathlib import Path
+from unittest.mock import patch
+
+from recython.config import RecythonConfig
+from recython.engine import build_run_request, execute_run_with_pack, plan_run
+from recython.jobs import BenchmarkCase, ValidationRequest
+from recython.prompts import load_prompt_pack
+from recython.validation.compile import validate_outputs
+
+SOURCE = "def add(a, b):\n    return a + b\n"
+
+
+def _request(tmp_path: Path, source: Path, **overrides):
+    options = dict(
+        source_root=source,
+        output_root=tmp_path / "out",
+        style="pure_pxd",
+        provider="openai",
+        model="gpt-4o-mini",
+        temperature=0.0,
+        max_completion_tokens=4000,
+        exclude=[],
+        include=[],
+        prompt_profile="default",
+        max_attempts=1,
+        maintenance_mode=False,
+        baseline_manifest=None,
+        write_manifest=False,
+        dry_run=False,
+        validation=ValidationRequest(),
+    )
+    options.update(overrides)
+    return build_run_request(**options)
+
+
+def _package(tmp_path: Path) -> Path:
+    source = tmp_path / "mathpkg"
+    source.mkdir()
+    (source / "arith.py").write_text(SOURCE, encoding="utf-8")
+    return source
+
+
+def test_plan_maps_pure_pxd_to_source_copy_and_sibling_pxd(tmp_path: Path):
+    source = _package(tmp_path)
+
+    result = plan_run(_request(tmp_path, source, dry_run=True))
+
+    outputs = result.planned_files[0].outputs
+    assert [(output.kind, output.path.name) for output in outputs] == [
+        ("pure_source", "arith.py"),
+        ("pure_pxd", "arith.pxd"),
+    ]
+    assert result.prompts_used == ["pure_pxd"]
+
+
+def test_pure_pxd_keeps_python_untouched_and_compiles_against_pxd(tmp_path: Path):
+    source = _package(tmp_path)
+    pack = load_prompt_pack(RecythonConfig(project_root=tmp_path))
+
+    response = "```cython\ncpdef long add(long a, long b)\n```"
+    with patch("recython.ai_calls.completion", return_value=response) as completion:
+        result = execute_run_with_pack(_request(tmp_path, source), pack)
+
+    assert "Python source to augment" in completion.call_args.args[0]
+    assert (tmp_path / "out" / "arith.py").read_text(encoding="utf-8") == SOURCE
+    assert (tmp_path / "out" / "arith.pxd").read_text(encoding="utf-8") == "cpdef long add(long a, long b)"
+    validators = {item["validator"] for item in result.validation_results["files"]}
+    assert "cython_compile" in validators
+    assert result.validation_results["ok"] is True
+
+
+def test_pure_pxd_reports_mismatched_pxd(tmp_path: Path):
+    source = _package(tmp_path)
+    pack = load_prompt_pack(RecythonConfig(project_root=tmp_path))
+
+    with patch("recython.ai_calls.completion", return_value="```cython\ncpdef long add(long x)\n```"):
+        result = execute_run_with_pack(_request(tmp_path, source), pack)
+
+    assert result.validation_results["ok"] is False
+
+
+def test_pure_pxd_validates_subpackage_modules_against_their_pxd(tmp_path: Path):
+    package = tmp_path / "out" / "sub"
+    package.mkdir(parents=True)
+    (package / "__init__.py").write_text("", encoding="utf-8")
+    (package / "helper.pxd").write_text("cdef inline long twice(long x):\n    return 2 * x\n", encoding="utf-8")
+    (package / "arith.py").write_text(SOURCE, encoding="utf-8")
+    pxd = package / "arith.pxd"
+    options = dict(style="pure_pxd", python_compile_enabled=False, cython_compile_enabled=True)
+
+    pxd.write_text("from .helper cimport twice\ncpdef long add(long a, long b)\n", encoding="utf-8")
+    assert validate_outputs([package / "arith.py"], **options)["ok"] is True
+    pxd.write_text("from .helper cimport twice\ncpdef long add(long x)\n", encoding="utf-8")
+    assert validate_outputs([package / "arith.py"], **options)["ok"] is False
+
+
+def test_pure_pxd_builds_and_benchmarks_output(tmp_path: Path):
+    source = _package(tmp_path)
+    pack = load_prompt_pack(RecythonConfig(project_root=tmp_path))
+    request = _request(
+        tmp_path,
+        source,
+        benchmarks=[BenchmarkCase(name="add", setup="from mathpkg.arith import add", stmt="add(1, 2)", repeat=2)],
+    )
+
+    with patch("recython.ai_calls.completion", return_value="```cython\ncpdef long add(long a, long b)\n```"):
+        result = execute_run_with_pack(request, pack)
+
+    assert [item["ok"] for item in result.build_results] == [True]
+    assert Path(result.build_results[0]["path"]).exists()
+    bench = result.benchmark_results[0]
+    assert bench["ok"] is True, bench["error"]
+    assert bench["pure_seconds"] > 0
+    assert bench["compiled_seconds"] > 0
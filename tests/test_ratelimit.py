@@ -0,0 +1,184 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import openai
+import pytest
+
+from recython import ratelimit
+from recython.ai_calls import completion
+from recython.jobs import RateLimitRequest
+from recython.ratelimit import (
+    RateLimiter,
+    SharedBudget,
+    account_key,
+    limiter_for,
+    parse_duration,
+    retry_after,
+)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters():
+    ratelimit.LIMITERS.clear()
+    yield
+    ratelimit.LIMITERS.clear()
+
+
+def test_retry_after_reads_every_header_form():
+    assert parse_duration("6m0s") == 360.0
+    assert parse_duration("1.5") == 1.5
+    assert parse_duration("250ms") == 0.25
+    assert parse_duration("soon") is None
+    assert retry_after({"retry-after-ms": "20", "retry-after": "3"}) == 0.02
+    assert retry_after({"retry-after": "3"}) == 3.0
+    assert retry_after({"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "1m2s"}) == 62.0
+    assert retry_after({"x-ratelimit-remaining-tokens": "10", "x-ratelimit-reset-tokens": "1m2s"}) is None
+
+
+def test_window_grows_with_successes_and_halves_once_per_burst():
+    limiter = RateLimiter(RateLimitRequest(max_concurrency=8))
+    tickets = [limiter.acquire(10) for _ in range(4)]
+    for ticket in tickets[:2]:
+        limiter.release(ticket, tokens_used=10)
+    assert limiter.window == 5  # capped one above the peak in flight
+
+    limiter.release(tickets[2], rate_limited=True, retry_after=0.1)
+    limiter.release(tickets[3], rate_limited=True)  # same burst: no second decrease
+    assert limiter.window == 1.0
+    assert limiter.rate_limited == 2
+
+    started = time.monotonic()
+    limiter.release(limiter.acquire(10), tokens_used=10)
+    assert time.monotonic() - started >= 0.05  # waited out Retry-After
+    assert limiter.snapshot()["window_history"][-1][1] == 2
+
+
+def test_limits_are_learned_from_response_headers():
+    limiter = RateLimiter(RateLimitRequest())
+    ticket = limiter.acquire(100)
+    limiter.release(
+        ticket,
+        headers={
+            "x-ratelimit-limit-requests": "60",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-limit-tokens": "6000",
+            "x-ratelimit-remaining-tokens": "5900",
+        },
+        tokens_used=50,
+    )
+
+    snapshot = limiter.snapshot()
+    assert (snapshot["requests_per_minute"], snapshot["tokens_per_minute"]) == (60.0, 6000.0)
+    assert snapshot["remaining_requests"] == 0.0
+    assert limiter.requests.delay(1) == pytest.approx(1.0, abs=0.05)  # one request per second
+    assert limiter.tokens.delay(100) == 0.0
+
+
+def test_completion_honours_retry_after_from_a_429():
+    error = openai.RateLimitError(
+        "slow down",
+        response=SimpleNamespace(status_code=429, headers={"retry-after-ms": "30"}, request=None),
+        body=None,
+    )
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [
+        error,
+        SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+            usage=SimpleNamespace(prompt_tokens=3, completion_tokens=2, prompt_tokens_details=None),
+        ),
+    ]
+    usage: dict[str, int] = {}
+    delays: list[float] = []
+
+    with patch("recython.ai_calls.get_client", return_value=client):
+        reply = completion(
+            "prompt",
+            usage=usage,
+            rate_limit=RateLimitRequest(),
+            on_backoff=lambda _retry, delay, _error: delays.append(delay),
+        )
+
+    assert reply == "ok"
+    assert delays == [0.03]
+    assert usage["rate_limited"] == 1 and usage["requests"] == 2
+    (snapshot,) = ratelimit.limiter_snapshots().values()
+    assert (snapshot["calls"], snapshot["rate_limited"], snapshot["window"]) == (
+        2,
+        1,
+        2,
+    )  # halved to 1, then +1 on success
+
+
+def test_shared_budget_counts_processes_and_is_drawn_down_by_all(tmp_path: Path):
+    path = tmp_path / "ratelimit.sqlite3"
+    account = account_key("openai", "gpt-4o-mini", "sk-test", None)
+    budget = SharedBudget(path, account)
+    assert budget.take(0, {"requests": 0.0, "tokens": 600.0}) == (0.0, 1, {"requests": 0.0, "tokens": 600.0})
+
+    script = (
+        "import sys\nfrom pathlib import Path\nfrom recython.ratelimit import SharedBudget\n"
+        "budget = SharedBudget(Path(sys.argv[1]), sys.argv[2])\n"
+        "wait, members, _ = budget.take(600, {'requests': 0.0, 'tokens': 0.0})\nprint(wait, members)"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")]))}
+    child = subprocess.run(
+        [sys.executable, "-c", script, str(path), account], env=env, capture_output=True, text=True, check=True
+    )
+    assert child.stdout.split() == ["0.0", "2"]  # learned the limit from the shared row, counted both processes
+
+    wait, members, _ = budget.take(300, {"requests": 0.0, "tokens": 600.0})
+    assert members == 1  # the child left when it exited
+    assert wait == pytest.approx(30.0, abs=1.0)  # 300 tokens at 10 per second
+    assert "sk-test" not in account
+
+
+def test_shared_limiters_split_limits_and_share_retry_after(tmp_path: Path):
+    settings = RateLimitRequest(shared=True, shared_path=tmp_path / "ratelimit.sqlite3")
+    first = limiter_for("openai", "gpt-4o-mini", settings, account="acct")
+    first.release(
+        first.acquire(10),
+        headers={"x-ratelimit-limit-requests": "120", "x-ratelimit-remaining-requests": "119"},
+        tokens_used=10,
+    )
+    first.release(first.acquire(10), rate_limited=True, retry_after=0.3)
+
+    other = RateLimiter(settings, SharedBudget(settings.shared_path, "acct"))
+    other.shared.pid += 1  # a second process drawing on the same account
+    ticket = other.acquire(10)
+
+    assert ticket.waited >= 0.2  # held back by the first process's Retry-After
+    assert other.members == 2
+    assert other.limits["requests"] == 120.0
+    assert other.requests.per_minute == 60.0  # its fair share
+    assert first.snapshot()["shared"] == str(settings.shared_path)
+
+
+def test_shared_reservation_runs_outside_the_lock_and_a_429_refunds_tokens(tmp_path: Path):
+    settings = RateLimitRequest(tokens_per_minute=1000, shared=True, shared_path=tmp_path / "ratelimit.sqlite3")
+    limiter = RateLimiter(settings, SharedBudget(settings.shared_path, "acct"))
+    take = limiter.shared.take
+
+    def take_while_probing(tokens, limits):
+        probe = threading.Thread(target=limiter.snapshot)
+        probe.start()
+        probe.join(timeout=2)
+        assert not probe.is_alive(), "shared.take must not run under the limiter lock"
+        return take(tokens, limits)
+
+    with patch.object(limiter.shared, "take", side_effect=take_while_probing):
+        ticket = limiter.acquire(400)
+    limiter.release(ticket, rate_limited=True)
+
+    assert limiter.tokens.level == pytest.approx(1000, abs=1)
+    (shared_tokens,) = sqlite3.connect(settings.shared_path).execute("SELECT tokens FROM budgets").fetchone()
+    assert shared_tokens == pytest.approx(1000, abs=1)
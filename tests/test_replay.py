@@ -0,0 +1,98 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from recython import ai_calls
+from recython.ai_calls import ReplayMiss, completion, prompt_hash
+from recython.config import RecythonConfig
+from recython.engine import build_run_request, execute_run_with_pack
+from recython.jobs import ReplayRequest, ValidationRequest
+from recython.prompts import load_prompt_pack
+
+
+@pytest.fixture(autouse=True)
+def fresh_cassettes():
+    ai_calls.CASSETTES.clear()
+    yield
+    ai_calls.CASSETTES.clear()
+
+
+def _client(*replies: str) -> MagicMock:
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [
+        SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))]) for reply in replies
+    ]
+    return client
+
+
+def test_record_then_replay_strict_and_fallthrough(tmp_path: Path):
+    cassette = tmp_path / "cassette.jsonl"
+    with patch("recython.ai_calls.get_client", return_value=_client("first")):
+        assert completion("prompt one", record_path=cassette) == "first"
+
+    (entry,) = [json.loads(line) for line in cassette.read_text(encoding="utf-8").splitlines()]
+    assert entry["prompt_hash"] == prompt_hash("prompt one")
+    assert entry["response"] == "first"
+
+    usage: dict[str, int] = {}
+    with patch("recython.ai_calls.get_client", side_effect=AssertionError("no network on a hit")):
+        assert completion("prompt one", provider="replay", replay_source=cassette, usage=usage) == "first"
+        with pytest.raises(ReplayMiss):
+            completion("prompt two", provider="replay", replay_source=cassette)
+    assert usage["replayed"] == 1
+
+    with patch("recython.ai_calls.get_client", return_value=_client("second")) as get_client:
+        reply = completion(
+            "prompt two",
+            provider="replay",
+            replay_source=cassette,
+            replay_mode="fallthrough",
+            fallthrough_provider="openrouter",
+            record_path=cassette,
+        )
+    assert reply == "second"
+    assert get_client.call_args.args == ("openrouter",)
+    assert len(cassette.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_replay_run_directory_reproduces_outputs_without_the_provider(tmp_path: Path):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "module.py").write_text("print('hi')", encoding="utf-8")
+
+    def run(output: str, **overrides: object):
+        request = build_run_request(
+            source_root=source,
+            output_root=tmp_path / output,
+            style="pure",
+            provider=str(overrides.pop("provider", "openai")),
+            model="gpt-4o-mini",
+            temperature=0.0,
+            max_completion_tokens=4000,
+            exclude=[],
+            include=[],
+            prompt_profile="default",
+            max_attempts=1,
+            maintenance_mode=False,
+            baseline_manifest=None,
+            write_manifest=True,
+            dry_run=False,
+            validation=ValidationRequest(),
+            **overrides,
+        )
+        return execute_run_with_pack(request, load_prompt_pack(RecythonConfig(project_root=tmp_path)))
+
+    with patch("recython.ai_calls.get_client", return_value=_client("```python\nprint('converted')\n```")):
+        recorded = run("first")
+    with patch("recython.ai_calls.get_client", side_effect=AssertionError("no network on a hit")):
+        replayed = run("second", provider="replay", replay=ReplayRequest(source=recorded.artifacts_dir))
+
+    assert (tmp_path / "second" / "module.py").read_text(encoding="utf-8") == "print('converted')"
+    assert replayed.validation_results["ok"] is True
+    assert replayed.telemetry.summary["tokens"]["calls"] == 1
+
+    with pytest.raises(ValueError, match="replay provider needs"):
+        run("third", provider="replay")
@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from recython.benchmarks import expand_cases, grid_name
+from recython.cli import main
+from recython.jobs import BenchmarkCase
+from recython.scaling import fit_complexity, render_scaling_chart, scaling_curve
+
+PAIRS = "def pairs(n):\n    return sum(i * j for i in range(n) for j in range(n))\n"
+
+
+def test_fit_complexity_recovers_the_growth_class():
+    sizes = [10, 100, 1000, 10000]
+
+    quadratic = fit_complexity(sizes, [2e-9 * n * n for n in sizes])
+    assert quadratic["best_fit"] == "O(n^2)"
+    assert quadratic["exponent"] == pytest.approx(2.0)
+    assert quadratic["r_squared"] == pytest.approx(1.0)
+    assert fit_complexity(sizes, [1e-6 * n for n in sizes])["best_fit"] == "O(n)"
+    assert fit_complexity(sizes, [3e-7] * 4)["best_fit"] == "O(1)"
+    assert fit_complexity([10, 10], [1.0, 2.0]) is None
+
+
+def test_expand_cases_binds_each_grid_point():
+    case = BenchmarkCase(name="fit", stmt="fit(n)", setup="from pkg import fit", params={"n": [10, 100], "k": [2]})
+
+    points = expand_cases([case, BenchmarkCase(name="plain", stmt="1")])
+
+    assert [point.name for point in points] == ["fit[n=10,k=2]", "fit[n=100,k=2]", "plain"]
+    assert points[1].setup == "n = 100\nk = 2\nfrom pkg import fit"
+    assert points[1].point == {"n": 100, "k": 2}
+    assert points[1].params == {}
+    assert {grid_name(point) for point in points} == {"fit", "plain"}
+    assert expand_cases(points) == points
+    with pytest.raises(ValueError, match="invalid parameter name"):
+        expand_cases([BenchmarkCase(name="bad", stmt="1", params={"not valid": [1]})])
+
+
+def test_render_scaling_chart_draws_speedup_bars():
+    curve = scaling_curve(
+        "fit",
+        "n",
+        [
+            {"size": 10, "pure_seconds": 1e-5, "compiled_seconds": 5e-6, "speedup": 2.0},
+            {"size": 100, "pure_seconds": 1e-3, "compiled_seconds": 2.5e-4, "speedup": 4.0},
+        ],
+    )
+
+    chart = render_scaling_chart([curve], width=8)
+
+    assert chart.startswith("fit (by n)\n  pure O(n^2) (exponent 2.00)")
+    assert "2.00x |####\n" in chart
+    assert chart.endswith("4.00x |########\n")
+
+
+def test_bench_command_reports_scaling_curves(tmp_path: Path, capsys):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "__init__.py").write_text("", encoding="utf-8")
+    (source / "core.py").write_text(PAIRS, encoding="utf-8")
+    (tmp_path / "out").mkdir()
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.recython]\nsource = ["pkg"]\noutput_root = "out"\n\n'
+        "[tool.recython.bench]\nprocesses = 1\nmin_time = 0.002\nmemory = false\nhistory = false\n\n"
+        '[[tool.recython.benchmarks]]\nname = "pairs"\nsetup = "from pkg.core import pairs"\nstmt = "pairs(n)"\n'
+        "repeat = 3\nparams = { n = [10, 40, 160] }\n",
+        encoding="utf-8",
+    )
+    report_path = tmp_path / "bench.json"
+
+    with patch("pathlib.Path.cwd", return_value=tmp_path):
+        assert main(["bench", "--case", "pairs", "--report-json", str(report_path)]) == 0
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert [case["params"] for case in report["cases"]] == [{"n": 10}, {"n": 40}, {"n": 160}]
+    (curve,) = report["scaling"]
+    assert curve["case"] == "pairs"
+    assert curve["axis"] == "n"
+    assert [point["size"] for point in curve["points"]] == [10, 40, 160]
+    assert curve["pure_fit"]["exponent"] > 1.5
+    assert "pairs (by n)" in capsys.readouterr().out
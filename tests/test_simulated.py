@@ -0,0 +1,108 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from recython import ai_calls, ratelimit
+from recython.ai_calls import completion
+from recython.config import RecythonConfig
+from recython.engine import build_run_request, execute_run_with_pack
+from recython.jobs import SimulatedRequest, ValidationRequest
+from recython.prompts import load_prompt_pack
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters():
+    ratelimit.LIMITERS.clear()
+    yield
+    ratelimit.LIMITERS.clear()
+
+
+def test_simulated_replies_are_canned_and_deterministic(tmp_path: Path):
+    replies = [tmp_path / "a.pyx", tmp_path / "b.pyx"]
+    replies[0].write_text("cdef int a = 1", encoding="utf-8")
+    replies[1].write_text("cdef int b = 2", encoding="utf-8")
+    settings = SimulatedRequest(responses=replies, latency="fixed", latency_median=0.0)
+    usage: dict[str, int] = {}
+
+    first = completion("prompt", provider="simulated", simulated=settings, usage=usage)
+
+    assert first == completion("prompt", provider="simulated", simulated=settings)
+    assert first.strip("`\n").removeprefix("cython\n") in {"cdef int a = 1", "cdef int b = 2"}
+    assert usage["requests"] == 1 and usage["completion_tokens"] > 0
+
+
+def test_simulated_rate_limits_are_retried():
+    settings = SimulatedRequest(latency="fixed", latency_median=0.0, rate_limit_rate=1.0, retry_after=0.5)
+    retries: list[tuple[int, float, BaseException]] = []
+
+    with pytest.raises(ai_calls.SimulatedAPIError) as excinfo:
+        completion(
+            "prompt",
+            provider="simulated",
+            simulated=settings,
+            max_retries=2,
+            on_backoff=lambda retry, delay, error: retries.append((retry, delay, error)),
+        )
+
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.headers == {"retry-after": "0.5"}
+    assert [(retry, delay) for retry, delay, _error in retries] == [
+        (1, 0.5)
+    ]  # Retry-After, not the exponential backoff
+
+
+def test_seeded_draws_do_not_depend_on_call_order(monkeypatch):
+    settings = SimulatedRequest(latency="lognormal", latency_median=0.01, latency_spread=0.5, seed=7)
+
+    def latencies(order: list[str]) -> dict[str, float]:
+        slept: dict[str, float] = {}
+        for prompt in order:
+            monkeypatch.setattr(ai_calls, "_sleep", lambda seconds, cancel, key=prompt: slept.__setitem__(key, seconds))
+            completion(prompt, provider="simulated", simulated=settings)
+        return slept
+
+    assert latencies(["a", "b", "c"]) == latencies(["c", "b", "a"])
+
+
+def test_concurrency_overlaps_simulated_calls(tmp_path: Path):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    for name in "abcd":
+        (source / f"{name}.py").write_text(f"{name} = 1", encoding="utf-8")
+
+    def run(concurrency: int) -> tuple[float, list[dict[str, object]]]:
+        request = build_run_request(
+            source_root=source,
+            output_root=tmp_path / f"out{concurrency}",
+            style="classic",
+            provider="simulated",
+            model="simulated",
+            temperature=0.0,
+            max_completion_tokens=4000,
+            exclude=[],
+            include=[],
+            prompt_profile="default",
+            max_attempts=1,
+            maintenance_mode=False,
+            baseline_manifest=None,
+            write_manifest=False,
+            dry_run=False,
+            validation=ValidationRequest(python_compile=False, ruff=False),
+            simulated=SimulatedRequest(latency="fixed", latency_median=0.2),
+            concurrency=concurrency,
+        )
+        events: list[dict[str, object]] = []
+        started = time.perf_counter()
+        execute_run_with_pack(request, load_prompt_pack(RecythonConfig(project_root=tmp_path)), events.append)
+        return time.perf_counter() - started, events
+
+    serial, _ = run(1)
+    parallel, events = run(4)
+
+    assert serial >= 0.8
+    assert parallel < serial * 0.6
+    finished = [event for event in events if event["event"] == "file_finished"]
+    assert sorted(event["file"] for event in finished) == ["a.py", "b.py", "c.py", "d.py"]
+    assert all(event["ok"] for event in finished)
+    assert (tmp_path / "out4" / "c.pyx").exists()
@@ -0,0 +1,110 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from recython import ai_calls
+from recython.config import RecythonConfig
+from recython.engine import build_run_request, execute_run_with_pack
+from recython.jobs import ValidationRequest
+from recython.prompts import load_prompt_pack
+from recython.telemetry import Telemetry, trace_events
+
+
+def test_summarize_rolls_spans_up_per_phase_file_and_validator():
+    telemetry = Telemetry(origin=100.0)
+    telemetry.add("plan", "plan", start=100.0, seconds=0.5)
+    telemetry.add("llm", "pure", start=100.5, seconds=2.0, file="a.py", attempt=1, prompt_tokens=90, cached_tokens=40)
+    telemetry.add("validate", "validate", start=102.5, seconds=0.3, file="a.py", attempt=1)
+    telemetry.add("validator", "python_compile", start=102.5, seconds=0.1, file="a.py", attempt=1)
+    telemetry.add("llm", "pure", start=102.8, seconds=1.0, file="a.py", attempt=2, completion_tokens=12)
+
+    summary = telemetry.summarize()
+
+    assert summary["total_seconds"] == pytest.approx(3.8)
+    assert summary["phases"]["llm"] == {"count": 2, "seconds": pytest.approx(3.0)}
+    assert summary["validators"] == {"python_compile": {"count": 1, "seconds": pytest.approx(0.1)}}
+    assert summary["tokens"] == {"prompt_tokens": 90, "completion_tokens": 12, "cached_tokens": 40, "calls": 2}
+    row = summary["files"]["a.py"]
+    assert row["attempts"] == 2
+    assert row["seconds"] == pytest.approx(3.3)  # validator spans sit inside their validate span
+    assert row["phases"] == pytest.approx({"llm": 3.0, "validate": 0.3})
+
+
+def test_trace_events_use_one_lane_per_file():
+    telemetry = Telemetry(origin=0.0)
+    telemetry.add("plan", "plan", start=0.0, seconds=0.25)
+    telemetry.add("llm", "pure", start=0.25, seconds=1.0, file="a.py", attempt=1, prompt_tokens=5)
+
+    trace = trace_events(telemetry.spans)
+
+    metadata = [event for event in trace["traceEvents"] if event["ph"] == "M"]
+    assert [event["args"]["name"] for event in metadata] == ["run", "a.py"]
+    plan, llm = (event for event in trace["traceEvents"] if event["ph"] == "X")
+    assert (plan["tid"], plan["ts"], plan["dur"]) == (0, 0.0, 250000.0)
+    assert (llm["tid"], llm["cat"], llm["ts"]) == (1, "llm", 250000.0)
+    assert llm["args"] == {"prompt_tokens": 5, "attempt": 1}
+
+
+def test_completion_reports_token_usage():
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+        usage=SimpleNamespace(
+            prompt_tokens=120, completion_tokens=30, prompt_tokens_details=SimpleNamespace(cached_tokens=64)
+        ),
+    )
+    client = MagicMock()
+    client.chat.completions.create.return_value = response
+    usage: dict[str, int] = {}
+
+    with patch("recython.ai_calls.get_client", return_value=client):
+        assert ai_calls.completion("hi", usage=usage) == "ok"
+
+    assert usage == {"prompt_tokens": 120, "completion_tokens": 30, "cached_tokens": 64, "requests": 1}
+
+
+def test_run_records_telemetry_in_manifest_report_and_trace(tmp_path: Path):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "module.py").write_text("print('hi')", encoding="utf-8")
+    request = build_run_request(
+        source_root=source,
+        output_root=tmp_path / "out",
+        style="pure",
+        provider="openai",
+        model="gpt-4o-mini",
+        temperature=0.0,
+        max_completion_tokens=4000,
+        exclude=[],
+        include=[],
+        prompt_profile="default",
+        max_attempts=1,
+        maintenance_mode=False,
+        baseline_manifest=None,
+        write_manifest=True,
+        dry_run=False,
+        chrome_trace=True,
+        validation=ValidationRequest(),
+    )
+    pack = load_prompt_pack(RecythonConfig(project_root=tmp_path))
+
+    def fake_completion(prompt: str, *, usage: dict[str, int], **_kwargs: object) -> str:
+        usage.update(prompt_tokens=len(prompt), completion_tokens=7, cached_tokens=3, requests=1)
+        return "```python\nprint('converted')\n```"
+
+    with patch("recython.ai_calls.completion", side_effect=fake_completion):
+        result = execute_run_with_pack(request, pack)
+
+    manifest = json.loads(result.manifest_path.read_text(encoding="utf-8"))
+    summary = manifest["telemetry"]["summary"]
+    assert set(summary["phases"]) == {"plan", "render", "llm", "extract", "validate", "validator"}
+    assert summary["tokens"]["completion_tokens"] == 7
+    assert summary["tokens"]["cached_tokens"] == 3
+    assert summary["files"]["module.py"]["attempts"] == 1
+    assert set(summary["validators"]) == {"python_compile"}
+    assert "## Telemetry" in result.report_path.read_text(encoding="utf-8")
+    assert result.trace_path == result.artifacts_dir / "trace.json"
+    trace = json.loads(result.trace_path.read_text(encoding="utf-8"))
+    assert {event["cat"] for event in trace["traceEvents"] if event["ph"] == "X"} >= {"llm", "validator"}
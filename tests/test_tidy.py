@@ -1,4 +1,4 @@
-from recython.tidy import extract_code_block, run
+from recython.tidy import extract_code_block, extract_code_blocks, run
 
 
 def test_extract_code_block():
@@ -15,3 +15,13 @@ def test_extract_code_block():
 
 def test_run():
     run()
+
+
+def test_extract_code_blocks_by_name():
+    text = (
+        "Here you go:\n"
+        "```cython file=pkg/a.py\ncdef int a = 1\n```\n"
+        "```python\nunnamed = True\n```\n"
+        "```cython pkg/b.py\nb = 2\n```\n"
+    )
+    assert extract_code_blocks(text) == {"pkg/a.py": "cdef int a = 1", "pkg/b.py": "b = 2"}
@@ -0,0 +1,144 @@
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from recython.cli import main
+from recython.config import RecythonConfig
+from recython.engine import build_run_request, execute_run_with_pack
+from recython.jobs import ValidationRequest
+from recython.prompts import load_prompt_pack
+from recython.tracing import (
+    TypeTracer,
+    describe_type,
+    merge_type_evidence,
+    render_type_evidence,
+    run_traced_command,
+)
+
+WORKLOAD = """
+def scale(values, factor):
+    total = 0.0
+    for value in values:
+        total += value * factor
+    return total
+
+
+scale([1.0, 2.0], 3)
+scale([1, 2], 2)
+"""
+
+
+def test_describe_type_peeks_into_builtin_containers():
+    assert describe_type(1.5) == "float"
+    assert describe_type(None) == "None"
+    assert describe_type([[1.0, 2.0]]) == "list[list[float]]"
+    assert describe_type({"a": 1}) == "dict[str, int]"
+    assert describe_type((1, "x")) == "tuple[int, str]"
+    assert describe_type([]) == "list"
+
+
+def test_trace_records_args_returns_and_locals(tmp_path: Path):
+    script = tmp_path / "workload.py"
+    script.write_text(WORKLOAD, encoding="utf-8")
+
+    tracer = TypeTracer([tmp_path])
+    exit_code = run_traced_command([str(script)], tracer)
+    evidence = tracer.to_evidence(tmp_path)
+
+    assert exit_code == 0
+    record = evidence["modules"]["workload.py"]["scale"]
+    assert record["calls"] == 2
+    assert record["args"]["values"] == {"list[float]": 1, "list[int]": 1}
+    assert record["args"]["factor"] == {"int": 2}
+    assert record["return"] == {"float": 2}
+    assert "total" in record["locals"]
+
+
+def test_trace_stops_sampling_after_cap(tmp_path: Path):
+    script = tmp_path / "loop.py"
+    script.write_text("def f(x):\n    return x\n\nfor i in range(50):\n    f(i)\n", encoding="utf-8")
+
+    tracer = TypeTracer([tmp_path], max_samples=5)
+    run_traced_command([str(script)], tracer)
+
+    assert tracer.to_evidence(tmp_path)["modules"]["loop.py"]["f"]["calls"] == 5
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="sys.monitoring needs Python 3.12")
+def test_trace_falls_back_to_setprofile_when_profiler_id_is_taken(tmp_path: Path):
+    script = tmp_path / "workload.py"
+    script.write_text(WORKLOAD, encoding="utf-8")
+    monitoring = sys.monitoring
+    monitoring.use_tool_id(monitoring.PROFILER_ID, "other-profiler")
+    try:
+        tracer = TypeTracer([tmp_path])
+        run_traced_command([str(script)], tracer)
+    finally:
+        monitoring.free_tool_id(monitoring.PROFILER_ID)
+
+    assert tracer.to_evidence(tmp_path)["modules"]["workload.py"]["scale"]["calls"] == 2
+
+
+def test_merge_and_render_type_evidence(tmp_path: Path):
+    first = {
+        "version": 1,
+        "root": str(tmp_path),
+        "modules": {"mod.py": {"f": {"calls": 1, "args": {"x": {"int": 1}}, "return": {"int": 1}, "locals": {}}}},
+    }
+    second = {
+        "version": 1,
+        "root": str(tmp_path),
+        "modules": {"mod.py": {"f": {"calls": 3, "args": {"x": {"float": 3}}, "return": {"float": 3}, "locals": {}}}},
+    }
+    merged = merge_type_evidence(first, second)
+
+    assert merged["modules"]["mod.py"]["f"]["calls"] == 4
+    rendered = render_type_evidence(merged, tmp_path / "mod.py")
+    assert "f(x: float | int) -> float | int" in rendered
+    assert render_type_evidence(merged, tmp_path / "other.py") == ""
+
+
+def test_trace_command_writes_types_json_and_convert_uses_it(tmp_path: Path, capsys):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "module.py").write_text(WORKLOAD, encoding="utf-8")
+    (tmp_path / "pyproject.toml").write_text('[tool.recython]\nsource = ["pkg"]\n', encoding="utf-8")
+
+    with patch("pathlib.Path.cwd", return_value=tmp_path):
+        exit_code = main(["trace", "--", str(source / "module.py")])
+
+    types_path = tmp_path / ".recython" / "types.json"
+    assert exit_code == 0
+    assert "Recorded types for" in capsys.readouterr().out
+    assert "scale" in json.loads(types_path.read_text(encoding="utf-8"))["modules"]["pkg/module.py"]
+
+    request = build_run_request(
+        source_root=source,
+        output_root=tmp_path / "out",
+        style="pure",
+        provider="openai",
+        model="gpt-4o-mini",
+        temperature=0.0,
+        max_completion_tokens=4000,
+        exclude=[],
+        include=[],
+        prompt_profile="default",
+        max_attempts=1,
+        maintenance_mode=False,
+        baseline_manifest=None,
+        write_manifest=False,
+        dry_run=False,
+        validation=ValidationRequest(),
+        type_evidence=types_path,
+    )
+    pack = load_prompt_pack(RecythonConfig(project_root=tmp_path))
+
+    with patch("recython.ai_calls.completion", return_value="```python\nx = 1\n```") as completion:
+        execute_run_with_pack(request, pack)
+
+    prompt = completion.call_args.args[0]
+    assert "Observed runtime types" in prompt
+    assert "scale(values: " in prompt
@@ -0,0 +1,183 @@
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from recython.build import flag_profile_args
+from recython.cli import main
+from recython.jobs import BuildRequest
+from recython.tune import (
+    apply_directive_header,
+    apply_stored_directives,
+    flags_path,
+    load_flags,
+    load_tuning,
+    save_flags,
+    tune_module,
+    tuning_key,
+    tuning_path,
+)
+
+SOURCE = "def last(values):\n    return values[-1]\n"
+
+# With bounds checking on, wraparound=False makes view[-1] raise IndexError, so
+# that candidate must be rejected as unsafe even if it were faster.
+GENERATED = """# cython: language_level=3, boundscheck=True
+import array
+
+
+def last(values):
+    cdef double[::1] view = array.array("d", values)
+    return view[-1]
+"""
+
+
+def test_apply_directive_header_replaces_only_tunable_directives():
+    updated = apply_directive_header(GENERATED, {"cdivision": True})
+
+    assert updated.startswith("# cython: cdivision=True\n# cython: language_level=3\nimport array")
+    assert apply_directive_header(updated, {}).startswith("# cython: language_level=3\n")
+
+
+def test_tune_rejects_unsafe_directives_stores_results_and_skips_when_current(tmp_path: Path, capsys):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "core.py").write_text(SOURCE, encoding="utf-8")
+    output_root = tmp_path / "out"
+    output_root.mkdir()
+    (output_root / "core.pyx").write_text(GENERATED, encoding="utf-8")
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.recython]\nsource = ["pkg"]\noutput_root = "out"\nstyle = "classic"\n\n'
+        "[[tool.recython.benchmarks]]\n"
+        'name = "last"\nsetup = "from pkg.core import last"\nstmt = "last([1.0, 2.0, 3.0])"\nmodule = "core"\n',
+        encoding="utf-8",
+    )
+    report_path = tmp_path / "tune.json"
+
+    with (
+        patch("pathlib.Path.cwd", return_value=tmp_path),
+        patch.dict("recython.tune.TUNABLE_DIRECTIVES", {"wraparound": (True, False)}, clear=True),
+    ):
+        assert main(["tune", "--report-json", str(report_path)]) == 0
+        assert main(["tune"]) == 0
+
+    (result,) = json.loads(report_path.read_text(encoding="utf-8"))
+    assert result["status"] == "tuned"
+    assert result["directives"] == {}
+    baseline, wraparound = result["trials"]
+    assert baseline["safe"] is True
+    assert wraparound["directives"] == {"wraparound": False}
+    assert wraparound["safe"] is False
+    assert "out of bounds" in wraparound["error"].lower()
+    generated = (output_root / "core.pyx").read_text(encoding="utf-8")
+    assert generated.startswith("# cython: language_level=3, boundscheck=True\n")
+    assert "core [up-to-date]" in capsys.readouterr().out
+
+    store = load_tuning(tuning_path(output_root, "pkg"))
+    assert store["core"]["directives"] == {}
+
+
+def test_apply_stored_directives_reapplies_to_regenerated_output(tmp_path: Path):
+    output = tmp_path / "core.pyx"
+    output.write_text("def f():\n    return 1\n", encoding="utf-8")
+    store = {"core": {"directives": {"boundscheck": False, "cdivision": True}}}
+
+    assert apply_stored_directives(output, "core", store) == {"boundscheck": False, "cdivision": True}
+    assert output.read_text(encoding="utf-8").startswith("# cython: boundscheck=False, cdivision=True\ndef f():")
+    assert apply_stored_directives(output, "other", store) is None
+
+
+def test_tuning_key_names_package_init_like_benchmark_cases(tmp_path: Path):
+    assert tuning_key(tmp_path, "pkg", tmp_path / "sub" / "__init__.pyx") == "sub"
+    assert tuning_key(tmp_path, "pkg", tmp_path / "sub" / "core.pyx") == "sub.core"
+    assert tuning_key(tmp_path, "pkg", tmp_path / "__init__.pyx") == "__init__"
+
+
+def test_tune_module_restores_source_when_a_trial_fails(tmp_path: Path):
+    output_root = tmp_path / "out"
+    output_root.mkdir()
+    generated = output_root / "core.pyx"
+    generated.write_text(GENERATED, encoding="utf-8")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "core.py").write_text(SOURCE, encoding="utf-8")
+    baseline = {"seconds": 1.0, "ci_low": 0.9, "ci_high": 1.1, "safe": True, "error": None}
+
+    with (
+        patch("recython.tune._run_trial", side_effect=[baseline, KeyboardInterrupt]),
+        pytest.raises(KeyboardInterrupt),
+    ):
+        tune_module(
+            generated,
+            [],
+            output_root=output_root,
+            package_name="pkg",
+            source_root=tmp_path / "pkg",
+            style="classic",
+            build=BuildRequest(),
+        )
+
+    assert generated.read_text(encoding="utf-8") == GENERATED
+
+
+def test_flag_profile_args_rejects_unknown_profiles():
+    compile_args, link_args = flag_profile_args("lto")
+    assert compile_args and link_args
+    with pytest.raises(ValueError, match="Unknown flag profile 'fastest'"):
+        flag_profile_args("fastest")
+
+
+def test_build_flag_search_benchmarks_each_profile(tmp_path: Path, capsys):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "core.py").write_text("def total(n):\n    return sum(i * 0.5 for i in range(n))\n", encoding="utf-8")
+    output_root = tmp_path / "out"
+    output_root.mkdir()
+    (output_root / "core.pyx").write_text(
+        "def total(int n):\n    cdef double acc = 0.0\n    cdef int i\n"
+        "    for i in range(n):\n        acc += i * 0.5\n    return acc\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.recython]\nsource = ["pkg"]\noutput_root = "out"\nstyle = "classic"\n\n'
+        "[[tool.recython.benchmarks]]\n"
+        'name = "total"\nsetup = "from pkg.core import total"\nstmt = "total(1000)"\nmodule = "core"\nrepeat = 2\n',
+        encoding="utf-8",
+    )
+    report_path = tmp_path / "build.json"
+
+    with patch("pathlib.Path.cwd", return_value=tmp_path):
+        code = main(["build", "--flag-search", "default", "lto", "--report-json", str(report_path)])
+
+    assert code == 0
+    (flags,) = json.loads(report_path.read_text(encoding="utf-8"))["flags"]
+    assert flags["status"] == "tuned"
+    assert [trial["profile"] for trial in flags["trials"]] == ["default", "lto"]
+    assert all(trial["safe"] for trial in flags["trials"]), flags["trials"]
+    assert all(trial["ci_low"] <= trial["seconds"] <= trial["ci_high"] for trial in flags["trials"])
+    assert flags["profile"] in {"default", "lto"}
+    assert flags["compile_args"] == flag_profile_args(flags["profile"])[0]
+    assert "Compiler flags:" in capsys.readouterr().out
+    assert load_flags(flags_path(output_root, "pkg"))["core"]["profile"] == flags["profile"]
+
+
+def test_build_applies_stored_flag_profiles_unless_overridden(tmp_path: Path):
+    source = tmp_path / "pkg"
+    source.mkdir()
+    (source / "core.py").write_text(SOURCE, encoding="utf-8")
+    output_root = tmp_path / "out"
+    output_root.mkdir()
+    (output_root / "core.pyx").write_text("def last(values):\n    return values[-1]\n", encoding="utf-8")
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.recython]\nsource = ["pkg"]\noutput_root = "out"\nstyle = "classic"\n', encoding="utf-8"
+    )
+    save_flags(flags_path(output_root, "pkg"), {"core": {"profile": "O3"}})
+
+    with (
+        patch("pathlib.Path.cwd", return_value=tmp_path),
+        patch("recython.backends.flag_profile_args", wraps=flag_profile_args) as profile_args,
+    ):
+        assert main(["build"]) == 0
+        assert main(["build", "--flag-profile", "default"]) == 0
+
+    assert [call.args[0] for call in profile_args.call_args_list] == ["O3", "default"]